@@ -0,0 +1,111 @@
+import hmac
+import logging
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from app.models import CollectionActivateRequest
+from app.core.config import settings
+from app.core.dependencies import get_index_service
+from app.core.executor import run_blocking
+from app.services.index_service import IndexBusyError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _verificar_token(x_admin_token: Optional[str]):
+    """
+    Valida el token de administración.
+
+    Raises:
+        HTTPException 403: Si ADMIN_TOKEN no está configurado o el token no coincide
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="API de administración deshabilitada. Configura ADMIN_TOKEN")
+
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Token de administración inválido")
+
+
+@router.get("/collections")
+async def get_collections(x_admin_token: Optional[str] = Header(None)):
+    """Versiones de la colección, versión publicada y estado de la última construcción."""
+    _verificar_token(x_admin_token)
+    index_service = await run_blocking(get_index_service)
+    return await run_blocking(index_service.status)
+
+
+@router.post("/collections/build", status_code=202)
+async def build_collection(
+    activate: bool = True,
+    full: bool = False,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Construye la siguiente versión de la colección en segundo plano.
+
+    La versión publicada se sigue sirviendo durante la construcción. Con
+    activate=True la nueva versión se publica al terminar; el resultado se
+    consulta en GET /admin/collections.
+
+    Args:
+        activate: Publicar la versión al terminar de construirla
+        full: Regenerar todos los embeddings en vez de solo los cambios
+
+    Raises:
+        HTTPException 409: Si ya hay una construcción en curso (en cualquier worker)
+    """
+    _verificar_token(x_admin_token)
+    index_service = await run_blocking(get_index_service)
+
+    if not index_service.start_build(activate=activate, incremental=not full):
+        raise HTTPException(status_code=409, detail="Ya hay una construcción en curso")
+
+    logger.info(f"🏗️ Construcción de versión iniciada (activate={activate}, full={full})")
+    return await run_blocking(index_service.status)
+
+
+@router.post("/collections/activate")
+async def activate_collection(
+    request: CollectionActivateRequest,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Publica una versión existente de la colección.
+
+    Raises:
+        HTTPException 404: Si la versión no existe
+        HTTPException 409: Si hay una construcción o publicación en curso
+    """
+    _verificar_token(x_admin_token)
+    index_service = await run_blocking(get_index_service)
+
+    try:
+        publicada = await run_blocking(index_service.activate, request.version)
+    except IndexBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not publicada:
+        raise HTTPException(status_code=404, detail=f"La versión '{request.version}' no existe")
+
+    return await run_blocking(index_service.status)
+
+
+@router.post("/collections/rollback")
+async def rollback_collection(x_admin_token: Optional[str] = Header(None)):
+    """
+    Vuelve a publicar la versión anterior de la colección.
+
+    Raises:
+        HTTPException 409: Si no hay versión anterior o hay una construcción en curso
+    """
+    _verificar_token(x_admin_token)
+    index_service = await run_blocking(get_index_service)
+
+    try:
+        version = await run_blocking(index_service.rollback)
+    except IndexBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if version is None:
+        raise HTTPException(status_code=409, detail="No hay versión anterior a la que volver")
+
+    return await run_blocking(index_service.status)
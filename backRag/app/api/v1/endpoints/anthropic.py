@@ -4,12 +4,46 @@ from fastapi import APIRouter, HTTPException
 from app.models import AnthropicRequest, AnthropicResponse
 from app.core.dependencies import get_anthropic_service, get_tool_manager
 from app.core.config import settings
+from app.core.readiness import require_ready
+from app.utils.sse import sse_event, sse_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _validar_request(request: AnthropicRequest):
+    """
+    Valida los campos obligatorios de un AnthropicRequest.
+
+    Raises:
+        HTTPException 400: Si algún campo obligatorio está vacío
+    """
+    if not request.pregunta or not request.pregunta.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="El campo 'pregunta' no puede estar vacío"
+        )
+
+    if not request.context.system or not request.context.system.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="El campo 'context.system' no puede estar vacío"
+        )
+
+    if not request.context.user or not request.context.user.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="El campo 'context.user' no puede estar vacío"
+        )
+
+    if not request.intencion or not request.intencion.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="El campo 'intencion' no puede estar vacío"
+        )
+
+
 @router.post("", response_model=AnthropicResponse)
 async def chat_anthropic(
     request: AnthropicRequest
@@ -38,6 +72,10 @@ async def chat_anthropic(
             - answer: La respuesta generada por el modelo
             - model_used: El modelo que se utilizó (configurado en sistema)
             - processing_time: Tiempo de procesamiento en segundos
+            - usage: Tokens de input/output y de caché (escritos y leídos)
+            - metadata: Tiempos por iteración y por tool (solo con use_tools)
+            - context_compaction: Tokens del contexto del usuario originales,
+              enviados y ahorrados por la compactación del historial
 
     Raises:
         HTTPException 400: Si los campos obligatorios están vacíos
@@ -71,29 +109,7 @@ async def chat_anthropic(
             )
 
         # Validar inputs
-        if not request.pregunta or not request.pregunta.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="El campo 'pregunta' no puede estar vacío"
-            )
-
-        if not request.context.system or not request.context.system.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="El campo 'context.system' no puede estar vacío"
-            )
-
-        if not request.context.user or not request.context.user.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="El campo 'context.user' no puede estar vacío"
-            )
-
-        if not request.intencion or not request.intencion.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="El campo 'intencion' no puede estar vacío"
-            )
+        _validar_request(request)
 
         logger.info(f"📨 Procesando consulta Anthropic Claude")
         logger.info(f"   Intención: {request.intencion}")
@@ -101,10 +117,16 @@ async def chat_anthropic(
         logger.info(f"   Use tools: {request.use_tools}")
 
         # Generar respuesta
+        tool_metadata = None
+        usage = None
+        compaction = {}
         if request.use_tools:
             # Flujo con function calling (tools)
             logger.info(f"🔧 Usando function calling con tools")
 
+            # Los tools consultan ChromaDB: esperar al calentamiento (o 503)
+            await require_ready()
+
             # Obtener tool manager
             tool_manager = get_tool_manager()
 
@@ -120,16 +142,17 @@ async def chat_anthropic(
 
             if not tool_definitions:
                 logger.warning("⚠️ No hay tools disponibles, usando flujo sin tools")
-                answer = anthropic_service.chat_with_context(
+                answer, usage = await anthropic_service.chat_with_context(
                     system_context=request.context.system,
                     user_context=request.context.user,
                     pregunta=request.pregunta,
                     entidades=request.entidades,
-                    intencion=request.intencion
+                    intencion=request.intencion,
+                    compaction=compaction
                 )
             else:
                 # Llamar a chat_with_tools
-                answer = anthropic_service.chat_with_tools(
+                answer, tool_metadata = await anthropic_service.chat_with_tools(
                     system_context=request.context.system,
                     user_context=request.context.user,
                     pregunta=request.pregunta,
@@ -137,17 +160,20 @@ async def chat_anthropic(
                     intencion=request.intencion,
                     tools=tool_definitions,
                     tool_manager=tool_manager,
-                    max_iterations=5
+                    max_iterations=5,
+                    compaction=compaction
                 )
+                usage = tool_metadata["usage"]
         else:
             # Flujo original sin tools
             logger.info(f"💬 Usando flujo sin tools (comportamiento original)")
-            answer = anthropic_service.chat_with_context(
+            answer, usage = await anthropic_service.chat_with_context(
                 system_context=request.context.system,
                 user_context=request.context.user,
                 pregunta=request.pregunta,
                 entidades=request.entidades,
-                intencion=request.intencion
+                intencion=request.intencion,
+                compaction=compaction
             )
 
         processing_time = time.time() - start_time
@@ -157,7 +183,10 @@ async def chat_anthropic(
         return AnthropicResponse(
             answer=answer,
             model_used='claude-3-5-haiku-20241022',
-            processing_time=processing_time
+            processing_time=processing_time,
+            usage=usage,
+            metadata=tool_metadata,
+            context_compaction=compaction or None
         )
 
     except HTTPException:
@@ -168,3 +197,114 @@ async def chat_anthropic(
     except Exception as e:
         logger.error(f"❌ Error procesando consulta Anthropic: {e}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+
+@router.post("/stream")
+async def chat_anthropic_stream(
+    request: AnthropicRequest
+):
+    """
+    Versión en streaming (Server-Sent Events) de /anthropic.
+
+    Emite `meta` (modelo), `token` por cada fragmento generado por Claude y
+    `done` con la respuesta completa, el tiempo al primer token, el tiempo
+    total y el reporte de compactación del contexto. Con use_tools=True el
+    loop de tools no se puede transmitir token a token: se ejecuta completo
+    y la respuesta final se emite como un único `token`.
+
+    Args:
+        request: AnthropicRequest (mismos campos que /anthropic)
+
+    Returns:
+        StreamingResponse con media type text/event-stream
+
+    Raises:
+        HTTPException 400: Si los campos obligatorios están vacíos
+        HTTPException 503: Si el servicio Anthropic no está disponible o,
+            con use_tools, si el modelo de embeddings aún se está cargando
+    """
+    start_time = time.time()
+
+    anthropic_service = get_anthropic_service()
+    if not anthropic_service.client:
+        raise HTTPException(
+            status_code=503,
+            detail="Servicio Anthropic no disponible. Verifica la configuración de ANTHROPIC_API_KEY"
+        )
+    _validar_request(request)
+
+    logger.info(f"📨 Procesando consulta Anthropic Claude (stream)")
+    logger.info(f"   Intención: {request.intencion}")
+    logger.info(f"   Use tools: {request.use_tools}")
+    if request.use_tools:
+        await require_ready()
+
+    tool_metadata = {}
+    usage = {}
+    compaction = {}
+
+    async def fragmentos():
+        tool_definitions = []
+        if request.use_tools:
+            tool_manager = get_tool_manager()
+            tool_definitions = tool_manager.get_tool_definitions(request.available_tools or None)
+
+        if tool_definitions:
+            answer, metadata = await anthropic_service.chat_with_tools(
+                system_context=request.context.system,
+                user_context=request.context.user,
+                pregunta=request.pregunta,
+                entidades=request.entidades,
+                intencion=request.intencion,
+                tools=tool_definitions,
+                tool_manager=tool_manager,
+                max_iterations=5,
+                compaction=compaction
+            )
+            tool_metadata.update(metadata)
+            usage.update(metadata["usage"])
+            yield answer
+            return
+
+        async for fragmento in anthropic_service.stream_chat_with_context(
+            system_context=request.context.system,
+            user_context=request.context.user,
+            pregunta=request.pregunta,
+            entidades=request.entidades,
+            intencion=request.intencion,
+            usage=usage,
+            compaction=compaction
+        ):
+            yield fragmento
+
+    async def eventos():
+        yield sse_event("meta", {"model_used": settings.CLAUDE_MODEL})
+
+        partes = []
+        time_to_first_token = None
+        try:
+            async for fragmento in fragmentos():
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                    logger.info(f"⏱️ Primer token en {time_to_first_token:.3f}s")
+                partes.append(fragmento)
+                yield sse_event("token", {"text": fragmento})
+        except Exception as e:
+            logger.error(f"❌ Error en streaming Anthropic: {e}")
+            yield sse_event("error", {"detail": str(e)})
+            return
+
+        done = {
+            "answer": "".join(partes),
+            "time_to_first_token": time_to_first_token,
+            "processing_time": time.time() - start_time
+        }
+        if usage:
+            done["usage"] = usage
+        if tool_metadata:
+            done["metadata"] = tool_metadata
+        if compaction:
+            done["context_compaction"] = compaction
+        yield sse_event("done", done)
+
+    return sse_response(eventos())
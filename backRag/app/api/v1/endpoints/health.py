@@ -1,7 +1,11 @@
 import logging
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 from app.models import HealthResponse
+from app.core.config import settings
 from app.core.dependencies import get_health_service, get_openrouter_service
+from app.core.executor import run_blocking
+from app.core.readiness import STATUS_STARTING, readiness
 
 logger = logging.getLogger(__name__)
 
@@ -10,16 +14,33 @@ router = APIRouter()
 
 @router.get("", response_model=HealthResponse)
 async def health_check():
-    """Verificar el estado de la API y la base de datos."""
-    health_service = get_health_service()
+    """Verificar el estado de la API y la base de datos (liveness: no espera al calentamiento)."""
+    health_service = await run_blocking(get_health_service)
     return health_service.check_health()
 
 
+@router.get("/ready")
+async def readiness_check():
+    """
+    Readiness: 200 cuando el modelo de embeddings y ChromaDB están cargados.
+
+    Durante el calentamiento retorna 503 con Retry-After; si la carga falló,
+    503 con el error. Incluye los tiempos de arranque (hasta estar listo y
+    hasta la primera consulta exitosa).
+    """
+    stats = readiness.stats()
+    if readiness.is_ready:
+        return stats
+
+    headers = {"Retry-After": str(settings.READINESS_RETRY_AFTER)} if stats['status'] == STATUS_STARTING else None
+    return JSONResponse(status_code=503, content=stats, headers=headers)
+
+
 @router.get("/stats")
 async def get_database_stats():
     """Obtener estadísticas de la base de datos."""
     try:
-        health_service = get_health_service()
+        health_service = await run_blocking(get_health_service)
         return health_service.get_database_stats()
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
@@ -31,7 +52,7 @@ async def get_database_stats():
 @router.get("/llm-status")
 async def get_llm_status():
     """Verificar el estado del servicio LLM (Claude)."""
-    health_service = get_health_service()
+    health_service = await run_blocking(get_health_service)
     return health_service.get_llm_status()
 
 
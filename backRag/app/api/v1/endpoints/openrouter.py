@@ -100,7 +100,7 @@ async def chat_openrouter(
         logger.info(f"   Pregunta: {request.pregunta[:100]}...")
 
         # Generar respuesta
-        answer = openrouter_service.chat_with_context(
+        answer = await openrouter_service.chat_with_context(
             system_context=request.context.system,
             user_context=request.context.user,
             pregunta=request.pregunta,
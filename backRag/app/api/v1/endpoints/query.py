@@ -1,23 +1,46 @@
 import logging
 import time
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.models import QueryRequest, QueryResponse
-from app.core.dependencies import get_search_service, get_response_service, get_db_repository
+from app.core.config import settings
+from app.core.dependencies import get_search_service, get_response_service, get_db_repository, get_answer_cache
+from app.core.executor import run_blocking
+from app.core.readiness import readiness
+from app.utils.constants import NO_RESULTS_MESSAGE
+from app.utils.sse import sse_event, sse_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# El cliente cerró la conexión (convención de nginx; no es un código estándar)
+CLIENT_CLOSED_REQUEST = 499
+
+def _cache_namespace(request: QueryRequest) -> tuple:
+    """Parámetros que deben coincidir para reutilizar una respuesta cacheada."""
+    return (
+        request.max_results,
+        request.confidence_threshold,
+        request.keyword_scorer or settings.KEYWORD_SCORER,
+        request.fusion or settings.SEARCH_FUSION,
+        settings.RERANK_ENABLED if request.rerank is None else request.rerank
+    )
+
 
 @router.post("", response_model=QueryResponse)
 async def query_transit_bot(
-    request: QueryRequest
+    request: QueryRequest,
+    http_request: Request
 ):
     """
     Procesar consulta sobre normas de tránsito usando búsqueda vectorial y LLM.
 
+    Si el cliente se desconecta durante la búsqueda (p. ej. el orquestador
+    canceló una consulta especulativa), no se llama al LLM.
+
     Args:
         request: QueryRequest con la consulta del usuario
+        http_request: Petición HTTP (para detectar la desconexión del cliente)
 
     Returns:
         QueryResponse con la respuesta generada
@@ -26,7 +49,7 @@ async def query_transit_bot(
 
     try:
         # Obtener servicios
-        db_repository = get_db_repository()
+        db_repository = await run_blocking(get_db_repository)
         search_service = get_search_service(db_repository)
         response_service = get_response_service()
 
@@ -36,27 +59,46 @@ async def query_transit_bot(
                 detail="Base de datos no disponible. Ejecuta el script de setup primero"
             )
 
-        # Realizar búsqueda híbrida
-        resultados = search_service.hybrid_search(
+        # Caché semántica: consultas casi idénticas con los mismos parámetros
+        answer_cache = get_answer_cache()
+        cache_namespace = _cache_namespace(request)
+        query_embedding = await run_blocking(db_repository.encode_query, request.query)
+        cached = answer_cache.get(query_embedding, cache_namespace, db_repository.collection_version)
+        if cached is not None:
+            logger.info("⚡ Respuesta servida desde la caché semántica")
+            readiness.record_query()
+            return QueryResponse(**cached, processing_time=time.time() - start_time)
+
+        # Realizar búsqueda híbrida (bloqueante) en el pool de hilos
+        resultados = await run_blocking(
+            search_service.hybrid_search,
             consulta=request.query,
             n_resultados=request.max_results,
-            umbral_confianza=request.confidence_threshold
+            umbral_confianza=request.confidence_threshold,
+            keyword_scorer=request.keyword_scorer,
+            fusion=request.fusion,
+            rerank=request.rerank
         )
 
         if not resultados['articulos']:
             # Si no hay resultados, devolver respuesta genérica
+            readiness.record_query()
             return QueryResponse(
-                answer="Lo siento, no encontré información específica sobre tu consulta en el código de tránsito. ¿Podrías reformular tu pregunta?",
+                answer=NO_RESULTS_MESSAGE,
                 confidence=0.0,
                 sources=[],
                 processing_time=time.time() - start_time
             )
 
+        if await http_request.is_disconnected():
+            logger.info("🔌 El cliente se desconectó antes de generar la respuesta, se omite el LLM")
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="El cliente cerró la conexión")
+
         # Calcular confianza promedio
         confianza_promedio = response_service.calculate_confidence(resultados['articulos'])
 
         # Generar respuesta (con LLM o fallback)
-        respuesta = response_service.generate_response(
+        respuesta = await response_service.generate_response(
             consulta=request.query,
             articulos=resultados['articulos'],
             confianza_promedio=confianza_promedio
@@ -66,6 +108,13 @@ async def query_transit_bot(
         sources = response_service.format_sources(resultados['articulos'])
         logger.info("Consulta procesada exitosamente")
         logger.info(respuesta)
+        readiness.record_query()
+        answer_cache.set(
+            query_embedding,
+            cache_namespace,
+            {'answer': respuesta, 'confidence': confianza_promedio, 'sources': sources},
+            db_repository.collection_version
+        )
         return QueryResponse(
             answer=respuesta,
             confidence=confianza_promedio,
@@ -78,3 +127,114 @@ async def query_transit_bot(
     except Exception as e:
         logger.error(f"Error procesando consulta: {e}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+
+@router.post("/stream")
+async def query_transit_bot_stream(
+    request: QueryRequest
+):
+    """
+    Versión en streaming (Server-Sent Events) de /query.
+
+    La búsqueda se hace antes de abrir el stream; después se emiten los
+    eventos `meta` (fuentes y confianza), `token` (fragmentos de la
+    respuesta de Claude) y `done` (respuesta completa, tiempo al primer
+    token y tiempo total). Un error durante la generación se emite como
+    evento `error`.
+
+    Args:
+        request: QueryRequest con la consulta del usuario
+
+    Returns:
+        StreamingResponse con media type text/event-stream
+    """
+    start_time = time.time()
+
+    try:
+        db_repository = await run_blocking(get_db_repository)
+        search_service = get_search_service(db_repository)
+        response_service = get_response_service()
+
+        if not db_repository or not db_repository.collection:
+            raise HTTPException(
+                status_code=503,
+                detail="Base de datos no disponible. Ejecuta el script de setup primero"
+            )
+
+        answer_cache = get_answer_cache()
+        cache_namespace = _cache_namespace(request)
+        query_embedding = await run_blocking(db_repository.encode_query, request.query)
+        cached = answer_cache.get(query_embedding, cache_namespace, db_repository.collection_version)
+
+        resultados = None
+        if cached is None:
+            resultados = await run_blocking(
+                search_service.hybrid_search,
+                consulta=request.query,
+                n_resultados=request.max_results,
+                umbral_confianza=request.confidence_threshold,
+                keyword_scorer=request.keyword_scorer,
+                fusion=request.fusion,
+                rerank=request.rerank
+            )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error procesando consulta en streaming: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+    async def eventos():
+        if cached is not None:
+            logger.info("⚡ Respuesta servida desde la caché semántica (stream)")
+            sources = [source.model_dump() for source in cached['sources']]
+            yield sse_event("meta", {"confidence": cached['confidence'], "sources": sources, "cached": True})
+            yield sse_event("token", {"text": cached['answer']})
+            elapsed = time.time() - start_time
+            yield sse_event("done", {"answer": cached['answer'], "time_to_first_token": elapsed, "processing_time": elapsed})
+            return
+
+        articulos = resultados['articulos']
+        confianza_promedio = response_service.calculate_confidence(articulos) if articulos else 0.0
+        sources = response_service.format_sources(articulos)
+        yield sse_event("meta", {
+            "confidence": confianza_promedio,
+            "sources": [source.model_dump() for source in sources],
+            "cached": False
+        })
+
+        fragmentos = []
+        time_to_first_token = None
+        try:
+            async for fragmento in response_service.stream_response(
+                consulta=request.query,
+                articulos=articulos,
+                confianza_promedio=confianza_promedio
+            ):
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                    logger.info(f"⏱️ Primer token en {time_to_first_token:.3f}s")
+                fragmentos.append(fragmento)
+                yield sse_event("token", {"text": fragmento})
+        except Exception as e:
+            logger.error(f"Error generando respuesta en streaming: {e}")
+            yield sse_event("error", {"detail": str(e)})
+            return
+
+        respuesta = "".join(fragmentos)
+        if articulos:
+            answer_cache.set(
+                query_embedding,
+                cache_namespace,
+                {'answer': respuesta, 'confidence': confianza_promedio, 'sources': sources},
+                db_repository.collection_version
+            )
+
+        readiness.record_query()
+        yield sse_event("done", {
+            "answer": respuesta,
+            "time_to_first_token": time_to_first_token,
+            "processing_time": time.time() - start_time
+        })
+
+    return sse_response(eventos())
@@ -1,10 +1,13 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import query, health, openrouter, anthropic
+from fastapi import APIRouter, Depends
+from app.api.v1.endpoints import query, health, openrouter, anthropic, admin
+from app.core.readiness import require_ready
 
 api_router = APIRouter()
 
 # Incluir routers de endpoints
 api_router.include_router(health.router, prefix="/health", tags=["health"])
-api_router.include_router(query.router, prefix="/query", tags=["query"])
+# /query y /admin necesitan el modelo y ChromaDB: esperan al calentamiento o responden 503
+api_router.include_router(query.router, prefix="/query", tags=["query"], dependencies=[Depends(require_ready)])
 api_router.include_router(openrouter.router, prefix="/openrouter", tags=["openrouter"])
 api_router.include_router(anthropic.router, prefix="/anthropic", tags=["anthropic"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"], dependencies=[Depends(require_ready)])
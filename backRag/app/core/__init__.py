@@ -2,6 +2,9 @@ from app.core.config import settings
 from app.core.logging_config import setup_logging
 from app.core.dependencies import (
     get_db_repository,
+    get_keyword_index,
+    get_answer_cache,
+    get_index_service,
     get_llm_service,
     get_search_service,
     get_response_service,
@@ -12,6 +15,9 @@ __all__ = [
     'settings',
     'setup_logging',
     'get_db_repository',
+    'get_keyword_index',
+    'get_answer_cache',
+    'get_index_service',
     'get_llm_service',
     'get_search_service',
     'get_response_service',
@@ -8,6 +8,8 @@ class Settings(BaseSettings):
 
     # Base dir absoluto del proyecto
     BASE_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+    # Directorio del servicio backRag (contiene app/, scripts/ y data/)
+    PROJECT_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 
     # Información del proyecto
     PROJECT_NAME: str = "TránsitoBot API"
@@ -25,13 +27,79 @@ class Settings(BaseSettings):
     # ChromaDB
     CHROMA_DB_PATH: str = os.path.join(BASE_DIR, "data", "chroma_db")
     EMBEDDING_MODEL: str = "paraphrase-multilingual-MiniLM-L12-v2"
+    # Backend del encoder: "torch" (SentenceTransformer fp32) u "onnx" (ONNX Runtime
+    # int8, generado con scripts/export_onnx_encoder.py)
+    EMBEDDING_BACKEND: str = "torch"
+    # Directorio del encoder ONNX (vacío = data/models/<modelo>-onnx-int8)
+    EMBEDDING_ONNX_PATH: str = ""
+    # Hilos de ONNX Runtime por inferencia (0 = automático)
+    EMBEDDING_ONNX_THREADS: int = 0
     COLLECTION_NAME: str = "codigo_transito_colombia"
+    # Versiones de la colección (blue/green) y documento fuente para reconstruirlas
+    COLLECTION_VERSIONS_TO_KEEP: int = 3
+    DOCUMENT_PATH: str = os.path.join(PROJECT_DIR, "data", "documents", "CodigoNacionaldeTransitoTerrestre.docx")
+    # Normas adicionales (.docx/.txt) indexadas junto al código, tanto por
+    # scripts/setup_database.py como al reconstruir desde /admin (si existe)
+    NORMAS_PATH: str = os.path.join(PROJECT_DIR, "data", "normas")
+    # Batch del modelo al reconstruir desde /admin con la API sirviendo:
+    # batches pequeños dejan pasar los embeddings de las consultas entre uno y otro
+    INDEX_BUILD_EMBEDDING_BATCH_SIZE: int = 8
+    # Token del API de administración (vacío = endpoints /admin deshabilitados)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    EMBEDDING_CACHE_SIZE: int = 512
+    EMBEDDING_CACHE_TTL: float = 3600.0
+    # Micro-batching de embeddings de consultas concurrentes
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+    # Caché semántica de respuestas de /query
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIZE: int = 256
+    ANSWER_CACHE_TTL: float = 1800.0
+    ANSWER_CACHE_MAX_DISTANCE: float = 0.05
+    # Índice invertido de keywords (vacío = junto a CHROMA_DB_PATH)
+    KEYWORD_INDEX_PATH: str = ""
+
+    # Pool de hilos para búsqueda y trabajo bloqueante fuera del event loop
+    SEARCH_THREAD_POOL_SIZE: int = 8
+    # Calentamiento en segundo plano: segundos que una consulta espera a que el
+    # modelo esté listo antes de responder 503, y valor de Retry-After
+    READINESS_WAIT_SECONDS: float = 10.0
+    READINESS_RETRY_AFTER: int = 5
+    # Workers de run.py (>1 = maestro con fork) y precarga del modelo en el
+    # maestro para compartir sus pesos copy-on-write entre los workers
+    WORKERS: int = 1
+    PRELOAD_EMBEDDING_MODEL: bool = True
+    # Reinicio de workers caídos: espera inicial (se duplica con cada reinicio
+    # reciente hasta el máximo) y tope de reinicios por worker dentro de la
+    # ventana; al superarlo se detiene el servidor
+    WORKER_RESTART_BACKOFF_SECONDS: float = 1.0
+    WORKER_RESTART_BACKOFF_MAX_SECONDS: float = 30.0
+    WORKER_MAX_RESTARTS: int = 5
+    WORKER_RESTART_WINDOW_SECONDS: float = 60.0
+    # Tools de Claude: ejecución concurrente de los tool_use de un mismo turno
+    TOOL_PARALLEL_EXECUTION: bool = True
+    TOOL_TIMEOUT_SECONDS: float = 20.0
 
     # LLM (Anthropic Claude)
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     CLAUDE_MODEL: str = "claude-haiku-4-5"
     CLAUDE_MAX_TOKENS: int =2000
     CLAUDE_TEMPERATURE: float = 0.0
+    # Prompt caching del system prompt y de las definiciones de tools
+    ANTHROPIC_PROMPT_CACHING: bool = True
+    # URL alternativa de la Messages API (p. ej. scripts/anthropic_stub_server.py)
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "")
+    # Compactación del historial (context.user) de /anthropic: si supera
+    # CONTEXT_TOKEN_BUDGET (tokens estimados) se envían literales los turnos
+    # recientes y los anteriores como resúmenes extractivos cacheados
+    CONTEXT_COMPACTION_ENABLED: bool = True
+    CONTEXT_TOKEN_BUDGET: int = 600
+    CONTEXT_RECENT_TURNS: int = 2
+    CONTEXT_SEGMENT_TURNS: int = 4
+    CONTEXT_SUMMARY_TOKENS: int = 60
+    CONTEXT_SUMMARY_CACHE_SIZE: int = 1024
+    CONTEXT_SUMMARY_CACHE_TTL: float = 3600.0
 
     # OpenRouter
     OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY", "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")
@@ -44,6 +112,34 @@ class Settings(BaseSettings):
     DEFAULT_MAX_RESULTS: int = 3
     DEFAULT_CONFIDENCE_THRESHOLD: float = 0.4
     MIN_CONFIDENCE_THRESHOLD: float = 0.2
+    # Motor de puntuación de keywords: "hits" (conteo original, con el que se
+    # calibró DEFAULT_CONFIDENCE_THRESHOLD) o "bm25" (BM25F). Solo "bm25" usa
+    # listas de postings: "hits" busca subcadenas recorriendo todo el corpus por
+    # cada palabra nueva (O(corpus)), guarda una copia concatenada de los textos
+    # y no ignora tildes
+    KEYWORD_SCORER: str = "hits"
+    # Fusión de la búsqueda híbrida: "max" (mayor similitud, original), "rrf"
+    # (Reciprocal Rank Fusion) o "weighted" (suma ponderada normalizada por pata)
+    SEARCH_FUSION: str = "max"
+    SEARCH_FUSION_VECTOR_WEIGHT: float = 1.0
+    SEARCH_FUSION_KEYWORD_WEIGHT: float = 1.0
+    SEARCH_RRF_K: int = 60
+    # Candidatos por pata antes de fusionar (0 = 2 * max_results vectorial, max_results keywords)
+    SEARCH_VECTOR_DEPTH: int = 0
+    SEARCH_KEYWORD_DEPTH: int = 0
+    # Re-ranking con cross-encoder de los primeros candidatos de la fusión: se
+    # conservan max_results artículos (RERANK_TOP_K > 0 los limita a ese número
+    # aunque la petición pida más) y se omite si el siguiente lote no cabe en
+    # RERANK_BUDGET_MS
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+    RERANK_CANDIDATES: int = 10
+    RERANK_TOP_K: int = 0
+    RERANK_BUDGET_MS: float = 150.0
+    RERANK_BATCH_SIZE: int = 16
+    RERANK_MAX_LENGTH: int = 256
+    RERANK_CACHE_SIZE: int = 2048
+    RERANK_CACHE_TTL: float = 3600.0
 
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -1,45 +1,185 @@
 import logging
+import threading
+from collections import OrderedDict
 from functools import lru_cache
-from typing import Generator
+from typing import Generator, Optional
 from app.core.config import settings
+from app.core.readiness import readiness
 from app.repositories.chroma_repository import ChromaRepository
+from app.repositories.embedding_encoders import embedding_backend_options
+from app.repositories.keyword_index import KeywordIndex
 from app.services.llm_service import LLMService
 from app.services.search_service import SearchService
+from app.services.fusion import LEG_KEYWORD, LEG_VECTOR
+from app.services.reranker import CrossEncoderReranker
 from app.services.response_service import ResponseService
 from app.services.health_service import HealthService
 from app.services.openrouter_service import OpenRouterService
 from app.services.anthropic_service import AnthropicService
+from app.services.context_compactor import ContextCompactor
 from app.services.tool_manager import ToolManager
+from app.services.index_service import IndexService
+from app.utils.semantic_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
 # Variables globales para instancias singleton
 _db_repository: ChromaRepository = None
+# El repositorio se crea en el calentamiento (hilo del pool) y puede pedirse a la vez desde otro hilo
+_db_repository_lock = threading.Lock()
+# Índices de keywords cargados por ruta (versión publicada y anterior)
+_keyword_indexes: "OrderedDict[str, Optional[KeywordIndex]]" = OrderedDict()
+# Se cargan desde el hilo que publica una versión y desde el de la construcción
+_keyword_indexes_lock = threading.Lock()
 _llm_service: LLMService = None
 _openrouter_service: OpenRouterService = None
 _anthropic_service: AnthropicService = None
+_answer_cache: SemanticCache = None
+_index_service: IndexService = None
+_reranker: CrossEncoderReranker = None
 
 
 def get_db_repository() -> ChromaRepository:
     """
     Dependency para obtener el repositorio de ChromaDB.
-    Implementa patrón Singleton.
+    Implementa patrón Singleton. Si otro proceso publicó una versión nueva
+    de la colección, el repositorio pasa a servirla junto con su índice de
+    keywords; por eso es bloqueante y se llama con run_blocking.
     """
     global _db_repository
 
-    if _db_repository is None:
+    if _db_repository is not None:
+        _db_repository.refresh_collection()
+        return _db_repository
+
+    with _db_repository_lock:
+        if _db_repository is not None:
+            return _db_repository
+
         logger.info("Inicializando ChromaRepository...")
-        _db_repository = ChromaRepository(
+        repository = ChromaRepository(
             db_path=settings.CHROMA_DB_PATH,
-            model_name=settings.EMBEDDING_MODEL
+            model_name=settings.EMBEDDING_MODEL,
+            embedding_cache_size=settings.EMBEDDING_CACHE_SIZE,
+            embedding_cache_ttl=settings.EMBEDDING_CACHE_TTL,
+            keyword_index_loader=_load_published_keyword_index,
+            **embedding_backend_options(settings)
         )
         # Intentar obtener la colección existente
-        if not _db_repository.get_collection():
+        if not repository.get_collection():
             logger.warning("⚠️ ChromaDB no encontrado. Ejecuta el script de setup primero")
+        _db_repository = repository
 
     return _db_repository
 
 
+def is_db_repository_loaded() -> bool:
+    """Indica si el repositorio (modelo y cliente de ChromaDB) ya fue creado, sin crearlo."""
+    return _db_repository is not None
+
+
+def load_keyword_index(index_path: str) -> Optional[KeywordIndex]:
+    """
+    Carga (una sola vez por ruta) un índice invertido de keywords.
+    Se conservan los dos últimos para que publicar o revertir una versión
+    no obligue a releerlo desde disco.
+
+    Args:
+        index_path: Ruta del archivo del índice
+
+    Returns:
+        El índice o None si no existe
+    """
+    with _keyword_indexes_lock:
+        if index_path not in _keyword_indexes:
+            logger.info(f"Cargando índice de keywords: {index_path}")
+            _keyword_indexes[index_path] = KeywordIndex.load(index_path)
+            if _keyword_indexes[index_path] is None:
+                logger.warning("⚠️ Índice de keywords no disponible. Se usará búsqueda completa")
+        _keyword_indexes.move_to_end(index_path)
+        indice = _keyword_indexes[index_path]
+        while len(_keyword_indexes) > 2:
+            _keyword_indexes.popitem(last=False)
+
+    return indice
+
+
+def _load_published_keyword_index(index_path: str) -> Optional[KeywordIndex]:
+    """Índice que el repositorio publica con cada versión (KEYWORD_INDEX_PATH lo fija)."""
+    return load_keyword_index(settings.KEYWORD_INDEX_PATH or index_path)
+
+
+def get_keyword_index() -> KeywordIndex:
+    """
+    Dependency para obtener el índice invertido de keywords de la versión
+    publicada de la colección. Retorna None si no existe.
+    """
+    return get_db_repository().snapshot.keyword_index
+
+
+def get_index_service() -> IndexService:
+    """
+    Dependency para obtener el servicio de versiones de la colección.
+    Implementa patrón Singleton.
+    """
+    global _index_service
+
+    if _index_service is None:
+        _index_service = IndexService(
+            db_manager=get_db_repository(),
+            document_path=settings.DOCUMENT_PATH,
+            normas_path=settings.NORMAS_PATH,
+            versions_to_keep=settings.COLLECTION_VERSIONS_TO_KEEP,
+            preload_keyword_index=load_keyword_index,
+            embedding_batch_size=settings.INDEX_BUILD_EMBEDDING_BATCH_SIZE
+        )
+
+    return _index_service
+
+
+def get_answer_cache() -> SemanticCache:
+    """
+    Dependency para obtener la caché semántica de respuestas de /query.
+    Implementa patrón Singleton.
+    """
+    global _answer_cache
+
+    if _answer_cache is None:
+        _answer_cache = SemanticCache(
+            max_size=settings.ANSWER_CACHE_SIZE if settings.ANSWER_CACHE_ENABLED else 0,
+            ttl_seconds=settings.ANSWER_CACHE_TTL,
+            max_distance=settings.ANSWER_CACHE_MAX_DISTANCE
+        )
+
+    return _answer_cache
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """
+    Dependency para obtener el re-ranker de candidatos (cross-encoder).
+    Implementa patrón Singleton. Retorna None si el re-ranking está
+    deshabilitado; el modelo se carga en el calentamiento.
+    """
+    global _reranker
+
+    if not settings.RERANK_ENABLED:
+        return None
+
+    if _reranker is None:
+        _reranker = CrossEncoderReranker(
+            model_name=settings.RERANK_MODEL,
+            max_candidates=settings.RERANK_CANDIDATES,
+            top_k=settings.RERANK_TOP_K,
+            budget_ms=settings.RERANK_BUDGET_MS,
+            batch_size=settings.RERANK_BATCH_SIZE,
+            max_length=settings.RERANK_MAX_LENGTH,
+            cache_size=settings.RERANK_CACHE_SIZE,
+            cache_ttl=settings.RERANK_CACHE_TTL
+        )
+
+    return _reranker
+
+
 def get_llm_service() -> LLMService:
     """
     Dependency para obtener el servicio LLM.
@@ -49,7 +189,11 @@ def get_llm_service() -> LLMService:
 
     if _llm_service is None:
         logger.info("Inicializando LLMService...")
-        _llm_service = LLMService(api_key=settings.ANTHROPIC_API_KEY)
+        _llm_service = LLMService(
+            api_key=settings.ANTHROPIC_API_KEY,
+            base_url=settings.ANTHROPIC_BASE_URL,
+            prompt_caching=settings.ANTHROPIC_PROMPT_CACHING
+        )
 
     return _llm_service
 
@@ -77,7 +221,20 @@ def get_anthropic_service() -> AnthropicService:
 
     if _anthropic_service is None:
         logger.info("Inicializando AnthropicService...")
-        _anthropic_service = AnthropicService(api_key=settings.ANTHROPIC_API_KEY)
+        context_compactor = None
+        if settings.CONTEXT_COMPACTION_ENABLED:
+            context_compactor = ContextCompactor(
+                token_budget=settings.CONTEXT_TOKEN_BUDGET,
+                recent_turns=settings.CONTEXT_RECENT_TURNS,
+                segment_turns=settings.CONTEXT_SEGMENT_TURNS,
+                summary_tokens=settings.CONTEXT_SUMMARY_TOKENS,
+                cache_size=settings.CONTEXT_SUMMARY_CACHE_SIZE,
+                cache_ttl=settings.CONTEXT_SUMMARY_CACHE_TTL
+            )
+        _anthropic_service = AnthropicService(
+            api_key=settings.ANTHROPIC_API_KEY,
+            context_compactor=context_compactor
+        )
 
     return _anthropic_service
 
@@ -94,7 +251,20 @@ def get_search_service(
     if db_repository is None:
         db_repository = get_db_repository()
 
-    return SearchService(db_manager=db_repository)
+    # Sin keyword_index: cada búsqueda fija la colección y el índice publicados juntos
+    return SearchService(
+        db_manager=db_repository,
+        default_keyword_scorer=settings.KEYWORD_SCORER,
+        default_fusion=settings.SEARCH_FUSION,
+        vector_depth=settings.SEARCH_VECTOR_DEPTH,
+        keyword_depth=settings.SEARCH_KEYWORD_DEPTH,
+        fusion_weights={
+            LEG_VECTOR: settings.SEARCH_FUSION_VECTOR_WEIGHT,
+            LEG_KEYWORD: settings.SEARCH_FUSION_KEYWORD_WEIGHT
+        },
+        rrf_k=settings.SEARCH_RRF_K,
+        reranker=get_reranker()
+    )
 
 
 def get_response_service(
@@ -122,8 +292,11 @@ def get_health_service(
     Args:
         db_repository: Repositorio de ChromaDB (inyectado)
         llm_service: Servicio LLM (inyectado)
+
+    El repositorio no se crea aquí: mientras el calentamiento no termina, el
+    health check responde sin esperar a que se cargue el modelo.
     """
-    if db_repository is None:
+    if db_repository is None and is_db_repository_loaded():
         db_repository = get_db_repository()
 
     if llm_service is None:
@@ -131,7 +304,10 @@ def get_health_service(
 
     return HealthService(
         db_manager=db_repository,
-        llm_service=llm_service
+        llm_service=llm_service,
+        answer_cache=get_answer_cache(),
+        readiness=readiness,
+        reranker=get_reranker()
     )
 
 
@@ -0,0 +1,109 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pool acotado para trabajo bloqueante (búsqueda, embeddings, ChromaDB, tools)
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Contadores del pool: tareas enviadas, en ejecución y pendientes (en cola o
+# en ejecución). Se llevan aquí para no depender de atributos privados de
+# ThreadPoolExecutor
+_stats_lock = threading.Lock()
+_submitted = 0
+_active = 0
+_pending = 0
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Obtiene el pool de hilos para trabajo bloqueante.
+    Implementa patrón Singleton.
+    """
+    global _executor
+
+    if _executor is None:
+        logger.info(f"Inicializando pool de búsqueda ({settings.SEARCH_THREAD_POOL_SIZE} hilos)...")
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.SEARCH_THREAD_POOL_SIZE,
+            thread_name_prefix="search-worker"
+        )
+
+    return _executor
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Ejecuta una función síncrona en el pool sin bloquear el event loop.
+
+    Args:
+        func: Función bloqueante a ejecutar
+        *args, **kwargs: Argumentos de la función
+
+    Returns:
+        El valor retornado por la función
+    """
+    global _submitted, _pending
+
+    with _stats_lock:
+        _submitted += 1
+        _pending += 1
+    try:
+        future = get_executor().submit(_run_tracked, functools.partial(func, *args, **kwargs))
+    except BaseException:
+        _task_done(None)
+        raise
+    # También se descuenta si la tarea se cancela antes de empezar
+    future.add_done_callback(_task_done)
+    return await asyncio.wrap_future(future)
+
+
+def _run_tracked(func: Callable) -> Any:
+    """Ejecuta la tarea en un hilo del pool contándola como activa."""
+    global _active
+
+    with _stats_lock:
+        _active += 1
+    try:
+        return func()
+    finally:
+        with _stats_lock:
+            _active -= 1
+
+
+def _task_done(future: Optional[Future]):
+    """Descuenta una tarea terminada, fallida o cancelada."""
+    global _pending
+
+    with _stats_lock:
+        _pending -= 1
+
+
+def shutdown_executor():
+    """Cierra el pool de hilos esperando las tareas en curso."""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """
+    Retorna el estado del pool de hilos.
+
+    Returns:
+        Diccionario con hilos máximos, tareas enviadas, en ejecución y en cola
+    """
+    with _stats_lock:
+        return {
+            'max_workers': settings.SEARCH_THREAD_POOL_SIZE,
+            'submitted': _submitted,
+            'active': _active,
+            'queued': _pending - _active
+        }
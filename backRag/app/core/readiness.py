@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+from fastapi import HTTPException
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STATUS_STARTING = "starting"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+class ReadinessState:
+    """
+    Estado de calentamiento de la aplicación (readiness), separado de la
+    liveness: el proceso responde /health apenas arranca, mientras el modelo
+    de embeddings y el cliente de ChromaDB se cargan en segundo plano.
+    """
+
+    def __init__(self):
+        self.status = STATUS_STARTING
+        self.error: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self.first_query_at: Optional[float] = None
+        self._event: Optional[asyncio.Event] = None
+
+    def start(self):
+        """Reinicia el estado al comenzar el calentamiento (lifespan)."""
+        self.status = STATUS_STARTING
+        self.error = None
+        self.started_at = time.monotonic()
+        self.ready_at = None
+        self.first_query_at = None
+        self._event = asyncio.Event()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == STATUS_READY
+
+    def mark_ready(self):
+        """Marca la aplicación como lista y despierta a las peticiones en espera."""
+        self.status = STATUS_READY
+        self.ready_at = time.monotonic()
+        logger.info(f"✅ Aplicación lista en {self.ready_at - self.started_at:.2f}s")
+        if self._event is not None:
+            self._event.set()
+
+    def mark_failed(self, error: Exception):
+        """Registra el fallo del calentamiento."""
+        self.status = STATUS_FAILED
+        self.error = str(error)
+        logger.error(f"❌ Error en el calentamiento: {error}")
+        if self._event is not None:
+            self._event.set()
+
+    def record_query(self):
+        """Registra la primera consulta exitosa (tiempo de arranque en frío)."""
+        if self.first_query_at is None:
+            self.first_query_at = time.monotonic()
+            logger.info(
+                f"⏱️ Primera consulta exitosa {self.first_query_at - self.started_at:.2f}s después del arranque"
+            )
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Espera a que termine el calentamiento.
+
+        Args:
+            timeout: Segundos máximos de espera
+
+        Returns:
+            True si la aplicación quedó lista dentro del plazo
+        """
+        if self.status == STATUS_STARTING and self._event is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.is_ready
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna el estado del calentamiento.
+
+        Returns:
+            Diccionario con estado, error, pid del worker y tiempos desde el arranque (segundos)
+        """
+        def desde_arranque(instante: Optional[float]) -> Optional[float]:
+            return round(instante - self.started_at, 3) if instante is not None else None
+
+        return {
+            'status': self.status,
+            'error': self.error,
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.monotonic() - self.started_at, 3),
+            'ready_after_seconds': desde_arranque(self.ready_at),
+            'first_query_after_seconds': desde_arranque(self.first_query_at)
+        }
+
+
+# Estado global del proceso
+readiness = ReadinessState()
+
+
+async def require_ready():
+    """
+    Dependency para endpoints que necesitan el modelo y ChromaDB.
+
+    Espera hasta READINESS_WAIT_SECONDS a que termine el calentamiento.
+
+    Raises:
+        HTTPException 503: Si la aplicación no está lista (con Retry-After
+            mientras sigue calentando)
+    """
+    if await readiness.wait(settings.READINESS_WAIT_SECONDS):
+        return
+
+    if readiness.status == STATUS_FAILED:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Servicio no disponible: falló la carga del modelo ({readiness.error})"
+        )
+
+    raise HTTPException(
+        status_code=503,
+        detail="Servicio iniciando: cargando el modelo de embeddings",
+        headers={"Retry-After": str(settings.READINESS_RETRY_AFTER)}
+    )
@@ -0,0 +1,188 @@
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+from collections import deque
+from typing import Deque, Dict
+
+import uvicorn
+
+from app.core.config import settings
+from app.repositories.embedding_encoders import embedding_backend_options, preload_embedding_model
+from app.utils.system import available_cpus
+
+logger = logging.getLogger(__name__)
+
+# Código de salida de un worker que no pudo arrancar (no se reinicia)
+STARTUP_FAILURE = 3
+# Código de salida de un worker que falló después de arrancar (se reinicia)
+RUNTIME_FAILURE = 1
+
+# Intervalo de sondeo de workers terminados mientras hay reinicios en espera
+WAIT_POLL_SECONDS = 0.1
+
+
+def _limit_threads(threads: int):
+    """Reparte los núcleos entre los workers para que no compitan por los mismos hilos."""
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+    if not settings.EMBEDDING_ONNX_THREADS:
+        settings.EMBEDDING_ONNX_THREADS = threads
+
+
+def _run_worker(config: uvicorn.Config, sock, threads: int):
+    """Cuerpo de un worker (proceso hijo): sirve la app sobre el socket heredado."""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _limit_threads(threads)
+
+    server = uvicorn.Server(config)
+    try:
+        server.run(sockets=[sock])
+    except BaseException:
+        logger.exception(f"❌ Error en el worker {os.getpid()}")
+        os._exit(RUNTIME_FAILURE if server.started else STARTUP_FAILURE)
+    os._exit(0 if server.started else STARTUP_FAILURE)
+
+
+def _restart_delay(restarts: int) -> float:
+    """Espera antes del reinicio número `restarts` (backoff exponencial con tope)."""
+    retraso = settings.WORKER_RESTART_BACKOFF_SECONDS * 2 ** max(0, restarts - 1)
+    return min(retraso, settings.WORKER_RESTART_BACKOFF_MAX_SECONDS)
+
+
+def serve_prefork(app_path: str, host: str, port: int, workers: int, preload: bool = True):
+    """
+    Sirve la app con varios workers creados con fork desde un proceso maestro.
+
+    A diferencia de `uvicorn --workers` (que arranca cada worker desde cero
+    con spawn), el maestro importa la app y, con preload, carga y congela el
+    modelo de embeddings antes del fork. Los workers comparten esas páginas
+    copy-on-write: agregar workers no multiplica la memoria de los pesos. El
+    cliente de ChromaDB, los pools de hilos y el micro-batcher se crean en
+    cada worker (en el lifespan), porque no sobreviven al fork.
+
+    El maestro reinicia los workers que terminan inesperadamente tras una
+    espera que crece con cada reinicio reciente (WORKER_RESTART_BACKOFF_*).
+    Si un worker supera WORKER_MAX_RESTARTS dentro de
+    WORKER_RESTART_WINDOW_SECONDS, se detiene el servidor en vez de
+    reiniciarlo en bucle. Al apagarse reenvía SIGTERM/SIGINT a todos.
+
+    Args:
+        app_path: Import string de la app ("app.main:app")
+        host: Interfaz de escucha
+        port: Puerto de escucha
+        workers: Número de workers
+        preload: Cargar el modelo en el maestro antes del fork
+
+    Raises:
+        RuntimeError: Si la plataforma no soporta fork
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("El modo multi-worker con precarga requiere fork (Linux/macOS)")
+
+    config = uvicorn.Config(app_path, host=host, port=port)
+    # Importar la app en el maestro: el código de los módulos también se comparte
+    config.load()
+
+    if preload:
+        preload_embedding_model(settings.EMBEDDING_MODEL, **embedding_backend_options(settings))
+
+    sock = config.bind_socket()
+
+    # Sacar los objetos existentes del recolector: sin esto, cada pasada del GC
+    # en un worker escribe en sus cabeceras y copia las páginas compartidas
+    gc.collect()
+    gc.freeze()
+
+    threads = max(1, available_cpus() // workers)
+    children: Dict[int, int] = {}
+    # Reinicios recientes de cada worker y reinicios en espera (índice -> instante)
+    restarts: Dict[int, Deque[float]] = {}
+    pending: Dict[int, float] = {}
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(config, sock, threads)
+            finally:
+                # Solo se llega aquí si falló antes de crear el servidor
+                os._exit(STARTUP_FAILURE)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        pending.clear()
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info(
+        f"🚀 Iniciando {workers} workers en {host}:{port} "
+        f"(precarga: {'sí' if preload else 'no'}, {threads} hilos por worker)"
+    )
+    for index in range(workers):
+        spawn(index)
+
+    while children or pending:
+        ahora = time.monotonic()
+        for index in [i for i, instante in pending.items() if instante <= ahora]:
+            del pending[index]
+            spawn(index)
+
+        if pending:
+            # Sondear sin bloquear: stop() vacía `pending` y el bucle termina
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid, status = 0, 0
+            if not pid:
+                espera = min(pending.values(), default=0.0) - time.monotonic()
+                time.sleep(min(WAIT_POLL_SECONDS, max(0.0, espera)))
+                continue
+        else:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+
+        if os.WIFEXITED(status) and os.WEXITSTATUS(status) == STARTUP_FAILURE:
+            logger.error(f"❌ El worker {index} no pudo arrancar. Deteniendo el servidor")
+            stop(signal.SIGTERM, None)
+            continue
+
+        ahora = time.monotonic()
+        recientes = restarts.setdefault(index, deque())
+        while recientes and ahora - recientes[0] > settings.WORKER_RESTART_WINDOW_SECONDS:
+            recientes.popleft()
+        if len(recientes) >= settings.WORKER_MAX_RESTARTS:
+            logger.error(
+                f"❌ El worker {index} se reinició {len(recientes)} veces en "
+                f"{settings.WORKER_RESTART_WINDOW_SECONDS:.0f}s. Deteniendo el servidor"
+            )
+            stop(signal.SIGTERM, None)
+            continue
+
+        recientes.append(ahora)
+        retraso = _restart_delay(len(recientes))
+        logger.warning(
+            f"⚠️ Worker {index} (pid {pid}) terminó inesperadamente. Reiniciando en {retraso:.1f}s..."
+        )
+        pending[index] = ahora + retraso
+
+    sock.close()
+    logger.info("🔄 Servidor detenido")
@@ -1,36 +1,80 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.logging_config import setup_logging
-from app.core.dependencies import get_db_repository
+from app.core.dependencies import get_db_repository, get_keyword_index, get_reranker, is_db_repository_loaded
+from app.core.executor import run_blocking, shutdown_executor
+from app.core.readiness import readiness
 from app.api.v1.router import api_router
 
 # Configurar logging
 logger = setup_logging()
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Gestiona el ciclo de vida de la aplicación."""
-    # Startup
-    logger.info("🚀 Iniciando TránsitoBot API...")
+async def warm_up():
+    """
+    Carga el modelo de embeddings y ChromaDB en segundo plano.
 
-    # Inicializar ChromaDB
+    Mientras tanto /health responde (liveness) y /health/ready retorna 503;
+    las consultas esperan a que termine o reciben 503 con Retry-After.
+    """
     try:
-        db_repository = get_db_repository()
-        if db_repository.get_collection():
+        db_repository = await run_blocking(get_db_repository)
+        if db_repository.collection is not None:
             logger.info("✅ ChromaDB conectado exitosamente")
         else:
             logger.warning("⚠️ ChromaDB no encontrado. Ejecuta el script de setup primero")
+
+        if settings.EMBEDDING_BATCH_ENABLED:
+            await db_repository.start_batcher(
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS
+            )
+
+        # Cargar índice invertido de keywords
+        if await run_blocking(get_keyword_index) is not None:
+            logger.info("✅ Índice de keywords cargado")
+
+        await run_blocking(db_repository.warm_up)
+        readiness.mark_ready()
     except Exception as e:
-        logger.error(f"❌ Error conectando ChromaDB: {e}")
+        readiness.mark_failed(e)
+        return
+
+    # El re-ranker es opcional: se carga después de marcar la app como lista
+    # y, mientras tanto, las consultas usan el orden de la fusión
+    reranker = get_reranker()
+    if reranker is not None:
+        await run_blocking(reranker.load)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Gestiona el ciclo de vida de la aplicación."""
+    # Startup
+    logger.info("🚀 Iniciando TránsitoBot API...")
+    readiness.start()
+    warm_up_task = asyncio.create_task(warm_up())
 
     yield  # Aquí la aplicación está corriendo
 
     # Shutdown
     logger.info("🔄 Cerrando aplicación...")
+    if not warm_up_task.done():
+        warm_up_task.cancel()
+        try:
+            await warm_up_task
+        except asyncio.CancelledError:
+            pass
+    if is_db_repository_loaded():
+        try:
+            await get_db_repository().stop_batcher()
+        except Exception as e:
+            logger.error(f"❌ Error deteniendo micro-batcher: {e}")
+    shutdown_executor()
 
 
 def create_app() -> FastAPI:
@@ -1,11 +1,14 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 
 class QueryRequest(BaseModel):
     query: str
     max_results: Optional[int] = 3
     confidence_threshold: Optional[float] = 0.4  # Umbral m�s bajo por defecto
+    keyword_scorer: Optional[Literal["hits", "bm25"]] = None  # None = settings.KEYWORD_SCORER
+    fusion: Optional[Literal["max", "rrf", "weighted"]] = None  # None = settings.SEARCH_FUSION
+    rerank: Optional[bool] = None  # None = settings.RERANK_ENABLED
 
 
 class Source(BaseModel):
@@ -28,6 +31,11 @@ class HealthResponse(BaseModel):
     version: str
     database_status: str
     total_articles: Optional[int] = None
+    embedding_cache: Optional[Dict[str, Any]] = None
+    embedding_batcher: Optional[Dict[str, Any]] = None
+    answer_cache: Optional[Dict[str, Any]] = None
+    readiness: Optional[Dict[str, Any]] = None
+    reranker: Optional[Dict[str, Any]] = None
 
 
 class ContextData(BaseModel):
@@ -61,3 +69,10 @@ class AnthropicResponse(BaseModel):
     answer: str
     model_used: str
     processing_time: float
+    usage: Optional[Dict[str, int]] = None
+    metadata: Optional[Dict[str, Any]] = None
+    context_compaction: Optional[Dict[str, Any]] = None
+
+
+class CollectionActivateRequest(BaseModel):
+    version: str
@@ -1,3 +1,5 @@
 from app.repositories.chroma_repository import ChromaRepository
+from app.repositories.keyword_index import KeywordIndex
+from app.repositories.embedding_batcher import EmbeddingBatcher
 
-__all__ = ['ChromaRepository']
+__all__ = ['ChromaRepository', 'KeywordIndex', 'EmbeddingBatcher']
@@ -1,11 +1,49 @@
 import chromadb
 import os
+import re
+import json
+import time
+import hashlib
+import threading
 import logging
-from typing import List, Dict, Optional
-from sentence_transformers import SentenceTransformer
+import unicodedata
+from typing import Any, Callable, Iterable, List, Dict, NamedTuple, Optional, Tuple
+from app.utils.cache import TTLLRUCache
+from app.utils.system import available_cpus
+from app.repositories.embedding_batcher import EmbeddingBatcher
+from app.repositories.embedding_encoders import BACKEND_TORCH, load_embedding_model
+from app.repositories.keyword_index import DEFAULT_INDEX_FILENAME
 
 logger = logging.getLogger(__name__)
 
+# Metadato con el hash del contenido de cada artículo (indexación incremental)
+CONTENT_HASH_KEY = "content_hash"
+# Metadato de la colección con el encoder que generó sus embeddings
+ENCODER_KEY = "embedding_encoder"
+# Versiones de la colección (<nombre>_v<n>) y alias de la versión publicada
+VERSION_SUFFIX_PATTERN = r"_v(\d+)"
+ALIAS_FILENAME = "collection_alias.json"
+# Candado entre procesos para construir y publicar versiones (IndexService, setup_database.py)
+BUILD_LOCK_FILENAME = "collection_build.lock"
+# Tamaño de lote para leer/escribir en ChromaDB
+SYNC_BATCH_SIZE = 256
+
+
+class CollectionSnapshot(NamedTuple):
+    """Versión servida: la colección y su índice de keywords, publicados juntos."""
+    collection: Any
+    keyword_index: Any
+
+
+def default_embedding_batch_size() -> int:
+    """
+    Tamaño de batch del modelo para indexar, según los núcleos disponibles.
+
+    Con más núcleos cada batch se reparte entre más hilos de inferencia, así
+    que conviene batches más grandes; se acota entre 32 y SYNC_BATCH_SIZE.
+    """
+    return max(32, min(SYNC_BATCH_SIZE, 16 * available_cpus()))
+
 
 class ChromaRepository:
     """Repositorio para gestionar ChromaDB local con el código de tránsito."""
@@ -13,7 +51,13 @@ class ChromaRepository:
     def __init__(
         self,
         db_path: str = "./data/chroma_db",
-        model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"
+        model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
+        embedding_cache_size: int = 512,
+        embedding_cache_ttl: Optional[float] = 3600,
+        embedding_backend: str = BACKEND_TORCH,
+        onnx_path: Optional[str] = None,
+        onnx_threads: int = 0,
+        keyword_index_loader: Optional[Callable[[str], Any]] = None
     ):
         """
         Inicializa el repositorio de ChromaDB.
@@ -21,9 +65,25 @@ class ChromaRepository:
         Args:
             db_path: Ruta donde se guardará la base de datos local
             model_name: Modelo de embeddings a usar
+            embedding_cache_size: Máximo de embeddings de consultas en caché (0 la desactiva)
+            embedding_cache_ttl: Segundos de vida de cada embedding en caché
+            embedding_backend: "torch" (fp32) u "onnx" (ONNX Runtime int8)
+            onnx_path: Directorio del encoder ONNX (backend "onnx")
+            onnx_threads: Hilos de ONNX Runtime (0 = automático)
+            keyword_index_loader: Función que carga el índice de keywords de
+                una ruta; se publica junto con cada versión (None = sin índice)
         """
         self.db_path = db_path
         self.model_name = model_name
+        self.embedding_backend = embedding_backend
+        # Identifica los embeddings de una colección: otro encoder obliga a regenerarlos
+        self.encoder_id = f"{embedding_backend}:{model_name}"
+
+        # Caché LRU de embeddings de consultas (clave: texto normalizado)
+        self.embedding_cache = TTLLRUCache(
+            max_size=embedding_cache_size,
+            ttl_seconds=embedding_cache_ttl
+        )
 
         # Crear directorio si no existe
         os.makedirs(db_path, exist_ok=True)
@@ -32,25 +92,76 @@ class ChromaRepository:
         self.client = chromadb.PersistentClient(path=db_path)
 
         # Cargar modelo de embeddings
-        logger.info(f"Cargando modelo de embeddings: {model_name}")
-        self.embedding_model = SentenceTransformer(model_name)
+        logger.info(f"Cargando modelo de embeddings: {model_name} (backend: {embedding_backend})")
+        self.embedding_model = load_embedding_model(model_name, embedding_backend, onnx_path, onnx_threads)
 
         # Nombre de la colección
         self.collection_name = "codigo_transito_colombia"
-        self.collection = None
+        # Colección e índice de keywords servidos; se reemplazan en una sola asignación
+        self.keyword_index_loader = keyword_index_loader
+        self.snapshot = CollectionSnapshot(None, None)
+        # Se incrementa cada vez que cambia la colección o su contenido
+        self.collection_generation = 0
+        # Fecha de modificación del alias leído por última vez
+        self._alias_mtime: Optional[int] = None
+        # Serializa publicar una versión y seguir el alias
+        self._version_lock = threading.Lock()
+
+        # Micro-batcher opcional (se arranca en el lifespan de la aplicación)
+        self.embedding_batcher: Optional[EmbeddingBatcher] = None
+
+    async def start_batcher(self, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        """
+        Arranca el micro-batcher de embeddings en el event loop actual.
+
+        Args:
+            max_batch_size: Máximo de consultas por batch
+            max_wait_ms: Milisegundos máximos de espera para completar un batch
+        """
+        if self.embedding_batcher is None:
+            self.embedding_batcher = EmbeddingBatcher(
+                self.embedding_model,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms
+            )
+        await self.embedding_batcher.start()
+
+    async def stop_batcher(self):
+        """Detiene el micro-batcher de embeddings si está activo."""
+        if self.embedding_batcher is not None:
+            await self.embedding_batcher.stop()
+            self.embedding_batcher = None
+
+    def warm_up(self):
+        """
+        Ejecuta una inferencia de prueba del modelo.
+
+        La primera inferencia reserva memoria e inicializa kernels; hacerla
+        en el calentamiento evita que la pague la primera consulta real.
+        """
+        self.embedding_model.encode(["calentamiento del modelo"])
+        if self.collection is not None:
+            self.collection.count()
 
     def get_collection(self) -> bool:
         """
-        Obtiene la colección existente.
+        Obtiene la colección publicada.
+
+        Usa la versión indicada por el alias; sin alias, la colección con el
+        nombre base (índices creados antes del versionado).
 
         Returns:
             True si la colección existe, False en caso contrario
         """
+        self._alias_mtime = self._alias_mtime_ns()
+        nombre = self.read_alias().get('live') or self.collection_name
         try:
-            self.collection = self.client.get_collection(self.collection_name)
+            coleccion = self.client.get_collection(nombre)
+            with self._version_lock:
+                self._publish(coleccion)
             return True
         except Exception as e:
-            logger.warning(f"Colección '{self.collection_name}' no existe: {e}")
+            logger.warning(f"Colección '{nombre}' no existe: {e}")
             return False
 
     def create_collection(self, recreate: bool = False) -> bool:
@@ -72,15 +183,18 @@ class ChromaRepository:
                     pass
 
             # Crear colección con función de embedding personalizada
-            self.collection = self.client.create_collection(
+            coleccion = self.client.create_collection(
                 name=self.collection_name,
                 embedding_function=None,
                 metadata={
                     "description": "Código Nacional de Tránsito Terrestre de Colombia",
-                    "hnsw:space": "cosine"
+                    "hnsw:space": "cosine",
+                    ENCODER_KEY: self.encoder_id
                 }
             )
 
+            with self._version_lock:
+                self._publish(coleccion)
             logger.info(f"Colección '{self.collection_name}' creada exitosamente")
             return True
 
@@ -88,11 +202,22 @@ class ChromaRepository:
             logger.error(f"Error creando colección: {e}")
             return False
 
+    @property
+    def collection(self):
+        """Colección que se está sirviendo."""
+        return self.snapshot.collection
+
+    @property
+    def collection_version(self) -> tuple:
+        """Identifica el contenido actual de la colección (para invalidar cachés)."""
+        return (getattr(self.collection, 'id', None), self.collection_generation)
+
     def search_articles(
         self,
         consulta: str,
         n_resultados: int = 3,
-        umbral_confianza: float = 0.7
+        umbral_confianza: float = 0.7,
+        collection=None
     ) -> Dict:
         """
         Busca artículos relevantes usando búsqueda vectorial.
@@ -101,17 +226,18 @@ class ChromaRepository:
             consulta: Pregunta del usuario
             n_resultados: Número máximo de resultados
             umbral_confianza: Umbral mínimo de similitud
+            collection: Colección a consultar (None = la publicada)
 
         Returns:
             Diccionario con resultados de la búsqueda
         """
         logger.info(f"Buscando: '{consulta}'")
 
-        # Generar embedding de la consulta
-        query_embedding = self.embedding_model.encode([consulta]).tolist()
+        # Generar embedding de la consulta (o reutilizarlo desde la caché)
+        query_embedding = [self.encode_query(consulta)]
 
         # Buscar en ChromaDB
-        resultados = self.collection.query(
+        resultados = (collection or self.collection).query(
             query_embeddings=query_embedding,
             n_results=n_resultados * 2,
             include=['documents', 'metadatas', 'distances']
@@ -149,6 +275,38 @@ class ChromaRepository:
             'tiempo_busqueda': 0.1
         }
 
+    @staticmethod
+    def _normalize_query(consulta: str) -> str:
+        """Normaliza el texto de una consulta para usarlo como clave de caché."""
+        texto = unicodedata.normalize('NFC', consulta).strip().lower()
+        return re.sub(r'\s+', ' ', texto)
+
+    def encode_query(self, consulta: str) -> List[float]:
+        """
+        Genera el embedding de una consulta usando la caché LRU.
+
+        Las consultas repetidas (tras normalizar mayúsculas y espacios) no
+        vuelven a pasar por el modelo. Si el micro-batcher está activo y la
+        llamada llega desde un hilo de trabajo, el embedding se calcula en
+        batch junto con las demás consultas concurrentes.
+
+        Args:
+            consulta: Texto de la consulta
+
+        Returns:
+            Embedding de la consulta
+        """
+        return self.embedding_cache.get_or_compute(
+            self._normalize_query(consulta),
+            lambda: self._encode_uncached(consulta)
+        )
+
+    def _encode_uncached(self, consulta: str) -> List[float]:
+        batcher = self.embedding_batcher
+        if batcher is not None and batcher.can_block():
+            return batcher.encode_blocking(consulta)
+        return self.embedding_model.encode([consulta])[0].tolist()
+
     def get_stats(self) -> Dict:
         """
         Obtiene estadísticas de la base de datos.
@@ -161,8 +319,12 @@ class ChromaRepository:
             return {
                 'total_articulos': count,
                 'coleccion': self.collection_name,
+                'version': self.live_version,
                 'modelo_embeddings': self.model_name,
-                'ruta_db': self.db_path
+                'backend_embeddings': self.embedding_backend,
+                'ruta_db': self.db_path,
+                'cache_embeddings': self.embedding_cache.stats(),
+                'batcher_embeddings': self.embedding_batcher.stats() if self.embedding_batcher else None
             }
         except Exception as e:
             logger.error(f"Error obteniendo estadísticas: {e}")
@@ -201,6 +363,7 @@ class ChromaRepository:
                 ids=ids
             )
 
+            self.collection_generation += 1
             logger.info(f"✅ {len(documents)} documentos almacenados exitosamente")
             return True
 
@@ -208,14 +371,423 @@ class ChromaRepository:
             logger.error(f"Error añadiendo documentos: {e}")
             return False
 
+    @staticmethod
+    def content_hash(doc_id: str, document: str, metadata: Dict) -> str:
+        """
+        Hash del contenido de un artículo (ID, texto y metadatos).
+
+        Args:
+            doc_id: ID del documento (incluye el número de artículo)
+            document: Texto del artículo
+            metadata: Metadatos del artículo (sin el propio hash)
+
+        Returns:
+            Hash SHA-256 en hexadecimal
+        """
+        metadata = {k: v for k, v in metadata.items() if k != CONTENT_HASH_KEY}
+        payload = json.dumps([doc_id, document, metadata], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def build_version(
+        self,
+        documents: List[str],
+        metadatas: List[Dict],
+        ids: List[str],
+        incremental: bool = True,
+        embedding_batch_size: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        Construye la siguiente versión de la colección (<nombre>_v<n>) sin publicarla.
+
+        En modo incremental compara el hash de contenido de cada documento con
+        el de la versión publicada y solo genera embeddings para los nuevos o
+        modificados; los sin cambios reutilizan su embedding. La versión
+        publicada no se toca: se sigue sirviendo hasta llamar a activate_version.
+
+        Args:
+            documents: Lista de textos de documentos
+            metadatas: Lista de metadatos
+            ids: Lista de IDs únicos
+            incremental: Si es False se regeneran todos los embeddings
+            embedding_batch_size: Tamaño de batch del modelo (por defecto según los núcleos)
+
+        Returns:
+            Diccionario con version, base_version, built, added, updated,
+            unchanged, deleted y elapsed_seconds, o None si hubo un error
+        """
+        lotes = (
+            (documents[i:i + SYNC_BATCH_SIZE], metadatas[i:i + SYNC_BATCH_SIZE], ids[i:i + SYNC_BATCH_SIZE])
+            for i in range(0, len(ids), SYNC_BATCH_SIZE)
+        )
+        return self.build_version_stream(lotes, incremental=incremental, embedding_batch_size=embedding_batch_size)
+
+    def build_version_stream(
+        self,
+        lotes: Iterable[Tuple[List[str], List[Dict], List[str]]],
+        incremental: bool = True,
+        embedding_batch_size: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        Igual que build_version, pero consumiendo los documentos por lotes a
+        medida que se producen (p. ej. desde el pipeline de ingesta).
+
+        Cada lote se clasifica y se escribe en la nueva versión al llegar, así
+        la generación de embeddings se solapa con el procesamiento de los
+        documentos siguientes. Mientras no aparezca ningún cambio, los lotes
+        sin cambios solo se acumulan: si al final no hay cambios no se crea
+        ninguna versión.
+
+        Args:
+            lotes: Iterable de tuplas (documents, metadatas, ids)
+            incremental: Si es False se regeneran todos los embeddings
+            embedding_batch_size: Tamaño de batch del modelo (por defecto según los núcleos)
+
+        Returns:
+            Mismo reporte que build_version, o None si hubo un error
+        """
+        inicio = time.perf_counter()
+        batch_size = embedding_batch_size or default_embedding_batch_size()
+        version = None
+        destino = None
+
+        try:
+            # Hashes de la versión publicada
+            base = self.collection if incremental else None
+            existentes = {}
+            if base is not None and self._collection_encoder(base) != self.encoder_id:
+                # Embeddings de otro encoder: se regeneran todos para no mezclar vectores
+                logger.info(
+                    f"La versión publicada usa el encoder '{self._collection_encoder(base)}', "
+                    f"se regeneran los embeddings con '{self.encoder_id}'"
+                )
+                base = None
+            if base is not None:
+                data = base.get(include=['metadatas'])
+                existentes = {
+                    doc_id: (metadata or {}).get(CONTENT_HASH_KEY)
+                    for doc_id, metadata in zip(data['ids'], data['metadatas'])
+                }
+
+            reporte = {
+                'version': None,
+                'base_version': getattr(base, 'name', None),
+                'built': False,
+                'added': 0,
+                'updated': 0,
+                'unchanged': 0,
+                'deleted': 0
+            }
+            vistos = set()
+            # Artículos sin cambios aún no copiados: id -> (documento, metadato)
+            sin_cambios: Dict[str, Tuple[str, Dict]] = {}
+
+            def abrir_destino():
+                nonlocal version, destino
+                version = self._next_version_name()
+                destino = self._create_empty_collection(version)
+                logger.info(f"Construyendo versión '{version}'...")
+
+            def copiar_sin_cambios():
+                # Copiar los artículos sin cambios con su embedding existente
+                for lote in self._lotes(list(sin_cambios)):
+                    data = base.get(ids=lote, include=['embeddings'])
+                    destino.add(
+                        ids=data['ids'],
+                        embeddings=data['embeddings'],
+                        documents=[sin_cambios[doc_id][0] for doc_id in data['ids']],
+                        metadatas=[sin_cambios[doc_id][1] for doc_id in data['ids']]
+                    )
+                sin_cambios.clear()
+
+            for documents, metadatas, ids in lotes:
+                pendientes = []
+                for doc_id, documento, metadata in zip(ids, documents, metadatas):
+                    if doc_id in vistos:
+                        raise ValueError(f"ID duplicado en los documentos: {doc_id}")
+                    vistos.add(doc_id)
+
+                    metadata = {**metadata, CONTENT_HASH_KEY: self.content_hash(doc_id, documento, metadata)}
+                    if doc_id not in existentes:
+                        reporte['added'] += 1
+                        pendientes.append((doc_id, documento, metadata))
+                    elif existentes[doc_id] != metadata[CONTENT_HASH_KEY]:
+                        reporte['updated'] += 1
+                        pendientes.append((doc_id, documento, metadata))
+                    else:
+                        reporte['unchanged'] += 1
+                        sin_cambios[doc_id] = (documento, metadata)
+
+                if pendientes and destino is None:
+                    abrir_destino()
+                if destino is None:
+                    continue
+
+                copiar_sin_cambios()
+
+                # Generar embeddings solo para los nuevos y modificados
+                if pendientes:
+                    textos = [documento for _, documento, _ in pendientes]
+                    embeddings = self.embedding_model.encode(textos, batch_size=batch_size).tolist()
+                    destino.add(
+                        ids=[doc_id for doc_id, _, _ in pendientes],
+                        embeddings=embeddings,
+                        documents=textos,
+                        metadatas=[metadata for _, _, metadata in pendientes]
+                    )
+
+            if not vistos:
+                raise ValueError("No hay documentos para indexar")
+            reporte['deleted'] = sum(1 for doc_id in existentes if doc_id not in vistos)
+
+            if destino is None:
+                if base is not None and not reporte['deleted']:
+                    logger.info("✅ La colección ya está actualizada, no hay cambios que indexar")
+                    reporte['version'] = base.name
+                    reporte['elapsed_seconds'] = round(time.perf_counter() - inicio, 3)
+                    return reporte
+                # Solo hubo eliminaciones (o no hay versión base): la versión igual cambia
+                abrir_destino()
+                copiar_sin_cambios()
+
+            reporte['version'] = version
+            reporte['built'] = True
+            reporte['elapsed_seconds'] = round(time.perf_counter() - inicio, 3)
+            logger.info(
+                f"✅ Versión '{version}' construida: {reporte['added']} nuevos, {reporte['updated']} modificados, "
+                f"{reporte['unchanged']} sin cambios, {reporte['deleted']} eliminados "
+                f"({reporte['elapsed_seconds']}s)"
+            )
+            return reporte
+
+        except Exception as e:
+            logger.error(f"Error construyendo versión de la colección: {e}")
+            # No dejar versiones a medio construir
+            if version and self._get_collection_or_none(version) is not None:
+                self.client.delete_collection(version)
+            return None
+
+    def activate_version(self, version: str) -> bool:
+        """
+        Publica una versión: actualiza el alias y cambia la colección servida.
+
+        El índice de keywords de la versión se carga antes del cambio, que es
+        una sola asignación de atributo; las búsquedas en curso terminan sobre
+        la versión anterior, que sigue existiendo.
+
+        Args:
+            version: Nombre de la colección a publicar
+
+        Returns:
+            True si se publicó correctamente
+        """
+        coleccion = self._get_collection_or_none(version)
+        if coleccion is None:
+            logger.error(f"❌ La versión '{version}' no existe")
+            return False
+
+        with self._version_lock:
+            anterior = self.live_version
+            if anterior == version:
+                return True
+
+            self._publish(coleccion)
+            self._write_alias(live=version, previous=anterior)
+        logger.info(f"🔀 Versión publicada: '{version}' (anterior: '{anterior}')")
+        return True
+
+    def rollback(self) -> Optional[str]:
+        """
+        Vuelve a publicar la versión anterior registrada en el alias.
+
+        Returns:
+            Nombre de la versión publicada o None si no hay versión anterior
+        """
+        anterior = self.read_alias().get('previous')
+        if not anterior or not self.activate_version(anterior):
+            logger.warning("⚠️ No hay versión anterior a la que volver")
+            return None
+        return anterior
+
+    def refresh_collection(self) -> bool:
+        """
+        Sigue el alias si otro proceso publicó una versión distinta.
+
+        Solo lee el alias cuando cambia su fecha de modificación, así que es
+        barato llamarlo en cada petición. Al cambiar de versión carga su índice
+        de keywords (bloqueante: llamar fuera del event loop).
+
+        Returns:
+            True si se cambió de versión
+        """
+        if self._alias_mtime_ns() == self._alias_mtime:
+            return False
+
+        with self._version_lock:
+            mtime = self._alias_mtime_ns()
+            if mtime == self._alias_mtime:
+                return False
+            self._alias_mtime = mtime
+
+            live = self.read_alias().get('live')
+            if not live or live == self.live_version:
+                return False
+
+            coleccion = self._get_collection_or_none(live)
+            if coleccion is None:
+                logger.error(f"❌ El alias apunta a una versión inexistente: '{live}'")
+                return False
+
+            self._publish(coleccion)
+        logger.info(f"🔀 Versión publicada por otro proceso: '{live}'")
+        return True
+
+    def prune_versions(self, keep: int = 3) -> List[str]:
+        """
+        Elimina las versiones más antiguas, conservando la publicada y la anterior.
+
+        Args:
+            keep: Número de versiones a conservar
+
+        Returns:
+            Lista de versiones eliminadas
+        """
+        protegidas = {self.live_version, self.read_alias().get('previous')}
+        versiones = self.list_versions()
+        eliminables = [v for v in versiones[:max(len(versiones) - keep, 0)] if v not in protegidas]
+
+        for version in eliminables:
+            self.client.delete_collection(version)
+            ruta_indice = self.keyword_index_path(version)
+            if os.path.exists(ruta_indice):
+                os.remove(ruta_indice)
+            logger.info(f"🗑️ Versión eliminada: '{version}'")
+
+        return eliminables
+
+    @property
+    def live_version(self) -> Optional[str]:
+        """Nombre de la colección que se está sirviendo."""
+        return getattr(self.collection, 'name', None)
+
+    def list_versions(self) -> List[str]:
+        """Versiones existentes (<nombre>_v<n>) ordenadas de la más antigua a la más nueva."""
+        patron = re.compile(re.escape(self.collection_name) + VERSION_SUFFIX_PATTERN)
+        versiones = []
+        for coleccion in self.client.list_collections():
+            coincidencia = patron.fullmatch(coleccion.name)
+            if coincidencia:
+                versiones.append((int(coincidencia.group(1)), coleccion.name))
+        return [nombre for _, nombre in sorted(versiones)]
+
+    def keyword_index_path(self, version: Optional[str] = None) -> str:
+        """
+        Ruta del índice de keywords de una versión.
+
+        Args:
+            version: Nombre de la versión (None = la publicada). Si la versión
+                no tiene índice propio se usa el índice legado de CHROMA_DB_PATH
+
+        Returns:
+            Ruta del archivo del índice
+        """
+        version = version or self.live_version
+        if version and version != self.live_version:
+            return os.path.join(self.db_path, f"{version}.{DEFAULT_INDEX_FILENAME}")
+        return self._published_index_path(version)
+
+    def read_alias(self) -> Dict:
+        """Lee el alias de versiones ({'live', 'previous', 'updated_at'})."""
+        try:
+            with open(os.path.join(self.db_path, ALIAS_FILENAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Error leyendo alias de la colección: {e}")
+            return {}
+
+    def _write_alias(self, live: str, previous: Optional[str]):
+        """Escribe el alias de forma atómica (archivo temporal + os.replace)."""
+        path = os.path.join(self.db_path, ALIAS_FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'live': live,
+                'previous': previous,
+                'updated_at': time.strftime("%Y-%m-%dT%H:%M:%S%z")
+            }, f)
+        os.replace(tmp_path, path)
+        self._alias_mtime = self._alias_mtime_ns()
+
+    def _publish(self, coleccion):
+        """
+        Publica una colección junto con su índice de keywords (con _version_lock tomado).
+
+        El índice se carga antes de reemplazar la instantánea, así que ninguna
+        búsqueda ve la colección nueva con el índice de la anterior.
+        """
+        indice = None
+        if self.keyword_index_loader is not None:
+            indice = self.keyword_index_loader(self._published_index_path(coleccion.name))
+        self.snapshot = CollectionSnapshot(coleccion, indice)
+        self.collection_generation += 1
+
+    def _published_index_path(self, version: Optional[str]) -> str:
+        """Índice propio de la versión o, si no lo tiene, el índice legado."""
+        if version:
+            ruta = os.path.join(self.db_path, f"{version}.{DEFAULT_INDEX_FILENAME}")
+            if os.path.exists(ruta):
+                return ruta
+        return os.path.join(self.db_path, DEFAULT_INDEX_FILENAME)
+
+    def _alias_mtime_ns(self) -> Optional[int]:
+        try:
+            return os.stat(os.path.join(self.db_path, ALIAS_FILENAME)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _next_version_name(self) -> str:
+        versiones = self.list_versions()
+        siguiente = int(versiones[-1].rsplit("_v", 1)[1]) + 1 if versiones else 1
+        return f"{self.collection_name}_v{siguiente}"
+
+    def _collection_encoder(self, collection) -> str:
+        """Encoder de una colección (las creadas antes de este metadato usaban torch)."""
+        return (collection.metadata or {}).get(ENCODER_KEY) or f"{BACKEND_TORCH}:{self.model_name}"
+
+    def _get_collection_or_none(self, name: str):
+        """Retorna la colección con ese nombre o None si no existe."""
+        try:
+            return self.client.get_collection(name)
+        except Exception:
+            return None
+
+    def _create_empty_collection(self, name: str):
+        """Crea una colección vacía con la configuración del código, descartando una previa."""
+        if self._get_collection_or_none(name) is not None:
+            self.client.delete_collection(name)
+        return self.client.create_collection(
+            name=name,
+            embedding_function=None,
+            metadata={
+                "description": "Código Nacional de Tránsito Terrestre de Colombia",
+                "hnsw:space": "cosine",
+                ENCODER_KEY: self.encoder_id
+            }
+        )
+
+    @staticmethod
+    def _lotes(items: List[str]) -> List[List[str]]:
+        return [items[i:i + SYNC_BATCH_SIZE] for i in range(0, len(items), SYNC_BATCH_SIZE)]
+
     # Métodos legacy para compatibilidad (alias)
     def obtener_coleccion(self) -> bool:
         """Alias para get_collection (compatibilidad)."""
         return self.get_collection()
 
-    def buscar_articulos(self, consulta: str, n_resultados: int = 3, umbral_confianza: float = 0.7) -> Dict:
+    def buscar_articulos(self, consulta: str, n_resultados: int = 3, umbral_confianza: float = 0.7, collection=None) -> Dict:
         """Alias para search_articles (compatibilidad)."""
-        return self.search_articles(consulta, n_resultados, umbral_confianza)
+        return self.search_articles(consulta, n_resultados, umbral_confianza, collection=collection)
 
     def obtener_estadisticas_db(self) -> Dict:
         """Alias para get_stats (compatibilidad)."""
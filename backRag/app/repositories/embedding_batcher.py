@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batcher asíncrono para el modelo de embeddings.
+
+    Agrupa las llamadas concurrentes a encode() durante unos milisegundos
+    (hasta max_batch_size) y las ejecuta como un único batch en el modelo,
+    resolviendo el future de cada llamador con su propio vector.
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        """
+        Inicializa el batcher. Debe arrancarse con start() dentro del event loop.
+
+        Args:
+            model: Modelo con método encode(List[str]) (SentenceTransformer)
+            max_batch_size: Máximo de textos por batch
+            max_wait_ms: Milisegundos máximos que espera el primer texto del batch
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Un solo hilo para el modelo: los forward passes no se solapan
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-batcher")
+
+        self.batches = 0
+        self.items = 0
+        self.max_batch_observed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Arranca la tarea de fondo que procesa los batches."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"✅ Micro-batcher de embeddings iniciado "
+            f"(max_batch={self.max_batch_size}, max_wait={self.max_wait * 1000:.1f}ms)"
+        )
+
+    async def stop(self):
+        """Detiene la tarea de fondo y cancela las solicitudes pendientes."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+
+        self._executor.shutdown(wait=False)
+        logger.info("Micro-batcher de embeddings detenido")
+
+    async def encode(self, texto: str) -> List[float]:
+        """
+        Encola un texto y espera su embedding.
+
+        Args:
+            texto: Texto a vectorizar
+
+        Returns:
+            Embedding del texto
+        """
+        future = self._loop.create_future()
+        await self._queue.put((texto, future))
+        return await future
+
+    def can_block(self) -> bool:
+        """True si el hilo actual puede esperar al batcher sin bloquear su event loop."""
+        return self.running and threading.get_ident() != self._loop_thread
+
+    def encode_blocking(self, texto: str, timeout: Optional[float] = None) -> List[float]:
+        """
+        Versión síncrona de encode() para código que corre en hilos de trabajo.
+
+        Args:
+            texto: Texto a vectorizar
+            timeout: Segundos máximos de espera
+
+        Returns:
+            Embedding del texto
+        """
+        return asyncio.run_coroutine_threadsafe(self.encode(texto), self._loop).result(timeout)
+
+    async def _run(self):
+        """Bucle principal: junta solicitudes y ejecuta un batch por vuelta."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                restante = deadline - self._loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._process(batch)
+
+    async def _process(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Ejecuta el modelo sobre el batch y resuelve cada future."""
+        pendientes = [(texto, future) for texto, future in batch if not future.done()]
+        if not pendientes:
+            return
+
+        textos = [texto for texto, _ in pendientes]
+        try:
+            vectores = await self._loop.run_in_executor(self._executor, self._encode_batch, textos)
+        except Exception as e:
+            logger.error(f"Error generando embeddings en batch: {e}")
+            for _, future in pendientes:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.items += len(textos)
+        self.max_batch_observed = max(self.max_batch_observed, len(textos))
+
+        for (_, future), vector in zip(pendientes, vectores):
+            if not future.done():
+                future.set_result(vector)
+
+    def _encode_batch(self, textos: List[str]) -> List[List[float]]:
+        return self.model.encode(textos, batch_size=self.max_batch_size).tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas del batcher.
+
+        Returns:
+            Diccionario con número de batches, textos procesados y tamaño medio
+        """
+        return {
+            'running': self.running,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'max_batch_observed': self.max_batch_observed
+        }
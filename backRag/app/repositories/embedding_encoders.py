@@ -0,0 +1,261 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Backends de embeddings disponibles
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+EMBEDDING_BACKENDS = (BACKEND_TORCH, BACKEND_ONNX)
+
+# Archivos de un encoder exportado por scripts/export_onnx_encoder.py
+ONNX_MODEL_FILENAME = "model_int8.onnx"
+ONNX_CONFIG_FILENAME = "encoder_config.json"
+TOKENIZER_FILENAME = "tokenizer.json"
+
+# Modelos cargados en el proceso maestro antes de crear los workers (app/core/server.py).
+# Los workers creados con fork heredan estas páginas y las comparten copy-on-write
+_preloaded_models: Dict[Tuple[str, str], Any] = {}
+
+
+def default_onnx_path(models_dir: str, model_name: str) -> str:
+    """Directorio por defecto del encoder ONNX int8 de un modelo."""
+    return os.path.join(models_dir, f"{model_name.split('/')[-1]}-onnx-int8")
+
+
+def embedding_backend_options(settings) -> Dict[str, Any]:
+    """
+    Argumentos de backend de ChromaRepository según la configuración.
+
+    Args:
+        settings: Configuración de la aplicación (app.core.config.settings)
+
+    Returns:
+        Diccionario con embedding_backend, onnx_path y onnx_threads
+    """
+    return {
+        'embedding_backend': settings.EMBEDDING_BACKEND,
+        'onnx_path': settings.EMBEDDING_ONNX_PATH or default_onnx_path(
+            os.path.join(settings.PROJECT_DIR, "data", "models"), settings.EMBEDDING_MODEL
+        ),
+        'onnx_threads': settings.EMBEDDING_ONNX_THREADS
+    }
+
+
+class OnnxEncoder:
+    """
+    Encoder de sentence embeddings sobre ONNX Runtime (modelo cuantizado int8).
+
+    Reproduce el pipeline de SentenceTransformer (tokenización, transformer,
+    pooling y normalización opcional) con el modelo exportado por
+    scripts/export_onnx_encoder.py, así que sus vectores son compatibles con
+    los del modelo original. Expone el mismo encode() que usa el resto del
+    código, sin cargar PyTorch.
+    """
+
+    def __init__(self, model_dir: str, num_threads: int = 0):
+        """
+        Carga el modelo ONNX, el tokenizer y la configuración de pooling.
+
+        Args:
+            model_dir: Directorio generado por scripts/export_onnx_encoder.py
+            num_threads: Hilos de ONNX Runtime por inferencia (0 = automático)
+
+        Raises:
+            FileNotFoundError: Si el directorio no contiene un encoder exportado
+            ImportError: Si onnxruntime o tokenizers no están instalados
+        """
+        config_path = os.path.join(model_dir, ONNX_CONFIG_FILENAME)
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(
+                f"No hay un encoder ONNX en '{model_dir}'. Genéralo con scripts/export_onnx_encoder.py"
+            )
+
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("El backend 'onnx' requiere onnxruntime y tokenizers") from e
+
+        with open(config_path, 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+
+        self.model_dir = model_dir
+        self.max_seq_length = self.config['max_seq_length']
+        self.pooling = self.config.get('pooling', 'mean')
+        self.normalize = self.config.get('normalize', False)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILENAME))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=self.config['pad_token_id'], pad_token=self.config['pad_token'])
+
+        opciones = onnxruntime.SessionOptions()
+        if num_threads:
+            opciones.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, self.config.get('model_file', ONNX_MODEL_FILENAME)),
+            sess_options=opciones,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {entrada.name for entrada in self.session.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config['dimension']
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Genera los embeddings de uno o varios textos.
+
+        Como SentenceTransformer, procesa los textos ordenados por longitud
+        para minimizar el padding y devuelve los vectores en el orden original.
+
+        Args:
+            sentences: Texto o lista de textos
+            batch_size: Textos por inferencia
+            normalize_embeddings: Normalizar a norma 1 (además de la normalización del modelo)
+            **kwargs: Se ignoran (compatibilidad con SentenceTransformer.encode)
+
+        Returns:
+            np.ndarray (n, dimension) en float32, o (dimension,) si se pasó un solo texto
+        """
+        un_texto = isinstance(sentences, str)
+        textos = [sentences] if un_texto else list(sentences)
+        if not textos:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        orden = np.argsort([-len(texto) for texto in textos], kind='stable')
+        embeddings = np.empty((len(textos), self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        for inicio in range(0, len(textos), batch_size):
+            indices = orden[inicio:inicio + batch_size]
+            embeddings[indices] = self._encode_batch([textos[i] for i in indices])
+
+        if self.normalize or normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+
+        return embeddings[0] if un_texto else embeddings
+
+    def _encode_batch(self, textos: List[str]) -> np.ndarray:
+        codificados = self.tokenizer.encode_batch(textos)
+        input_ids = np.array([c.ids for c in codificados], dtype=np.int64)
+        attention_mask = np.array([c.attention_mask for c in codificados], dtype=np.int64)
+
+        entradas = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self._input_names:
+            entradas['token_type_ids'] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, entradas)[0]
+        return self._pool(token_embeddings, attention_mask)
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling == 'cls':
+            return token_embeddings[:, 0]
+
+        mascara = attention_mask[..., None].astype(np.float32)
+        if self.pooling == 'max':
+            return np.where(mascara > 0, token_embeddings, -1e9).max(axis=1)
+
+        suma = (token_embeddings * mascara).sum(axis=1)
+        return suma / np.clip(mascara.sum(axis=1), 1e-9, None)
+
+
+def load_embedding_model(
+    model_name: str,
+    backend: str = BACKEND_TORCH,
+    onnx_path: Optional[str] = None,
+    onnx_threads: int = 0
+):
+    """
+    Carga el modelo de embeddings con el backend configurado.
+
+    Args:
+        model_name: Modelo de sentence-transformers
+        backend: "torch" (SentenceTransformer fp32) u "onnx" (ONNX Runtime int8)
+        onnx_path: Directorio del encoder ONNX exportado (backend "onnx")
+        onnx_threads: Hilos de ONNX Runtime (0 = automático)
+
+    Returns:
+        Objeto con encode(List[str]) compatible con SentenceTransformer
+
+    Raises:
+        ValueError: Si el backend no existe
+    """
+    if backend == BACKEND_ONNX:
+        logger.info(f"Cargando encoder ONNX int8: {onnx_path}")
+        return OnnxEncoder(onnx_path, num_threads=onnx_threads)
+
+    if backend == BACKEND_TORCH:
+        preloaded = _preloaded_models.get((backend, model_name))
+        if preloaded is not None:
+            logger.info(f"♻️ Usando modelo precargado en el proceso maestro: {model_name}")
+            return preloaded
+
+        # Importación diferida: con el backend ONNX no se carga PyTorch
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    raise ValueError(f"Backend de embeddings desconocido: '{backend}'. Opciones: {', '.join(EMBEDDING_BACKENDS)}")
+
+
+def freeze_embedding_model(model):
+    """
+    Congela los pesos de un modelo torch: modo evaluación y sin gradientes.
+
+    Ninguna inferencia vuelve a escribir sobre los tensores de pesos, así que
+    las páginas heredadas por fork siguen compartidas entre los workers.
+
+    Args:
+        model: SentenceTransformer (u otro torch.nn.Module)
+    """
+    if hasattr(model, 'eval'):
+        model.eval()
+    if hasattr(model, 'parameters'):
+        for parametro in model.parameters():
+            parametro.requires_grad_(False)
+
+
+def preload_embedding_model(
+    model_name: str,
+    embedding_backend: str = BACKEND_TORCH,
+    onnx_path: Optional[str] = None,
+    onnx_threads: int = 0
+) -> bool:
+    """
+    Carga y congela el modelo en el proceso actual para que los workers
+    creados después con fork lo reutilicen (load_embedding_model lo retorna).
+
+    Solo se precarga el backend torch, y sin ejecutar inferencias (los
+    pools de hilos de PyTorch se crean en cada worker). ONNX Runtime crea sus
+    hilos al abrir la sesión y no sobreviven al fork: con ese backend cada
+    worker carga su propia sesión int8.
+
+    Args:
+        model_name: Modelo de sentence-transformers
+        embedding_backend: Backend configurado
+        onnx_path: Directorio del encoder ONNX (no se usa al precargar)
+        onnx_threads: Hilos de ONNX Runtime (no se usa al precargar)
+
+    Returns:
+        True si el modelo quedó precargado
+    """
+    if embedding_backend != BACKEND_TORCH:
+        logger.warning(
+            f"⚠️ El backend '{embedding_backend}' no se precarga: cada worker carga su propia sesión"
+        )
+        return False
+
+    model = load_embedding_model(model_name, embedding_backend)
+    freeze_embedding_model(model)
+    _preloaded_models[(embedding_backend, model_name)] = model
+    logger.info(f"✅ Modelo precargado para compartir entre workers: {model_name}")
+    return True
@@ -0,0 +1,501 @@
+import bisect
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import unicodedata
+from array import array
+from typing import Dict, List, Optional, Tuple
+from app.utils.cache import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Nombre del archivo del índice (se guarda junto a ChromaDB)
+DEFAULT_INDEX_FILENAME = "keyword_index.json"
+
+# Versión del formato en disco
+INDEX_FORMAT_VERSION = 3
+
+# Caracteres iniciales del documento que se consideran "título/encabezado"
+HEAD_LENGTH = 200
+
+# Longitud máxima de los tokens de BM25 (truncamiento como stemming ligero en español)
+TOKEN_PREFIX_LENGTH = 6
+
+# Separador de documentos en el corpus concatenado del motor 'hits'
+# (no aparece en las palabras de una consulta, que se separan por espacios)
+_SEPARADOR_CORPUS = '\x00'
+
+# Palabras cuyas coincidencias 'hits' se guardan en memoria (el índice es inmutable)
+HITS_CACHE_SIZE = 4096
+
+# Motores de puntuación disponibles para la búsqueda por keywords
+SCORER_HITS = "hits"
+SCORER_BM25 = "bm25"
+AVAILABLE_SCORERS = (SCORER_HITS, SCORER_BM25)
+
+# Parámetros BM25F
+BM25_K1 = 1.2
+BM25_B_TITULO = 0.3
+BM25_B_CUERPO = 0.75
+BM25_PESO_TITULO = 3.0
+BM25_PESO_CUERPO = 1.0
+BM25_PESO_SINONIMO = 0.5
+
+# Palabras vacías que no aportan a la búsqueda por keywords
+STOPWORDS = {
+    'a', 'al', 'ante', 'con', 'cual', 'cuales', 'cuanto', 'de', 'del', 'el',
+    'en', 'es', 'esta', 'este', 'hay', 'la', 'las', 'lo', 'los', 'me', 'mi',
+    'o', 'para', 'por', 'que', 'se', 'si', 'sin', 'su', 'sus', 'un', 'una',
+    'y', 'como', 'cuando', 'donde', 'puedo', 'son'
+}
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _fold(texto: str) -> str:
+    """Pasa a minúsculas y elimina tildes/diacríticos."""
+    descompuesto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def _normalizar_token(token: str) -> str:
+    """
+    Stemming ligero: reduce plurales simples y trunca el token para que
+    'multas' coincida con 'multa' y 'suspenderá' con 'suspende'.
+    """
+    if len(token) > 4 and token.endswith('es') and token[-3] in 'dlnr':
+        token = token[:-2]
+    elif len(token) > 3 and token.endswith('s'):
+        token = token[:-1]
+    return token[:TOKEN_PREFIX_LENGTH]
+
+
+def tokenize(texto: str) -> List[str]:
+    """
+    Tokeniza un texto: minúsculas, sin tildes, sin palabras vacías.
+
+    Args:
+        texto: Texto a tokenizar
+
+    Returns:
+        Lista de tokens normalizados (en orden de aparición)
+    """
+    return [
+        _normalizar_token(token)
+        for token in _TOKEN_RE.findall(_fold(texto))
+        if token not in STOPWORDS
+    ]
+
+
+class Posting:
+    """Posting list de un término almacenada en arrays compactos."""
+
+    __slots__ = ('docs', 'tf_titulo', 'tf_cuerpo')
+
+    def __init__(self):
+        self.docs = array('I')       # índice interno del documento
+        self.tf_titulo = array('H')  # frecuencia en el campo título/número
+        self.tf_cuerpo = array('H')  # frecuencia en el cuerpo
+
+    def append(self, doc: int, tf_titulo: int, tf_cuerpo: int):
+        self.docs.append(doc)
+        self.tf_titulo.append(min(tf_titulo, 0xFFFF))
+        self.tf_cuerpo.append(min(tf_cuerpo, 0xFFFF))
+
+    def to_list(self) -> List[List[int]]:
+        return [list(self.docs), list(self.tf_titulo), list(self.tf_cuerpo)]
+
+    @classmethod
+    def from_list(cls, data: List[List[int]]) -> "Posting":
+        posting = cls()
+        posting.docs.extend(data[0])
+        posting.tf_titulo.extend(data[1])
+        posting.tf_cuerpo.extend(data[2])
+        return posting
+
+
+class KeywordIndex:
+    """
+    Índice invertido persistente para la búsqueda por palabras clave.
+
+    Soporta dos motores de puntuación:
+    - 'hits': conteo de subcadenas (+2 encabezado, +1 cuerpo), el contrato original.
+      Busca sobre los textos en minúsculas guardados en el índice, así que da
+      los mismos puntajes que recorrer la colección.
+    - 'bm25': BM25F con campos título/número y cuerpo ponderados por separado
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        postings: Dict[str, Posting],
+        synonyms: Dict[str, List[List[str]]],
+        longitud_titulo: array,
+        longitud_cuerpo: array,
+        textos: List[str],
+        sinonimos_literales: Dict[str, List[str]]
+    ):
+        """
+        Inicializa el índice. Usar build() o load() para construirlo.
+
+        Args:
+            ids: IDs de los documentos en ChromaDB (posición = índice interno)
+            postings: token -> Posting
+            synonyms: token -> lista de términos (cada término es una lista de tokens)
+            longitud_titulo: Longitud en tokens del campo título por documento
+            longitud_cuerpo: Longitud en tokens del cuerpo por documento
+            textos: Texto de cada documento en minúsculas (motor 'hits')
+            sinonimos_literales: Diccionario de sinónimos sin normalizar (motor 'hits')
+        """
+        self.ids = ids
+        self.postings = postings
+        self.synonyms = synonyms
+        self.longitud_titulo = longitud_titulo
+        self.longitud_cuerpo = longitud_cuerpo
+        self.textos = textos
+        self.sinonimos_literales = sinonimos_literales
+        self._precalcular_bm25()
+        self._precalcular_hits()
+
+    def _precalcular_bm25(self):
+        """Precalcula promedios de longitud y la tabla IDF (array por término)."""
+        total_docs = len(self.ids)
+        self.promedio_titulo = (sum(self.longitud_titulo) / total_docs) if total_docs else 0.0
+        self.promedio_cuerpo = (sum(self.longitud_cuerpo) / total_docs) if total_docs else 0.0
+
+        self.vocabulario: Dict[str, int] = {}
+        self.idf = array('d')
+        for termino_id, (token, posting) in enumerate(self.postings.items()):
+            self.vocabulario[token] = termino_id
+            self.idf.append(self._calcular_idf(len(posting.docs)))
+
+        # IDF de un término inexistente (df = 0); se usa para normalizar
+        self.idf_maximo = self._calcular_idf(0)
+
+    def _precalcular_hits(self):
+        """
+        Concatena los textos (y sus encabezados) en un solo string con las
+        posiciones de inicio de cada documento: cada palabra de la consulta se
+        busca con str.find sobre el corpus en vez de documento por documento.
+
+        Sigue siendo O(tamaño del corpus) por cada palabra que no está en la
+        caché, y los dos corpus concatenados duplican los textos en memoria; para
+        búsquedas por listas de postings se usa el motor 'bm25'.
+        """
+        self._corpus, self._inicios = self._concatenar(self.textos)
+        self._corpus_encabezado, self._inicios_encabezado = self._concatenar(
+            [texto[:HEAD_LENGTH] for texto in self.textos]
+        )
+        self._cache_hits = TTLLRUCache(max_size=HITS_CACHE_SIZE, ttl_seconds=None)
+
+    @staticmethod
+    def _concatenar(textos: List[str]) -> Tuple[str, array]:
+        inicios = array('I')
+        posicion = 0
+        for texto in textos:
+            inicios.append(posicion)
+            posicion += len(texto) + len(_SEPARADOR_CORPUS)
+        return _SEPARADOR_CORPUS.join(textos), inicios
+
+    def _calcular_idf(self, df: int) -> float:
+        total_docs = len(self.ids)
+        return math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+
+    @classmethod
+    def build(
+        cls,
+        ids: List[str],
+        documents: List[str],
+        synonyms: Optional[Dict[str, List[str]]] = None,
+        metadatas: Optional[List[Dict]] = None
+    ) -> "KeywordIndex":
+        """
+        Construye el índice a partir de los documentos de la colección.
+
+        Args:
+            ids: IDs únicos de los documentos
+            documents: Textos de los documentos
+            synonyms: Diccionario de sinónimos para expansión de consultas
+            metadatas: Metadatos de los documentos (numero_articulo, titulo).
+                Si no se proporcionan, el título se toma del encabezado.
+
+        Returns:
+            KeywordIndex construido
+        """
+        postings: Dict[str, Posting] = {}
+        longitud_titulo = array('H')
+        longitud_cuerpo = array('I')
+
+        for indice, documento in enumerate(documents):
+            metadata = metadatas[indice] if metadatas else None
+            tokens_titulo = tokenize(cls._campo_titulo(documento, metadata))
+            tokens_cuerpo = tokenize(documento)
+
+            longitud_titulo.append(min(len(tokens_titulo), 0xFFFF))
+            longitud_cuerpo.append(len(tokens_cuerpo))
+
+            frecuencias_titulo: Dict[str, int] = {}
+            for token in tokens_titulo:
+                frecuencias_titulo[token] = frecuencias_titulo.get(token, 0) + 1
+            frecuencias_cuerpo: Dict[str, int] = {}
+            for token in tokens_cuerpo:
+                frecuencias_cuerpo[token] = frecuencias_cuerpo.get(token, 0) + 1
+
+            for token in frecuencias_cuerpo.keys() | frecuencias_titulo.keys():
+                postings.setdefault(token, Posting()).append(
+                    indice,
+                    frecuencias_titulo.get(token, 0),
+                    frecuencias_cuerpo.get(token, 0)
+                )
+
+        sinonimos_normalizados: Dict[str, List[List[str]]] = {}
+        for palabra, lista in (synonyms or {}).items():
+            clave = tokenize(palabra)
+            if len(clave) != 1:
+                continue
+            terminos = [tokenize(sinonimo) for sinonimo in lista]
+            sinonimos_normalizados.setdefault(clave[0], []).extend(t for t in terminos if t)
+
+        logger.info(f"Índice de keywords construido: {len(ids)} documentos, {len(postings)} términos")
+        return cls(
+            list(ids),
+            postings,
+            sinonimos_normalizados,
+            longitud_titulo,
+            longitud_cuerpo,
+            [documento.lower() for documento in documents],
+            dict(synonyms or {})
+        )
+
+    @staticmethod
+    def _campo_titulo(documento: str, metadata: Optional[Dict]) -> str:
+        """
+        Texto del campo título/número de un artículo.
+
+        Muchos artículos no tienen título propio; en ese caso se usa el
+        encabezado del documento (su frase inicial resume el tema).
+        """
+        if metadata and metadata.get('titulo'):
+            return f"Artículo {metadata.get('numero_articulo', '')} {metadata['titulo']}"
+        return documento[:HEAD_LENGTH]
+
+    def save(self, path: str) -> bool:
+        """
+        Guarda el índice en disco (JSON).
+
+        Args:
+            path: Ruta del archivo de destino
+
+        Returns:
+            True si se guardó correctamente
+        """
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            data = {
+                'version': INDEX_FORMAT_VERSION,
+                'ids': self.ids,
+                'longitud_titulo': list(self.longitud_titulo),
+                'longitud_cuerpo': list(self.longitud_cuerpo),
+                'postings': {
+                    token: posting.to_list()
+                    for token, posting in self.postings.items()
+                },
+                'synonyms': self.synonyms,
+                'textos': self.textos,
+                'sinonimos_literales': self.sinonimos_literales
+            }
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            logger.info(f"✅ Índice de keywords guardado en: {path}")
+            return True
+        except Exception as e:
+            logger.error(f"Error guardando índice de keywords: {e}")
+            return False
+
+    @classmethod
+    def load(cls, path: str) -> Optional["KeywordIndex"]:
+        """
+        Carga el índice desde disco.
+
+        Args:
+            path: Ruta del archivo del índice
+
+        Returns:
+            KeywordIndex cargado o None si no existe o es inválido
+        """
+        if not os.path.exists(path):
+            logger.warning(f"⚠️ Índice de keywords no encontrado en: {path}")
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            if data.get('version') != INDEX_FORMAT_VERSION:
+                logger.warning(
+                    f"⚠️ Versión de índice no soportada: {data.get('version')}. "
+                    "Ejecuta el script de setup para regenerarlo"
+                )
+                return None
+
+            postings = {
+                token: Posting.from_list(posting)
+                for token, posting in data['postings'].items()
+            }
+            index = cls(
+                data['ids'],
+                postings,
+                data.get('synonyms', {}),
+                array('H', data['longitud_titulo']),
+                array('I', data['longitud_cuerpo']),
+                data['textos'],
+                data.get('sinonimos_literales', {})
+            )
+            logger.info(f"✅ Índice de keywords cargado: {len(data['ids'])} documentos, {len(postings)} términos")
+            return index
+        except Exception as e:
+            logger.error(f"Error cargando índice de keywords: {e}")
+            return None
+
+    def search(
+        self,
+        consulta: str,
+        n_resultados: int,
+        scorer: str = SCORER_HITS
+    ) -> List[Tuple[str, float]]:
+        """
+        Busca documentos por palabras clave sin recorrer la colección de ChromaDB.
+
+        Args:
+            consulta: Query del usuario
+            n_resultados: Número máximo de resultados
+            scorer: Motor de puntuación ('hits' o 'bm25')
+
+        Returns:
+            Lista de (id_documento, similitud) ordenada por similitud descendente,
+            con similitud normalizada en [0, 1]
+        """
+        if scorer == SCORER_BM25:
+            scores = self._score_bm25(consulta)
+        else:
+            scores = self._score_hits(consulta)
+
+        # Empates en el orden de la colección, como el recorrido sin índice
+        mejores = heapq.nlargest(n_resultados, scores.items(), key=lambda item: (item[1], -item[0]))
+
+        return [(self.ids[indice], score) for indice, score in mejores]
+
+    def _score_hits(self, consulta: str) -> Dict[int, float]:
+        """
+        Puntuación por conteo de coincidencias (contrato original).
+
+        Las palabras son las de la consulta en minúsculas separadas por espacios
+        más sus sinónimos; cada una suma 2 si es subcadena de los primeros
+        HEAD_LENGTH caracteres del documento y 1 si lo es del resto. El puntaje
+        se normaliza por (número de palabras * 2).
+        """
+        palabras_clave = consulta.lower().split()
+        for palabra in palabras_clave.copy():
+            if palabra in self.sinonimos_literales:
+                palabras_clave.extend(self.sinonimos_literales[palabra])
+        if not palabras_clave:
+            return {}
+
+        scores: Dict[int, int] = {}
+        for palabra in palabras_clave:
+            for indice, peso in self._coincidencias_hits(palabra).items():
+                scores[indice] = scores.get(indice, 0) + peso
+
+        max_score = len(palabras_clave) * 2
+        return {indice: min(score / max_score, 1.0) for indice, score in scores.items()}
+
+    def _coincidencias_hits(self, palabra: str) -> Dict[int, int]:
+        """Documentos que contienen la palabra: 2 si está en el encabezado, 1 si no."""
+        coincidencias = self._cache_hits.get(palabra)
+        if coincidencias is None:
+            en_encabezado = set(self._buscar_en_corpus(palabra, self._corpus_encabezado, self._inicios_encabezado))
+            coincidencias = {
+                indice: 2 if indice in en_encabezado else 1
+                for indice in self._buscar_en_corpus(palabra, self._corpus, self._inicios)
+            }
+            self._cache_hits.set(palabra, coincidencias)
+        return coincidencias
+
+    @staticmethod
+    def _buscar_en_corpus(palabra: str, corpus: str, inicios: array) -> List[int]:
+        """Índices de los documentos del corpus concatenado que contienen la palabra."""
+        documentos = []
+        posicion = 0
+        while inicios:
+            posicion = corpus.find(palabra, posicion)
+            if posicion < 0:
+                return documentos
+            indice = bisect.bisect_right(inicios, posicion) - 1
+            documentos.append(indice)
+            if indice + 1 >= len(inicios):
+                return documentos
+            # Saltar al siguiente documento: basta una coincidencia por documento
+            posicion = inicios[indice + 1]
+        return documentos
+
+    def _score_bm25(self, consulta: str) -> Dict[int, float]:
+        """
+        Puntuación BM25F: los campos título/número y cuerpo se normalizan por
+        separado y se combinan con pesos antes de la saturación k1.
+
+        El puntaje se normaliza dividiendo por la suma ponderada de IDF de los
+        términos de la consulta, que es la cota superior del puntaje.
+        """
+        pesos_terminos = self._terminos_bm25(consulta)
+        if not pesos_terminos:
+            return {}
+
+        scores: Dict[int, float] = {}
+        cota = 0.0
+        for token, peso_termino in pesos_terminos.items():
+            termino_id = self.vocabulario.get(token)
+            if termino_id is None:
+                cota += peso_termino * self.idf_maximo
+                continue
+
+            idf = self.idf[termino_id]
+            cota += peso_termino * idf
+            posting = self.postings[token]
+            for indice, tf_titulo, tf_cuerpo in zip(posting.docs, posting.tf_titulo, posting.tf_cuerpo):
+                tf = 0.0
+                if tf_titulo:
+                    tf += BM25_PESO_TITULO * tf_titulo / self._norma(
+                        BM25_B_TITULO, self.longitud_titulo[indice], self.promedio_titulo
+                    )
+                if tf_cuerpo:
+                    tf += BM25_PESO_CUERPO * tf_cuerpo / self._norma(
+                        BM25_B_CUERPO, self.longitud_cuerpo[indice], self.promedio_cuerpo
+                    )
+                scores[indice] = scores.get(indice, 0.0) + peso_termino * idf * tf / (BM25_K1 + tf)
+
+        if cota <= 0:
+            return {}
+        return {indice: min(score / cota, 1.0) for indice, score in scores.items()}
+
+    def _terminos_bm25(self, consulta: str) -> Dict[str, float]:
+        """Tokens de la consulta con su peso (sinónimos con peso reducido)."""
+        pesos: Dict[str, float] = {}
+        originales = tokenize(consulta)
+        for token in originales:
+            pesos[token] = 1.0
+        for token in originales:
+            for termino in self.synonyms.get(token, []):
+                for sinonimo in termino:
+                    pesos.setdefault(sinonimo, BM25_PESO_SINONIMO)
+        return pesos
+
+    @staticmethod
+    def _norma(b: float, longitud: int, promedio: float) -> float:
+        if promedio <= 0:
+            return 1.0
+        return 1 - b + b * longitud / promedio
@@ -1,9 +1,14 @@
 import os
+import time
+import asyncio
 import logging
 import json
-from typing import Dict, Optional, List, Any
-from anthropic import Anthropic
+from typing import AsyncIterator, Dict, Optional, List, Any, Tuple
+from anthropic import AsyncAnthropic
 from app.core.config import settings
+from app.core.executor import run_blocking
+from app.services.context_compactor import ContextCompactor
+from app.utils.prompt_caching import cacheable_system, cacheable_tools, usage_metrics, merge_usage, describe_usage
 
 logger = logging.getLogger(__name__)
 
@@ -11,14 +16,16 @@ logger = logging.getLogger(__name__)
 class AnthropicService:
     """Servicio para generar respuestas usando Anthropic Claude."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, context_compactor: Optional[ContextCompactor] = None):
         """
         Inicializa el servicio Anthropic.
 
         Args:
             api_key: Clave API de Anthropic. Si no se proporciona, se busca en variables de entorno.
+            context_compactor: Compactador del historial de conversación (None = se envía completo)
         """
         self.api_key = api_key or settings.ANTHROPIC_API_KEY
+        self.context_compactor = context_compactor
 
         if not self.api_key:
             logger.warning("⚠️ No se encontró ANTHROPIC_API_KEY. El servicio no estará disponible.")
@@ -26,32 +33,42 @@ class AnthropicService:
         else:
             try:
                 logger.info("🔑 Inicializando cliente Anthropic")
-                self.client = Anthropic(api_key='sk-ant-REDACTED')
+                self.client = AsyncAnthropic(
+                    api_key='sk-ant-REDACTED',
+                    base_url=settings.ANTHROPIC_BASE_URL or None
+                )
                 logger.info(f"✅ Cliente Anthropic inicializado con modelo: {settings.CLAUDE_MODEL}")
             except Exception as e:
                 logger.error(f"❌ Error inicializando Anthropic: {e}")
                 self.client = None
 
-    def chat_with_context(
+    async def chat_with_context(
         self,
         system_context: str,
         user_context: str,
         pregunta: str,
         entidades: List[dict],
-        intencion: str
-    ) -> str:
+        intencion: str,
+        compaction: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, int]]:
         """
         Genera una respuesta basada en el contexto, pregunta, entidades e intención.
 
+        El contexto del sistema se marca como cacheable (ANTHROPIC_PROMPT_CACHING)
+        para que las peticiones que comparten plantilla reutilicen el prefijo.
+
         Args:
             system_context: Contexto del sistema para el modelo
             user_context: Contexto específico del usuario
             pregunta: Pregunta del usuario
             entidades: Lista de entidades detectadas
             intencion: Intención de la consulta
+            compaction: Diccionario opcional que se completa con el reporte de
+                        compactación del contexto del usuario (tokens ahorrados)
 
         Returns:
-            str: Respuesta generada por el modelo
+            Tuple[str, Dict]: Respuesta generada por el modelo y uso de tokens
+            (input, output y escritura/lectura de caché)
 
         Raises:
             ValueError: Si el servicio no está disponible
@@ -61,6 +78,7 @@ class AnthropicService:
             raise ValueError("El servicio Anthropic no está disponible. Verifica la configuración de la API key.")
 
         try:
+            user_context = self._compactar_contexto(user_context, compaction)
             logger.info(f"📤 Enviando consulta a Anthropic Claude")
             logger.info(f"   system_context: {system_context}")
             logger.info(f"   user_context: {user_context}")
@@ -68,16 +86,11 @@ class AnthropicService:
             logger.info(f"   Pregunta: {pregunta[:100]}...")
             logger.info(f"   Entidades: {len(entidades)} detectadas")
 
-            # Construir mensaje del sistema completo
-            system_message = f"{system_context}\n\nContexto del usuario: {user_context}"
-
-            # Construir mensaje del usuario con metadatos
-            user_message = f"Pregunta: {pregunta}\n"
-            if entidades:
-                user_message += f"Entidades detectadas: {entidades}\n"
-            user_message += f"Intención: {intencion}"
+            system_message, user_message = self._build_messages(
+                system_context, user_context, pregunta, entidades, intencion
+            )
 
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model='claude-haiku-4-5',
                 max_tokens=settings.CLAUDE_MAX_TOKENS,
                 temperature=settings.CLAUDE_TEMPERATURE,
@@ -88,15 +101,137 @@ class AnthropicService:
             )
 
             answer = response.content[0].text
+            usage = usage_metrics(response.usage)
             logger.info(f"✅ Respuesta generada exitosamente: {answer}")
             logger.info(f"✅ Respuesta generada exitosamente: {len(answer)} caracteres")
+            self._log_usage(usage)
 
-            return answer
+            return answer, usage
 
         except Exception as e:
             logger.error(f"❌ Error generando respuesta con Anthropic: {e}")
             raise Exception(f"Error al procesar la solicitud: {str(e)}")
 
+    @staticmethod
+    def _build_messages(
+        system_context: str,
+        user_context: str,
+        pregunta: str,
+        entidades: List[dict],
+        intencion: str
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Construye los mensajes de sistema y usuario para chat_with_context.
+
+        Returns:
+            Tupla (bloques de system, user_message). El contexto del sistema
+            es el prefijo cacheable; el contexto del usuario va después.
+        """
+        # Construir mensaje del sistema completo
+        system_message = cacheable_system(
+            system_context,
+            f"Contexto del usuario: {user_context}",
+            enabled=settings.ANTHROPIC_PROMPT_CACHING
+        )
+
+        # Construir mensaje del usuario con metadatos
+        user_message = f"Pregunta: {pregunta}\n"
+        if entidades:
+            user_message += f"Entidades detectadas: {entidades}\n"
+        user_message += f"Intención: {intencion}"
+
+        return system_message, user_message
+
+    async def stream_chat_with_context(
+        self,
+        system_context: str,
+        user_context: str,
+        pregunta: str,
+        entidades: List[dict],
+        intencion: str,
+        usage: Optional[Dict[str, int]] = None,
+        compaction: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Versión en streaming de chat_with_context.
+
+        Args:
+            system_context: Contexto del sistema para el modelo
+            user_context: Contexto específico del usuario
+            pregunta: Pregunta del usuario
+            entidades: Lista de entidades detectadas
+            intencion: Intención de la consulta
+            usage: Diccionario opcional que se completa con el uso de tokens
+                   (incluida la caché) al terminar el stream
+            compaction: Diccionario opcional que se completa con el reporte de
+                        compactación del contexto del usuario
+
+        Yields:
+            str: Fragmentos de la respuesta a medida que Claude los genera
+
+        Raises:
+            ValueError: Si el servicio no está disponible
+        """
+        if not self.client:
+            raise ValueError("El servicio Anthropic no está disponible. Verifica la configuración de la API key.")
+
+        user_context = self._compactar_contexto(user_context, compaction)
+        system_message, user_message = self._build_messages(
+            system_context, user_context, pregunta, entidades, intencion
+        )
+
+        logger.info(f"📤 Enviando consulta en streaming a Anthropic Claude")
+        logger.info(f"   Intención: {intencion}")
+        logger.info(f"   Pregunta: {pregunta[:100]}...")
+
+        stream = await self.client.messages.create(
+            model='claude-haiku-4-5',
+            max_tokens=settings.CLAUDE_MAX_TOKENS,
+            temperature=settings.CLAUDE_TEMPERATURE,
+            system=system_message,
+            messages=[
+                {"role": "user", "content": user_message}
+            ],
+            stream=True
+        )
+        uso = {}
+        async for event in stream:
+            if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                yield event.delta.text
+            elif event.type == "message_start":
+                uso = usage_metrics(event.message.usage)
+            elif event.type == "message_delta" and getattr(event, "usage", None) is not None:
+                uso["output_tokens"] = event.usage.output_tokens
+
+        self._log_usage(uso)
+        if usage is not None:
+            usage.update(uso)
+
+    def _compactar_contexto(self, user_context: str, compaction: Optional[Dict[str, Any]]) -> str:
+        """
+        Aplica el presupuesto de tokens al contexto del usuario (historial de la conversación).
+
+        Args:
+            user_context: Contexto del usuario tal como llegó en la petición
+            compaction: Diccionario opcional que se completa con el reporte
+
+        Returns:
+            Contexto a enviar a Claude (el original si no supera el presupuesto)
+        """
+        if self.context_compactor is None:
+            return user_context
+
+        texto, reporte = self.context_compactor.compact(user_context)
+        if reporte['applied']:
+            logger.info(
+                f"🗜️ Contexto del usuario compactado: {reporte['tokens_original']} → {reporte['tokens_sent']} "
+                f"tokens (-{reporte['tokens_saved']}), {reporte['turns_summarized']} turnos resumidos en "
+                f"{reporte['segments']} segmentos ({reporte['summary_cache_hits']} desde caché)"
+            )
+        if compaction is not None:
+            compaction.update(reporte)
+        return texto
+
     def verificar_disponibilidad(self) -> Dict[str, any]:
         """
         Verifica si el servicio Anthropic está disponible.
@@ -110,7 +245,7 @@ class AnthropicService:
             "modelo": settings.CLAUDE_MODEL if self.client else "no_disponible"
         }
 
-    def chat_with_tools(
+    async def chat_with_tools(
         self,
         system_context: str,
         user_context: str,
@@ -119,8 +254,9 @@ class AnthropicService:
         intencion: str,
         tools: List[Dict[str, Any]],
         tool_manager,
-        max_iterations: int = 5
-    ) -> str:
+        max_iterations: int = 5,
+        compaction: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
         """
         Genera una respuesta usando Claude con function calling (tools).
 
@@ -136,9 +272,18 @@ class AnthropicService:
             tools: Lista de definiciones de tools en formato Anthropic
             tool_manager: Instancia de ToolManager para ejecutar tools
             max_iterations: Número máximo de iteraciones del loop. Default: 5
+            compaction: Diccionario opcional que se completa con el reporte de
+                        compactación del contexto del usuario
+
+        Los tool_use de un mismo turno son independientes entre sí: se ejecutan
+        concurrentemente en el pool de hilos (TOOL_PARALLEL_EXECUTION), cada uno
+        con un timeout de TOOL_TIMEOUT_SECONDS, y sus resultados se devuelven a
+        Claude en el orden original.
 
         Returns:
-            str: Respuesta generada por el modelo
+            Tuple[str, Dict]: Respuesta generada por el modelo y metadatos de
+            tiempos (llamada al LLM, tools y total por iteración; duración y
+            estado de cada tool) y de uso de tokens, incluida la caché
 
         Raises:
             ValueError: Si el servicio no está disponible
@@ -148,13 +293,20 @@ class AnthropicService:
             raise ValueError("El servicio Anthropic no está disponible. Verifica la configuración de la API key.")
 
         try:
+            user_context = self._compactar_contexto(user_context, compaction)
             logger.info(f"🔧 Iniciando chat con tools habilitados")
             logger.info(f"   Tools disponibles: {[tool['name'] for tool in tools]}")
             logger.info(f"   Intención: {intencion}")
             logger.info(f"   Pregunta: {pregunta[:100]}...")
 
-            # Construir mensaje del sistema completo
-            system_message = f"Genera un correo profesional de máximo 150 tokens. No excedas ese límite \n\n {system_context}\n\nContexto del usuario: {user_context}"
+            # Construir mensaje del sistema: instrucciones + contexto del sistema
+            # (prefijo cacheable, junto con las tools) y contexto del usuario
+            system_message = cacheable_system(
+                f"Genera un correo profesional de máximo 150 tokens. No excedas ese límite \n\n {system_context}",
+                f"Contexto del usuario: {user_context}",
+                enabled=settings.ANTHROPIC_PROMPT_CACHING
+            )
+            tools = cacheable_tools(tools, enabled=settings.ANTHROPIC_PROMPT_CACHING)
             logger.info("///////"*50)
             logger.info(f"     system_message : {  system_message }...")
             logger.info("///////"*50)
@@ -167,12 +319,23 @@ class AnthropicService:
             # Inicializar conversación
             messages = [{"role": "user", "content": user_message}]
 
+            # Tiempos por iteración y por tool
+            metadata = {
+                "parallel_tools": settings.TOOL_PARALLEL_EXECUTION,
+                "tool_timeout": settings.TOOL_TIMEOUT_SECONDS,
+                "iterations": [],
+                "usage": {}
+            }
+
             # Loop agentic
             for iteration in range(max_iterations):
                 logger.info(f"🔄 Iteración {iteration + 1}/{max_iterations}")
+                iteration_start = time.perf_counter()
+                iteration_metrics = {"iteration": iteration + 1}
+                metadata["iterations"].append(iteration_metrics)
 
                 # Llamar a Claude con tools habilitados
-                response = self.client.messages.create(
+                response = await self.client.messages.create(
                     model='claude-haiku-4-5',
                     max_tokens=settings.CLAUDE_MAX_TOKENS,
                     temperature=settings.CLAUDE_TEMPERATURE,
@@ -180,6 +343,10 @@ class AnthropicService:
                     messages=messages,
                     tools=tools
                 )
+                iteration_metrics["llm_time"] = round(time.perf_counter() - iteration_start, 4)
+                iteration_metrics["stop_reason"] = response.stop_reason
+                iteration_metrics["usage"] = usage_metrics(response.usage)
+                merge_usage(metadata["usage"], iteration_metrics["usage"])
 
                 logger.info(f"📥 Stop reason: {response.stop_reason}")
 
@@ -194,7 +361,7 @@ class AnthropicService:
                             break
 
                     logger.info(f"✅ Respuesta final generada sin tools (iteración {iteration + 1})")
-                    return text_response
+                    return text_response, self._cerrar_metadata(metadata, iteration_metrics, iteration_start)
 
                 elif response.stop_reason == "tool_use":
                     # Claude quiere usar uno o más tools
@@ -206,38 +373,16 @@ class AnthropicService:
                         "content": response.content
                     })
 
-                    # Procesar cada tool_use en la respuesta
-                    tool_results = []
-                    for block in response.content:
-                        if hasattr(block, 'type') and block.type == "tool_use":
-                            tool_name = block.name
-                            tool_input = block.input
-                            tool_use_id = block.id
-
-                            logger.info(f"   🔨 Tool: {tool_name}")
-                            logger.info(f"   📝 Input: {tool_input}")
-
-                            # Ejecutar tool
-                            try:
-                                tool_result = tool_manager.execute_tool(
-                                    tool_name=tool_name,
-                                    tool_input=tool_input
-                                )
-                                logger.info(f"   ✅ Tool ejecutado exitosamente")
-
-                            except Exception as e:
-                                logger.error(f"   ❌ Error ejecutando tool: {e}")
-                                tool_result = {
-                                    "success": False,
-                                    "error": str(e)
-                                }
-
-                            # Agregar resultado a la lista
-                            tool_results.append({
-                                "type": "tool_result",
-                                "tool_use_id": tool_use_id,
-                                "content": json.dumps(tool_result, ensure_ascii=False)
-                            })
+                    # Ejecutar los tool_use del turno (concurrentes entre sí)
+                    tool_blocks = [
+                        block for block in response.content
+                        if hasattr(block, 'type') and block.type == "tool_use"
+                    ]
+                    tools_start = time.perf_counter()
+                    tool_results, tool_timings = await self._execute_tool_calls(tool_manager, tool_blocks)
+                    iteration_metrics["tools_time"] = round(time.perf_counter() - tools_start, 4)
+                    iteration_metrics["tools"] = tool_timings
+                    iteration_metrics["total_time"] = round(time.perf_counter() - iteration_start, 4)
 
                     # Agregar tool_results a messages
                     messages.append({
@@ -256,19 +401,126 @@ class AnthropicService:
                             text_response = block.text
                             break
 
-                    if text_response:
-                        return text_response
-                    else:
-                        return "Lo siento, la respuesta fue muy larga. Por favor, intenta con una pregunta más específica."
+                    if not text_response:
+                        text_response = "Lo siento, la respuesta fue muy larga. Por favor, intenta con una pregunta más específica."
+                    return text_response, self._cerrar_metadata(metadata, iteration_metrics, iteration_start)
 
                 else:
                     logger.warning(f"⚠️ Stop reason inesperado: {response.stop_reason}")
+                    self._cerrar_metadata(metadata, iteration_metrics, iteration_start)
                     break
 
             # Si se alcanzó max_iterations sin respuesta final
             logger.warning(f"⚠️ Se alcanzó el máximo de iteraciones ({max_iterations})")
-            return "Lo siento, no pude procesar tu consulta completamente. Por favor, intenta reformularla."
+            return (
+                "Lo siento, no pude procesar tu consulta completamente. Por favor, intenta reformularla.",
+                self._cerrar_metadata(metadata)
+            )
 
         except Exception as e:
             logger.error(f"❌ Error generando respuesta con tools: {e}")
             raise Exception(f"Error al procesar la solicitud con tools: {str(e)}")
+
+    async def _execute_tool(self, tool_manager, block) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Ejecuta un tool_use en el pool de hilos con timeout.
+
+        Args:
+            tool_manager: Instancia de ToolManager
+            block: Bloque tool_use de la respuesta de Claude
+
+        Returns:
+            Tuple con el bloque tool_result y los tiempos del tool
+        """
+        logger.info(f"   🔨 Tool: {block.name}")
+        logger.info(f"   📝 Input: {block.input}")
+
+        inicio = time.perf_counter()
+        status = "ok"
+        try:
+            # El hilo no se puede interrumpir: si vence el timeout, el tool
+            # termina en segundo plano y Claude recibe el error.
+            tool_result = await asyncio.wait_for(
+                run_blocking(tool_manager.execute_tool, tool_name=block.name, tool_input=block.input),
+                timeout=settings.TOOL_TIMEOUT_SECONDS
+            )
+            if isinstance(tool_result, dict) and tool_result.get("success") is False:
+                status = "error"
+            logger.info(f"   ✅ Tool '{block.name}' ejecutado")
+
+        except asyncio.TimeoutError:
+            logger.error(f"   ⏰ Tool '{block.name}' excedió {settings.TOOL_TIMEOUT_SECONDS}s")
+            status = "timeout"
+            tool_result = {
+                "success": False,
+                "error": f"El tool excedió el tiempo máximo de {settings.TOOL_TIMEOUT_SECONDS}s"
+            }
+
+        except Exception as e:
+            logger.error(f"   ❌ Error ejecutando tool: {e}")
+            status = "error"
+            tool_result = {
+                "success": False,
+                "error": str(e)
+            }
+
+        duracion = time.perf_counter() - inicio
+        tool_content = {
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": json.dumps(tool_result, ensure_ascii=False)
+        }
+        if status != "ok":
+            tool_content["is_error"] = True
+
+        return tool_content, {
+            "name": block.name,
+            "tool_use_id": block.id,
+            "status": status,
+            "duration": round(duracion, 4)
+        }
+
+    async def _execute_tool_calls(self, tool_manager, blocks: List[Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Ejecuta los tool_use de un turno, concurrentemente si está habilitado.
+
+        Args:
+            tool_manager: Instancia de ToolManager
+            blocks: Bloques tool_use en el orden en que los pidió Claude
+
+        Returns:
+            Tuple con los tool_result y los tiempos, en el mismo orden que blocks
+        """
+        if settings.TOOL_PARALLEL_EXECUTION and len(blocks) > 1:
+            logger.info(f"   ⚡ Ejecutando {len(blocks)} tools en paralelo")
+            ejecutados = await asyncio.gather(
+                *(self._execute_tool(tool_manager, block) for block in blocks)
+            )
+        else:
+            ejecutados = [await self._execute_tool(tool_manager, block) for block in blocks]
+
+        return [resultado for resultado, _ in ejecutados], [tiempos for _, tiempos in ejecutados]
+
+    @staticmethod
+    def _cerrar_metadata(
+        metadata: Dict[str, Any],
+        iteration_metrics: Optional[Dict[str, Any]] = None,
+        iteration_start: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Completa los totales de los metadatos de tiempos de chat_with_tools."""
+        if iteration_metrics is not None and iteration_start is not None:
+            iteration_metrics["total_time"] = round(time.perf_counter() - iteration_start, 4)
+
+        iteraciones = metadata["iterations"]
+        metadata["iteration_count"] = len(iteraciones)
+        metadata["llm_time"] = round(sum(i.get("llm_time", 0.0) for i in iteraciones), 4)
+        metadata["tools_time"] = round(sum(i.get("tools_time", 0.0) for i in iteraciones), 4)
+        metadata["tool_calls"] = sum(len(i.get("tools", [])) for i in iteraciones)
+        AnthropicService._log_usage(metadata["usage"])
+        return metadata
+
+    @staticmethod
+    def _log_usage(usage: Dict[str, int]):
+        """Registra el uso de tokens y de la caché de prompts de una petición."""
+        if usage:
+            logger.info(f"🧮 {describe_usage(usage)}")
@@ -0,0 +1,304 @@
+"""
+Compactación del historial de conversación (context.user) antes de llamar a Claude.
+
+Rasa envía en context.user el historial reciente con una línea por mensaje
+("Usuario: ..." / "Bot: ..."). Si supera el presupuesto de tokens, se
+conservan literales los turnos más recientes y los anteriores se agrupan en
+segmentos que se reemplazan por un resumen extractivo (las oraciones con más
+términos relevantes del segmento).
+
+Los límites de los segmentos dependen del contenido de cada turno y no de su
+posición, así que siguen siendo los mismos aunque la ventana de Rasa
+descarte los mensajes más antiguos: el resumen de cada segmento se calcula
+una vez y se reutiliza desde la caché en las peticiones siguientes.
+"""
+import hashlib
+import logging
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.repositories.keyword_index import tokenize
+from app.utils.cache import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Prefijos de las líneas del historial (actions/utils/transcript_builder.py de Rasa)
+PREFIJO_USUARIO = "Usuario"
+PREFIJO_BOT = "Bot"
+
+# Fracción del presupuesto reservada para los resúmenes de los turnos anteriores
+_FRACCION_RESUMENES = 0.25
+
+# Las preguntas del usuario expresan la intención de la conversación
+_PESO_USUARIO = 1.5
+
+# Fin de oración: puntuación seguida de una palabra que empieza en mayúscula o con ¿ / ¡
+_ORACION_RE = re.compile(r'(?<=[.!?])\s+(?=[A-ZÁÉÍÓÚÑ¿¡])')
+
+
+def estimate_tokens(texto: str) -> int:
+    """Estimación de tokens de un texto (caracteres / 4, igual que en Rasa)."""
+    return max(1, len(texto) // 4) if texto else 0
+
+
+def _separar_turnos(contexto: str) -> List[List[str]]:
+    """
+    Divide el historial en turnos: cada línea "Usuario:" abre uno nuevo.
+
+    Las líneas sin prefijo continúan el mensaje anterior (respuestas en
+    varias líneas); las que preceden al primer "Usuario:" forman un turno.
+    """
+    turnos: List[List[str]] = []
+    for linea in contexto.splitlines():
+        if not linea.strip():
+            continue
+        if linea.startswith(f"{PREFIJO_USUARIO}:") or not turnos:
+            turnos.append([linea])
+        elif linea.startswith(f"{PREFIJO_BOT}:"):
+            turnos[-1].append(linea)
+        else:
+            turnos[-1][-1] += f"\n{linea}"
+    return turnos
+
+
+def _analizar_mensaje(linea: str) -> Tuple[str, float, List[Tuple[str, frozenset]]]:
+    """
+    Separa una línea del historial en prefijo, peso y oraciones con sus términos.
+
+    Returns:
+        Tupla (prefijo o "" si no tiene, peso de sus oraciones, [(oración, términos)])
+    """
+    prefijo, _, mensaje = linea.partition(":")
+    if prefijo not in (PREFIJO_USUARIO, PREFIJO_BOT):
+        prefijo, mensaje = "", linea
+    peso = _PESO_USUARIO if prefijo == PREFIJO_USUARIO else 1.0
+    oraciones = []
+    for oracion in _ORACION_RE.split(mensaje.strip().replace("\n", " ")):
+        tokens = frozenset(tokenize(oracion))
+        if tokens:
+            oraciones.append((oracion, tokens))
+    return prefijo, peso, oraciones
+
+
+def _cierra_segmento(turno: List[str], segment_turns: int) -> bool:
+    """Límite de segmento definido por el contenido del turno (estable entre peticiones)."""
+    return zlib.crc32("\n".join(turno).encode('utf-8')) % segment_turns == 0
+
+
+class ContextCompactor:
+    """
+    Aplica un presupuesto de tokens al historial de conversación.
+
+    Con historiales dentro del presupuesto no hace nada; el texto se envía
+    igual que antes.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 600,
+        recent_turns: int = 2,
+        segment_turns: int = 4,
+        summary_tokens: int = 60,
+        cache_size: int = 1024,
+        cache_ttl: Optional[float] = 3600.0
+    ):
+        """
+        Inicializa el compactador.
+
+        Args:
+            token_budget: Tokens estimados máximos del historial enviado a Claude
+            recent_turns: Turnos recientes que siempre se envían literales
+            segment_turns: Turnos promedio por segmento resumido
+            summary_tokens: Tokens máximos del resumen de cada segmento
+            cache_size: Resúmenes de segmentos en caché (0 la desactiva)
+            cache_ttl: Segundos de vida de cada resumen
+        """
+        self.token_budget = token_budget
+        self.recent_turns = max(1, recent_turns)
+        self.segment_turns = max(1, segment_turns)
+        self.summary_tokens = summary_tokens
+        self.summaries = TTLLRUCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        # Oraciones y términos de cada mensaje: un mensaje aparece en muchas
+        # peticiones seguidas (la ventana de Rasa se desliza de a un turno)
+        self._mensajes = TTLLRUCache(max_size=cache_size * 4, ttl_seconds=cache_ttl)
+        self._contadores = {'peticiones': 0, 'compactadas': 0, 'tokens_ahorrados': 0}
+
+    def compact(self, contexto: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Compacta el historial si supera el presupuesto de tokens.
+
+        Args:
+            contexto: Historial con una línea "Usuario:"/"Bot:" por mensaje
+
+        Returns:
+            Tupla (historial a enviar, reporte con tokens originales, enviados
+            y ahorrados, turnos literales/resumidos y segmentos)
+        """
+        self._contadores['peticiones'] += 1
+        tokens_originales = estimate_tokens(contexto)
+        turnos = _separar_turnos(contexto)
+        reporte = {
+            'applied': False,
+            'budget': self.token_budget,
+            'tokens_original': tokens_originales,
+            'tokens_sent': tokens_originales,
+            'tokens_saved': 0,
+            'turns': len(turnos),
+            'turns_verbatim': len(turnos),
+            'turns_summarized': 0,
+            'segments': 0,
+            'segments_dropped': 0,
+            'summary_cache_hits': 0
+        }
+        if tokens_originales <= self.token_budget or len(turnos) <= self.recent_turns:
+            return contexto, reporte
+
+        literales, anteriores = self._dividir_recientes(turnos)
+        tokens_literales = sum(estimate_tokens("\n".join(turno)) for turno in literales)
+
+        resumenes = []
+        for segmento in self._segmentos(anteriores):
+            resumen, en_cache = self._resumir(segmento)
+            resumenes.append(resumen)
+            reporte['summary_cache_hits'] += en_cache
+        reporte['segments'] = len(resumenes)
+
+        # Si los resúmenes no caben junto a los turnos literales, se descartan los más antiguos
+        disponibles = self.token_budget - tokens_literales
+        while resumenes and sum(estimate_tokens(r) for r in resumenes) + len(resumenes) > disponibles:
+            resumenes.pop(0)
+            reporte['segments_dropped'] += 1
+
+        texto = "\n".join(resumenes + ["\n".join(turno) for turno in literales])
+        tokens_enviados = estimate_tokens(texto)
+        if tokens_enviados >= tokens_originales:
+            return contexto, reporte
+
+        reporte.update({
+            'applied': True,
+            'tokens_sent': tokens_enviados,
+            'tokens_saved': tokens_originales - tokens_enviados,
+            'turns_verbatim': len(literales),
+            'turns_summarized': len(anteriores)
+        })
+        self._contadores['compactadas'] += 1
+        self._contadores['tokens_ahorrados'] += reporte['tokens_saved']
+        return texto, reporte
+
+    def _dividir_recientes(self, turnos: List[List[str]]) -> Tuple[List[List[str]], List[List[str]]]:
+        """
+        Separa los turnos que se envían literales (los más recientes) de los que se resumen.
+
+        Los últimos recent_turns se conservan siempre; los anteriores a ellos
+        también, mientras quepan en la parte del presupuesto no reservada
+        para los resúmenes.
+        """
+        presupuesto = self.token_budget * (1 - _FRACCION_RESUMENES)
+        corte = len(turnos) - self.recent_turns
+        tokens = sum(estimate_tokens("\n".join(turno)) for turno in turnos[corte:])
+        while corte > 0:
+            tokens_turno = estimate_tokens("\n".join(turnos[corte - 1]))
+            if tokens + tokens_turno > presupuesto:
+                break
+            tokens += tokens_turno
+            corte -= 1
+        return turnos[corte:], turnos[:corte]
+
+    def _segmentos(self, turnos: List[List[str]]) -> List[List[List[str]]]:
+        """Agrupa los turnos anteriores en segmentos de límites definidos por contenido."""
+        segmentos, actual = [], []
+        for turno in turnos:
+            actual.append(turno)
+            if _cierra_segmento(turno, self.segment_turns) or len(actual) >= 2 * self.segment_turns:
+                segmentos.append(actual)
+                actual = []
+        if actual:
+            segmentos.append(actual)
+        return segmentos
+
+    def _resumir(self, segmento: List[List[str]]) -> Tuple[str, bool]:
+        """
+        Retorna el resumen del segmento (desde la caché si ya se calculó).
+
+        Returns:
+            Tupla (resumen, si vino de la caché)
+        """
+        texto = "\n".join("\n".join(turno) for turno in segmento)
+        clave = hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+        resumen = self.summaries.get(clave)
+        if resumen is not None:
+            return resumen, True
+
+        turnos = f"{len(segmento)} turnos anteriores" if len(segmento) > 1 else "1 turno anterior"
+        resumen = f"[Resumen de {turnos}] {self._extraer_oraciones(segmento)}"
+        self.summaries.set(clave, resumen)
+        return resumen, False
+
+    def _extraer_oraciones(self, segmento: List[List[str]]) -> str:
+        """
+        Resumen extractivo al estilo SumBasic: elige la oración cuyos términos
+        son más frecuentes en el segmento, baja el peso de esos términos (para
+        no repetir información) y repite hasta llenar summary_tokens. Las
+        oraciones elegidas se devuelven en su orden original.
+        """
+        oraciones, vistas = [], set()
+        for turno in segmento:
+            for linea in turno:
+                prefijo, peso, analizadas = self._mensajes.get_or_compute(linea, lambda: _analizar_mensaje(linea))
+                for oracion, tokens in analizadas:
+                    if (prefijo, tokens) not in vistas:
+                        vistas.add((prefijo, tokens))
+                        oraciones.append((prefijo, oracion, tokens, peso))
+        if not oraciones:
+            return ""
+
+        probabilidades: Dict[str, float] = {}
+        for _, _, tokens, _ in oraciones:
+            for token in tokens:
+                probabilidades[token] = probabilidades.get(token, 0) + 1
+        total = sum(probabilidades.values())
+        probabilidades = {token: n / total for token, n in probabilidades.items()}
+
+        def puntaje(i: int) -> float:
+            _, _, tokens, peso = oraciones[i]
+            return peso * sum(probabilidades[t] for t in tokens) / len(tokens)
+
+        elegidas, tokens_usados = [], 0
+        pendientes = set(range(len(oraciones)))
+        while pendientes:
+            candidatas = [
+                i for i in pendientes
+                if tokens_usados + estimate_tokens(oraciones[i][1]) <= self.summary_tokens
+            ]
+            if not candidatas:
+                if elegidas:
+                    break
+                candidatas = list(pendientes)
+            mejor = max(candidatas, key=puntaje)
+            pendientes.discard(mejor)
+            elegidas.append(mejor)
+            tokens_usados += estimate_tokens(oraciones[mejor][1])
+            for token in oraciones[mejor][2]:
+                probabilidades[token] **= 2
+
+        partes = []
+        for i in sorted(elegidas):
+            prefijo, oracion = oraciones[i][0], oraciones[i][1]
+            if len(oracion) > self.summary_tokens * 4:
+                oracion = oracion[:self.summary_tokens * 4].rstrip() + "…"
+            partes.append(f"{prefijo}: {oracion}" if prefijo else oracion)
+        return " ".join(partes)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas acumuladas de la compactación.
+
+        Returns:
+            Diccionario con peticiones, compactadas, tokens ahorrados y caché de resúmenes
+        """
+        return {
+            'token_budget': self.token_budget,
+            **self._contadores,
+            'cache': self.summaries.stats()
+        }
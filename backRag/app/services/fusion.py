@@ -0,0 +1,145 @@
+"""
+Fusión de los resultados de la búsqueda híbrida (vectorial + keywords).
+
+Cada pata entrega su lista ordenada de artículos con 'similitud' en su propia
+escala (coseno para la vectorial, BM25F o conteo normalizado para keywords).
+La fusión calcula un puntaje por artículo sin materializar la lista
+combinada ordenada: solo se construyen los n mejores con un heap.
+
+Métodos:
+- max: la mayor similitud entre las patas (comportamiento original)
+- rrf: Reciprocal Rank Fusion, suma de peso / (rrf_k + posición) por pata;
+  usa solo las posiciones, así que no depende de la escala de cada pata
+- weighted: suma ponderada de las similitudes normalizadas min-max por pata
+
+La 'similitud' de cada artículo sigue siendo la mayor similitud entre las
+patas: el umbral de confianza y la confianza de la respuesta usan esa escala
+calibrada; el puntaje de fusión solo decide el orden.
+"""
+import heapq
+from typing import Dict, Hashable, List, Optional
+
+FUSION_MAX = "max"
+FUSION_RRF = "rrf"
+FUSION_WEIGHTED = "weighted"
+AVAILABLE_FUSIONS = (FUSION_MAX, FUSION_RRF, FUSION_WEIGHTED)
+
+# Nombres de las patas de la búsqueda híbrida
+LEG_VECTOR = "vectorial"
+LEG_KEYWORD = "keyword"
+
+# Constante de RRF (Cormack et al.): atenúa la diferencia entre las primeras posiciones
+RRF_K = 60
+
+
+class _Candidato:
+    """Acumulador del puntaje de un artículo (el resultado se copia solo si queda en el top-n)."""
+
+    __slots__ = ('resultado', 'similitud', 'score', 'patas')
+
+    def __init__(self, resultado: Dict):
+        self.resultado = resultado
+        self.similitud = resultado['similitud']
+        self.score = 0.0
+        self.patas: List[str] = []
+
+
+def _clave(resultado: Dict) -> Hashable:
+    metadata = resultado['metadata']
+    return metadata.get('fuente'), metadata['numero_articulo']
+
+
+def _normalizador(resultados: List[Dict]):
+    """Min-max de las similitudes de una pata (1.0 si todas son iguales)."""
+    similitudes = [r['similitud'] for r in resultados]
+    minimo, maximo = min(similitudes), max(similitudes)
+    if maximo <= minimo:
+        return lambda similitud: 1.0
+    return lambda similitud: (similitud - minimo) / (maximo - minimo)
+
+
+def _puntuar(
+    patas: Dict[str, List[Dict]],
+    metodo: str,
+    pesos: Dict[str, float],
+    rrf_k: int
+) -> List[_Candidato]:
+    candidatos: Dict[Hashable, _Candidato] = {}
+
+    for nombre, resultados in patas.items():
+        if not resultados:
+            continue
+        peso = pesos.get(nombre, 1.0)
+        normalizar = _normalizador(resultados) if metodo == FUSION_WEIGHTED else None
+
+        for posicion, resultado in enumerate(resultados, start=1):
+            clave = _clave(resultado)
+            candidato = candidatos.get(clave)
+            if candidato is None:
+                candidato = candidatos[clave] = _Candidato(resultado)
+            elif resultado['similitud'] > candidato.similitud:
+                candidato.resultado = resultado
+                candidato.similitud = resultado['similitud']
+            candidato.patas.append(nombre)
+
+            if metodo == FUSION_RRF:
+                candidato.score += peso / (rrf_k + posicion)
+            elif metodo == FUSION_WEIGHTED:
+                candidato.score += peso * normalizar(resultado['similitud'])
+
+    if metodo == FUSION_MAX:
+        for candidato in candidatos.values():
+            candidato.score = candidato.similitud
+
+    return list(candidatos.values())
+
+
+def fuse_results(
+    patas: Dict[str, List[Dict]],
+    n_resultados: int,
+    umbral_confianza: float,
+    metodo: str = FUSION_MAX,
+    pesos: Optional[Dict[str, float]] = None,
+    rrf_k: int = RRF_K,
+    umbral_minimo: float = 0.2
+) -> List[Dict]:
+    """
+    Fusiona las patas de la búsqueda y retorna los n mejores artículos.
+
+    Se eligen los n de mayor puntaje entre los que superan umbral_confianza;
+    si ninguno lo supera, entre los que superan umbral_minimo y, si tampoco,
+    el mejor artículo (el mismo fallback de la búsqueda original).
+
+    Args:
+        patas: Resultados ordenados de cada pata ({LEG_VECTOR: [...], LEG_KEYWORD: [...]})
+        n_resultados: Número máximo de artículos a retornar
+        umbral_confianza: Similitud mínima de un artículo
+        metodo: 'max', 'rrf' o 'weighted'
+        pesos: Peso de cada pata en rrf y weighted (1.0 por defecto)
+        rrf_k: Constante de RRF
+        umbral_minimo: Umbral del fallback
+
+    Returns:
+        Artículos ordenados por puntaje, con 'score_fusion' y 'patas'
+
+    Raises:
+        ValueError: Si el método no existe
+    """
+    if metodo not in AVAILABLE_FUSIONS:
+        raise ValueError(f"Método de fusión desconocido: '{metodo}'. Opciones: {', '.join(AVAILABLE_FUSIONS)}")
+
+    candidatos = _puntuar(patas, metodo, pesos or {}, rrf_k)
+    puntaje = lambda candidato: candidato.score
+
+    # heapq.nlargest equivale a sorted(...)[:n] (estable), sin ordenar todo
+    seleccion = heapq.nlargest(n_resultados, (c for c in candidatos if c.similitud >= umbral_confianza), key=puntaje)
+    if not seleccion and candidatos:
+        seleccion = heapq.nlargest(n_resultados, (c for c in candidatos if c.similitud >= umbral_minimo), key=puntaje)
+        if not seleccion:
+            seleccion = heapq.nlargest(1, candidatos, key=puntaje)
+
+    return [
+        {**candidato.resultado, 'score_fusion': candidato.score, 'patas': candidato.patas}
+        for candidato in seleccion
+    ]
+
@@ -8,24 +8,43 @@ logger = logging.getLogger(__name__)
 class HealthService:
     """Servicio para health checks y monitoreo del sistema."""
 
-    def __init__(self, db_manager, llm_service):
+    def __init__(self, db_manager, llm_service, answer_cache=None, readiness=None, reranker=None):
         """
         Inicializa el servicio de health.
 
         Args:
-            db_manager: Instancia de ChromaDBManager
+            db_manager: Instancia de ChromaDBManager (None mientras se carga)
             llm_service: Instancia de LLMService
+            answer_cache: Caché semántica de respuestas (opcional)
+            readiness: Estado del calentamiento (app.core.readiness, opcional)
+            reranker: Re-ranker de candidatos (opcional)
         """
         self.db_manager = db_manager
         self.llm_service = llm_service
+        self.answer_cache = answer_cache
+        self.readiness = readiness
+        self.reranker = reranker
 
     def check_health(self) -> HealthResponse:
         """
         Verifica el estado de la API y la base de datos.
 
+        Responde de inmediato también durante el calentamiento (liveness):
+        en ese caso el estado es "starting" y database_status "loading".
+
         Returns:
             HealthResponse con el estado del sistema
         """
+        readiness = self.readiness.stats() if self.readiness else None
+        if self.readiness and not self.readiness.is_ready:
+            fallido = readiness['status'] == 'failed'
+            return HealthResponse(
+                status="unhealthy" if fallido else "starting",
+                version="1.0.0",
+                database_status="error" if fallido else "loading",
+                readiness=readiness
+            )
+
         try:
             if self.db_manager and self.db_manager.collection:
                 stats = self.db_manager.obtener_estadisticas_db()
@@ -33,13 +52,19 @@ class HealthService:
                     status="healthy",
                     version="1.0.0",
                     database_status="connected",
-                    total_articles=stats.get('total_articulos', 0)
+                    total_articles=stats.get('total_articulos', 0),
+                    embedding_cache=stats.get('cache_embeddings'),
+                    embedding_batcher=stats.get('batcher_embeddings'),
+                    answer_cache=self.answer_cache.stats() if self.answer_cache else None,
+                    readiness=readiness,
+                    reranker=self.reranker.stats() if self.reranker else None
                 )
             else:
                 return HealthResponse(
                     status="degraded",
                     version="1.0.0",
-                    database_status="disconnected"
+                    database_status="disconnected",
+                    readiness=readiness
                 )
         except Exception as e:
             logger.error(f"Error en health check: {e}")
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.repositories.chroma_repository import BUILD_LOCK_FILENAME
+from app.utils.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class IndexBusyError(RuntimeError):
+    """Otro proceso (worker o script) está construyendo o publicando una versión."""
+
+
+class IndexService:
+    """
+    Servicio para reconstruir y publicar versiones de la colección sin detener la API.
+
+    La construcción corre en segundo plano sobre una colección nueva
+    (<nombre>_v<n>); la versión publicada se sigue sirviendo hasta que se
+    activa la nueva, y la anterior se conserva para poder volver a ella.
+
+    Los documentos pasan por el mismo pipeline y las mismas fuentes que
+    scripts/setup_database.py (código de tránsito + NORMAS_PATH), así una
+    reconstrucción desde la API no descarta lo indexado por el script.
+
+    Construir, publicar y volver atrás toman un candado de archivo en
+    CHROMA_DB_PATH compartido por todos los workers y por setup_database.py:
+    con WORKERS>1 solo un proceso construye a la vez. La construcción corre
+    en un hilo propio (no en el pool de búsqueda) y con batches del modelo
+    pequeños para no competir con las consultas.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        document_path: str,
+        normas_path: str = "",
+        versions_to_keep: int = 3,
+        preload_keyword_index: Optional[Callable[[str], Any]] = None,
+        embedding_batch_size: Optional[int] = None
+    ):
+        """
+        Inicializa el servicio de indexación.
+
+        Args:
+            db_manager: Instancia de ChromaRepository
+            document_path: Ruta del documento del código de tránsito
+            normas_path: Directorio con normas adicionales (vacío = solo el código)
+            versions_to_keep: Versiones de la colección que se conservan
+            preload_keyword_index: Función que carga en memoria el índice de
+                keywords de una ruta antes de publicar su versión
+            embedding_batch_size: Batch del modelo al construir (None = según los núcleos)
+        """
+        self.db_manager = db_manager
+        self.document_path = document_path
+        self.normas_path = normas_path
+        self.versions_to_keep = versions_to_keep
+        self.preload_keyword_index = preload_keyword_index
+        self.embedding_batch_size = embedding_batch_size
+        self._lock = FileLock(os.path.join(db_manager.db_path, BUILD_LOCK_FILENAME))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_build: Dict[str, Any] = {'status': 'idle'}
+
+    @property
+    def building(self) -> bool:
+        """True si este proceso u otro está construyendo o publicando una versión."""
+        return (self._task is not None and not self._task.done()) or self._lock.locked()
+
+    def start_build(self, activate: bool = True, incremental: bool = True) -> bool:
+        """
+        Lanza la construcción de la siguiente versión en segundo plano.
+
+        Args:
+            activate: Si True, publica la versión al terminar
+            incremental: Si False, regenera todos los embeddings
+
+        Returns:
+            False si ya hay una construcción en curso (en este u otro proceso)
+        """
+        if self._task is not None and not self._task.done():
+            return False
+        # Se libera al terminar _build
+        if not self._lock.acquire():
+            return False
+
+        self.last_build = {
+            'status': 'building',
+            'started_at': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            'activate': activate,
+            'incremental': incremental
+        }
+        self._task = asyncio.create_task(self._build(activate, incremental))
+        return True
+
+    async def _build(self, activate: bool, incremental: bool):
+        """Construye (y opcionalmente publica) una versión, registrando el resultado."""
+        inicio = time.perf_counter()
+        try:
+            # Hilo dedicado: la construcción no ocupa un hilo del pool de búsqueda
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-build")
+            loop = asyncio.get_running_loop()
+            reporte = await loop.run_in_executor(self._executor, self._build_blocking, incremental)
+            if reporte is None:
+                raise RuntimeError("No se pudo construir la versión de la colección")
+
+            if activate and reporte['built']:
+                self._activate_locked(reporte['version'])
+
+            self.last_build.update(status='completed', report=reporte)
+
+        except Exception as e:
+            logger.error(f"❌ Error construyendo versión de la colección: {e}")
+            self.last_build.update(status='failed', error=str(e))
+
+        finally:
+            self._lock.release()
+            self.last_build['elapsed_seconds'] = round(time.perf_counter() - inicio, 3)
+
+    def _build_blocking(self, incremental: bool) -> Optional[Dict]:
+        """Procesa los documentos, construye la versión y su índice de keywords."""
+        # Importación diferida: el pipeline (python-docx) solo se necesita al indexar
+        from scripts.ingestion_pipeline import construir_version, fuentes_indexadas
+
+        # Otro worker pudo publicar una versión: la base incremental es la vigente
+        self.db_manager.refresh_collection()
+        if not os.path.exists(self.document_path):
+            raise FileNotFoundError(f"No se encontró el documento: {self.document_path}")
+        fuentes = fuentes_indexadas(self.document_path, self.normas_path)
+        logger.info(f"📄 Procesando {len(fuentes)} documento(s): {', '.join(f.ruta for f in fuentes)}")
+
+        # Un solo worker: el parsing corre en este hilo en vez de hacer fork de un proceso con hilos
+        reporte, stats = construir_version(
+            self.db_manager, fuentes, incremental=incremental, workers=1,
+            embedding_batch_size=self.embedding_batch_size
+        )
+        if reporte is None or not reporte['built']:
+            return reporte
+        reporte['ingestion'] = stats
+
+        # Cargar el índice antes de publicar para que la primera consulta no lo espere
+        if self.preload_keyword_index:
+            self.preload_keyword_index(self.db_manager.keyword_index_path(reporte['version']))
+
+        return reporte
+
+    def activate(self, version: str) -> bool:
+        """
+        Publica una versión y elimina las que exceden versions_to_keep.
+
+        Args:
+            version: Nombre de la versión a publicar
+
+        Returns:
+            True si se publicó
+
+        Raises:
+            IndexBusyError: Si hay una construcción o publicación en curso
+        """
+        if not self._lock.acquire():
+            raise IndexBusyError("Hay una construcción o publicación de versión en curso")
+        try:
+            return self._activate_locked(version)
+        finally:
+            self._lock.release()
+
+    def _activate_locked(self, version: str) -> bool:
+        """activate() con el candado ya tomado."""
+        if not self.db_manager.activate_version(version):
+            return False
+        self.db_manager.prune_versions(self.versions_to_keep)
+        return True
+
+    def rollback(self) -> Optional[str]:
+        """
+        Vuelve a publicar la versión anterior.
+
+        Returns:
+            Nombre de la versión publicada o None si no hay anterior
+
+        Raises:
+            IndexBusyError: Si hay una construcción o publicación en curso
+        """
+        if not self._lock.acquire():
+            raise IndexBusyError("Hay una construcción o publicación de versión en curso")
+        try:
+            # El alias pudo cambiar en otro worker
+            self.db_manager.refresh_collection()
+            return self.db_manager.rollback()
+        finally:
+            self._lock.release()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Estado de las versiones de la colección.
+
+        Returns:
+            Versión publicada, anterior, versiones existentes y última construcción
+        """
+        alias = self.db_manager.read_alias()
+        return {
+            'live': self.db_manager.live_version,
+            'previous': alias.get('previous'),
+            'updated_at': alias.get('updated_at'),
+            'versions': self.db_manager.list_versions(),
+            'building': self.building,
+            'last_build': self.last_build
+        }
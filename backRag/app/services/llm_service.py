@@ -1,8 +1,9 @@
 import os
 import logging
-from typing import List, Dict, Optional
-from anthropic import Anthropic
+from typing import AsyncIterator, List, Dict, Optional
+from anthropic import AsyncAnthropic
 from app.utils.promps import PROMPT_TEMPLATE_QUERY, system_prompt
+from app.utils.prompt_caching import cacheable_system, usage_metrics, describe_usage
 
 logger = logging.getLogger(__name__)
 
@@ -10,14 +11,22 @@ logger = logging.getLogger(__name__)
 class LLMService:
     """Servicio para generar respuestas naturales usando Claude de Anthropic."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        prompt_caching: bool = True
+    ):
         """
         Inicializa el servicio LLM.
 
         Args:
             api_key: Clave API de Anthropic. Si no se proporciona, se busca en variables de entorno.
+            base_url: URL base de la API de Anthropic (None = la oficial)
+            prompt_caching: Marcar el system prompt como cacheable
         """
         self.historial = []
+        self.prompt_caching = prompt_caching
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY',"")
 
         if not self.api_key:
@@ -27,7 +36,10 @@ class LLMService:
             try:
                 logger.info("🔑 Inicializando cliente Claude de Anthropic")
                 logger.info(self.api_key)
-                self.client = Anthropic(api_key='sk-ant-REDACTED')
+                self.client = AsyncAnthropic(
+                    api_key='sk-ant-REDACTED',
+                    base_url=base_url or None
+                )
             except Exception as e:
                 logger.error(f"❌ Error inicializando Claude: {e}")
                 self.client = None
@@ -35,7 +47,7 @@ class LLMService:
     def limpiar_historial(self):
         self.historial = []
 
-    def generar_respuesta_natural(
+    async def generar_respuesta_natural(
         self,
         consulta: str,
         articulos_relevantes: List[Dict],
@@ -59,7 +71,7 @@ class LLMService:
 
         # Si no hay artículos relevantes, respuesta amable de limitación
         if not articulos_relevantes or confianza_promedio < 0.3:
-            return self._generar_respuesta_sin_resultados(consulta)
+            return await self._generar_respuesta_sin_resultados(consulta)
 
         try:
             # Preparar contexto para Claude
@@ -69,11 +81,11 @@ class LLMService:
             logger.info(f"✅ PROMP : { prompt})")
             logger.info(f"✅ PROMP : { prompt})")
             
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model="claude-haiku-4-5",
                 max_tokens=300,
                 temperature=0.2,
-                system=consulta,  
+                system=self._system_blocks(),
                 messages=[
                     *self.historial[-3:],
                     {"role": "user", "content": prompt}
@@ -81,6 +93,7 @@ class LLMService:
             )
 
             respuesta_natural = response.content[0].text.strip()
+            self._log_usage(usage_metrics(response.usage))
             # Actualiza historial
             self.historial.append({"role": "user", "content":  prompt})
             self.historial.append({"role": "assistant", "content":  respuesta_natural})
@@ -93,6 +106,86 @@ class LLMService:
             logger.error(f"❌ Error generando respuesta con Claude: {e}")
             return self._generar_respuesta_basica(consulta, articulos_relevantes, confianza_promedio)
     
+    async def stream_respuesta_natural(
+        self,
+        consulta: str,
+        articulos_relevantes: List[Dict],
+        confianza_promedio: float
+    ) -> AsyncIterator[str]:
+        """
+        Versión en streaming de generar_respuesta_natural.
+
+        Emite los fragmentos de texto a medida que Claude los genera. Sin
+        cliente, sin artículos o ante un error antes del primer token,
+        emite la respuesta de respaldo en un solo fragmento.
+
+        Args:
+            consulta: Pregunta original del usuario
+            articulos_relevantes: Lista de artículos encontrados en ChromaDB
+            confianza_promedio: Nivel de confianza promedio de la búsqueda
+
+        Yields:
+            str: Fragmentos de la respuesta
+        """
+        if not self.client:
+            yield self._generar_respuesta_basica(consulta, articulos_relevantes, confianza_promedio)
+            return
+
+        if not articulos_relevantes or confianza_promedio < 0.3:
+            yield await self._generar_respuesta_sin_resultados(consulta)
+            return
+
+        prompt = self._construir_prompt(
+            consulta,
+            self._preparar_contexto_articulos(articulos_relevantes),
+            confianza_promedio
+        )
+        fragmentos = []
+
+        try:
+            stream = await self.client.messages.create(
+                model="claude-haiku-4-5",
+                max_tokens=300,
+                temperature=0.2,
+                system=self._system_blocks(),
+                messages=[
+                    *self.historial[-3:],
+                    {"role": "user", "content": prompt}
+                ],
+                stream=True
+            )
+            uso = {}
+            async for event in stream:
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    fragmentos.append(event.delta.text)
+                    yield event.delta.text
+                elif event.type == "message_start":
+                    uso = usage_metrics(event.message.usage)
+                elif event.type == "message_delta" and getattr(event, "usage", None) is not None:
+                    uso["output_tokens"] = event.usage.output_tokens
+            self._log_usage(uso)
+
+        except Exception as e:
+            logger.error(f"❌ Error en streaming con Claude: {e}")
+            if not fragmentos:
+                yield self._generar_respuesta_basica(consulta, articulos_relevantes, confianza_promedio)
+            return
+
+        respuesta_natural = "".join(fragmentos).strip()
+        self.historial.append({"role": "user", "content": prompt})
+        self.historial.append({"role": "assistant", "content": respuesta_natural})
+        logger.info(f"✅ Respuesta en streaming generada con Claude (confianza: {confianza_promedio:.2f})")
+
+    def _system_blocks(self) -> List[Dict]:
+        """System prompt estable de TránsitoBot, marcado como cacheable."""
+        return cacheable_system(system_prompt.strip(), enabled=self.prompt_caching)
+
+    @staticmethod
+    def _log_usage(usage: Dict[str, int]):
+        """Registra el uso de tokens y de la caché de prompts."""
+        if usage:
+            logger.info(f"🧮 {describe_usage(usage)}")
+
     def _preparar_contexto_articulos(self, articulos: List[Dict]) -> str:
         """Prepara el contexto de artículos para el prompt."""
         contexto = ""
@@ -117,7 +210,7 @@ class LLMService:
         return prompt
 
     
-    def _generar_respuesta_sin_resultados(self, consulta: str) -> str:
+    async def _generar_respuesta_sin_resultados(self, consulta: str) -> str:
         """Genera una respuesta amable cuando no se encuentran resultados relevantes."""
 
         if not self.client:
@@ -139,7 +232,7 @@ Responde de manera amable y profesional:
 
 Máximo 150 palabras."""
 
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model="claude-haiku-4-5",
                 max_tokens=200,
                 temperature=0.4,
@@ -25,7 +25,7 @@ class OpenRouterService:
         else:
             try:
                 logger.info("🔑 Inicializando cliente OpenRouter")
-                self.client = openai.OpenAI(
+                self.client = openai.AsyncOpenAI(
                     base_url=settings.OPENROUTER_BASE_URL,
                     api_key=self.api_key
                 )
@@ -34,7 +34,7 @@ class OpenRouterService:
                 logger.error(f"❌ Error inicializando OpenRouter: {e}")
                 self.client = None
 
-    def chat_with_context(
+    async def chat_with_context(
         self,
         system_context: str,
         user_context: str,
@@ -79,7 +79,7 @@ class OpenRouterService:
                 user_message += f"Entidades detectadas: {entidades}\n"
             user_message += f"Intención: {intencion}"
 
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=settings.OPENROUTER_MODEL,
                 messages=[
                     {"role": "system", "content": system_message},
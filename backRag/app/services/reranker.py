@@ -0,0 +1,210 @@
+"""
+Re-ranking con cross-encoder de los candidatos de la búsqueda híbrida.
+
+El cross-encoder lee la consulta y el artículo juntos, así que ordena mejor
+que la similitud coseno o BM25, pero cuesta una inferencia por par. Por eso
+solo se aplica a los primeros candidatos de la fusión, en lotes, con caché
+de puntajes (consulta, artículo) y con un presupuesto de latencia por
+consulta: si el siguiente lote no alcanza a puntuarse dentro del
+presupuesto, se conserva el orden de la fusión.
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.cache import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Motivos por los que una consulta no se re-ordena
+SKIP_FEW_CANDIDATES = "pocos_candidatos"
+SKIP_NOT_LOADED = "modelo_no_cargado"
+SKIP_BUDGET = "presupuesto"
+SKIP_ERROR = "error"
+
+# Peso de la última medición en el promedio móvil de ms por par
+_EWMA_ALPHA = 0.3
+
+
+def _clave_documento(articulo: Dict) -> str:
+    """Identifica el contenido del artículo (cambia si se re-indexa con otro texto)."""
+    return hashlib.blake2b(articulo['documento'].encode('utf-8'), digest_size=16).hexdigest()
+
+
+class CrossEncoderReranker:
+    """
+    Re-ordena los candidatos de la búsqueda con un cross-encoder en CPU.
+
+    El modelo se carga con load() (en el calentamiento); mientras no esté
+    cargado, rerank() retorna los candidatos en el orden de la fusión.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_candidates: int = 10,
+        top_k: int = 0,
+        budget_ms: float = 150.0,
+        batch_size: int = 16,
+        max_length: int = 256,
+        cache_size: int = 2048,
+        cache_ttl: Optional[float] = 3600.0
+    ):
+        """
+        Inicializa el re-ranker (sin cargar el modelo).
+
+        Args:
+            model_name: Modelo de sentence-transformers CrossEncoder
+            max_candidates: Candidatos de la fusión que se re-ordenan
+            top_k: Artículos que se conservan después de re-ordenar (0 = los pedidos)
+            budget_ms: Tiempo máximo de re-ranking por consulta
+            batch_size: Pares (consulta, artículo) por inferencia
+            max_length: Tokens máximos por par (el artículo se trunca)
+            cache_size: Puntajes (consulta, artículo) en caché (0 la desactiva)
+            cache_ttl: Segundos de vida de cada puntaje
+        """
+        self.model_name = model_name
+        self.max_candidates = max_candidates
+        self.top_k = top_k
+        self.budget_ms = budget_ms
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self.model = None
+        self.scores = TTLLRUCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        self._load_lock = threading.Lock()
+        # Promedio móvil de ms por par, para saber si el siguiente lote cabe en el presupuesto
+        self._ms_por_par: Optional[float] = None
+        self._contadores = {'aplicados': 0, SKIP_FEW_CANDIDATES: 0, SKIP_NOT_LOADED: 0, SKIP_BUDGET: 0, SKIP_ERROR: 0}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self) -> bool:
+        """
+        Carga el cross-encoder y ejecuta una inferencia de prueba.
+
+        La inferencia de prueba inicializa los kernels y da la primera
+        estimación de ms por par que usa el presupuesto.
+
+        Returns:
+            True si el modelo quedó cargado
+        """
+        with self._load_lock:
+            if self.model is not None:
+                return True
+            try:
+                # Importación diferida: sin re-ranking no se carga el modelo
+                from sentence_transformers import CrossEncoder
+                logger.info(f"Cargando cross-encoder: {self.model_name}")
+                model = CrossEncoder(self.model_name, max_length=self.max_length)
+                self._predecir(model, [("calentamiento del modelo", "artículo de prueba")] * self.batch_size)
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo cargar el cross-encoder, re-ranking deshabilitado: {e}")
+                return False
+
+            self.model = model
+            logger.info(f"✅ Cross-encoder listo ({self._ms_por_par:.1f} ms por par)")
+            return True
+
+    def _predecir(self, model, pares: List[Tuple[str, str]]) -> List[float]:
+        """Puntúa un lote de pares y actualiza la estimación de ms por par."""
+        inicio = time.perf_counter()
+        puntajes = model.predict(pares, batch_size=len(pares), show_progress_bar=False)
+        ms_por_par = (time.perf_counter() - inicio) * 1000 / len(pares)
+        self._ms_por_par = ms_por_par if self._ms_por_par is None else \
+            _EWMA_ALPHA * ms_por_par + (1 - _EWMA_ALPHA) * self._ms_por_par
+        return [float(p) for p in puntajes]
+
+    def rerank(
+        self,
+        consulta: str,
+        articulos: List[Dict],
+        n_resultados: int,
+        budget_ms: Optional[float] = None
+    ) -> Tuple[List[Dict], Dict]:
+        """
+        Re-ordena los candidatos por puntaje del cross-encoder.
+
+        Los puntajes en caché no consumen presupuesto. Los demás se calculan
+        en lotes; antes de cada lote se estima si termina dentro del
+        presupuesto y, si no, se conserva el orden de la fusión (los
+        puntajes ya calculados quedan en caché para la próxima consulta).
+
+        Args:
+            consulta: Query del usuario
+            articulos: Candidatos en el orden de la fusión
+            n_resultados: Artículos pedidos por la consulta
+            budget_ms: Presupuesto de esta consulta (None = el configurado)
+
+        Returns:
+            Tupla (artículos, info): los artículos re-ordenados con
+            'score_rerank' (o los primeros de la fusión si se omitió) y un
+            dict con aplicado, motivo, candidatos, puntuados, cache_hits y ms
+        """
+        inicio = time.perf_counter()
+        limite = inicio + (self.budget_ms if budget_ms is None else budget_ms) / 1000
+        candidatos = articulos[:self.max_candidates]
+        info = {'aplicado': False, 'motivo': None, 'candidatos': len(candidatos), 'puntuados': 0, 'cache_hits': 0}
+
+        def omitir(motivo: str) -> Tuple[List[Dict], Dict]:
+            self._contadores[motivo] += 1
+            info.update(motivo=motivo, ms=(time.perf_counter() - inicio) * 1000)
+            return articulos[:n_resultados], info
+
+        if len(candidatos) <= 1:
+            return omitir(SKIP_FEW_CANDIDATES)
+        if self.model is None:
+            return omitir(SKIP_NOT_LOADED)
+
+        texto_consulta = " ".join(consulta.split())
+        claves = [(texto_consulta, _clave_documento(a)) for a in candidatos]
+        puntajes: List[Optional[float]] = [self.scores.get(clave) for clave in claves]
+        pendientes = [i for i, puntaje in enumerate(puntajes) if puntaje is None]
+        info['cache_hits'] = len(candidatos) - len(pendientes)
+
+        try:
+            for desde in range(0, len(pendientes), self.batch_size):
+                lote = pendientes[desde:desde + self.batch_size]
+                estimado = len(lote) * (self._ms_por_par or 0.0) / 1000
+                if time.perf_counter() + estimado > limite:
+                    return omitir(SKIP_BUDGET)
+
+                nuevos = self._predecir(self.model, [(texto_consulta, candidatos[i]['documento']) for i in lote])
+                for i, puntaje in zip(lote, nuevos):
+                    puntajes[i] = puntaje
+                    self.scores.set(claves[i], puntaje)
+                info['puntuados'] += len(lote)
+        except Exception as e:
+            logger.error(f"Error en re-ranking, se conserva el orden de la fusión: {e}")
+            return omitir(SKIP_ERROR)
+
+        # sorted es estable: ante empate se conserva el orden de la fusión
+        orden = sorted(range(len(candidatos)), key=lambda i: puntajes[i], reverse=True)
+        top_k = min(n_resultados, self.top_k) if self.top_k else n_resultados
+
+        self._contadores['aplicados'] += 1
+        info.update(aplicado=True, ms=(time.perf_counter() - inicio) * 1000)
+        return [{**candidatos[i], 'score_rerank': puntajes[i]} for i in orden[:top_k]], info
+
+    def stats(self) -> Dict:
+        """
+        Retorna las métricas del re-ranker.
+
+        Returns:
+            Diccionario con modelo, estado, consultas aplicadas/omitidas por
+            motivo, ms por par estimado y métricas de la caché de puntajes
+        """
+        return {
+            'model': self.model_name,
+            'loaded': self.is_loaded,
+            'max_candidates': self.max_candidates,
+            'top_k': self.top_k,
+            'budget_ms': self.budget_ms,
+            'ms_per_pair': round(self._ms_por_par, 3) if self._ms_por_par is not None else None,
+            'applied': self._contadores['aplicados'],
+            'skipped': {motivo: n for motivo, n in self._contadores.items() if motivo != 'aplicados'},
+            'cache': self.scores.stats()
+        }
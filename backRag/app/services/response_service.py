@@ -1,6 +1,7 @@
 import logging
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 from app.models import Source
+from app.utils.constants import NO_RESULTS_MESSAGE
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +18,7 @@ class ResponseService:
         """
         self.llm_service = llm_service
 
-    def generate_response(
+    async def generate_response(
         self,
         consulta: str,
         articulos: List[Dict],
@@ -43,7 +44,7 @@ class ResponseService:
 
         # Intentar mejorar con LLM
         try:
-            respuesta_llm = self.llm_service.generar_respuesta_natural(
+            respuesta_llm = await self.llm_service.generar_respuesta_natural(
                 consulta=consulta,
                 articulos_relevantes=articulos,
                 confianza_promedio=confianza_promedio
@@ -59,6 +60,34 @@ class ResponseService:
 
         return respuesta_basica
 
+    async def stream_response(
+        self,
+        consulta: str,
+        articulos: List[Dict],
+        confianza_promedio: float
+    ) -> AsyncIterator[str]:
+        """
+        Genera la respuesta en streaming, fragmento a fragmento.
+
+        Args:
+            consulta: Pregunta del usuario
+            articulos: Artículos relevantes encontrados
+            confianza_promedio: Nivel de confianza promedio
+
+        Yields:
+            Fragmentos de la respuesta
+        """
+        if not articulos:
+            yield NO_RESULTS_MESSAGE
+            return
+
+        async for fragmento in self.llm_service.stream_respuesta_natural(
+            consulta=consulta,
+            articulos_relevantes=articulos,
+            confianza_promedio=confianza_promedio
+        ):
+            yield fragmento
+
     def _generar_respuesta_contextual(self, consulta: str, articulos: List[Dict]) -> str:
         """
         Genera una respuesta contextual básica basada en los artículos encontrados.
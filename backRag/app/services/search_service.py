@@ -1,5 +1,9 @@
 import logging
-from typing import List, Dict, Optional
+import time
+from typing import List, Dict, Optional, Tuple
+from app.repositories.keyword_index import SCORER_HITS
+from app.services.fusion import FUSION_MAX, LEG_KEYWORD, LEG_VECTOR, RRF_K, fuse_results
+from app.utils.constants import SEARCH_SYNONYMS
 
 logger = logging.getLogger(__name__)
 
@@ -7,35 +11,58 @@ logger = logging.getLogger(__name__)
 class SearchService:
     """Servicio para realizar búsquedas híbridas (vectorial + keywords)."""
 
-    def __init__(self, db_manager):
+    def __init__(
+        self,
+        db_manager,
+        keyword_index=None,
+        default_keyword_scorer: str = SCORER_HITS,
+        default_fusion: str = FUSION_MAX,
+        vector_depth: int = 0,
+        keyword_depth: int = 0,
+        fusion_weights: Optional[Dict[str, float]] = None,
+        rrf_k: int = RRF_K,
+        reranker=None
+    ):
         """
         Inicializa el servicio de búsqueda.
 
         Args:
             db_manager: Instancia de ChromaDBManager
+            keyword_index: Índice invertido de keywords (opcional). Si no se
+                proporciona se usa el publicado con la colección del
+                repositorio; sin índice, la búsqueda por keywords recorre
+                toda la colección.
+            default_keyword_scorer: Motor de puntuación de keywords por defecto
+            default_fusion: Método de fusión por defecto ('max', 'rrf' o 'weighted')
+            vector_depth: Candidatos de la pata vectorial (0 = 2 * n_resultados)
+            keyword_depth: Candidatos de la pata de keywords (0 = n_resultados)
+            fusion_weights: Peso de cada pata en la fusión ('vectorial', 'keyword')
+            rrf_k: Constante de Reciprocal Rank Fusion
+            reranker: CrossEncoderReranker para re-ordenar los candidatos (opcional)
         """
         self.db_manager = db_manager
+        self.keyword_index = keyword_index
+        self.default_keyword_scorer = default_keyword_scorer
+        self.default_fusion = default_fusion
+        self.vector_depth = vector_depth
+        self.keyword_depth = keyword_depth
+        self.fusion_weights = fusion_weights or {}
+        self.rrf_k = rrf_k
+        self.reranker = reranker
         self.synonyms = self._load_synonyms()
 
     def _load_synonyms(self) -> Dict[str, List[str]]:
         """Carga el diccionario de sinónimos para búsqueda mejorada."""
-        return {
-            'velocidad': ['rapidez', 'límite', 'máximo', 'velocidades'],
-            'ciudad': ['urbana', 'urbano', 'zona urbana', 'vías urbanas'],
-            'multa': ['sanción', 'penalidad', 'infracción'],
-            'celular': ['móvil', 'teléfono', 'dispositivo'],
-            'pico': ['restricción', 'circulación'],
-            'límites': ['velocidades', 'máximas', 'mínimas', 'límite'],
-            'carretera': ['vía', 'autopista', 'nacional', 'carreteras'],
-            'km': ['kilómetros', 'kilometros'],
-            'hora': ['h', '/h']
-        }
+        return SEARCH_SYNONYMS
 
     def hybrid_search(
         self,
         consulta: str,
         n_resultados: int = 1,
-        umbral_confianza: float = 0.7
+        umbral_confianza: float = 0.7,
+        keyword_scorer: Optional[str] = None,
+        fusion: Optional[str] = None,
+        rerank: Optional[bool] = None
     ) -> Dict:
         """
         Realiza búsqueda híbrida combinando vectorial y palabras clave.
@@ -44,55 +71,190 @@ class SearchService:
             consulta: Query del usuario
             n_resultados: Número máximo de resultados a retornar
             umbral_confianza: Umbral mínimo de similitud
+            keyword_scorer: Motor de puntuación de keywords ('hits' o 'bm25').
+                Si es None se usa el motor por defecto del servicio
+            fusion: Método de fusión ('max', 'rrf' o 'weighted'). Si es None
+                se usa el método por defecto del servicio
+            rerank: Re-ordenar los candidatos con el cross-encoder. Si es None
+                se re-ordena cuando el servicio tiene re-ranker
 
         Returns:
-            Dict con resultados encontrados
+            Dict con resultados encontrados, tiempos por etapa (ms) y, si se
+            intentó re-ordenar, el detalle del re-ranking
+
+        Raises:
+            ValueError: Si el método de fusión no existe
         """
+        inicio = time.perf_counter()
+        reranker = self.reranker if rerank is not False else None
+        # Con re-ranking la fusión entrega más candidatos de los que se retornan
+        n_candidatos = max(n_resultados, reranker.max_candidates) if reranker else n_resultados
+        # Toda la búsqueda usa la misma versión de la colección (y su índice)
+        # aunque se publique otra mientras tanto
+        collection, keyword_index = self._pin_version()
+
         # 1. Búsqueda vectorial con umbral más bajo
         resultados_vectoriales = self.db_manager.buscar_articulos(
             consulta=consulta,
-            n_resultados=n_resultados * 2,
-            umbral_confianza=max(0.2, umbral_confianza - 0.2)
+            n_resultados=self.vector_depth or n_candidatos * 2,
+            umbral_confianza=max(0.2, umbral_confianza - 0.2),
+            collection=collection
         )
+        fin_vectorial = time.perf_counter()
 
         # 2. Búsqueda por palabras clave
-        resultados_keywords = self._keyword_search(consulta, n_resultados)
-
-        # 3. Combinar y eliminar duplicados
-        resultados_combinados = self._merge_results(
-            resultados_vectoriales['articulos'],
-            resultados_keywords
+        resultados_keywords = self._keyword_search(
+            consulta, self.keyword_depth or n_candidatos, keyword_scorer, collection, keyword_index
         )
+        fin_keywords = time.perf_counter()
 
-        # 4. Ordenar por similitud y filtrar
-        resultados_finales = sorted(
-            resultados_combinados,
-            key=lambda x: x['similitud'],
-            reverse=True
+        # 3. Fusión: deduplica, puntúa y selecciona los n mejores que superan el umbral
+        resultados_filtrados = self._merge_results(
+            resultados_vectoriales['articulos'],
+            resultados_keywords,
+            n_resultados=n_candidatos,
+            umbral_confianza=umbral_confianza,
+            fusion=fusion or self.default_fusion
         )
-        resultados_filtrados = [r for r in resultados_finales if r['similitud'] >= umbral_confianza]
+        fin_fusion = time.perf_counter()
 
-        # Si no hay resultados con el umbral, aplicar lógica de fallback
-        if not resultados_filtrados and resultados_finales:
-            umbral_minimo = 0.2
-            resultados_filtrados = [r for r in resultados_finales if r['similitud'] >= umbral_minimo]
-            if not resultados_filtrados:
-                resultados_filtrados = resultados_finales[:1]
+        # 4. Re-ranking opcional de los candidatos (dentro de su presupuesto de latencia)
+        info_rerank = None
+        if reranker:
+            resultados_filtrados, info_rerank = reranker.rerank(consulta, resultados_filtrados, n_resultados)
+        fin = time.perf_counter()
 
-        return {
+        resultado = {
             'consulta': consulta,
-            'total_encontrados': len(resultados_filtrados[:n_resultados]),
-            'articulos': resultados_filtrados[:n_resultados],
-            'tiempo_busqueda': 0.1
+            'total_encontrados': len(resultados_filtrados),
+            'articulos': resultados_filtrados,
+            'tiempo_busqueda': fin - inicio,
+            'tiempos_ms': {
+                'vectorial': (fin_vectorial - inicio) * 1000,
+                'keywords': (fin_keywords - fin_vectorial) * 1000,
+                'fusion': (fin_fusion - fin_keywords) * 1000,
+                'rerank': (fin - fin_fusion) * 1000
+            }
         }
+        if info_rerank is not None:
+            resultado['rerank'] = info_rerank
+        return resultado
 
-    def _keyword_search(self, consulta: str, n_resultados: int) -> List[Dict]:
+    def _pin_version(self) -> Tuple:
+        """
+        Colección e índice de keywords con los que se hace una búsqueda.
+
+        Returns:
+            Tupla (colección, índice): el índice inyectado o, si no hay, la
+            instantánea publicada por el repositorio, que cambia ambos a la vez
+        """
+        if self.keyword_index is not None:
+            return self.db_manager.collection, self.keyword_index
+        return self.db_manager.snapshot
+
+    def _keyword_search(
+        self,
+        consulta: str,
+        n_resultados: int,
+        keyword_scorer: Optional[str] = None,
+        collection=None,
+        keyword_index=None
+    ) -> List[Dict]:
         """
         Realiza búsqueda por palabras clave con sinónimos.
 
+        Usa el índice invertido si está cargado; si no, recorre la colección
+        con el conteo de coincidencias.
+
+        Args:
+            consulta: Query del usuario
+            n_resultados: Número de resultados
+            keyword_scorer: Motor de puntuación ('hits' o 'bm25')
+            collection: Colección a consultar (None = la publicada)
+            keyword_index: Índice de esa colección (se ignora si collection es None)
+
+        Returns:
+            Lista de artículos encontrados
+        """
+        if collection is None:
+            collection, keyword_index = self._pin_version()
+
+        if keyword_index is not None:
+            return self._keyword_search_indexed(
+                consulta,
+                n_resultados,
+                keyword_scorer or self.default_keyword_scorer,
+                collection,
+                keyword_index
+            )
+
+        return self._keyword_search_scan(consulta, n_resultados, collection)
+
+    def _keyword_search_indexed(
+        self,
+        consulta: str,
+        n_resultados: int,
+        keyword_scorer: str,
+        collection,
+        keyword_index
+    ) -> List[Dict]:
+        """
+        Búsqueda por palabras clave usando el índice invertido.
+
+        Solo se leen las posting lists de los términos de la consulta y se
+        recuperan de ChromaDB únicamente los mejores n_resultados documentos.
+
         Args:
             consulta: Query del usuario
             n_resultados: Número de resultados
+            keyword_scorer: Motor de puntuación ('hits' o 'bm25')
+            collection: Colección de la que se leen los documentos
+            keyword_index: Índice invertido de esa colección
+
+        Returns:
+            Lista de artículos encontrados
+        """
+        coincidencias = keyword_index.search(consulta, n_resultados, scorer=keyword_scorer)
+        if not coincidencias:
+            return []
+
+        try:
+            docs = collection.get(
+                ids=[doc_id for doc_id, _ in coincidencias],
+                include=['documents', 'metadatas']
+            )
+        except Exception as e:
+            logger.error(f"Error obteniendo documentos: {e}")
+            return []
+
+        por_id = {
+            doc_id: (doc, metadata)
+            for doc_id, doc, metadata in zip(docs['ids'], docs['documents'], docs['metadatas'])
+        }
+
+        resultados_keywords = []
+        for doc_id, similitud in coincidencias:
+            if doc_id not in por_id:
+                continue
+            doc, metadata = por_id[doc_id]
+            resultados_keywords.append({
+                'documento': doc,
+                'metadata': metadata,
+                'similitud': similitud,
+                'tipo': 'keyword',
+                'ranking': 0
+            })
+
+        return resultados_keywords
+
+    def _keyword_search_scan(self, consulta: str, n_resultados: int, collection) -> List[Dict]:
+        """
+        Búsqueda por palabras clave recorriendo toda la colección (sin índice).
+
+        Args:
+            consulta: Query del usuario
+            n_resultados: Número de resultados
+            collection: Colección a recorrer
 
         Returns:
             Lista de artículos encontrados
@@ -106,7 +268,7 @@ class SearchService:
 
         # Obtener todos los documentos
         try:
-            todos_docs = self.db_manager.collection.get(include=['documents', 'metadatas'])
+            todos_docs = collection.get(include=['documents', 'metadatas'])
         except Exception as e:
             logger.error(f"Error obteniendo documentos: {e}")
             return []
@@ -140,7 +302,10 @@ class SearchService:
     def _merge_results(
         self,
         resultados_vectoriales: List[Dict],
-        resultados_keywords: List[Dict]
+        resultados_keywords: List[Dict],
+        n_resultados: int,
+        umbral_confianza: float,
+        fusion: str = FUSION_MAX
     ) -> List[Dict]:
         """
         Combina resultados vectoriales y de keywords eliminando duplicados.
@@ -148,16 +313,18 @@ class SearchService:
         Args:
             resultados_vectoriales: Resultados de búsqueda vectorial
             resultados_keywords: Resultados de búsqueda por keywords
+            n_resultados: Número máximo de resultados
+            umbral_confianza: Umbral mínimo de similitud
+            fusion: Método de fusión ('max', 'rrf' o 'weighted')
 
         Returns:
-            Lista combinada sin duplicados
+            Los n mejores artículos según la fusión, sin duplicados
         """
-        todos_resultados = resultados_vectoriales + resultados_keywords
-
-        resultados_unicos = {}
-        for resultado in todos_resultados:
-            numero = resultado['metadata']['numero_articulo']
-            if numero not in resultados_unicos or resultado['similitud'] > resultados_unicos[numero]['similitud']:
-                resultados_unicos[numero] = resultado
-
-        return list(resultados_unicos.values())
+        return fuse_results(
+            {LEG_VECTOR: resultados_vectoriales, LEG_KEYWORD: resultados_keywords},
+            n_resultados=n_resultados,
+            umbral_confianza=umbral_confianza,
+            metodo=fusion,
+            pesos=self.fusion_weights,
+            rrf_k=self.rrf_k
+        )
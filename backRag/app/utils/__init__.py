@@ -4,7 +4,8 @@ from app.utils.constants import (
     MIN_CONFIDENCE_THRESHOLD,
     MAX_RESULTS_DEFAULT,
     CONTENT_SNIPPET_MAX_LENGTH,
-    CONTENT_MAX_PARAGRAPHS
+    CONTENT_MAX_PARAGRAPHS,
+    SEARCH_SYNONYMS
 )
 
 __all__ = [
@@ -13,5 +14,6 @@ __all__ = [
     'MIN_CONFIDENCE_THRESHOLD',
     'MAX_RESULTS_DEFAULT',
     'CONTENT_SNIPPET_MAX_LENGTH',
-    'CONTENT_MAX_PARAGRAPHS'
+    'CONTENT_MAX_PARAGRAPHS',
+    'SEARCH_SYNONYMS'
 ]
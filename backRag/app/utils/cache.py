@@ -0,0 +1,102 @@
+"""Caché LRU en memoria con expiración (TTL) y contadores de uso."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLLRUCache:
+    """
+    Caché LRU acotada por tamaño y con tiempo de vida por entrada.
+
+    Es segura para uso concurrente desde varios hilos.
+    """
+
+    def __init__(self, max_size: int = 512, ttl_seconds: Optional[float] = 3600):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_size: Número máximo de entradas (0 desactiva la caché)
+            ttl_seconds: Segundos de vida de cada entrada (None = sin expiración)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Obtiene un valor y lo marca como usado recientemente.
+
+        Returns:
+            El valor cacheado o None si no existe o expiró
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Guarda un valor, desalojando el menos usado si se supera el tamaño."""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Retorna el valor cacheado o lo calcula con compute() y lo guarda."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """Elimina todas las entradas (los contadores se conservan)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas de uso de la caché.
+
+        Returns:
+            Diccionario con tamaño, hits, misses, desalojos y tasa de aciertos
+        """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
@@ -11,3 +11,16 @@ MAX_RESULTS_DEFAULT = 3
 # Límites de contenido
 CONTENT_SNIPPET_MAX_LENGTH = 300
 CONTENT_MAX_PARAGRAPHS = 3
+
+# Sinónimos para expansión de consultas por palabras clave
+SEARCH_SYNONYMS = {
+    'velocidad': ['rapidez', 'límite', 'máximo', 'velocidades'],
+    'ciudad': ['urbana', 'urbano', 'zona urbana', 'vías urbanas'],
+    'multa': ['sanción', 'penalidad', 'infracción'],
+    'celular': ['móvil', 'teléfono', 'dispositivo'],
+    'pico': ['restricción', 'circulación'],
+    'límites': ['velocidades', 'máximas', 'mínimas', 'límite'],
+    'carretera': ['vía', 'autopista', 'nacional', 'carreteras'],
+    'km': ['kilómetros', 'kilometros'],
+    'hora': ['h', '/h']
+}
@@ -0,0 +1,83 @@
+"""Candado exclusivo entre procesos basado en un archivo (fcntl.flock)."""
+import os
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: sin flock el candado solo protege dentro del proceso
+    fcntl = None
+
+
+class FileLock:
+    """
+    Candado no bloqueante compartido por los workers de run.py y los scripts.
+
+    El sistema operativo lo libera si el proceso que lo tiene termina, así que
+    un worker que muere durante una construcción no deja el candado tomado.
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializa el candado.
+
+        Args:
+            path: Archivo del candado (se crea si no existe)
+        """
+        self.path = path
+        self._fd: Optional[int] = None
+        self._local = threading.Lock()
+
+    def acquire(self) -> bool:
+        """
+        Intenta tomar el candado sin esperar.
+
+        Returns:
+            True si se tomó; False si lo tiene otro proceso (o esta misma instancia)
+        """
+        if not self._local.acquire(blocking=False):
+            return False
+        if fcntl is None:
+            return True
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            self._local.release()
+            return False
+
+        # PID del dueño, solo informativo
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Libera el candado si esta instancia lo tiene."""
+        if not self._local.locked():
+            return
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._local.release()
+
+    def locked(self) -> bool:
+        """True si el candado lo tiene esta instancia u otro proceso."""
+        if self._local.locked():
+            return True
+        if not self.acquire():
+            return True
+        self.release()
+        return False
+
+    def __enter__(self) -> "FileLock":
+        if not self.acquire():
+            raise RuntimeError(f"El candado {self.path} lo tiene otro proceso")
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
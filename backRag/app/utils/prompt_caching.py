@@ -0,0 +1,80 @@
+"""Utilidades para el prompt caching de la Messages API de Anthropic."""
+from typing import Any, Dict, List, Optional
+
+# Marca de caché: el prefijo del prompt hasta este bloque (tools -> system ->
+# messages) se guarda en la caché del API durante ~5 minutos.
+CACHE_CONTROL = {"type": "ephemeral"}
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens"
+)
+
+
+def cacheable_system(stable: str, dynamic: Optional[str] = None, enabled: bool = True) -> List[Dict[str, Any]]:
+    """
+    Construye el system prompt como bloques, marcando como cacheable la parte estable.
+
+    Args:
+        stable: Texto que se repite entre peticiones (instrucciones, plantillas)
+        dynamic: Texto propio de la petición (va después del punto de caché)
+        enabled: Si es False no se agrega cache_control
+
+    Returns:
+        Lista de bloques de texto para el parámetro system
+    """
+    bloque = {"type": "text", "text": stable}
+    if enabled:
+        bloque["cache_control"] = CACHE_CONTROL
+
+    bloques = [bloque]
+    if dynamic:
+        bloques.append({"type": "text", "text": dynamic})
+    return bloques
+
+
+def cacheable_tools(tools: List[Dict[str, Any]], enabled: bool = True) -> List[Dict[str, Any]]:
+    """
+    Copia las definiciones de tools marcando la última como punto de caché.
+
+    Args:
+        tools: Definiciones de tools en formato Anthropic
+        enabled: Si es False se retornan sin cambios
+
+    Returns:
+        Lista de tools (las definiciones originales no se modifican)
+    """
+    if not enabled or not tools:
+        return tools
+    return [*tools[:-1], {**tools[-1], "cache_control": CACHE_CONTROL}]
+
+
+def usage_metrics(usage: Any) -> Dict[str, int]:
+    """
+    Extrae los contadores de tokens (incluidos los de caché) de un objeto usage.
+
+    Args:
+        usage: Atributo usage de la respuesta (o evento) de la Messages API
+
+    Returns:
+        Diccionario con input, output, escritura y lectura de caché
+    """
+    return {campo: getattr(usage, campo, None) or 0 for campo in USAGE_FIELDS}
+
+
+def merge_usage(total: Dict[str, int], usage: Dict[str, int]) -> Dict[str, int]:
+    """Acumula los contadores de usage en total (in place) y lo retorna."""
+    for campo in USAGE_FIELDS:
+        total[campo] = total.get(campo, 0) + usage.get(campo, 0)
+    return total
+
+
+def describe_usage(usage: Dict[str, int]) -> str:
+    """Resumen legible del uso de tokens para los logs."""
+    return (
+        f"Tokens - input: {usage.get('input_tokens', 0)}, output: {usage.get('output_tokens', 0)}, "
+        f"caché escrita: {usage.get('cache_creation_input_tokens', 0)}, "
+        f"caché leída: {usage.get('cache_read_input_tokens', 0)}"
+    )
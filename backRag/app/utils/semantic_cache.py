@@ -0,0 +1,159 @@
+"""Caché semántica: reutiliza valores de consultas con embeddings cercanos."""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Caché LRU con TTL indexada por embedding.
+
+    Una búsqueda acierta si existe una entrada con el mismo namespace (por
+    ejemplo, los parámetros de la consulta) cuya distancia coseno al
+    embedding consultado sea menor o igual a max_distance. Todas las
+    entradas quedan ligadas a una versión de la colección: si la versión
+    cambia, la caché se vacía.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl_seconds: Optional[float] = 1800,
+        max_distance: float = 0.05
+    ):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_size: Número máximo de entradas (0 desactiva la caché)
+            ttl_seconds: Segundos de vida de cada entrada (None = sin expiración)
+            max_distance: Distancia coseno máxima para considerar un acierto
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.version: Optional[Hashable] = None
+
+        # id -> (namespace, vector normalizado, valor, expira)
+        self._data: "OrderedDict[int, tuple]" = OrderedDict()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norma = np.linalg.norm(vector)
+        return vector / norma if norma else vector
+
+    def _check_version(self, version: Hashable):
+        """Vacía la caché si la colección cambió. Requiere el lock tomado."""
+        if version != self.version:
+            if self._data:
+                self._data.clear()
+                self.invalidations += 1
+            self.version = version
+
+    def get(self, embedding: List[float], namespace: Hashable, version: Hashable = None) -> Optional[Any]:
+        """
+        Busca el valor de la consulta cacheada más cercana.
+
+        Args:
+            embedding: Embedding de la consulta
+            namespace: Parámetros que deben coincidir exactamente
+            version: Versión actual de la colección
+
+        Returns:
+            El valor cacheado o None si no hay ninguna entrada suficientemente cercana
+        """
+        if self.max_size <= 0:
+            return None
+
+        vector = self._normalize(embedding)
+        ahora = time.monotonic()
+
+        with self._lock:
+            self._check_version(version)
+
+            candidatos = []
+            for entry_id, (ns, cached_vector, _, expires_at) in list(self._data.items()):
+                if expires_at is not None and expires_at < ahora:
+                    del self._data[entry_id]
+                    self.expirations += 1
+                elif ns == namespace:
+                    candidatos.append((entry_id, cached_vector))
+
+            if candidatos:
+                matriz = np.stack([v for _, v in candidatos])
+                distancias = 1.0 - matriz @ vector
+                mejor = int(np.argmin(distancias))
+                distancia = float(distancias[mejor])
+
+                if distancia <= self.max_distance:
+                    entry_id = candidatos[mejor][0]
+                    self._data.move_to_end(entry_id)
+                    self.hits += 1
+                    if distancia <= 1e-6:
+                        self.exact_hits += 1
+                    return self._data[entry_id][2]
+
+            self.misses += 1
+            return None
+
+    def set(self, embedding: List[float], namespace: Hashable, value: Any, version: Hashable = None):
+        """Guarda un valor, desalojando el menos usado si se supera el tamaño."""
+        if self.max_size <= 0:
+            return
+
+        vector = self._normalize(embedding)
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            self._check_version(version)
+            self._data[next(self._ids)] = (namespace, vector, value, expires_at)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Elimina todas las entradas (los contadores se conservan)."""
+        with self._lock:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas de uso de la caché.
+
+        Returns:
+            Diccionario con tamaño, aciertos (totales y exactos), fallos,
+            desalojos, invalidaciones y tasa de aciertos
+        """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl_seconds,
+            'max_distance': self.max_distance,
+            'hits': self.hits,
+            'exact_hits': self.exact_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
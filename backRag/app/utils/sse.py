@@ -0,0 +1,36 @@
+"""Utilidades para respuestas Server-Sent Events (SSE)."""
+import json
+from typing import Any, AsyncIterator, Dict
+
+from fastapi.responses import StreamingResponse
+
+# Eventos del protocolo de streaming:
+# - meta:  datos previos a los tokens (fuentes, confianza, modelo)
+# - token: fragmento de texto generado ({"text": ...})
+# - done:  fin del stream (respuesta completa y tiempos)
+# - error: error durante la generación ({"detail": ...})
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    # Evita que nginx acumule el stream en buffer
+    "X-Accel-Buffering": "no"
+}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """
+    Serializa un evento SSE.
+
+    Args:
+        event: Nombre del evento
+        data: Payload JSON del evento
+
+    Returns:
+        Texto del evento listo para enviar
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Envuelve un generador de eventos SSE en una StreamingResponse."""
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,11 @@
+"""Información del sistema para dimensionar pools y batches."""
+import os
+
+
+def available_cpus() -> int:
+    """Núcleos disponibles para el proceso (respeta la afinidad de CPU del contenedor)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # macOS y Windows no exponen sched_getaffinity
+        return os.cpu_count() or 1
@@ -1,13 +1,31 @@
 #!/usr/bin/env python3
 """
 Punto de entrada principal para ejecutar la aplicación TránsitoBot API.
+
+Con WORKERS > 1 un proceso maestro precarga el modelo de embeddings y crea
+los workers con fork (ver app/core/server.py).
 """
+import os
 import uvicorn
+from app.core.config import settings
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
-    )
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8000"))
+
+    if settings.WORKERS > 1:
+        from app.core.server import serve_prefork
+        serve_prefork(
+            "app.main:app",
+            host=host,
+            port=port,
+            workers=settings.WORKERS,
+            preload=settings.PRELOAD_EMBEDDING_MODEL
+        )
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host=host,
+            port=port,
+            reload=True
+        )
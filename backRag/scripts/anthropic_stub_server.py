@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Stub local de la Messages API de Anthropic con prompt caching simulado.
+
+Permite probar el prompt caching de backRag sin llamar al API real:
+cada petición se divide en el prefijo hasta el último bloque con
+cache_control (en el orden tools -> system -> messages) y el resto. La
+primera vez que se ve un prefijo se reporta como
+cache_creation_input_tokens; las siguientes como cache_read_input_tokens.
+Los tokens se estiman como caracteres / 4.
+
+Si la petición trae tools y el último mensaje no contiene tool_result,
+responde con un tool_use por cada tool (input vacío); si no, responde
+con texto. Soporta stream=True.
+
+Uso:
+    python scripts/anthropic_stub_server.py [--port 8099]
+    ANTHROPIC_BASE_URL=http://localhost:8099 uvicorn app.main:app
+"""
+import argparse
+import hashlib
+import json
+import uuid
+from typing import Any, Dict, List, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Anthropic Messages API stub")
+
+# Prefijos cacheados (hash -> tokens)
+_cache: Dict[str, int] = {}
+
+
+def _tokens(partes: List[Any]) -> int:
+    return sum(len(json.dumps(parte, ensure_ascii=False)) for parte in partes) // 4
+
+
+def _bloques(body: Dict[str, Any]) -> List[Any]:
+    """Aplana la petición en bloques en el orden en que el API arma el prefijo."""
+    bloques = list(body.get("tools") or [])
+
+    system = body.get("system") or []
+    bloques.extend([{"type": "text", "text": system}] if isinstance(system, str) else system)
+
+    for mensaje in body.get("messages", []):
+        contenido = mensaje["content"]
+        if isinstance(contenido, str):
+            bloques.append({"type": "text", "text": contenido})
+        else:
+            bloques.extend(contenido)
+    return bloques
+
+
+def _usage(body: Dict[str, Any]) -> Tuple[int, int, int]:
+    """Calcula (input_tokens, cache_creation, cache_read) de la petición."""
+    bloques = _bloques(body)
+    corte = max((i + 1 for i, b in enumerate(bloques) if isinstance(b, dict) and b.get("cache_control")), default=0)
+    prefijo, resto = bloques[:corte], bloques[corte:]
+
+    if not prefijo:
+        return _tokens(resto), 0, 0
+
+    clave = hashlib.sha256(
+        json.dumps([body.get("model"), prefijo], sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+    tokens_prefijo = _tokens(prefijo)
+    if clave in _cache:
+        return _tokens(resto), 0, tokens_prefijo
+    _cache[clave] = tokens_prefijo
+    return _tokens(resto), tokens_prefijo, 0
+
+
+def _contenido(body: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], str]:
+    """Genera los bloques de respuesta y el stop_reason."""
+    ultimo = body["messages"][-1]["content"]
+    respondiendo_tools = isinstance(ultimo, list) and any(b.get("type") == "tool_result" for b in ultimo)
+
+    if body.get("tools") and not respondiendo_tools:
+        return [
+            {"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:12]}", "name": tool["name"], "input": {}}
+            for tool in body["tools"]
+        ], "tool_use"
+
+    return [{"type": "text", "text": "Respuesta de prueba del stub de Anthropic."}], "end_turn"
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/v1/messages")
+async def messages(request: Request):
+    body = await request.json()
+    input_tokens, cache_creation, cache_read = _usage(body)
+    content, stop_reason = _contenido(body)
+    usage = {
+        "input_tokens": input_tokens,
+        "output_tokens": _tokens(content),
+        "cache_creation_input_tokens": cache_creation,
+        "cache_read_input_tokens": cache_read
+    }
+    message = {
+        "id": f"msg_{uuid.uuid4().hex[:12]}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model"),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": usage
+    }
+
+    if not body.get("stream"):
+        return JSONResponse(message)
+
+    async def eventos():
+        yield _sse("message_start", {
+            "type": "message_start",
+            "message": {**message, "content": [], "stop_reason": None, "usage": {**usage, "output_tokens": 0}}
+        })
+        for indice, bloque in enumerate(content):
+            yield _sse("content_block_start", {
+                "type": "content_block_start", "index": indice, "content_block": {"type": "text", "text": ""}
+            })
+            for palabra in bloque.get("text", "").split(" "):
+                yield _sse("content_block_delta", {
+                    "type": "content_block_delta", "index": indice,
+                    "delta": {"type": "text_delta", "text": palabra + " "}
+                })
+            yield _sse("content_block_stop", {"type": "content_block_stop", "index": indice})
+        yield _sse("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+            "usage": {"output_tokens": usage["output_tokens"]}
+        })
+        yield _sse("message_stop", {"type": "message_stop"})
+
+    return StreamingResponse(eventos(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099, help="Puerto del stub")
+    args = parser.parse_args()
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
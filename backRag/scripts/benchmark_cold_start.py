@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Medición del arranque en frío de la API.
+
+Lanza uvicorn en un subproceso y, desde el instante del lanzamiento, mide:
+- liveness: primer 200 de /api/v1/health
+- readiness: primer 200 de /api/v1/health/ready (modelo y ChromaDB cargados)
+- primera consulta exitosa: primer 200 de /api/v1/query (se reintenta ante
+  503 respetando Retry-After)
+
+Al final muestra los tiempos que reporta el propio servidor en
+/api/v1/health/ready (desde el inicio del lifespan). Con --repeticiones se
+reporta la mediana.
+
+Uso:
+    python scripts/benchmark_cold_start.py [--puerto 8011] [--repeticiones 3]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONSULTA = "¿Cuál es la multa por no usar el cinturón de seguridad?"
+
+
+def _esperar(client: httpx.Client, metodo: str, url: str, inicio: float, timeout: float, **kwargs) -> float:
+    """Repite la petición hasta obtener 200 y retorna los segundos desde `inicio`."""
+    while time.perf_counter() - inicio < timeout:
+        try:
+            respuesta = client.request(metodo, url, **kwargs)
+            if respuesta.status_code == 200:
+                return time.perf_counter() - inicio
+            espera = float(respuesta.headers.get("Retry-After", 0.05)) if respuesta.status_code == 503 else 0.05
+        except httpx.TransportError:
+            espera = 0.05
+        time.sleep(min(espera, 0.25))
+    raise TimeoutError(f"{url} no respondió 200 en {timeout}s")
+
+
+def medir_arranque(puerto: int, timeout: float) -> dict:
+    """Lanza el servidor, mide los tres hitos y lo detiene."""
+    base = f"http://127.0.0.1:{puerto}/api/v1"
+    inicio = time.perf_counter()
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(puerto)],
+        cwd=BASE_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(timeout=timeout) as client:
+            liveness = _esperar(client, "GET", f"{base}/health", inicio, timeout)
+            ready = _esperar(client, "GET", f"{base}/health/ready", inicio, timeout)
+            primera_consulta = _esperar(client, "POST", f"{base}/query", inicio, timeout, json={"query": CONSULTA})
+            servidor_stats = client.get(f"{base}/health/ready").json()
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=30)
+
+    return {
+        'liveness_s': liveness,
+        'ready_s': ready,
+        'primera_consulta_s': primera_consulta,
+        'servidor_ready_s': servidor_stats.get('ready_after_seconds'),
+        'servidor_primera_consulta_s': servidor_stats.get('first_query_after_seconds')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--puerto", type=int, default=8011, help="Puerto del servidor de prueba")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Arranques a medir (se reporta la mediana)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Segundos máximos por hito")
+    args = parser.parse_args()
+
+    mediciones = [medir_arranque(args.puerto, args.timeout) for _ in range(args.repeticiones)]
+
+    def mediana(clave):
+        valores = [m[clave] for m in mediciones if m[clave] is not None]
+        return statistics.median(valores) if valores else float('nan')
+
+    print(f"\n=== ARRANQUE EN FRÍO ({args.repeticiones} arranque(s), mediana) ===")
+    print(f"{'hito':<36} {'segundos':>9}")
+    print(f"{'/health 200 (liveness)':<36} {mediana('liveness_s'):>9.2f}")
+    print(f"{'/health/ready 200 (readiness)':<36} {mediana('ready_s'):>9.2f}")
+    print(f"{'primera /query exitosa':<36} {mediana('primera_consulta_s'):>9.2f}")
+    print("\nSegún el servidor (desde el inicio del lifespan):")
+    print(f"{'modelo y ChromaDB listos':<36} {mediana('servidor_ready_s'):>9.2f}")
+    print(f"{'primera consulta exitosa':<36} {mediana('servidor_primera_consulta_s'):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
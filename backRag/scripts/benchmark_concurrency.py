@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia contra la API en ejecución.
+
+Lanza rondas de peticiones a /api/v1/query con distinto número de
+peticiones en vuelo y reporta throughput y latencia por nivel. Con la
+búsqueda y las llamadas al LLM fuera del event loop, el throughput debe
+crecer con la concurrencia en vez de quedarse fijo en ~1/latencia.
+
+Uso:
+    python scripts/benchmark_concurrency.py [--url http://localhost:8000] [--niveles 1,2,4,8,16]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONSULTAS = os.path.join(BASE_DIR, "data", "eval", "consultas_etiquetadas.json")
+
+
+async def _ronda(client, url, consultas, concurrencia, por_nivel):
+    """Ejecuta por_nivel peticiones manteniendo `concurrencia` en vuelo."""
+    semaforo = asyncio.Semaphore(concurrencia)
+    latencias = []
+    errores = 0
+
+    async def peticion(i):
+        nonlocal errores
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                respuesta = await client.post(url, json={"query": consultas[i % len(consultas)]})
+                respuesta.raise_for_status()
+            except httpx.HTTPError:
+                errores += 1
+                return
+            latencias.append((time.perf_counter() - inicio) * 1000)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(peticion(i) for i in range(por_nivel)))
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        'concurrencia': concurrencia,
+        'rps': len(latencias) / total,
+        'latencia_media_ms': statistics.mean(latencias) if latencias else 0.0,
+        'latencia_p95_ms': latencias[max(int(len(latencias) * 0.95) - 1, 0)] if latencias else 0.0,
+        'errores': errores
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="URL base de backRag")
+    parser.add_argument("--consultas", default=DEFAULT_CONSULTAS, help="JSON con consultas de ejemplo")
+    parser.add_argument("--niveles", default="1,2,4,8,16", help="Niveles de concurrencia separados por coma")
+    parser.add_argument("--peticiones", type=int, default=64, help="Peticiones por nivel")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout por petición en segundos")
+    args = parser.parse_args()
+
+    with open(args.consultas, 'r', encoding='utf-8') as f:
+        consultas = [item['consulta'] for item in json.load(f)]
+
+    niveles = [int(n) for n in args.niveles.split(',')]
+    url = f"{args.url.rstrip('/')}/api/v1/query"
+
+    limites = httpx.Limits(max_connections=max(niveles), max_keepalive_connections=max(niveles))
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limites) as client:
+        print(f"\n=== BENCHMARK CONCURRENCIA ({args.peticiones} peticiones por nivel) ===")
+        base = None
+        for concurrencia in niveles:
+            resultado = await _ronda(client, url, consultas, concurrencia, args.peticiones)
+            base = base or resultado['rps']
+            print(
+                f"concurrencia {concurrencia:>3} | rps: {resultado['rps']:.2f} "
+                f"({resultado['rps'] / base:.2f}x) | media: {resultado['latencia_media_ms']:.1f}ms "
+                f"| p95: {resultado['latencia_p95_ms']:.1f}ms | errores: {resultado['errores']}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
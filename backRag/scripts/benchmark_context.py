@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la compactación del historial de conversación (context.user).
+
+Simula una conversación de N turnos y, en cada turno, envía a la compactación
+el historial que mandaría Rasa: los últimos mensajes que caben en su ventana
+de tokens (TRANSCRIPT_MAX_TOKENS de actions/utils/transcript_builder.py).
+Reporta por petición, para las peticiones que superan el presupuesto:
+- tokens estimados (caracteres / 4) del contexto original, enviado y ahorrado
+- aciertos de la caché de resúmenes (segmentos resumidos una sola vez)
+- tiempo de compactación (µs)
+
+Uso:
+    python scripts/benchmark_context.py [--turnos 50] [--ventana-rasa 2000] [--presupuestos 300 600 1000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.core.config import settings
+from app.services.context_compactor import ContextCompactor, estimate_tokens
+
+INFRACCIONES = [
+    "pasarse un semáforo en rojo", "exceso de velocidad", "conducir sin licencia",
+    "no usar el cinturón de seguridad", "estacionar en sitio prohibido", "conducir en estado de embriaguez",
+    "no portar el SOAT", "hablar por celular al conducir"
+]
+
+
+def mensajes_turno(turno: int, largo_respuesta: int) -> List[str]:
+    """Pregunta del usuario y respuesta del bot de un turno."""
+    infraccion = INFRACCIONES[turno % len(INFRACCIONES)]
+    respuesta = (
+        f"La infracción por {infraccion} está en el artículo {100 + turno} del código de tránsito. "
+        f"La multa es de {8 + turno % 20} salarios mínimos diarios legales vigentes. "
+        "Puedes pagarla en el portal del SIMIT o en los puntos autorizados. "
+        "Si tomas el curso pedagógico dentro de los cinco días hábiles obtienes un descuento del cincuenta por ciento. "
+        "Recuerda que la reincidencia puede acarrear la suspensión de la licencia. "
+    )
+    return [
+        f"Usuario: ¿Cuál es la multa por {infraccion} y cómo la pago? (turno {turno})",
+        f"Bot: {(respuesta * (largo_respuesta // len(respuesta) + 1))[:largo_respuesta]}"
+    ]
+
+
+def ventana_rasa(lineas: List[str], max_tokens: int) -> str:
+    """Últimas líneas del historial que caben en la ventana de Rasa (la última siempre)."""
+    seleccion, tokens = [], 0
+    for linea in reversed(lineas):
+        tokens += estimate_tokens(linea)
+        if seleccion and tokens > max_tokens:
+            break
+        seleccion.append(linea)
+    return "\n".join(reversed(seleccion))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turnos", type=int, default=50, help="Turnos de la conversación")
+    parser.add_argument("--ventana-rasa", type=int, default=2000, help="TRANSCRIPT_MAX_TOKENS de Rasa")
+    parser.add_argument("--largo-respuesta", type=int, default=600, help="Caracteres de cada respuesta del bot")
+    parser.add_argument("--presupuestos", type=int, nargs="+", default=[300, settings.CONTEXT_TOKEN_BUDGET, 1000],
+                        help="CONTEXT_TOKEN_BUDGET a comparar")
+    parser.add_argument("--mostrar", action="store_true", help="Imprime el contexto compactado del último turno")
+    args = parser.parse_args()
+
+    lineas = []
+    contextos = []
+    for turno in range(args.turnos):
+        lineas.extend(mensajes_turno(turno, args.largo_respuesta))
+        contextos.append(ventana_rasa(lineas, args.ventana_rasa))
+
+    print(f"\n=== COMPACTACIÓN DEL CONTEXTO ({args.turnos} turnos, ventana Rasa {args.ventana_rasa} tokens, "
+          f"respuestas de {args.largo_respuesta} caracteres) ===")
+    print(f"{'presupuesto':>11} {'compactadas':>12} {'tokens orig':>12} {'tokens env':>11} {'ahorro/pet':>11} "
+          f"{'ahorro %':>9} {'hit rate':>9} {'µs p50':>8} {'µs max':>8}")
+    for presupuesto in args.presupuestos:
+        compactor = ContextCompactor(
+            token_budget=presupuesto,
+            recent_turns=settings.CONTEXT_RECENT_TURNS,
+            segment_turns=settings.CONTEXT_SEGMENT_TURNS,
+            summary_tokens=settings.CONTEXT_SUMMARY_TOKENS
+        )
+        reportes, tiempos, texto = [], [], ""
+        for contexto in contextos:
+            inicio = time.perf_counter()
+            texto, reporte = compactor.compact(contexto)
+            tiempos.append((time.perf_counter() - inicio) * 1e6)
+            if reporte['applied']:
+                reportes.append(reporte)
+
+        if not reportes:
+            print(f"{presupuesto:>11} {0:>12}  (el historial nunca supera el presupuesto)")
+            continue
+        originales = statistics.mean(r['tokens_original'] for r in reportes)
+        enviados = statistics.mean(r['tokens_sent'] for r in reportes)
+        cache = compactor.stats()['cache']
+        print(
+            f"{presupuesto:>11} {len(reportes):>12} {originales:>12.0f} {enviados:>11.0f} "
+            f"{originales - enviados:>11.0f} {1 - enviados / originales:>9.1%} {cache['hit_rate']:>9.1%} "
+            f"{statistics.median(tiempos):>8.0f} {max(tiempos):>8.0f}"
+        )
+        if args.mostrar:
+            print(f"\n--- contexto enviado en el último turno (presupuesto {presupuesto}) ---\n{texto}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark del micro-batcher de embeddings.
+
+Lanza N consultas concurrentes desde hilos de trabajo (como las atiende la
+API) y compara el throughput de:
+- directo: cada consulta ejecuta su propio encode() en el modelo
+- batcher: las consultas se agrupan con EmbeddingBatcher
+
+Uso:
+    python scripts/benchmark_embedding_batcher.py [--concurrencia 32] [--consultas 512]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.repositories.embedding_batcher import EmbeddingBatcher
+from sentence_transformers import SentenceTransformer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONSULTAS = os.path.join(BASE_DIR, "data", "eval", "consultas_etiquetadas.json")
+
+
+async def _medir(encode, consultas, concurrencia):
+    """Ejecuta encode() para todas las consultas desde un pool de hilos."""
+    loop = asyncio.get_running_loop()
+    latencias = []
+
+    def tarea(consulta):
+        inicio = time.perf_counter()
+        encode(consulta)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+        await asyncio.gather(*(loop.run_in_executor(pool, tarea, c) for c in consultas))
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        'qps': len(consultas) / total,
+        'latencia_media_ms': statistics.mean(latencias),
+        'latencia_p95_ms': latencias[int(len(latencias) * 0.95) - 1]
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modelo", default="paraphrase-multilingual-MiniLM-L12-v2", help="Modelo de embeddings")
+    parser.add_argument("--consultas-json", default=DEFAULT_CONSULTAS, help="JSON con consultas de ejemplo")
+    parser.add_argument("--consultas", type=int, default=512, help="Total de consultas a lanzar")
+    parser.add_argument("--concurrencia", type=int, default=32, help="Hilos concurrentes")
+    parser.add_argument("--max-batch", type=int, default=32, help="Tamaño máximo de batch")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Espera máxima por batch")
+    args = parser.parse_args()
+
+    with open(args.consultas_json, 'r', encoding='utf-8') as f:
+        base = [item['consulta'] for item in json.load(f)]
+    # Sufijo numérico para que ninguna consulta sea idéntica a otra
+    consultas = [f"{base[i % len(base)]} {i}" for i in range(args.consultas)]
+
+    modelo = SentenceTransformer(args.modelo)
+    modelo.encode(["calentamiento"])
+
+    directo = await _medir(lambda c: modelo.encode([c])[0].tolist(), consultas, args.concurrencia)
+
+    batcher = EmbeddingBatcher(modelo, max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms)
+    await batcher.start()
+    try:
+        batched = await _medir(batcher.encode_blocking, consultas, args.concurrencia)
+    finally:
+        stats = batcher.stats()
+        await batcher.stop()
+
+    print(f"\n=== BENCHMARK MICRO-BATCHING ({args.consultas} consultas, concurrencia {args.concurrencia}) ===")
+    for nombre, resultado in (("directo", directo), ("batcher", batched)):
+        print(f"{nombre}: " + " | ".join(f"{clave}: {valor:.2f}" for clave, valor in resultado.items()))
+    print(f"batches: {stats['batches']} | tamaño medio: {stats['avg_batch_size']} | máximo: {stats['max_batch_observed']}")
+    print(f"speedup QPS: {batched['qps'] / directo['qps']:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
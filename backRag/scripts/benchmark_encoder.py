@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Comparación de backends de embeddings: recall@k, latencia y memoria.
+
+Cada backend corre en un subproceso propio (así la memoria residente y el
+tiempo de carga no se mezclan) que codifica los artículos del código y las
+consultas etiquetadas de data/eval/consultas_etiquetadas.json. Se reporta:
+- carga del modelo (s) y memoria residente máxima del proceso (MB)
+- latencia de encode de una consulta (p50/p95, como en /query) y throughput
+  de indexación (artículos/s)
+- recall@k y MRR de la búsqueda semántica (similitud coseno exacta)
+- compatibilidad con el primer backend (referencia): coseno medio entre los
+  vectores de cada artículo, solapamiento del top-k y recall@k de consultas
+  codificadas con el backend contra artículos codificados con la referencia
+  (el caso de consultar una colección indexada con el otro encoder)
+
+Uso:
+    python scripts/benchmark_encoder.py [--backends torch onnx] [--k 1 3 5]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.core.config import settings
+from app.repositories.embedding_encoders import EMBEDDING_BACKENDS, embedding_backend_options, load_embedding_model
+from scripts.transit_processor import ProcesadorCodigoTransito
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DOCX = os.path.join(BASE_DIR, "data", "documents", "CodigoNacionaldeTransitoTerrestre.docx")
+DEFAULT_CONSULTAS = os.path.join(BASE_DIR, "data", "eval", "consultas_etiquetadas.json")
+
+
+def _cargar_corpus(docx: str, consultas_json: str):
+    procesador = ProcesadorCodigoTransito()
+    procesador.procesar_codigo_transito(docx)
+    textos, metadatos, _ = procesador.exportar_para_chroma()
+    numeros = [str(m['numero_articulo']).rstrip('°º.') for m in metadatos]
+
+    with open(consultas_json, 'r', encoding='utf-8') as f:
+        consultas = json.load(f)
+    return textos, numeros, consultas
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def medir_backend(backend: str, args, salida: str):
+    """Subproceso: carga el backend, codifica corpus y consultas y guarda resultados."""
+    textos, _, consultas = _cargar_corpus(args.docx, args.consultas)
+    opciones = {**embedding_backend_options(settings), 'embedding_backend': backend}
+    rss_inicial = _max_rss_mb()
+
+    inicio = time.perf_counter()
+    modelo = load_embedding_model(
+        settings.EMBEDDING_MODEL, opciones['embedding_backend'], opciones['onnx_path'], opciones['onnx_threads']
+    )
+    carga = time.perf_counter() - inicio
+    modelo.encode(["calentamiento"])
+
+    inicio = time.perf_counter()
+    documentos = np.asarray(modelo.encode(textos, batch_size=32), dtype=np.float32)
+    indexacion = time.perf_counter() - inicio
+
+    latencias = []
+    vectores = []
+    for item in consultas:
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            vector = modelo.encode([item['consulta']])[0]
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        vectores.append(vector)
+
+    latencias.sort()
+    stats = {
+        'backend': backend,
+        'carga_s': carga,
+        'rss_mb': _max_rss_mb(),
+        'rss_modelo_mb': _max_rss_mb() - rss_inicial,
+        'encode_p50_ms': statistics.median(latencias),
+        'encode_p95_ms': latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))],
+        'articulos_por_s': len(textos) / indexacion
+    }
+    np.savez(salida, documentos=documentos, consultas=np.asarray(vectores, dtype=np.float32), stats=json.dumps(stats))
+
+
+def _normalizar(matriz: np.ndarray) -> np.ndarray:
+    return matriz / np.clip(np.linalg.norm(matriz, axis=1, keepdims=True), 1e-12, None)
+
+
+def _rankings(consultas: np.ndarray, documentos: np.ndarray, k: int) -> np.ndarray:
+    similitudes = _normalizar(consultas) @ _normalizar(documentos).T
+    return np.argsort(-similitudes, axis=1, kind='stable')[:, :k]
+
+
+def _recall_mrr(rankings: np.ndarray, numeros, consultas, k: int):
+    aciertos, reciprocos = 0, []
+    for fila, item in zip(rankings, consultas):
+        esperados = set(item['articulos'])
+        encontrados = [numeros[i] for i in fila[:k]]
+        aciertos += bool(esperados & set(encontrados))
+        rango = next((i + 1 for i, n in enumerate(encontrados) if n in esperados), None)
+        reciprocos.append(1 / rango if rango else 0.0)
+    return aciertos / len(consultas), statistics.mean(reciprocos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=EMBEDDING_BACKENDS,
+                        help="Backends a comparar (el primero es la referencia)")
+    parser.add_argument("--docx", default=DEFAULT_DOCX, help="Documento del código de tránsito")
+    parser.add_argument("--consultas", default=DEFAULT_CONSULTAS, help="JSON con consultas etiquetadas")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5], help="Valores de k")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Repeticiones del encode de cada consulta")
+    parser.add_argument("--worker", choices=EMBEDDING_BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--salida", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        medir_backend(args.worker, args, args.salida)
+        return
+
+    _, numeros, consultas = _cargar_corpus(args.docx, args.consultas)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as temporal:
+        for backend in args.backends:
+            salida = os.path.join(temporal, f"{backend}.npz")
+            subprocess.run([
+                sys.executable, os.path.abspath(__file__), "--worker", backend, "--salida", salida,
+                "--docx", args.docx, "--consultas", args.consultas, "--repeticiones", str(args.repeticiones)
+            ], check=True)
+            with np.load(salida) as datos:
+                resultados[backend] = {
+                    'documentos': datos['documentos'],
+                    'consultas': datos['consultas'],
+                    'stats': json.loads(str(datos['stats']))
+                }
+
+    k_max = max(args.k)
+    referencia = resultados[args.backends[0]]
+    print(f"\n=== BACKENDS DE EMBEDDINGS ({len(numeros)} artículos, {len(consultas)} consultas) ===")
+    print(f"Referencia: {args.backends[0]}\n")
+
+    for backend, datos in resultados.items():
+        stats = datos['stats']
+        rankings = _rankings(datos['consultas'], datos['documentos'], k_max)
+        print(f"--- {backend} ---")
+        print(
+            f"carga: {stats['carga_s']:.2f}s | RSS máx: {stats['rss_mb']:.0f} MB "
+            f"(+{stats['rss_modelo_mb']:.0f} MB modelo) | encode consulta p50/p95: "
+            f"{stats['encode_p50_ms']:.2f}/{stats['encode_p95_ms']:.2f} ms | "
+            f"indexación: {stats['articulos_por_s']:.1f} artículos/s"
+        )
+        print(" | ".join(
+            f"recall@{k}: {recall:.3f} (MRR {mrr:.3f})"
+            for k in args.k
+            for recall, mrr in [_recall_mrr(rankings, numeros, consultas, k)]
+        ))
+
+        dimension, dimension_ref = datos['documentos'].shape[1], referencia['documentos'].shape[1]
+        if datos is not referencia and dimension != dimension_ref:
+            print(f"❌ incompatible con la referencia: dimensión {dimension} vs {dimension_ref}")
+        elif datos is not referencia:
+            coseno = (_normalizar(datos['documentos']) * _normalizar(referencia['documentos'])).sum(axis=1)
+            ranking_ref = _rankings(referencia['consultas'], referencia['documentos'], k_max)
+            cruzado = _rankings(datos['consultas'], referencia['documentos'], k_max)
+            print(f"coseno vs referencia: medio {coseno.mean():.4f}, mínimo {coseno.min():.4f}")
+            print(" | ".join(
+                f"solapamiento top-{k}: "
+                f"{np.mean([len(set(a[:k]) & set(b[:k])) / k for a, b in zip(rankings, ranking_ref)]):.3f}"
+                for k in args.k
+            ))
+            print("consultas contra colección de la referencia: " + " | ".join(
+                f"recall@{k}: {_recall_mrr(cruzado, numeros, consultas, k)[0]:.3f}" for k in args.k
+            ))
+        print()
+
+
+if __name__ == "__main__":
+    main()
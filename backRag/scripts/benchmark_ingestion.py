@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput de ingesta (artículos/segundo).
+
+Compara sobre un corpus de N copias del código de tránsito (o un directorio
+de documentos):
+- python-docx: carga completa del documento + segmentación sobre el texto unido (original)
+- pipeline: párrafos en streaming + segmentación incremental, con 1..N workers
+
+Con --embeddings mide además la etapa de embeddings con distintos tamaños de
+batch (requiere sentence-transformers y el modelo descargado).
+
+Uso:
+    python scripts/benchmark_ingestion.py [--copias 50] [--workers 1 2 4] [--embeddings]
+    python scripts/benchmark_ingestion.py --directorio data/normas
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import docx
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.utils.system import available_cpus
+from scripts.benchmark_parser import ProcesadorLegado
+from scripts.ingestion_pipeline import FuenteDocumento, PipelineIngesta, fuentes_de_directorio
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DOCX = os.path.join(BASE_DIR, "data", "documents", "CodigoNacionaldeTransitoTerrestre.docx")
+
+
+def ingesta_python_docx(fuentes) -> int:
+    """Ingesta original: python-docx carga todo el documento y el parser anterior segmenta el texto unido."""
+    total = 0
+    for fuente in fuentes:
+        documento = docx.Document(fuente.ruta)
+        parrafos = [p.text.strip() for p in documento.paragraphs if p.text.strip()]
+        total += len(ProcesadorLegado().procesar_texto("\n".join(parrafos)))
+    return total
+
+
+def ingesta_pipeline(fuentes, workers: int) -> int:
+    return sum(len(ids) for _, _, ids in PipelineIngesta(workers=workers).procesar(fuentes))
+
+
+def medir(nombre: str, funcion, repeticiones: int):
+    mejor, articulos = float('inf'), 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        articulos = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"{nombre:<24} {articulos:>8} {mejor:>9.3f} {articulos / mejor:>12.1f}")
+    return articulos / mejor
+
+
+def medir_embeddings(fuentes, batch_sizes):
+    from sentence_transformers import SentenceTransformer
+    from app.core.config import settings
+
+    textos = [texto for lote in PipelineIngesta(workers=1).procesar(fuentes) for texto in lote[0]]
+    modelo = SentenceTransformer(settings.EMBEDDING_MODEL)
+    modelo.encode(textos[:32])  # calentamiento
+
+    print(f"\nEmbeddings ({len(textos)} artículos)")
+    print(f"{'batch_size':<24} {'segundos':>9} {'artículos/s':>12}")
+    for batch_size in batch_sizes:
+        inicio = time.perf_counter()
+        modelo.encode(textos, batch_size=batch_size)
+        segundos = time.perf_counter() - inicio
+        print(f"{batch_size:<24} {segundos:>9.3f} {len(textos) / segundos:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docx", default=DEFAULT_DOCX, help="Documento a replicar en el corpus")
+    parser.add_argument("--copias", type=int, default=20, help="Copias del documento en el corpus")
+    parser.add_argument("--directorio", help="Usar los documentos de este directorio en vez de copias")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="Workers a probar")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones (se reporta la mejor)")
+    parser.add_argument("--embeddings", action="store_true", help="Medir también la etapa de embeddings")
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    workers = args.workers or sorted({1, max(1, cpus // 2), cpus})
+
+    temporal = None
+    if args.directorio:
+        fuentes = fuentes_de_directorio(args.directorio)
+    else:
+        temporal = tempfile.mkdtemp(prefix="ingesta_")
+        fuentes = []
+        for i in range(args.copias):
+            ruta = os.path.join(temporal, f"doc_{i:04d}.docx")
+            shutil.copyfile(args.docx, ruta)
+            fuentes.append(FuenteDocumento(ruta, id_prefix=f"doc_{i:04d}"))
+
+    try:
+        print(f"Corpus: {len(fuentes)} documento(s), {cpus} núcleo(s) disponibles\n")
+        print(f"{'modo':<24} {'artículos':>8} {'segundos':>9} {'artículos/s':>12}")
+        base = medir("python-docx", lambda: ingesta_python_docx(fuentes), args.repeticiones)
+        for n in workers:
+            throughput = medir(f"pipeline ({n} workers)", lambda: ingesta_pipeline(fuentes, n), args.repeticiones)
+            print(f"{'':<24} speedup x{throughput / base:.2f}")
+
+        if args.embeddings:
+            medir_embeddings(fuentes[:1], sorted({32, 64, 128, 256}))
+    finally:
+        if temporal:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los motores de búsqueda por keywords.
+
+Compara en latencia y recall@k:
+- scan: recorrido completo de la colección con conteo de subcadenas (original)
+- hits: índice invertido con el mismo contrato de puntuación
+- bm25: índice invertido con BM25F (título/número y cuerpo ponderados)
+
+Uso:
+    python scripts/benchmark_keyword_search.py [--k 3] [--repeticiones 20]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.repositories.keyword_index import KeywordIndex, SCORER_HITS, SCORER_BM25
+from app.services.search_service import SearchService
+from app.utils.constants import SEARCH_SYNONYMS
+from scripts.transit_processor import ProcesadorCodigoTransito
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DOCX = os.path.join(BASE_DIR, "data", "documents", "CodigoNacionaldeTransitoTerrestre.docx")
+DEFAULT_CONSULTAS = os.path.join(BASE_DIR, "data", "eval", "consultas_etiquetadas.json")
+
+
+class _ColeccionEnMemoria:
+    """Expone la interfaz collection.get() de ChromaDB sobre listas en memoria."""
+
+    def __init__(self, ids, documentos, metadatos):
+        self._ids = ids
+        self._documentos = documentos
+        self._metadatos = metadatos
+        self._posicion = {doc_id: i for i, doc_id in enumerate(ids)}
+
+    def get(self, ids=None, include=None):
+        posiciones = range(len(self._ids)) if ids is None else [self._posicion[i] for i in ids]
+        return {
+            'ids': [self._ids[i] for i in posiciones],
+            'documents': [self._documentos[i] for i in posiciones],
+            'metadatas': [self._metadatos[i] for i in posiciones]
+        }
+
+
+class _RepositorioEnMemoria:
+    def __init__(self, coleccion):
+        self.collection = coleccion
+        # (colección, índice de keywords) publicados: sin índice, SearchService recorre la colección
+        self.snapshot = (coleccion, None)
+
+
+def _numero(articulo: dict) -> str:
+    return str(articulo['metadata']['numero_articulo']).rstrip('°º.')
+
+
+def evaluar(nombre, buscar, consultas, k, repeticiones):
+    """Ejecuta las consultas y calcula latencia, recall@k y MRR."""
+    latencias = []
+    aciertos = 0
+    reciprocos = []
+
+    for item in consultas:
+        esperados = set(item['articulos'])
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultados = buscar(item['consulta'], k)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+
+        numeros = [_numero(r) for r in resultados[:k]]
+        if esperados & set(numeros):
+            aciertos += 1
+        rango = next((i + 1 for i, n in enumerate(numeros) if n in esperados), None)
+        reciprocos.append(1 / rango if rango else 0.0)
+
+    latencias.sort()
+    return {
+        'motor': nombre,
+        'latencia_media_ms': statistics.mean(latencias),
+        'latencia_p95_ms': latencias[int(len(latencias) * 0.95) - 1],
+        f'recall@{k}': aciertos / len(consultas),
+        'mrr': statistics.mean(reciprocos)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docx", default=DEFAULT_DOCX, help="Documento del código de tránsito")
+    parser.add_argument("--consultas", default=DEFAULT_CONSULTAS, help="JSON con consultas etiquetadas")
+    parser.add_argument("--k", type=int, default=3, help="Número de resultados evaluados")
+    parser.add_argument("--repeticiones", type=int, default=20, help="Repeticiones por consulta")
+    args = parser.parse_args()
+
+    procesador = ProcesadorCodigoTransito()
+    if not procesador.procesar_codigo_transito(args.docx):
+        logger.error("No se pudieron procesar artículos")
+        return
+    textos, metadatos, ids = procesador.exportar_para_chroma()
+
+    with open(args.consultas, 'r', encoding='utf-8') as f:
+        consultas = json.load(f)
+
+    repositorio = _RepositorioEnMemoria(_ColeccionEnMemoria(ids, textos, metadatos))
+    indice = KeywordIndex.build(ids, textos, SEARCH_SYNONYMS, metadatos)
+
+    scan = SearchService(db_manager=repositorio)
+    indexado = SearchService(db_manager=repositorio, keyword_index=indice)
+
+    def buscar_scan(consulta, k):
+        resultados = scan._keyword_search(consulta, k)
+        return sorted(resultados, key=lambda r: r['similitud'], reverse=True)
+
+    motores = [
+        ("scan", buscar_scan),
+        (SCORER_HITS, lambda consulta, k: indexado._keyword_search(consulta, k, SCORER_HITS)),
+        (SCORER_BM25, lambda consulta, k: indexado._keyword_search(consulta, k, SCORER_BM25)),
+    ]
+
+    print(f"\n=== BENCHMARK KEYWORDS ({len(ids)} documentos, {len(consultas)} consultas) ===")
+    for nombre, buscar in motores:
+        resultado = evaluar(nombre, buscar, consultas, args.k, args.repeticiones)
+        print(" | ".join(
+            f"{clave}: {valor:.3f}" if isinstance(valor, float) else f"{clave}: {valor}"
+            for clave, valor in resultado.items()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark del parser de artículos.
+
+Compara el tiempo de parsing de la segmentación de una sola pasada de
+ProcesadorCodigoTransito (segmentar_texto, patrones precompilados) con la
+implementación anterior (ProcesadorLegado: hasta tres re.findall + re.split
+y regex sin compilar por cada artículo) sobre el texto del documento (sin la
+lectura del .docx), repetido --copias veces para simular un corpus mayor.
+
+La equivalencia de ambos parsers se verifica en
+tests/test_scripts/test_transit_processor.py.
+
+Uso:
+    python scripts/benchmark_parser.py [--copias 10] [--repeticiones 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scripts.transit_processor import ProcesadorCodigoTransito, iter_parrafos
+from tests.test_scripts.legacy_parser import ProcesadorLegado
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DOCX = os.path.join(BASE_DIR, "data", "documents", "CodigoNacionaldeTransitoTerrestre.docx")
+
+
+def medir(funcion, texto: str, repeticiones: int) -> List[float]:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(texto)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docx", default=DEFAULT_DOCX, help="Documento a parsear")
+    parser.add_argument("--copias", type=int, default=1, help="Veces que se repite el texto del documento")
+    parser.add_argument("--repeticiones", type=int, default=20, help="Repeticiones de cada medición")
+    args = parser.parse_args()
+
+    texto = "\n".join(iter_parrafos(args.docx))
+
+    corpus = "\n".join([texto] * args.copias)
+    print(f"\n=== RENDIMIENTO ({len(corpus):,} caracteres) ===")
+    print(f"{'parser':<12} {'mediana (ms)':>13} {'p95 (ms)':>10} {'artículos/s':>12}")
+    resultados = {}
+    for nombre, procesador in (("anterior", ProcesadorLegado()), ("una pasada", ProcesadorCodigoTransito())):
+        articulos = len(procesador.procesar_texto(corpus))
+        tiempos = sorted(medir(procesador.procesar_texto, corpus, args.repeticiones))
+        mediana = statistics.median(tiempos)
+        p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]
+        resultados[nombre] = mediana
+        print(f"{nombre:<12} {mediana * 1000:>13.2f} {p95 * 1000:>10.2f} {articulos / mediana:>12.1f}")
+    print(f"\nspeedup x{resultados['anterior'] / resultados['una pasada']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark del re-ranking con cross-encoder.
+
+Indexa el código de tránsito en memoria (igual que scripts/evaluate_search.py),
+ejecuta las consultas etiquetadas con y sin re-ranking y reporta:
+- recall@k y MRR de los artículos que recibe el LLM
+- artículos y tokens del prompt de /query que se envían a Claude
+  (estimados como caracteres / 4, igual que scripts/anthropic_stub_server.py)
+- latencia del re-ranking p50/p95 y consultas omitidas por presupuesto
+- aciertos de la caché de puntajes al repetir las consultas
+
+Uso:
+    python scripts/benchmark_rerank.py [--candidatos 10] [--top-k 1 2] [--presupuestos 50 150 1000]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.core.config import settings
+from app.repositories.embedding_encoders import embedding_backend_options, load_embedding_model
+from app.repositories.keyword_index import KeywordIndex
+from app.services.fusion import LEG_KEYWORD, LEG_VECTOR
+from app.services.llm_service import LLMService
+from app.services.reranker import CrossEncoderReranker
+from app.services.search_service import SearchService
+from app.utils.constants import SEARCH_SYNONYMS
+from scripts.evaluate_search import (
+    DEFAULT_CONSULTAS, DEFAULT_DOCX, ColeccionEnMemoria, RepositorioEnMemoria, _numero, _percentil
+)
+from scripts.transit_processor import ProcesadorCodigoTransito
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def tokens_prompt(llm: LLMService, consulta: str, articulos: List[Dict]) -> int:
+    """Tokens estimados del system prompt y del mensaje de /query con estos artículos."""
+    contexto = llm._preparar_contexto_articulos(articulos)
+    prompt = llm._construir_prompt(consulta, contexto, 0.0)
+    sistema = "".join(bloque['text'] for bloque in llm._system_blocks())
+    return (len(sistema) + len(prompt)) // 4
+
+
+def evaluar(servicio: SearchService, llm: LLMService, consultas, n: int, umbral: float, rerank: bool) -> Dict:
+    """Ejecuta las consultas y mide calidad, artículos/tokens enviados y latencia del re-ranking."""
+    aciertos = {k: 0 for k in range(1, n + 1)}
+    reciprocos, enviados, tokens, latencias, omitidas = [], [], [], [], 0
+
+    for item in consultas:
+        esperados = set(item['articulos'])
+        resultado = servicio.hybrid_search(item['consulta'], n, umbral, rerank=rerank)
+        articulos = resultado['articulos']
+
+        numeros = [_numero(a) for a in articulos]
+        for k in aciertos:
+            aciertos[k] += bool(esperados & set(numeros[:k]))
+        rango = next((i + 1 for i, numero in enumerate(numeros) if numero in esperados), None)
+        reciprocos.append(1 / rango if rango else 0.0)
+
+        # El LLM recibe como máximo los 3 primeros artículos (_preparar_contexto_articulos)
+        enviados.append(min(len(articulos), 3))
+        tokens.append(tokens_prompt(llm, item['consulta'], articulos))
+        latencias.append(resultado['tiempos_ms']['rerank'])
+        info = resultado.get('rerank')
+        omitidas += bool(info and not info['aplicado'])
+
+    return {
+        'recall': {k: aciertos[k] / len(consultas) for k in aciertos},
+        'mrr': statistics.mean(reciprocos),
+        'articulos': statistics.mean(enviados),
+        'tokens': statistics.mean(tokens),
+        'latencia': (statistics.median(latencias), _percentil(latencias, 0.95)),
+        'omitidas': omitidas
+    }
+
+
+def _imprimir(nombre: str, r: Dict, base: Dict):
+    calidad = " | ".join(f"recall@{k}: {valor:.3f}" for k, valor in r['recall'].items())
+    variacion = r['tokens'] / base['tokens'] - 1 if base['tokens'] else 0.0
+    print(f"{nombre:<28} {calidad} | MRR: {r['mrr']:.3f}")
+    print(
+        f"{'':<28} artículos al LLM: {r['articulos']:.2f} | tokens prompt: {r['tokens']:.0f} "
+        f"({variacion:+.1%} vs sin re-ranking) | rerank ms p50/p95: {r['latencia'][0]:.1f}/{r['latencia'][1]:.1f} "
+        f"| omitidas: {r['omitidas']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docx", default=DEFAULT_DOCX, help="Documento del código de tránsito")
+    parser.add_argument("--consultas", default=DEFAULT_CONSULTAS, help="JSON con consultas etiquetadas")
+    parser.add_argument("--modelo", default=settings.RERANK_MODEL, help="Modelo CrossEncoder")
+    parser.add_argument("--n", type=int, default=settings.DEFAULT_MAX_RESULTS, help="max_results de la consulta")
+    parser.add_argument("--umbral", type=float, default=settings.DEFAULT_CONFIDENCE_THRESHOLD, help="Umbral de confianza")
+    parser.add_argument("--candidatos", type=int, default=settings.RERANK_CANDIDATES, help="Candidatos a re-ordenar")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[1, 2], help="Artículos conservados")
+    parser.add_argument("--presupuestos", type=float, nargs="+", default=[settings.RERANK_BUDGET_MS],
+                        help="Presupuestos de latencia (ms)")
+    args = parser.parse_args()
+    # transit_processor configura logging en INFO al importarse; aquí solo interesan los errores
+    logging.getLogger().setLevel(logging.WARNING)
+
+    procesador = ProcesadorCodigoTransito()
+    if not procesador.procesar_codigo_transito(args.docx):
+        logger.error("No se pudieron procesar artículos")
+        sys.exit(1)
+    textos, metadatos, ids = procesador.exportar_para_chroma()
+    with open(args.consultas, 'r', encoding='utf-8') as f:
+        consultas = json.load(f)
+
+    opciones = embedding_backend_options(settings)
+    modelo = load_embedding_model(
+        settings.EMBEDDING_MODEL, opciones['embedding_backend'], opciones['onnx_path'], opciones['onnx_threads']
+    )
+    embeddings = np.asarray(modelo.encode(textos, batch_size=32), dtype=np.float32)
+    repositorio = RepositorioEnMemoria(modelo, ColeccionEnMemoria(ids, textos, metadatos, embeddings))
+    indice = KeywordIndex.build(ids, textos, SEARCH_SYNONYMS, metadatos)
+    llm = LLMService(api_key="")
+
+    def servicio(reranker=None) -> SearchService:
+        return SearchService(
+            repositorio,
+            keyword_index=indice,
+            default_keyword_scorer=settings.KEYWORD_SCORER,
+            default_fusion=settings.SEARCH_FUSION,
+            vector_depth=settings.SEARCH_VECTOR_DEPTH,
+            keyword_depth=settings.SEARCH_KEYWORD_DEPTH,
+            fusion_weights={LEG_VECTOR: settings.SEARCH_FUSION_VECTOR_WEIGHT,
+                            LEG_KEYWORD: settings.SEARCH_FUSION_KEYWORD_WEIGHT},
+            rrf_k=settings.SEARCH_RRF_K,
+            reranker=reranker
+        )
+
+    print(f"\n=== RE-RANKING ({len(ids)} artículos, {len(consultas)} consultas, max_results {args.n}, "
+          f"{args.candidatos} candidatos, fusión {settings.SEARCH_FUSION}, modelo {args.modelo}) ===")
+    base = evaluar(servicio(), llm, consultas, args.n, args.umbral, rerank=False)
+    _imprimir("sin re-ranking", base, base)
+
+    for presupuesto in args.presupuestos:
+        for top_k in args.top_k:
+            reranker = CrossEncoderReranker(
+                args.modelo,
+                max_candidates=args.candidatos,
+                top_k=top_k,
+                budget_ms=presupuesto,
+                batch_size=settings.RERANK_BATCH_SIZE,
+                max_length=settings.RERANK_MAX_LENGTH
+            )
+            if not reranker.load():
+                sys.exit(1)
+            con_reranker = servicio(reranker)
+            frio = evaluar(con_reranker, llm, consultas, args.n, args.umbral, rerank=True)
+            _imprimir(f"top-{top_k}, {presupuesto:.0f} ms (frío)", frio, base)
+            caliente = evaluar(con_reranker, llm, consultas, args.n, args.umbral, rerank=True)
+            _imprimir(f"top-{top_k}, {presupuesto:.0f} ms (caché)", caliente, base)
+            cache = reranker.stats()['cache']
+            print(f"{'':<28} caché de puntajes: {cache['size']} pares, hit rate {cache['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Reporte de memoria por número de workers.
+
+Arranca la API con N workers en cada modo, espera a que todos terminen el
+calentamiento, envía consultas para que cada worker ejecute inferencias y
+mide la memoria de todo el árbol de procesos (maestro + workers):
+
+- uvicorn: `uvicorn --workers N` (spawn: cada worker importa la app y carga el modelo)
+- fork: app/core/server.py sin precarga (fork, cada worker carga el modelo)
+- preload: app/core/server.py con precarga (el maestro carga y congela el
+  modelo antes del fork; los workers comparten los pesos copy-on-write)
+
+RSS cuenta las páginas compartidas una vez por proceso; PSS las reparte
+entre los procesos que las comparten, así que la suma de PSS es la memoria
+real del grupo. USS es la memoria privada de cada worker. Requiere Linux
+(/proc/<pid>/smaps_rollup).
+
+Uso:
+    python scripts/benchmark_workers_memory.py [--workers 1 2 4] [--modos uvicorn fork preload]
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODOS = ("uvicorn", "fork", "preload")
+MARCA_LISTO = "Aplicación lista"
+CONSULTAS = [
+    "¿Cuál es la multa por no usar el cinturón de seguridad?",
+    "Requisitos para obtener la licencia de conducción",
+    "¿Qué pasa si conduzco en estado de embriaguez?",
+    "Límites de velocidad en zona urbana"
+]
+
+
+def _comando(modo: str, workers: int, puerto: int) -> List[str]:
+    if modo == "uvicorn":
+        return [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(puerto), "--workers", str(workers)
+        ]
+    codigo = (
+        "from app.core.server import serve_prefork; "
+        f"serve_prefork('app.main:app', '127.0.0.1', {puerto}, {workers}, preload={modo == 'preload'})"
+    )
+    return [sys.executable, "-c", codigo]
+
+
+def _descendientes(pid: int) -> List[int]:
+    """PIDs del proceso y todos sus descendientes."""
+    hijos: Dict[int, List[int]] = {}
+    for entrada in os.listdir("/proc"):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat") as f:
+                # El nombre del proceso va entre paréntesis y puede tener espacios
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        hijos.setdefault(ppid, []).append(int(entrada))
+
+    arbol, pendientes = [], [pid]
+    while pendientes:
+        actual = pendientes.pop()
+        arbol.append(actual)
+        pendientes.extend(hijos.get(actual, []))
+    return arbol
+
+
+def _memoria(pid: int) -> Dict[str, float]:
+    """Rss, Pss y Uss (Private_Clean + Private_Dirty) de un proceso, en MB."""
+    campos = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for linea in f:
+            partes = linea.split()
+            if len(partes) >= 3 and partes[0].endswith(":"):
+                campos[partes[0][:-1]] = int(partes[1]) / 1024
+    return {
+        'rss': campos.get('Rss', 0.0),
+        'pss': campos.get('Pss', 0.0),
+        'uss': campos.get('Private_Clean', 0.0) + campos.get('Private_Dirty', 0.0)
+    }
+
+
+def medir(modo: str, workers: int, puerto: int, consultas: int, timeout: float) -> Dict[str, float]:
+    """Arranca el servidor, espera el calentamiento de todos los workers y mide la memoria."""
+    with tempfile.TemporaryFile(mode="w+") as log:
+        servidor = subprocess.Popen(_comando(modo, workers, puerto), cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            inicio = time.perf_counter()
+            while True:
+                log.seek(0)
+                if log.read().count(MARCA_LISTO) >= workers:
+                    break
+                if servidor.poll() is not None or time.perf_counter() - inicio > timeout:
+                    raise RuntimeError(f"El servidor ({modo}, {workers} workers) no quedó listo")
+                time.sleep(0.2)
+            arranque = time.perf_counter() - inicio
+
+            # Conexiones nuevas en cada consulta para repartirlas entre los workers
+            for i in range(consultas):
+                httpx.post(
+                    f"http://127.0.0.1:{puerto}/api/v1/query",
+                    json={"query": CONSULTAS[i % len(CONSULTAS)]},
+                    timeout=timeout
+                )
+
+            procesos = _descendientes(servidor.pid)
+            memorias = [_memoria(pid) for pid in procesos]
+            workers_memoria = [_memoria(pid) for pid in procesos if pid != servidor.pid] or memorias
+        finally:
+            servidor.send_signal(signal.SIGTERM)
+            try:
+                servidor.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                servidor.kill()
+
+    return {
+        'procesos': len(procesos),
+        'arranque_s': arranque,
+        'rss_total': sum(m['rss'] for m in memorias),
+        'pss_total': sum(m['pss'] for m in memorias),
+        'pss_worker': sum(m['pss'] for m in workers_memoria) / len(workers_memoria),
+        'uss_worker': max(m['uss'] for m in workers_memoria)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Números de workers a medir")
+    parser.add_argument("--modos", nargs="+", default=list(MODOS), choices=MODOS, help="Modos de arranque")
+    parser.add_argument("--puerto", type=int, default=8021, help="Puerto del servidor de prueba")
+    parser.add_argument("--consultas", type=int, default=20, help="Consultas enviadas antes de medir")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Segundos máximos de arranque")
+    args = parser.parse_args()
+
+    print(f"\n=== MEMORIA POR NÚMERO DE WORKERS (MB) ===")
+    print(
+        f"{'modo':<9} {'workers':>7} {'procesos':>8} {'arranque s':>10} {'RSS total':>10} "
+        f"{'PSS total':>10} {'PSS/worker':>10} {'USS máx':>8}"
+    )
+    for modo in args.modos:
+        for workers in args.workers:
+            r = medir(modo, workers, args.puerto, args.consultas, args.timeout)
+            print(
+                f"{modo:<9} {workers:>7} {r['procesos']:>8} {r['arranque_s']:>10.1f} {r['rss_total']:>10.0f} "
+                f"{r['pss_total']:>10.0f} {r['pss_worker']:>10.0f} {r['uss_worker']:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Evaluación offline de la búsqueda híbrida por método de fusión.
+
+Indexa el código de tránsito en memoria (embeddings con el backend
+configurado e índice invertido de keywords), ejecuta SearchService.hybrid_search
+sobre las consultas etiquetadas de data/eval/consultas_etiquetadas.json y
+reporta por método de fusión y profundidad de candidatos:
+- recall@k y MRR
+- latencia por etapa (vectorial, keywords, fusión) p50/p95 en ms
+
+Antes verifica que la fusión "max" devuelva exactamente lo mismo que la
+combinación original (ordenar todo por similitud y filtrar); sale con código
+1 si hay diferencias.
+
+Uso:
+    python scripts/evaluate_search.py [--fusiones max rrf weighted] [--profundidades 0 10 20] [--k 1 3 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.core.config import settings
+from app.repositories.chroma_repository import ChromaRepository
+from app.repositories.embedding_encoders import embedding_backend_options, load_embedding_model
+from app.repositories.keyword_index import KeywordIndex
+from app.services.fusion import AVAILABLE_FUSIONS, LEG_KEYWORD, LEG_VECTOR
+from app.services.search_service import SearchService
+from app.utils.constants import SEARCH_SYNONYMS
+from scripts.transit_processor import ProcesadorCodigoTransito
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DOCX = os.path.join(BASE_DIR, "data", "documents", "CodigoNacionaldeTransitoTerrestre.docx")
+DEFAULT_CONSULTAS = os.path.join(BASE_DIR, "data", "eval", "consultas_etiquetadas.json")
+ETAPAS = ('vectorial', 'keywords', 'fusion')
+
+
+class ColeccionEnMemoria:
+    """Expone get() y query() de una colección ChromaDB (espacio coseno) sobre arrays en memoria."""
+
+    def __init__(self, ids, documentos, metadatos, embeddings: np.ndarray):
+        self._ids = ids
+        self._documentos = documentos
+        self._metadatos = metadatos
+        self._posicion = {doc_id: i for i, doc_id in enumerate(ids)}
+        self._embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+
+    def get(self, ids=None, include=None):
+        posiciones = range(len(self._ids)) if ids is None else [self._posicion[i] for i in ids]
+        return {
+            'ids': [self._ids[i] for i in posiciones],
+            'documents': [self._documentos[i] for i in posiciones],
+            'metadatas': [self._metadatos[i] for i in posiciones]
+        }
+
+    def query(self, query_embeddings, n_results, include=None):
+        consulta = np.asarray(query_embeddings[0], dtype=np.float32)
+        similitudes = self._embeddings @ (consulta / max(np.linalg.norm(consulta), 1e-12))
+        n = min(n_results, len(self._ids))
+        mejores = np.argpartition(-similitudes, n - 1)[:n]
+        mejores = mejores[np.argsort(-similitudes[mejores], kind='stable')]
+        return {
+            'ids': [[self._ids[i] for i in mejores]],
+            'documents': [[self._documentos[i] for i in mejores]],
+            'metadatas': [[self._metadatos[i] for i in mejores]],
+            'distances': [[float(1 - similitudes[i]) for i in mejores]]
+        }
+
+
+class RepositorioEnMemoria:
+    """La parte de ChromaRepository que usa SearchService, sobre ColeccionEnMemoria."""
+
+    # La pata vectorial es exactamente la del repositorio real
+    search_articles = ChromaRepository.search_articles
+    buscar_articulos = ChromaRepository.buscar_articulos
+
+    def __init__(self, modelo, coleccion: ColeccionEnMemoria):
+        self.modelo = modelo
+        self.collection = coleccion
+
+    def encode_query(self, consulta: str) -> List[float]:
+        return self.modelo.encode([consulta])[0].tolist()
+
+
+def combinacion_original(resultados_vectoriales, resultados_keywords, n_resultados, umbral_confianza):
+    """Copia de la combinación anterior de SearchService (referencia de la fusión 'max')."""
+    resultados_unicos = {}
+    for resultado in resultados_vectoriales + resultados_keywords:
+        numero = resultado['metadata']['numero_articulo']
+        if numero not in resultados_unicos or resultado['similitud'] > resultados_unicos[numero]['similitud']:
+            resultados_unicos[numero] = resultado
+
+    resultados_finales = sorted(resultados_unicos.values(), key=lambda x: x['similitud'], reverse=True)
+    resultados_filtrados = [r for r in resultados_finales if r['similitud'] >= umbral_confianza]
+    if not resultados_filtrados and resultados_finales:
+        resultados_filtrados = [r for r in resultados_finales if r['similitud'] >= 0.2]
+        if not resultados_filtrados:
+            resultados_filtrados = resultados_finales[:1]
+    return resultados_filtrados[:n_resultados]
+
+
+def verificar_equivalencia(servicio: SearchService, consultas, umbrales, ns) -> int:
+    """Compara la fusión 'max' con la combinación original; retorna el número de diferencias."""
+    diferencias = 0
+    for item in consultas:
+        for n in ns:
+            for umbral in umbrales:
+                vectoriales = servicio.db_manager.buscar_articulos(
+                    item['consulta'], n * 2, max(0.2, umbral - 0.2)
+                )['articulos']
+                keywords = servicio._keyword_search(item['consulta'], n)
+                esperado = combinacion_original(vectoriales, keywords, n, umbral)
+                obtenido = servicio._merge_results(vectoriales, keywords, n, umbral, fusion='max')
+                if [(r['documento'], r['similitud']) for r in esperado] != \
+                        [(r['documento'], r['similitud']) for r in obtenido]:
+                    diferencias += 1
+                    logger.error(f"❌ Diferencia: '{item['consulta']}' (n={n}, umbral={umbral})")
+    return diferencias
+
+
+def _numero(articulo: Dict) -> str:
+    return str(articulo['metadata']['numero_articulo']).rstrip('°º.')
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def evaluar(servicio: SearchService, consultas, fusion: str, ks: List[int], umbral: float, repeticiones: int) -> Dict:
+    """Ejecuta las consultas con un método de fusión y calcula recall@k, MRR y latencias."""
+    k_max = max(ks)
+    aciertos = {k: 0 for k in ks}
+    reciprocos = []
+    tiempos = {etapa: [] for etapa in ETAPAS + ('total',)}
+
+    for item in consultas:
+        esperados = set(item['articulos'])
+        for _ in range(repeticiones):
+            resultado = servicio.hybrid_search(item['consulta'], k_max, umbral, fusion=fusion)
+            for etapa in ETAPAS:
+                tiempos[etapa].append(resultado['tiempos_ms'][etapa])
+            tiempos['total'].append(resultado['tiempo_busqueda'] * 1000)
+
+        numeros = [_numero(a) for a in resultado['articulos']]
+        for k in ks:
+            aciertos[k] += bool(esperados & set(numeros[:k]))
+        rango = next((i + 1 for i, n in enumerate(numeros) if n in esperados), None)
+        reciprocos.append(1 / rango if rango else 0.0)
+
+    return {
+        'recall': {k: aciertos[k] / len(consultas) for k in ks},
+        'mrr': statistics.mean(reciprocos),
+        'latencias': {etapa: (statistics.median(v), _percentil(v, 0.95)) for etapa, v in tiempos.items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docx", default=DEFAULT_DOCX, help="Documento del código de tránsito")
+    parser.add_argument("--consultas", default=DEFAULT_CONSULTAS, help="JSON con consultas etiquetadas")
+    parser.add_argument("--fusiones", nargs="+", default=list(AVAILABLE_FUSIONS), choices=AVAILABLE_FUSIONS)
+    parser.add_argument("--profundidades", type=int, nargs="+", default=[0, 10, 20],
+                        help="Candidatos por pata (0 = profundidad original)")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5], help="Valores de k")
+    parser.add_argument("--umbral", type=float, default=0.4, help="Umbral de confianza (el de /query por defecto)")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Repeticiones por consulta (latencia)")
+    args = parser.parse_args()
+    # transit_processor configura logging en INFO al importarse; aquí solo interesan los errores
+    logging.getLogger().setLevel(logging.WARNING)
+
+    procesador = ProcesadorCodigoTransito()
+    if not procesador.procesar_codigo_transito(args.docx):
+        logger.error("No se pudieron procesar artículos")
+        sys.exit(1)
+    textos, metadatos, ids = procesador.exportar_para_chroma()
+    with open(args.consultas, 'r', encoding='utf-8') as f:
+        consultas = json.load(f)
+
+    opciones = embedding_backend_options(settings)
+    modelo = load_embedding_model(
+        settings.EMBEDDING_MODEL, opciones['embedding_backend'], opciones['onnx_path'], opciones['onnx_threads']
+    )
+    embeddings = np.asarray(modelo.encode(textos, batch_size=32), dtype=np.float32)
+    repositorio = RepositorioEnMemoria(modelo, ColeccionEnMemoria(ids, textos, metadatos, embeddings))
+    indice = KeywordIndex.build(ids, textos, SEARCH_SYNONYMS, metadatos)
+    pesos = {LEG_VECTOR: settings.SEARCH_FUSION_VECTOR_WEIGHT, LEG_KEYWORD: settings.SEARCH_FUSION_KEYWORD_WEIGHT}
+
+    diferencias = verificar_equivalencia(
+        SearchService(repositorio, keyword_index=indice, default_keyword_scorer=settings.KEYWORD_SCORER),
+        consultas, umbrales=[0.2, 0.4, 0.7], ns=[1, 3, 5]
+    )
+    print(f"\nEquivalencia fusión 'max' vs combinación original: {'OK' if not diferencias else f'{diferencias} diferencias'}")
+    if diferencias:
+        sys.exit(1)
+
+    print(f"\n=== BÚSQUEDA HÍBRIDA ({len(ids)} artículos, {len(consultas)} consultas, "
+          f"encoder {opciones['embedding_backend']}, keywords {settings.KEYWORD_SCORER}, umbral {args.umbral}) ===")
+    for profundidad in args.profundidades:
+        servicio = SearchService(
+            repositorio,
+            keyword_index=indice,
+            default_keyword_scorer=settings.KEYWORD_SCORER,
+            vector_depth=profundidad,
+            keyword_depth=profundidad,
+            fusion_weights=pesos,
+            rrf_k=settings.SEARCH_RRF_K
+        )
+        print(f"\n--- profundidad por pata: {profundidad or 'original (2n / n)'} ---")
+        for fusion in args.fusiones:
+            r = evaluar(servicio, consultas, fusion, args.k, args.umbral, args.repeticiones)
+            calidad = " | ".join(f"recall@{k}: {valor:.3f}" for k, valor in r['recall'].items())
+            latencias = " | ".join(
+                f"{etapa} {p50:.2f}/{p95:.2f}" for etapa, (p50, p95) in r['latencias'].items()
+            )
+            print(f"{fusion:<9} {calidad} | MRR: {r['mrr']:.3f}")
+            print(f"{'':<9} ms p50/p95: {latencias}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Exporta el modelo de embeddings a ONNX con cuantización dinámica int8.
+
+Genera el directorio que usa el backend "onnx" (EMBEDDING_BACKEND=onnx):
+- model_int8.onnx: transformer exportado desde PyTorch y cuantizado a int8
+  (pesos de las capas lineales en int8, activaciones cuantizadas en ejecución)
+- tokenizer.json: tokenizer rápido del modelo
+- encoder_config.json: longitud máxima, pooling, normalización, dimensión y
+  token de padding, leídos de los módulos del SentenceTransformer
+
+El pooling y la normalización se aplican en app/repositories/embedding_encoders.py,
+igual que en SentenceTransformer, por eso los vectores son compatibles con
+los del modelo original. La exportación requiere torch, sentence-transformers
+y onnx; en ejecución solo se necesitan onnxruntime y tokenizers.
+
+Uso:
+    python scripts/export_onnx_encoder.py [--modelo paraphrase-multilingual-MiniLM-L12-v2] [--salida DIR]
+    EMBEDDING_BACKEND=onnx python scripts/setup_database.py
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.core.config import settings
+from app.repositories.embedding_encoders import (
+    ONNX_CONFIG_FILENAME,
+    ONNX_MODEL_FILENAME,
+    default_onnx_path,
+)
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPSET = 14
+
+
+def exportar_fp32(modelo, ruta: str, input_names):
+    """Exporta el transformer del SentenceTransformer a ONNX (salida: embeddings por token)."""
+    import torch
+
+    transformer = modelo[0].auto_model.eval()
+
+    class _TokenEmbeddings(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, *entradas):
+            return self.auto_model(**dict(zip(input_names, entradas))).last_hidden_state
+
+    ejemplo = modelo.tokenizer(["Artículo 1. Ejemplo para exportar"], return_tensors="pt")
+    ejes = {nombre: {0: "batch", 1: "secuencia"} for nombre in input_names}
+    ejes["token_embeddings"] = {0: "batch", 1: "secuencia"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            _TokenEmbeddings(transformer),
+            tuple(ejemplo[nombre] for nombre in input_names),
+            ruta,
+            input_names=list(input_names),
+            output_names=["token_embeddings"],
+            dynamic_axes=ejes,
+            opset_version=OPSET,
+            do_constant_folding=True
+        )
+
+
+def cuantizar_int8(ruta_fp32: str, ruta_int8: str):
+    """Cuantización dinámica: pesos en int8, activaciones cuantizadas al vuelo."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    # Inferencia de formas y fusión de nodos antes de cuantizar (recomendado por ONNX Runtime)
+    ruta_preprocesada = f"{ruta_fp32}.pre.onnx"
+    quant_pre_process(ruta_fp32, ruta_preprocesada)
+    try:
+        quantize_dynamic(ruta_preprocesada, ruta_int8, weight_type=QuantType.QInt8)
+    finally:
+        os.remove(ruta_preprocesada)
+
+
+def configuracion_encoder(modelo, input_names) -> dict:
+    """Lee del SentenceTransformer lo necesario para reproducir su encode()."""
+    pooling = next((m for m in modelo if type(m).__name__ == "Pooling"), None)
+    modos = pooling.get_config_dict() if pooling is not None else {}
+    if modos.get("pooling_mode_cls_token"):
+        modo = "cls"
+    elif modos.get("pooling_mode_max_tokens"):
+        modo = "max"
+    else:
+        modo = "mean"
+
+    tokenizer = modelo.tokenizer
+    return {
+        "model_file": ONNX_MODEL_FILENAME,
+        "max_seq_length": modelo.max_seq_length,
+        "pooling": modo,
+        "normalize": any(type(m).__name__ == "Normalize" for m in modelo),
+        "dimension": modelo.get_sentence_embedding_dimension(),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+        "inputs": list(input_names),
+        "quantization": "dynamic_int8"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modelo", default=settings.EMBEDDING_MODEL, help="Modelo de sentence-transformers")
+    parser.add_argument("--salida", default=None, help="Directorio de salida (por defecto data/models/<modelo>-onnx-int8)")
+    parser.add_argument("--conservar-fp32", action="store_true", help="Guardar también el modelo ONNX sin cuantizar")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    salida = args.salida or default_onnx_path(os.path.join(BASE_DIR, "data", "models"), args.modelo)
+    os.makedirs(salida, exist_ok=True)
+
+    logger.info(f"Cargando modelo: {args.modelo}")
+    modelo = SentenceTransformer(args.modelo, device="cpu")
+    input_names = [
+        nombre for nombre in ("input_ids", "attention_mask", "token_type_ids")
+        if nombre in modelo.tokenizer.model_input_names
+    ]
+
+    with tempfile.TemporaryDirectory() as temporal:
+        ruta_fp32 = os.path.join(salida if args.conservar_fp32 else temporal, "model_fp32.onnx")
+
+        logger.info("Exportando a ONNX...")
+        exportar_fp32(modelo, ruta_fp32, input_names)
+
+        logger.info("Cuantizando a int8...")
+        cuantizar_int8(ruta_fp32, os.path.join(salida, ONNX_MODEL_FILENAME))
+
+    modelo.tokenizer.save_pretrained(salida)
+    with open(os.path.join(salida, ONNX_CONFIG_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump(configuracion_encoder(modelo, input_names), f, ensure_ascii=False, indent=2)
+
+    tamano = os.path.getsize(os.path.join(salida, ONNX_MODEL_FILENAME)) / 1024 / 1024
+    logger.info(f"✅ Encoder ONNX int8 guardado en {salida} ({tamano:.1f} MB)")
+    logger.info("Actívalo con EMBEDDING_BACKEND=onnx y reindexa con scripts/setup_database.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Pipeline de ingesta paralela de documentos normativos.
+
+Etapas:
+1. Lectura de párrafos en streaming (iter_parrafos, sin cargar el .docx completo)
+2. Segmentación en artículos a medida que llegan los párrafos (segmentar_articulos)
+3. Extracción de metadatos (ProcesadorCodigoTransito.procesar_chunks)
+4. Embeddings por lotes en la nueva versión de la colección (build_version_stream)
+
+El código de tránsito y las normas adicionales (fuentes_indexadas) son las
+mismas fuentes para scripts/setup_database.py y para la reconstrucción
+desde la API (construir_version), así ambos caminos producen la misma
+colección.
+
+Las etapas 1-3 de cada documento corren en un pool de procesos (la unidad de
+trabajo es el documento: el capítulo y la sección se arrastran de un artículo
+al siguiente, así que un documento se procesa en orden); los resultados se
+re-empaquetan en lotes y se entregan en el orden de las fuentes mientras los
+workers siguen con los documentos siguientes, de modo que los embeddings del
+proceso principal se solapan con el parsing.
+
+Uso:
+    python scripts/ingestion_pipeline.py documento.docx [otro.docx ...] [--workers N]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Agregar el directorio padre al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.repositories.keyword_index import KeywordIndex
+from app.utils.constants import SEARCH_SYNONYMS
+from app.utils.system import available_cpus
+from scripts.transit_processor import ProcesadorCodigoTransito, iter_parrafos, segmentar_articulos
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de los lotes entregados a build_version_stream (igual a SYNC_BATCH_SIZE)
+DEFAULT_LOTE = 256
+
+Lote = Tuple[List[str], List[Dict], List[str]]
+
+
+@dataclass(frozen=True)
+class FuenteDocumento:
+    """
+    Documento a ingestar.
+
+    Attributes:
+        ruta: Archivo .docx (o texto plano, un párrafo por línea)
+        id_prefix: Prefijo de los IDs; vacío para el código de tránsito
+            (IDs articulo_<n>), obligatorio al ingestar varios documentos
+        tipo_documento: Reemplaza el metadato tipo_documento si se indica
+        fuente: Reemplaza el metadato fuente si se indica
+    """
+    ruta: str
+    id_prefix: str = ""
+    tipo_documento: Optional[str] = None
+    fuente: Optional[str] = None
+
+
+def procesar_fuente(fuente: FuenteDocumento) -> Lote:
+    """
+    Ejecuta las etapas de parsing, segmentación y metadatos de un documento.
+
+    Corre dentro de los workers del pool, por eso es una función de módulo.
+
+    Args:
+        fuente: Documento a procesar
+
+    Returns:
+        Tupla (textos, metadatos, ids) lista para ChromaDB
+    """
+    procesador = ProcesadorCodigoTransito()
+    procesador.procesar_chunks(segmentar_articulos(iter_parrafos(fuente.ruta)))
+    textos, metadatos, ids = procesador.exportar_para_chroma()
+
+    if fuente.id_prefix:
+        ids = [f"{fuente.id_prefix}_{doc_id}" for doc_id in ids]
+    for metadata in metadatos:
+        if fuente.tipo_documento:
+            metadata['tipo_documento'] = fuente.tipo_documento
+        if fuente.fuente:
+            metadata['fuente'] = fuente.fuente
+
+    return textos, metadatos, ids
+
+
+def fuentes_de_directorio(directorio: str) -> List[FuenteDocumento]:
+    """
+    Crea una fuente por cada .docx/.txt de un directorio, con el nombre del archivo como prefijo.
+
+    Args:
+        directorio: Directorio con documentos adicionales (resoluciones, decretos...)
+
+    Returns:
+        Lista de fuentes ordenada por nombre de archivo
+    """
+    fuentes = []
+    for nombre in sorted(os.listdir(directorio)):
+        base, extension = os.path.splitext(nombre)
+        if extension.lower() in ('.docx', '.txt') and not nombre.startswith('~$'):
+            fuentes.append(FuenteDocumento(
+                ruta=os.path.join(directorio, nombre),
+                id_prefix=base,
+                tipo_documento='norma',
+                fuente=base
+            ))
+    return fuentes
+
+
+def fuentes_indexadas(documento: str, normas: Optional[str] = None) -> List[FuenteDocumento]:
+    """
+    Fuentes de cada versión de la colección: el código de tránsito y las normas adicionales.
+
+    Args:
+        documento: Documento del código de tránsito (IDs articulo_<n>)
+        normas: Directorio con normas adicionales (se omite si está vacío o no existe)
+
+    Returns:
+        Lista de fuentes en el orden en que se indexan
+    """
+    fuentes = [FuenteDocumento(documento)]
+    if normas and os.path.isdir(normas):
+        fuentes.extend(fuentes_de_directorio(normas))
+    return fuentes
+
+
+class PipelineIngesta:
+    """Orquesta el procesamiento paralelo de documentos y su entrega por lotes."""
+
+    def __init__(self, workers: Optional[int] = None, tamano_lote: int = DEFAULT_LOTE):
+        """
+        Inicializa el pipeline.
+
+        Args:
+            workers: Procesos para parsing y metadatos. Por defecto los núcleos
+                disponibles menos uno, que queda para los embeddings
+            tamano_lote: Artículos por lote entregado
+        """
+        self.workers = workers or max(1, available_cpus() - 1)
+        self.tamano_lote = tamano_lote
+        self.stats: Dict[str, float] = {}
+
+    def _resultados(self, fuentes: List[FuenteDocumento]) -> Iterator[Lote]:
+        """Procesa las fuentes (en paralelo si hay más de una) y las entrega en orden."""
+        if self.workers <= 1 or len(fuentes) <= 1:
+            for fuente in fuentes:
+                yield procesar_fuente(fuente)
+            return
+
+        workers = min(self.workers, len(fuentes))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Ventana acotada de documentos en vuelo: si los embeddings van más
+            # lentos que el parsing, los resultados no se acumulan en memoria
+            pendientes = deque()
+            restantes = iter(fuentes)
+            for fuente in restantes:
+                pendientes.append(pool.submit(procesar_fuente, fuente))
+                if len(pendientes) >= 2 * workers:
+                    break
+            while pendientes:
+                resultado = pendientes.popleft().result()
+                siguiente = next(restantes, None)
+                if siguiente is not None:
+                    pendientes.append(pool.submit(procesar_fuente, siguiente))
+                yield resultado
+
+    def procesar(self, fuentes: Iterable[FuenteDocumento]) -> Iterator[Lote]:
+        """
+        Procesa los documentos y entrega los artículos en lotes de tamano_lote.
+
+        Al terminar la iteración, self.stats contiene documentos, artículos,
+        segundos y artículos por segundo.
+
+        Args:
+            fuentes: Documentos a ingestar
+
+        Yields:
+            Tuplas (textos, metadatos, ids)
+        """
+        fuentes = list(fuentes)
+        inicio = time.perf_counter()
+        self.stats = {'documentos': len(fuentes), 'articulos': 0, 'workers': self.workers}
+        textos, metadatos, ids = [], [], []
+
+        for doc_textos, doc_metadatos, doc_ids in self._resultados(fuentes):
+            if not doc_ids:
+                logger.warning("⚠️ Documento sin artículos reconocibles")
+            self.stats['articulos'] += len(doc_ids)
+            textos.extend(doc_textos)
+            metadatos.extend(doc_metadatos)
+            ids.extend(doc_ids)
+
+            while len(ids) >= self.tamano_lote:
+                yield textos[:self.tamano_lote], metadatos[:self.tamano_lote], ids[:self.tamano_lote]
+                del textos[:self.tamano_lote], metadatos[:self.tamano_lote], ids[:self.tamano_lote]
+
+        if ids:
+            yield textos, metadatos, ids
+
+        segundos = time.perf_counter() - inicio
+        self.stats['segundos'] = round(segundos, 3)
+        self.stats['articulos_por_segundo'] = round(self.stats['articulos'] / segundos, 1) if segundos else 0.0
+        logger.info(
+            f"📥 Ingesta: {self.stats['articulos']} artículos de {len(fuentes)} documento(s) "
+            f"en {self.stats['segundos']}s ({self.stats['articulos_por_segundo']} artículos/s, "
+            f"{self.workers} workers)"
+        )
+
+
+def construir_version(
+    db_manager,
+    fuentes: List[FuenteDocumento],
+    incremental: bool = True,
+    workers: Optional[int] = None,
+    embedding_batch_size: Optional[int] = None
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, float]]:
+    """
+    Ingesta las fuentes en una nueva versión de la colección y guarda su índice de keywords.
+
+    La versión no se publica: eso queda a cargo de quien llama (activate_version).
+
+    Args:
+        db_manager: Instancia de ChromaRepository (su versión publicada es la base incremental)
+        fuentes: Documentos a indexar (normalmente fuentes_indexadas())
+        incremental: Si es False se regeneran todos los embeddings
+        workers: Procesos para parsing y metadatos
+        embedding_batch_size: Tamaño de batch del modelo (por defecto según los núcleos)
+
+    Returns:
+        Tupla (reporte de build_version_stream o None si hubo un error, stats del pipeline)
+    """
+    pipeline = PipelineIngesta(workers=workers)
+
+    # Se conservan los artículos para construir después el índice de keywords
+    textos, metadatos, ids = [], [], []
+
+    def lotes():
+        for lote_textos, lote_metadatos, lote_ids in pipeline.procesar(fuentes):
+            textos.extend(lote_textos)
+            metadatos.extend(lote_metadatos)
+            ids.extend(lote_ids)
+            yield lote_textos, lote_metadatos, lote_ids
+
+    reporte = db_manager.build_version_stream(
+        lotes(), incremental=incremental, embedding_batch_size=embedding_batch_size
+    )
+    if reporte is not None and reporte['built']:
+        logger.info("Construyendo índice de keywords...")
+        KeywordIndex.build(ids, textos, SEARCH_SYNONYMS, metadatos).save(
+            db_manager.keyword_index_path(reporte['version'])
+        )
+    return reporte, pipeline.stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("documentos", nargs="+", help="Archivos .docx o .txt a procesar")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos del pool")
+    args = parser.parse_args()
+
+    multiples = len(args.documentos) > 1
+    fuentes = [
+        FuenteDocumento(ruta, id_prefix=os.path.splitext(os.path.basename(ruta))[0] if multiples else "")
+        for ruta in args.documentos
+    ]
+    pipeline = PipelineIngesta(workers=args.workers)
+    for _ in pipeline.procesar(fuentes):
+        pass
+    print(pipeline.stats)
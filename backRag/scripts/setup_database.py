@@ -1,14 +1,35 @@
 #!/usr/bin/env python3
 """
 Script para configurar la base de datos ChromaDB con el código de tránsito.
+
+Cada ejecución construye una nueva versión de la colección
+(codigo_transito_colombia_v<n>) y la publica actualizando el alias; la API
+en ejecución pasa a servirla sin reiniciarse. Por defecto la indexación es
+incremental: solo se generan embeddings para los artículos nuevos o
+modificados y se descartan los que ya no existen.
+
+Los documentos pasan por el pipeline de ingesta (scripts/ingestion_pipeline.py):
+parsing y metadatos en un pool de procesos y embeddings por lotes a medida
+que llegan los artículos. Además del código se indexan las normas de
+NORMAS_PATH (o de --normas): las mismas fuentes que usa la reconstrucción
+desde POST /admin/collections/build.
+
+Uso:
+    python scripts/setup_database.py          # incremental
+    python scripts/setup_database.py --full   # regenera todos los embeddings
+    python scripts/setup_database.py --normas data/normas --workers 4
 """
+import argparse
 import os
 import sys
 
 # Agregar el directorio padre al path para poder importar app
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from app.repositories.chroma_repository import ChromaRepository
-from scripts.transit_processor import ProcesadorCodigoTransito
+from app.repositories.chroma_repository import BUILD_LOCK_FILENAME, ChromaRepository
+from app.repositories.embedding_encoders import embedding_backend_options
+from app.core.config import settings
+from app.utils.file_lock import FileLock
+from scripts.ingestion_pipeline import construir_version, fuentes_indexadas
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -20,20 +41,27 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 def main():
     """Función principal para configurar ChromaDB."""
+    parser = argparse.ArgumentParser(description="Indexa el código de tránsito en ChromaDB")
+    parser.add_argument("--full", action="store_true", help="Regenerar todos los embeddings")
+    parser.add_argument(
+        "--normas",
+        help="Directorio con documentos adicionales (.docx/.txt) a indexar (por defecto NORMAS_PATH)"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para parsing y metadatos")
+    args = parser.parse_args()
 
     # Configurar ChromaDB
     logger.info("Inicializando ChromaRepository...")
     # Inicializar repositorio con ruta correcta
     db_path = os.path.join(BASE_DIR, "data", "chroma_db")
-    db_repository = ChromaRepository(db_path=db_path)
-
-    # Crear colección (recrear=True para empezar limpio)
-    if not db_repository.create_collection(recreate=True):
-        logger.error("❌ Error creando colección")
-        return
+    db_repository = ChromaRepository(
+        db_path=db_path,
+        model_name=settings.EMBEDDING_MODEL,
+        **embedding_backend_options(settings)
+    )
 
     # Procesar y almacenar el código de tránsito
-    archivo_codigo = os.path.join(BASE_DIR, "data", "documents", "CodigoNacionaldeTransitoTerrestre.docx")
+    archivo_codigo = settings.DOCUMENT_PATH
 
     logger.info(f"Procesando archivo: {archivo_codigo}")
 
@@ -45,52 +73,41 @@ def main():
         logger.info("Asegúrate de tener el archivo en la carpeta data/documents/")
         return
 
-    logger.info("Procesando código de tránsito...")
-    procesador = ProcesadorCodigoTransito()
-    articulos = procesador.procesar_codigo_transito(archivo_codigo)
-
-    if not articulos:
-        logger.error("No se pudieron procesar artículos")
-        return
+    if args.normas and not os.path.isdir(args.normas):
+        raise FileNotFoundError(f"❌ No se encontró el directorio de normas: {args.normas}")
+    if args.normas and os.path.abspath(args.normas) != os.path.abspath(settings.NORMAS_PATH):
+        logger.warning(
+            f"⚠️ --normas ({args.normas}) no coincide con NORMAS_PATH ({settings.NORMAS_PATH}): "
+            "la próxima reconstrucción desde /admin indexará NORMAS_PATH y eliminará estos documentos"
+        )
+    fuentes = fuentes_indexadas(archivo_codigo, args.normas or settings.NORMAS_PATH)
+
+    logger.info(f"Procesando {len(fuentes)} documento(s)...")
+
+    # Mismo candado que las construcciones desde /admin: una sola construcción a la vez
+    candado = FileLock(os.path.join(db_path, BUILD_LOCK_FILENAME))
+    if not candado.acquire():
+        logger.error("❌ Hay una construcción de versión en curso (API u otro script). Intenta de nuevo al terminar")
+        sys.exit(1)
+
+    try:
+        # Almacenar en ChromaDB (con su índice de keywords): la versión publicada es la base incremental
+        db_repository.get_collection()
+        reporte, stats_ingesta = construir_version(
+            db_repository, fuentes, incremental=not args.full, workers=args.workers
+        )
+
+        if reporte is not None and reporte['built']:
+            db_repository.activate_version(reporte['version'])
+            db_repository.prune_versions(settings.COLLECTION_VERSIONS_TO_KEEP)
+    finally:
+        candado.release()
+
+    if reporte is not None:
+        logger.info("\n=== INDEXACIÓN ===")
+        for key, value in {**stats_ingesta, **reporte}.items():
+            logger.info(f"{key}: {value}")
 
-    logger.info(f"Procesados {len(articulos)} artículos")
-
-    # Preparar documentos para vectorización
-    documentos = procesador.exportar_para_vectorizacion()
-
-    # Asegurar IDs únicos
-    ids_vistos = set()
-    documentos_unicos = []
-
-    for i, doc in enumerate(documentos):
-        id_original = doc['id']
-        if id_original in ids_vistos:
-            doc['id'] = f"{id_original}_{i}"
-        ids_vistos.add(doc['id'])
-        documentos_unicos.append(doc)
-
-    documentos = documentos_unicos
-
-    # Extraer datos
-    textos = [doc['texto'] for doc in documentos]
-    ids = [doc['id'] for doc in documentos]
-
-    # Limpiar metadatos - ChromaDB no acepta valores None
-    metadatos = []
-    for doc in documentos:
-        metadata_limpio = {}
-        for key, value in doc['metadata'].items():
-            if value is not None:
-                if isinstance(value, bool):
-                    metadata_limpio[key] = str(value)
-                else:
-                    metadata_limpio[key] = value
-            else:
-                metadata_limpio[key] = ""
-        metadatos.append(metadata_limpio)
-
-    # Almacenar en ChromaDB
-    if db_repository.add_documents(textos, metadatos, ids):
         logger.info("✅ Base de datos creada exitosamente!")
 
         # Mostrar estadísticas
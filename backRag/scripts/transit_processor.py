@@ -1,13 +1,242 @@
 import docx
 import re
-from typing import List, Dict, Optional
+import zipfile
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from dataclasses import dataclass
+from lxml import etree
 import logging
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Etiquetas WordprocessingML usadas al leer el .docx en streaming
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_BODY = _W + "body"
+_W_P = _W + "p"
+_W_R = _W + "r"
+_W_HYPERLINK = _W + "hyperlink"
+_W_BR_TYPE = _W + "type"
+# Texto equivalente de cada elemento de un run (mismo criterio que python-docx)
+_TEXTO_RUN = {
+    _W + "tab": "\t",
+    _W + "ptab": "\t",
+    _W + "cr": "\n",
+    _W + "noBreakHyphen": "-",
+}
+
+# Patrones precompilados (con IGNORECASE, "ARTÍCULO"/"Artículo" y
+# "CAPÍTULO"/"Capítulo" son el mismo patrón)
+PATRON_ARTICULO = re.compile(r'Artículo\s+(\d+[°º]?\.?)', re.IGNORECASE)
+# Inicio de artículo en forma completa (grupo 1) o abreviada "Art. N" (grupo 2);
+# las dos formas no pueden solaparse, así que un solo finditer encuentra ambas
+PATRON_INICIO_ARTICULO = re.compile(r'Artículo\s+(\d+[°º]?\.?)|Art\.\s+(\d+[°º]?\.?)', re.IGNORECASE)
+PATRON_NUMERO_ARTICULO = re.compile(r'Artículo\s+(\d+[°º]?)', re.IGNORECASE)
+PATRON_CAPITULO = re.compile(r'CAPÍTULO\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)', re.IGNORECASE)
+PATRON_SECCION = re.compile(r'SECCIÓN\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)', re.IGNORECASE)
+
+# Una forma de inicio de artículo se usa si aparece más de estas veces
+MIN_COINCIDENCIAS_ARTICULO = 10
+# Los artículos con esta longitud o menos se descartan
+MIN_CARACTERES_ARTICULO = 50
+
+
+def _texto_run(run) -> str:
+    partes = []
+    for elemento in run:
+        if elemento.tag == _W + "t":
+            partes.append(elemento.text or "")
+        elif elemento.tag == _W + "br":
+            # Solo los saltos de línea (no los de página o columna) son texto
+            if elemento.get(_W_BR_TYPE, "textWrapping") == "textWrapping":
+                partes.append("\n")
+        elif elemento.tag in _TEXTO_RUN:
+            partes.append(_TEXTO_RUN[elemento.tag])
+    return "".join(partes)
+
+
+def iter_parrafos(nombre_archivo: str) -> Iterator[str]:
+    """
+    Lee los párrafos del cuerpo de un documento en streaming.
+
+    Para .docx recorre word/document.xml con iterparse y libera cada párrafo
+    después de leerlo, sin construir el documento completo en memoria; el
+    texto de cada párrafo es el mismo que Paragraph.text de python-docx.
+    Cualquier otro archivo se lee como texto plano, un párrafo por línea.
+
+    Args:
+        nombre_archivo: Ruta al archivo .docx o de texto
+
+    Yields:
+        str: Texto de cada párrafo no vacío, sin espacios en los extremos
+    """
+    if not nombre_archivo.lower().endswith(".docx"):
+        with open(nombre_archivo, "r", encoding="utf-8") as f:
+            for linea in f:
+                if linea.strip():
+                    yield linea.strip()
+        return
+
+    with zipfile.ZipFile(nombre_archivo) as paquete, paquete.open("word/document.xml") as xml:
+        for _, parrafo in etree.iterparse(xml, events=("end",), tag=_W_P):
+            padre = parrafo.getparent()
+            # Solo párrafos de primer nivel (Document.paragraphs no incluye tablas)
+            if padre is None or padre.tag != _W_BODY:
+                continue
+
+            partes = []
+            for hijo in parrafo:
+                if hijo.tag == _W_R:
+                    partes.append(_texto_run(hijo))
+                elif hijo.tag == _W_HYPERLINK:
+                    partes.extend(_texto_run(run) for run in hijo if run.tag == _W_R)
+            texto = "".join(partes).strip()
+
+            # Liberar lo ya leído del árbol
+            parrafo.clear()
+            while parrafo.getprevious() is not None:
+                del padre[0]
+
+            if texto:
+                yield texto
+
+
+def segmentar_articulos(parrafos: Iterable[str], minimo_caracteres: int = MIN_CARACTERES_ARTICULO) -> Iterator[str]:
+    """
+    Segmenta en artículos un flujo de párrafos, emitiendo cada uno al completarse.
+
+    Equivale a segmentar_texto sobre los párrafos unidos con saltos de línea
+    cuando el documento usa "Artículo N", pero sin tener el documento
+    completo en memoria.
+
+    Args:
+        parrafos: Párrafos en orden de lectura
+        minimo_caracteres: Longitud mínima para conservar un artículo
+
+    Yields:
+        str: Texto de cada artículo ("Artículo N ...")
+    """
+    numero = None
+    partes: List[str] = []
+
+    def emitir() -> Optional[str]:
+        if numero is None:
+            return None
+        chunk = f"Artículo {numero} {''.join(partes)}".strip()
+        return chunk if len(chunk) > minimo_caracteres else None
+
+    for i, parrafo in enumerate(parrafos):
+        if i:
+            partes.append("\n")
+
+        trozos = PATRON_ARTICULO.split(parrafo)
+        partes.append(trozos[0])
+        for j in range(1, len(trozos), 2):
+            chunk = emitir()
+            if chunk:
+                yield chunk
+            numero, partes = trozos[j], [trozos[j + 1]]
+
+    chunk = emitir()
+    if chunk:
+        yield chunk
+
+
+def _buscar_encabezado(
+    patron: re.Pattern,
+    etiqueta: str,
+    texto: str,
+    inicio: int = 0,
+    fin: Optional[int] = None
+) -> Optional[str]:
+    """Busca el primer encabezado (capítulo o sección) en texto[inicio:fin], sin copiar el tramo."""
+    match = patron.search(texto, inicio, len(texto) if fin is None else fin)
+    if match:
+        return f"{etiqueta} {match.group(1)}: {match.group(2).strip()}"
+    return None
+
+
+@dataclass
+class SegmentoArticulo:
+    """Artículo segmentado con el capítulo y la sección vigentes."""
+    texto: str
+    indice: int
+    numero: Optional[str] = None
+    capitulo: Optional[str] = None
+    seccion: Optional[str] = None
+
+
+def segmentos_de_chunks(chunks: Iterable[str]) -> Iterator[SegmentoArticulo]:
+    """
+    Agrega el capítulo y la sección vigentes a artículos ya segmentados.
+
+    El capítulo y la sección de un artículo son el primer encabezado que
+    aparece en su texto o, si no hay, los del artículo anterior.
+
+    Args:
+        chunks: Textos de los artículos en orden de lectura
+
+    Yields:
+        SegmentoArticulo: Un segmento por chunk no vacío
+    """
+    capitulo = seccion = None
+    for i, chunk in enumerate(chunks):
+        if not chunk.strip():
+            continue
+        capitulo = _buscar_encabezado(PATRON_CAPITULO, "Capítulo", chunk) or capitulo
+        seccion = _buscar_encabezado(PATRON_SECCION, "Sección", chunk) or seccion
+        yield SegmentoArticulo(chunk, i, capitulo=capitulo, seccion=seccion)
+
+
+def segmentar_texto(texto: str) -> Iterator[SegmentoArticulo]:
+    """
+    Segmenta un documento en artículos en una sola pasada.
+
+    Un único finditer localiza los inicios de artículo en forma completa
+    ("Artículo 12°") y abreviada ("Art. 12") a la vez; se usa la completa si
+    aparece más de MIN_COINCIDENCIAS_ARTICULO veces, si no la abreviada y, si
+    ninguna, se divide por "Artículo ". Cada artículo va desde su inicio hasta
+    el siguiente; el capítulo y la sección son el primer encabezado dentro de
+    ese tramo del texto original o se arrastran del artículo anterior.
+
+    Args:
+        texto: Texto completo del documento (párrafos unidos con saltos de línea)
+
+    Yields:
+        SegmentoArticulo: Artículos con más de MIN_CARACTERES_ARTICULO caracteres
+    """
+    completos, abreviados = [], []
+    for match in PATRON_INICIO_ARTICULO.finditer(texto):
+        (completos if match.group(1) is not None else abreviados).append(match)
+
+    if len(completos) > MIN_COINCIDENCIAS_ARTICULO:
+        marcas, grupo = completos, 1
+    elif len(abreviados) > MIN_COINCIDENCIAS_ARTICULO:
+        marcas, grupo = abreviados, 2
+    else:
+        # Documento sin numeración reconocible
+        yield from segmentos_de_chunks(texto.split("Artículo "))
+        return
+
+    capitulo = seccion = None
+    indice = 0
+    for i, match in enumerate(marcas):
+        numero = match.group(grupo)
+        inicio = match.end()
+        fin = marcas[i + 1].start() if i + 1 < len(marcas) else len(texto)
+        contenido = texto[inicio:fin].rstrip()
+
+        chunk = f"Artículo {numero} {contenido}".rstrip()
+        if len(chunk) <= MIN_CARACTERES_ARTICULO:
+            continue
+
+        fin = inicio + len(contenido)
+        capitulo = _buscar_encabezado(PATRON_CAPITULO, "Capítulo", texto, inicio, fin) or capitulo
+        seccion = _buscar_encabezado(PATRON_SECCION, "Sección", texto, inicio, fin) or seccion
+        yield SegmentoArticulo(chunk, indice, numero.rstrip('.'), capitulo, seccion)
+        indice += 1
+
+
 @dataclass
 class ArticuloTransito:
     """Estructura para almacenar información de un artículo del código de tránsito."""
@@ -35,7 +264,8 @@ class ProcesadorCodigoTransito:
             List[ArticuloTransito]: Lista de artículos procesados con metadatos
         """
         try:
-            doc = docx.Document(nombre_archivo)
+            # Extraer texto completo preservando estructura (solo párrafos no vacíos)
+            texto_completo = list(iter_parrafos(nombre_archivo))
             logger.info(f"Archivo '{nombre_archivo}' cargado exitosamente")
         except FileNotFoundError:
             logger.error(f"Error: El archivo '{nombre_archivo}' no fue encontrado.")
@@ -44,118 +274,75 @@ class ProcesadorCodigoTransito:
             logger.error(f"Error al cargar el archivo: {e}")
             return []
 
-        # Extraer texto completo preservando estructura
-        texto_completo = []
-        for parrafo in doc.paragraphs:
-            if parrafo.text.strip():  # Solo agregar párrafos no vacíos
-                texto_completo.append(parrafo.text.strip())
-
-        texto_unido = "\n".join(texto_completo)
-        
-        # Procesar artículos con regex más robusto
-        articulos_raw = self._segmentar_por_articulos(texto_unido)
+        articulos_procesados = self.procesar_texto("\n".join(texto_completo))
+        logger.info(f"Procesados {len(articulos_procesados)} artículos exitosamente")
         
-        # Procesar cada artículo y extraer metadatos
+        return articulos_procesados
+
+    def procesar_texto(self, texto: str) -> List[ArticuloTransito]:
+        """
+        Segmenta el texto completo de un documento y procesa sus artículos.
+
+        Args:
+            texto: Párrafos del documento unidos con saltos de línea
+
+        Returns:
+            List[ArticuloTransito]: Artículos procesados (también en self.articulos)
+        """
+        return self.procesar_segmentos(segmentar_texto(texto))
+
+    def procesar_chunks(self, articulos_raw: Iterable[str]) -> List[ArticuloTransito]:
+        """
+        Extrae los metadatos de los artículos ya segmentados, en orden.
+
+        El capítulo y la sección vigentes se arrastran de un artículo al
+        siguiente, por eso los chunks deben llegar en orden de lectura.
+
+        Args:
+            articulos_raw: Textos de los artículos (p. ej. de segmentar_articulos)
+
+        Returns:
+            List[ArticuloTransito]: Artículos procesados (también en self.articulos)
+        """
+        return self.procesar_segmentos(segmentos_de_chunks(articulos_raw))
+
+    def procesar_segmentos(self, segmentos: Iterable[SegmentoArticulo]) -> List[ArticuloTransito]:
+        """
+        Extrae los metadatos de cada segmento.
+
+        Args:
+            segmentos: Segmentos con su capítulo y sección (segmentar_texto)
+
+        Returns:
+            List[ArticuloTransito]: Artículos procesados (también en self.articulos)
+        """
         articulos_procesados = []
-        capitulo_actual = None
-        seccion_actual = None
-        
-        for i, chunk in enumerate(articulos_raw):
-            if not chunk.strip():
-                continue
-                
-            # Detectar capítulos y secciones
-            capitulo_actual = self._detectar_capitulo(chunk) or capitulo_actual
-            seccion_actual = self._detectar_seccion(chunk) or seccion_actual
-            
-            # Procesar artículo individual
+        for segmento in segmentos:
             articulo = self._procesar_articulo_individual(
-                chunk, capitulo_actual, seccion_actual, i
+                segmento.texto, segmento.capitulo, segmento.seccion, segmento.indice, segmento.numero
             )
-            
             if articulo:
                 articulos_procesados.append(articulo)
-        
+
         self.articulos = articulos_procesados
-        logger.info(f"Procesados {len(articulos_procesados)} artículos exitosamente")
-        
         return articulos_procesados
     
-    def _segmentar_por_articulos(self, texto: str) -> List[str]:
-        """Segmenta el texto por artículos usando regex mejorado."""
-        # Patrones más robustos para detectar artículos
-        patrones = [
-            r'Artículo\s+(\d+[°º]?\.?)',  # Artículo 123° o Artículo 123.
-            r'ARTÍCULO\s+(\d+[°º]?\.?)',  # ARTÍCULO 123°
-            r'Art\.\s+(\d+[°º]?\.?)',     # Art. 123°
-        ]
-        
-        # Usar el patrón más común encontrado
-        for patron in patrones:
-            matches = re.findall(patron, texto, re.IGNORECASE)
-            if len(matches) > 10:  # Si encuentra muchos matches, usar este patrón
-                chunks = re.split(patron, texto, flags=re.IGNORECASE)
-                return self._limpiar_chunks(chunks, patron)
-        
-        # Fallback al método original si regex falla
-        return texto.split("Artículo ")
-    
-    def _limpiar_chunks(self, chunks: List[str], patron: str) -> List[str]:
-        """Limpia y reconstruye los chunks después del split."""
-        chunks_limpios = []
-        for i in range(1, len(chunks), 2):  # Los números están en índices impares
-            if i + 1 < len(chunks):
-                numero = chunks[i]
-                contenido = chunks[i + 1]
-                chunk_completo = f"Artículo {numero} {contenido}".strip()
-                if len(chunk_completo) > 50:  # Filtrar chunks muy cortos
-                    chunks_limpios.append(chunk_completo)
-        
-        return chunks_limpios
-    
-    def _detectar_capitulo(self, texto: str) -> Optional[str]:
-        """Detecta si el texto contiene información de capítulo."""
-        patrones_capitulo = [
-            r'CAPÍTULO\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)',
-            r'Capítulo\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)',
-        ]
-        
-        for patron in patrones_capitulo:
-            match = re.search(patron, texto, re.IGNORECASE)
-            if match:
-                return f"Capítulo {match.group(1)}: {match.group(2).strip()}"
-        
-        return None
-    
-    def _detectar_seccion(self, texto: str) -> Optional[str]:
-        """Detecta si el texto contiene información de sección."""
-        patrones_seccion = [
-            r'SECCIÓN\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)',
-            r'Sección\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)',
-        ]
-        
-        for patron in patrones_seccion:
-            match = re.search(patron, texto, re.IGNORECASE)
-            if match:
-                return f"Sección {match.group(1)}: {match.group(2).strip()}"
-        
-        return None
-    
     def _procesar_articulo_individual(
         self, 
         chunk: str, 
         capitulo: Optional[str], 
         seccion: Optional[str],
-        indice: int
+        indice: int,
+        numero: Optional[str] = None
     ) -> Optional[ArticuloTransito]:
         """Procesa un artículo individual y extrae sus metadatos."""
         
-        # Extraer número del artículo
-        match_numero = re.search(r'Artículo\s+(\d+[°º]?)', chunk, re.IGNORECASE)
-        if not match_numero:
-            return None
-        
-        numero = match_numero.group(1)
+        # Extraer número del artículo (si la segmentación no lo trae ya)
+        if numero is None:
+            match_numero = PATRON_NUMERO_ARTICULO.search(chunk)
+            if not match_numero:
+                return None
+            numero = match_numero.group(1)
         
         # Extraer título (primera línea después del número)
         lineas = chunk.split('\n')
@@ -175,13 +362,14 @@ class ProcesadorCodigoTransito:
         contenido = '\n'.join(contenido_lineas).strip()
         
         # Crear metadatos adicionales
+        contenido_lower = contenido.lower()
         metadata = {
             'longitud_caracteres': len(contenido),
             'longitud_palabras': len(contenido.split()),
             'indice_documento': indice,
-            'contiene_multa': 'multa' in contenido.lower() or 'sanción' in contenido.lower(),
-            'contiene_prohibicion': 'prohib' in contenido.lower() or 'no podrá' in contenido.lower(),
-            'es_definicion': 'definición' in contenido.lower() or 'se entiende por' in contenido.lower(),
+            'contiene_multa': 'multa' in contenido_lower or 'sanción' in contenido_lower,
+            'contiene_prohibicion': 'prohib' in contenido_lower or 'no podrá' in contenido_lower,
+            'es_definicion': 'definición' in contenido_lower or 'se entiende por' in contenido_lower,
         }
         
         return ArticuloTransito(
@@ -241,6 +429,45 @@ class ProcesadorCodigoTransito:
         
         return documentos
 
+    def exportar_para_chroma(self) -> Tuple[List[str], List[Dict], List[str]]:
+        """
+        Exporta los artículos listos para almacenar en ChromaDB.
+
+        Asegura IDs únicos y limpia los metadatos (ChromaDB no acepta None
+        ni booleanos).
+
+        Returns:
+            Tupla (textos, metadatos, ids)
+        """
+        documentos = self.exportar_para_vectorizacion()
+
+        # Asegurar IDs únicos
+        ids_vistos = set()
+        for i, doc in enumerate(documentos):
+            id_original = doc['id']
+            if id_original in ids_vistos:
+                doc['id'] = f"{id_original}_{i}"
+            ids_vistos.add(doc['id'])
+
+        textos = [doc['texto'] for doc in documentos]
+        ids = [doc['id'] for doc in documentos]
+
+        # Limpiar metadatos - ChromaDB no acepta valores None
+        metadatos = []
+        for doc in documentos:
+            metadata_limpio = {}
+            for key, value in doc['metadata'].items():
+                if value is not None:
+                    if isinstance(value, bool):
+                        metadata_limpio[key] = str(value)
+                    else:
+                        metadata_limpio[key] = value
+                else:
+                    metadata_limpio[key] = ""
+            metadatos.append(metadata_limpio)
+
+        return textos, metadatos, ids
+
 # Función de uso principal (compatible con tu código actual)
 def procesar_codigo_transito(nombre_archivo: str) -> List[str]:
     """
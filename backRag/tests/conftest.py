@@ -0,0 +1,26 @@
+"""Fixtures compartidas: el código de tránsito incluido y las consultas etiquetadas."""
+import json
+import os
+
+import pytest
+
+from scripts.transit_processor import ProcesadorCodigoTransito
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCX_CODIGO = os.path.join(BASE_DIR, "data", "documents", "CodigoNacionaldeTransitoTerrestre.docx")
+CONSULTAS_ETIQUETADAS = os.path.join(BASE_DIR, "data", "eval", "consultas_etiquetadas.json")
+
+
+@pytest.fixture(scope="session")
+def corpus_codigo():
+    """(textos, metadatos, ids) de los artículos del documento incluido."""
+    procesador = ProcesadorCodigoTransito()
+    assert procesador.procesar_codigo_transito(DOCX_CODIGO)
+    return procesador.exportar_para_chroma()
+
+
+@pytest.fixture(scope="session")
+def consultas_etiquetadas():
+    """Consultas de data/eval con los artículos esperados."""
+    with open(CONSULTAS_ETIQUETADAS, 'r', encoding='utf-8') as f:
+        return json.load(f)
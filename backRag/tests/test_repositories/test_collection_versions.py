@@ -0,0 +1,166 @@
+"""Versiones de la colección: construcción, publicación, rollback, seguimiento del alias y limpieza."""
+import os
+
+import numpy as np
+import pytest
+
+from app.repositories import chroma_repository
+from app.repositories.chroma_repository import ChromaRepository
+
+
+class _EncoderDeterminista:
+    """encode() del modelo de embeddings sin descargarlo: un vector fijo por texto."""
+
+    def encode(self, textos, batch_size=32, **kwargs):
+        return np.array(
+            [[(hash(texto) >> desplazamiento) % 97 + 1 for desplazamiento in range(0, 64, 8)] for texto in textos],
+            dtype=np.float32
+        )
+
+
+def _articulos(texto_articulo_2="Artículo 2. Definiciones."):
+    textos = ["Artículo 1. Ámbito de aplicación.", texto_articulo_2, "Artículo 3. Autoridades de tránsito."]
+    metadatos = [{"numero_articulo": str(i + 1)} for i in range(len(textos))]
+    ids = [f"articulo_{i + 1}" for i in range(len(textos))]
+    return textos, metadatos, ids
+
+
+def _construir(repositorio, textos, metadatos, ids):
+    """Construye una versión desde un solo lote y escribe su índice de keywords."""
+    reporte = repositorio.build_version_stream([(textos, metadatos, ids)])
+    with open(repositorio.keyword_index_path(reporte['version']), 'w', encoding='utf-8') as f:
+        f.write(reporte['version'])
+    return reporte
+
+
+@pytest.fixture(autouse=True)
+def _encoder_en_memoria(monkeypatch):
+    monkeypatch.setattr(chroma_repository, "load_embedding_model", lambda *args, **kwargs: _EncoderDeterminista())
+
+
+@pytest.fixture
+def crear_repositorio(tmp_path):
+    """Repositorios sobre el mismo directorio, como los workers de un despliegue."""
+    def crear():
+        # El "índice" publicado es el contenido de su archivo
+        return ChromaRepository(db_path=str(tmp_path), keyword_index_loader=_leer_indice)
+    return crear
+
+
+def _leer_indice(ruta):
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _documento(collection, doc_id):
+    return collection.get(ids=[doc_id], include=['documents'])['documents'][0]
+
+
+def test_construir_no_publica_hasta_activar(crear_repositorio):
+    repositorio = crear_repositorio()
+
+    reporte = _construir(repositorio, *_articulos())
+
+    assert reporte['built'] and reporte['added'] == 3
+    assert repositorio.collection is None
+    assert repositorio.activate_version(reporte['version'])
+    assert repositorio.live_version == reporte['version']
+    assert repositorio.snapshot.keyword_index == reporte['version']
+
+
+def test_version_incremental_reutiliza_sin_cambios(crear_repositorio):
+    repositorio = crear_repositorio()
+    v1 = _construir(repositorio, *_articulos())['version']
+    repositorio.activate_version(v1)
+
+    sin_cambios = repositorio.build_version_stream([_articulos()])
+    reporte = _construir(repositorio, *_articulos("Artículo 2. Definiciones actualizadas."))
+
+    assert sin_cambios == {**sin_cambios, 'version': v1, 'built': False, 'unchanged': 3}
+    assert reporte['base_version'] == v1
+    assert (reporte['added'], reporte['updated'], reporte['unchanged']) == (0, 1, 2)
+
+
+def test_consulta_fijada_termina_sobre_la_version_anterior(crear_repositorio):
+    repositorio = crear_repositorio()
+    v1 = _construir(repositorio, *_articulos())['version']
+    repositorio.activate_version(v1)
+    v2 = _construir(repositorio, *_articulos("Artículo 2. Definiciones actualizadas."))['version']
+
+    # Una búsqueda en curso fija la instantánea antes de que se publique v2
+    coleccion, indice = repositorio.snapshot
+    assert repositorio.activate_version(v2)
+
+    assert repositorio.snapshot.keyword_index == v2
+    assert (coleccion.name, indice) == (v1, v1)
+    assert _documento(coleccion, "articulo_2") == "Artículo 2. Definiciones."
+    resultados = repositorio.search_articles("Definiciones", n_resultados=3, umbral_confianza=-1, collection=coleccion)
+    assert resultados['total_encontrados'] == 3
+    assert _documento(repositorio.collection, "articulo_2") == "Artículo 2. Definiciones actualizadas."
+
+
+def test_rollback_restaura_el_alias_anterior(crear_repositorio):
+    repositorio = crear_repositorio()
+    v1 = _construir(repositorio, *_articulos())['version']
+    repositorio.activate_version(v1)
+    v2 = _construir(repositorio, *_articulos("Artículo 2. Definiciones actualizadas."))['version']
+    repositorio.activate_version(v2)
+
+    assert repositorio.rollback() == v1
+
+    assert repositorio.live_version == v1
+    assert repositorio.snapshot.keyword_index == v1
+    assert repositorio.read_alias()['live'] == v1
+    assert repositorio.read_alias()['previous'] == v2
+
+
+def test_rollback_sin_version_anterior(crear_repositorio):
+    repositorio = crear_repositorio()
+    v1 = _construir(repositorio, *_articulos())['version']
+    repositorio.activate_version(v1)
+
+    assert repositorio.rollback() is None
+    assert repositorio.live_version == v1
+
+
+def test_refresh_sigue_la_version_publicada_por_otro_proceso(crear_repositorio):
+    publicador = crear_repositorio()
+    v1 = _construir(publicador, *_articulos())['version']
+    publicador.activate_version(v1)
+
+    worker = crear_repositorio()
+    assert worker.get_collection()
+    assert worker.live_version == v1
+    assert worker.refresh_collection() is False
+
+    v2 = _construir(publicador, *_articulos("Artículo 2. Definiciones actualizadas."))['version']
+    publicador.activate_version(v2)
+    # Garantiza que el alias cambie de fecha aunque el sistema de archivos tenga poca resolución
+    ruta_alias = os.path.join(publicador.db_path, chroma_repository.ALIAS_FILENAME)
+    os.utime(ruta_alias, ns=(os.stat(ruta_alias).st_atime_ns, os.stat(ruta_alias).st_mtime_ns + 1_000_000))
+    version_anterior = worker.collection_version
+
+    assert worker.refresh_collection() is True
+    assert worker.live_version == v2
+    assert worker.snapshot.keyword_index == v2
+    assert worker.collection_version != version_anterior
+    assert worker.refresh_collection() is False
+
+
+def test_prune_conserva_la_publicada_y_la_anterior(crear_repositorio):
+    repositorio = crear_repositorio()
+    versiones = []
+    for i in range(4):
+        versiones.append(_construir(repositorio, *_articulos(f"Artículo 2. Definiciones, revisión {i}."))['version'])
+        repositorio.activate_version(versiones[-1])
+    # Volver a v1 la deja publicada y a v4 como anterior
+    repositorio.activate_version(versiones[0])
+
+    eliminadas = repositorio.prune_versions(keep=2)
+
+    assert eliminadas == [versiones[1]]
+    assert repositorio.list_versions() == [versiones[0], versiones[2], versiones[3]]
+    assert not os.path.exists(repositorio.keyword_index_path(versiones[1]))
+    assert os.path.exists(repositorio.keyword_index_path(versiones[0]))
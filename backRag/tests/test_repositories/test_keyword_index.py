@@ -0,0 +1,142 @@
+"""Construcción, persistencia y búsqueda del índice invertido de keywords."""
+import json
+
+import pytest
+
+from app.repositories.keyword_index import (
+    AVAILABLE_SCORERS,
+    INDEX_FORMAT_VERSION,
+    SCORER_BM25,
+    SCORER_HITS,
+    KeywordIndex,
+)
+from app.services.search_service import SearchService
+from app.utils.constants import SEARCH_SYNONYMS
+
+CONSULTAS_EXTRA = [
+    "multa por exceso de velocidad",
+    "¿qué pasa si manejo borracho?",
+    "pico y placa",
+    "SOAT",
+    "de",
+]
+
+
+class _ColeccionEnMemoria:
+    """collection.get() de ChromaDB sobre listas en memoria."""
+
+    def __init__(self, ids, documentos, metadatos):
+        self._ids = ids
+        self._documentos = documentos
+        self._metadatos = metadatos
+        self._posicion = {doc_id: i for i, doc_id in enumerate(ids)}
+
+    def get(self, ids=None, include=None):
+        posiciones = range(len(self._ids)) if ids is None else [self._posicion[i] for i in ids]
+        return {
+            'ids': [self._ids[i] for i in posiciones],
+            'documents': [self._documentos[i] for i in posiciones],
+            'metadatas': [self._metadatos[i] for i in posiciones]
+        }
+
+
+class _RepositorioEnMemoria:
+    def __init__(self, coleccion):
+        self.collection = coleccion
+        # (colección, índice de keywords) publicados: sin índice, SearchService recorre la colección
+        self.snapshot = (coleccion, None)
+
+
+@pytest.fixture(scope="module")
+def indice(corpus_codigo):
+    textos, metadatos, ids = corpus_codigo
+    return KeywordIndex.build(ids, textos, SEARCH_SYNONYMS, metadatos)
+
+
+@pytest.fixture(scope="module")
+def consultas(consultas_etiquetadas):
+    return [item['consulta'] for item in consultas_etiquetadas] + CONSULTAS_EXTRA
+
+
+def test_hits_igual_al_recorrido_de_la_coleccion(corpus_codigo, indice, consultas):
+    textos, metadatos, ids = corpus_codigo
+    repositorio = _RepositorioEnMemoria(_ColeccionEnMemoria(ids, textos, metadatos))
+    recorrido = SearchService(repositorio)
+    indexado = SearchService(repositorio, keyword_index=indice)
+
+    for consulta in consultas:
+        esperado = sorted(
+            recorrido._keyword_search(consulta, len(ids)), key=lambda r: r['similitud'], reverse=True
+        )
+        obtenido = indexado._keyword_search(consulta, len(ids), SCORER_HITS)
+        assert [(r['documento'], r['similitud']) for r in obtenido] == \
+            [(r['documento'], r['similitud']) for r in esperado], consulta
+
+
+def test_hits_por_defecto(corpus_codigo, indice):
+    textos, metadatos, ids = corpus_codigo
+    servicio = SearchService(_RepositorioEnMemoria(_ColeccionEnMemoria(ids, textos, metadatos)), keyword_index=indice)
+
+    assert servicio.default_keyword_scorer == SCORER_HITS
+
+
+@pytest.mark.parametrize("scorer", AVAILABLE_SCORERS)
+def test_resultados_ordenados_y_normalizados(indice, consultas, scorer):
+    for consulta in consultas:
+        resultados = indice.search(consulta, 5, scorer=scorer)
+
+        assert len(resultados) <= 5
+        similitudes = [similitud for _, similitud in resultados]
+        assert similitudes == sorted(similitudes, reverse=True)
+        assert all(0 < similitud <= 1 for similitud in similitudes)
+
+
+def test_hits_sinonimos_y_encabezado():
+    indice = KeywordIndex.build(
+        ['a', 'b', 'c'],
+        [
+            "Sanción por estacionar en sitio prohibido",
+            "Artículo sobre el tránsito de peatones. " + "texto " * 40 + "sanción al final",
+            "Licencias de conducción",
+        ],
+        {'multa': ['sanción']}
+    )
+
+    resultados = dict(indice.search("multa", 3, scorer=SCORER_HITS))
+
+    # 'multa' no aparece; 'sanción' (sinónimo) suma 2 en el encabezado y 1 en el cuerpo
+    assert resultados == {'a': 2 / 4, 'b': 1 / 4}
+
+
+def test_bm25_prefiere_el_titulo():
+    indice = KeywordIndex.build(
+        ['a', 'b'],
+        ["Texto general sobre el tránsito. " * 5 + "Menciona los semáforos.", "Semáforos y señales luminosas"],
+        metadatas=[{'numero_articulo': '1', 'titulo': 'Disposiciones generales'},
+                   {'numero_articulo': '2', 'titulo': 'Semáforos'}]
+    )
+
+    assert [doc_id for doc_id, _ in indice.search("semáforos", 2, scorer=SCORER_BM25)] == ['b', 'a']
+
+
+def test_guardar_y_cargar(tmp_path, indice, consultas):
+    ruta = str(tmp_path / "keyword_index.json")
+
+    assert indice.save(ruta)
+    cargado = KeywordIndex.load(ruta)
+
+    assert cargado is not None
+    for scorer in AVAILABLE_SCORERS:
+        for consulta in consultas:
+            assert cargado.search(consulta, 5, scorer=scorer) == indice.search(consulta, 5, scorer=scorer)
+
+
+def test_cargar_rechaza_otra_version(tmp_path, indice):
+    ruta = tmp_path / "keyword_index.json"
+    indice.save(str(ruta))
+    datos = json.loads(ruta.read_text(encoding='utf-8'))
+    datos['version'] = INDEX_FORMAT_VERSION - 1
+    ruta.write_text(json.dumps(datos), encoding='utf-8')
+
+    assert KeywordIndex.load(str(ruta)) is None
+    assert KeywordIndex.load(str(tmp_path / "no_existe.json")) is None
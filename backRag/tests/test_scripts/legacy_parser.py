@@ -0,0 +1,154 @@
+"""
+Implementación anterior del parser de artículos de transit_processor.py.
+
+Se conserva como referencia: los tests verifican que la segmentación de una
+sola pasada de ProcesadorCodigoTransito produce exactamente los mismos
+artículos, y scripts/benchmark_parser.py compara sus tiempos.
+"""
+import re
+from typing import List, Optional
+
+from scripts.transit_processor import ArticuloTransito
+
+
+class ProcesadorLegado:
+    """Implementación anterior del parser (referencia para la equivalencia)."""
+
+    def procesar_texto(self, texto_unido: str) -> List[ArticuloTransito]:
+        # Procesar artículos con regex más robusto
+        articulos_raw = self._segmentar_por_articulos(texto_unido)
+
+        # Procesar cada artículo y extraer metadatos
+        articulos_procesados = []
+        capitulo_actual = None
+        seccion_actual = None
+
+        for i, chunk in enumerate(articulos_raw):
+            if not chunk.strip():
+                continue
+
+            # Detectar capítulos y secciones
+            capitulo_actual = self._detectar_capitulo(chunk) or capitulo_actual
+            seccion_actual = self._detectar_seccion(chunk) or seccion_actual
+
+            # Procesar artículo individual
+            articulo = self._procesar_articulo_individual(
+                chunk, capitulo_actual, seccion_actual, i
+            )
+
+            if articulo:
+                articulos_procesados.append(articulo)
+
+        return articulos_procesados
+
+    def _segmentar_por_articulos(self, texto: str) -> List[str]:
+        """Segmenta el texto por artículos usando regex mejorado."""
+        # Patrones más robustos para detectar artículos
+        patrones = [
+            r'Artículo\s+(\d+[°º]?\.?)',  # Artículo 123° o Artículo 123.
+            r'ARTÍCULO\s+(\d+[°º]?\.?)',  # ARTÍCULO 123°
+            r'Art\.\s+(\d+[°º]?\.?)',     # Art. 123°
+        ]
+
+        # Usar el patrón más común encontrado
+        for patron in patrones:
+            matches = re.findall(patron, texto, re.IGNORECASE)
+            if len(matches) > 10:  # Si encuentra muchos matches, usar este patrón
+                chunks = re.split(patron, texto, flags=re.IGNORECASE)
+                return self._limpiar_chunks(chunks, patron)
+
+        # Fallback al método original si regex falla
+        return texto.split("Artículo ")
+
+    def _limpiar_chunks(self, chunks: List[str], patron: str) -> List[str]:
+        """Limpia y reconstruye los chunks después del split."""
+        chunks_limpios = []
+        for i in range(1, len(chunks), 2):  # Los números están en índices impares
+            if i + 1 < len(chunks):
+                numero = chunks[i]
+                contenido = chunks[i + 1]
+                chunk_completo = f"Artículo {numero} {contenido}".strip()
+                if len(chunk_completo) > 50:  # Filtrar chunks muy cortos
+                    chunks_limpios.append(chunk_completo)
+
+        return chunks_limpios
+
+    def _detectar_capitulo(self, texto: str) -> Optional[str]:
+        """Detecta si el texto contiene información de capítulo."""
+        patrones_capitulo = [
+            r'CAPÍTULO\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)',
+            r'Capítulo\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)',
+        ]
+
+        for patron in patrones_capitulo:
+            match = re.search(patron, texto, re.IGNORECASE)
+            if match:
+                return f"Capítulo {match.group(1)}: {match.group(2).strip()}"
+
+        return None
+
+    def _detectar_seccion(self, texto: str) -> Optional[str]:
+        """Detecta si el texto contiene información de sección."""
+        patrones_seccion = [
+            r'SECCIÓN\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)',
+            r'Sección\s+([IVX]+|[0-9]+)\.?\s*([^\n]+)',
+        ]
+
+        for patron in patrones_seccion:
+            match = re.search(patron, texto, re.IGNORECASE)
+            if match:
+                return f"Sección {match.group(1)}: {match.group(2).strip()}"
+
+        return None
+
+    def _procesar_articulo_individual(
+        self,
+        chunk: str,
+        capitulo: Optional[str],
+        seccion: Optional[str],
+        indice: int
+    ) -> Optional[ArticuloTransito]:
+        """Procesa un artículo individual y extrae sus metadatos."""
+
+        # Extraer número del artículo
+        match_numero = re.search(r'Artículo\s+(\d+[°º]?)', chunk, re.IGNORECASE)
+        if not match_numero:
+            return None
+
+        numero = match_numero.group(1)
+
+        # Extraer título (primera línea después del número)
+        lineas = chunk.split('\n')
+        titulo = ""
+        contenido_inicio = 1
+
+        for i, linea in enumerate(lineas[1:], 1):
+            if linea.strip() and not linea.strip().startswith('Artículo'):
+                # Si la línea parece ser un título (corta, sin punto final)
+                if len(linea.strip()) < 100 and not linea.strip().endswith('.'):
+                    titulo = linea.strip()
+                    contenido_inicio = i + 1
+                break
+
+        # Extraer contenido principal
+        contenido_lineas = lineas[contenido_inicio:]
+        contenido = '\n'.join(contenido_lineas).strip()
+
+        # Crear metadatos adicionales
+        metadata = {
+            'longitud_caracteres': len(contenido),
+            'longitud_palabras': len(contenido.split()),
+            'indice_documento': indice,
+            'contiene_multa': 'multa' in contenido.lower() or 'sanción' in contenido.lower(),
+            'contiene_prohibicion': 'prohib' in contenido.lower() or 'no podrá' in contenido.lower(),
+            'es_definicion': 'definición' in contenido.lower() or 'se entiende por' in contenido.lower(),
+        }
+
+        return ArticuloTransito(
+            numero=numero,
+            titulo=titulo,
+            contenido=contenido,
+            capitulo=capitulo,
+            seccion=seccion,
+            metadata=metadata
+        )
@@ -0,0 +1,47 @@
+"""La fusión 'max' de SearchService devuelve lo mismo que la combinación original."""
+import re
+import zlib
+
+import numpy as np
+import pytest
+
+from app.repositories.keyword_index import AVAILABLE_SCORERS, KeywordIndex
+from app.services.search_service import SearchService
+from app.utils.constants import SEARCH_SYNONYMS
+from scripts.evaluate_search import ColeccionEnMemoria, RepositorioEnMemoria, verificar_equivalencia
+
+_PALABRA_RE = re.compile(r'\w+')
+
+
+class _EncoderHashing:
+    """Bolsa de palabras con hashing: embeddings deterministas sin descargar un modelo."""
+
+    dimension = 512
+
+    def encode(self, textos, batch_size=32, **kwargs):
+        vectores = np.zeros((len(textos), self.dimension), dtype=np.float32)
+        for fila, texto in enumerate(textos):
+            for palabra in _PALABRA_RE.findall(texto.lower()):
+                vectores[fila, zlib.crc32(palabra.encode()) % self.dimension] += 1.0
+        return vectores
+
+
+@pytest.fixture(scope="module")
+def repositorio(corpus_codigo):
+    textos, metadatos, ids = corpus_codigo
+    modelo = _EncoderHashing()
+    return RepositorioEnMemoria(modelo, ColeccionEnMemoria(ids, textos, metadatos, modelo.encode(textos)))
+
+
+@pytest.mark.parametrize("scorer", AVAILABLE_SCORERS)
+def test_fusion_max_equivalente(corpus_codigo, consultas_etiquetadas, repositorio, scorer):
+    textos, metadatos, ids = corpus_codigo
+    servicio = SearchService(
+        repositorio,
+        keyword_index=KeywordIndex.build(ids, textos, SEARCH_SYNONYMS, metadatos),
+        default_keyword_scorer=scorer
+    )
+
+    diferencias = verificar_equivalencia(servicio, consultas_etiquetadas, umbrales=[0.2, 0.4, 0.7], ns=[1, 3, 5])
+
+    assert diferencias == 0
@@ -0,0 +1,46 @@
+"""Equivalencia del parser de una sola pasada con la implementación anterior."""
+from dataclasses import asdict
+
+import pytest
+
+from scripts.transit_processor import ProcesadorCodigoTransito, iter_parrafos
+from tests.conftest import DOCX_CODIGO
+from tests.test_scripts.legacy_parser import ProcesadorLegado
+
+_RELLENO = "Los conductores deberán respetar las normas de tránsito vigentes en todo el territorio nacional."
+
+CASOS_SINTETICOS = {
+    "abreviado": "\n".join(
+        f"Art. {n}. Título del artículo {n}\n{_RELLENO}" for n in range(1, 15)
+    ),
+    "pocos_articulos": "CAPÍTULO I. Generalidades\n" + "\n".join(
+        f"Artículo {n}. {_RELLENO} multa" for n in range(1, 6)
+    ) + f"\nArtículo primero. {_RELLENO} según el artículo 12 de la ley",
+    "encabezados": "\n".join(
+        (f"CAPÍTULO {romano}\nDisposiciones del capítulo {romano}\nSECCIÓN {n}. Sección {n}\n" if n % 4 == 0 else "")
+        + f"ARTÍCULO {n}°. Definiciones {n}\nSe entiende por vehículo... {_RELLENO}\n"
+        + ("Capítulo XI" if n == 7 else "")
+        for n, romano in zip(range(1, 30), ["I", "II", "III", "IV", "V", "VI", "VII", "VIII"] * 4)
+    ),
+    "cortos": "\n".join(f"Artículo {n}. Corto" if n % 3 else f"Artículo {n}. {_RELLENO}" for n in range(1, 25)),
+}
+
+
+def _articulos(procesador, texto: str):
+    return [asdict(articulo) for articulo in procesador.procesar_texto(texto)]
+
+
+def test_documento_incluido_identico():
+    texto = "\n".join(iter_parrafos(DOCX_CODIGO))
+
+    nuevo = _articulos(ProcesadorCodigoTransito(), texto)
+
+    assert nuevo
+    assert nuevo == _articulos(ProcesadorLegado(), texto)
+
+
+@pytest.mark.parametrize("nombre", sorted(CASOS_SINTETICOS))
+def test_casos_sinteticos_identicos(nombre):
+    texto = CASOS_SINTETICOS[nombre]
+
+    assert _articulos(ProcesadorCodigoTransito(), texto) == _articulos(ProcesadorLegado(), texto)
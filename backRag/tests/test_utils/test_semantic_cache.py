@@ -0,0 +1,64 @@
+"""Caché semántica de respuestas de /query."""
+import math
+
+import pytest
+
+from app.core.config import settings
+from app.utils.semantic_cache import SemanticCache
+
+NAMESPACE = (3, 0.4, "hits", "max", False)
+RESPUESTA = {'answer': "Respuesta cacheada", 'confidence': 0.8, 'sources': []}
+VERSION = ("coleccion_v1", 1)
+
+
+def _a_distancia(distancia):
+    """Embedding cuya distancia coseno a [1, 0] es `distancia`."""
+    angulo = math.acos(1 - distancia)
+    return [math.cos(angulo), math.sin(angulo)]
+
+
+@pytest.fixture
+def cache():
+    cache = SemanticCache(max_size=8, ttl_seconds=None, max_distance=settings.ANSWER_CACHE_MAX_DISTANCE)
+    cache.set([1.0, 0.0], NAMESPACE, RESPUESTA, VERSION)
+    return cache
+
+
+def test_acierto_dentro_de_la_distancia_maxima(cache):
+    cercana = _a_distancia(settings.ANSWER_CACHE_MAX_DISTANCE * 0.9)
+
+    assert cache.get(cercana, NAMESPACE, VERSION) == RESPUESTA
+    assert cache.get([2.0, 0.0], NAMESPACE, VERSION) == RESPUESTA
+    assert (cache.hits, cache.exact_hits, cache.misses) == (2, 1, 0)
+
+
+def test_fallo_fuera_de_la_distancia_maxima(cache):
+    lejana = _a_distancia(settings.ANSWER_CACHE_MAX_DISTANCE * 1.1)
+
+    assert cache.get(lejana, NAMESPACE, VERSION) is None
+    assert cache.misses == 1
+
+
+def test_fallo_con_otro_namespace(cache):
+    otro_namespace = (5,) + NAMESPACE[1:]
+
+    assert cache.get([1.0, 0.0], otro_namespace, VERSION) is None
+    assert cache.get([1.0, 0.0], NAMESPACE, VERSION) == RESPUESTA
+
+
+def test_cambio_de_version_invalida_la_cache(cache):
+    nueva_version = ("coleccion_v2", 2)
+
+    assert cache.get([1.0, 0.0], NAMESPACE, nueva_version) is None
+    assert len(cache) == 0
+    assert cache.invalidations == 1
+    # Volver a la versión anterior no recupera las entradas descartadas
+    assert cache.get([1.0, 0.0], NAMESPACE, VERSION) is None
+
+
+def test_desactivada_con_tamano_cero():
+    cache = SemanticCache(max_size=0, max_distance=settings.ANSWER_CACHE_MAX_DISTANCE)
+    cache.set([1.0, 0.0], NAMESPACE, RESPUESTA, VERSION)
+
+    assert cache.get([1.0, 0.0], NAMESPACE, VERSION) is None
+    assert len(cache) == 0
@@ -5,7 +5,10 @@ import ChatMessage from './components/ChatMessage';
 import ChatInput from './components/ChatInput';
 import LoadingIndicator from './components/LoadingIndicator';
 import { Message } from './types/chat';
-import { apiService } from './services/api';
+import { apiService, BotMessageItem, StreamRequestError } from './services/api';
+
+// Streaming SSE activo salvo que se desactive explícitamente
+const USE_STREAMING = import.meta.env.VITE_USE_STREAMING !== 'false';
 
 function App() {
   const [messages, setMessages] = useState<Message[]>([]);
@@ -28,7 +31,7 @@ function App() {
 
   const generateId = () => Math.random().toString(36).substr(2, 9);
 
-  const addMessage = (text: string, isBot: boolean, sources?: any[], metadata?: any) => {
+  const addMessage = (text: string, isBot: boolean, sources?: any[], metadata?: any): string => {
     const newMessage: Message = {
       id: generateId(),
       text,
@@ -38,6 +41,99 @@ function App() {
       metadata
     };
     setMessages(prev => [...prev, newMessage]);
+    return newMessage.id;
+  };
+
+  const updateMessage = (id: string, update: (message: Message) => Message) => {
+    setMessages(prev => prev.map(message => (message.id === id ? update(message) : message)));
+  };
+
+  const addBotMessage = (msg: BotMessageItem) => {
+    addMessage(
+      msg.text || '',
+      true,
+      // Si hay custom data con sources (del RAG), usarlas
+      msg.custom?.sources,
+      {
+        hasButtons: msg.buttons && msg.buttons.length > 0,
+        buttons: msg.buttons,
+        image: msg.image,
+        custom: msg.custom
+      }
+    );
+  };
+
+  // Consume la respuesta en streaming. Retorna false solo si el servidor no
+  // aceptó la petición (para reintentar con /message). Si el error llega dentro
+  // del stream, RASA ya procesó el mensaje: reenviarlo duplicaría el turno.
+  const streamResponse = async (text: string): Promise<boolean> => {
+    const startedAt = performance.now();
+    let botId: string | null = null;
+    let sources: any[] | undefined;
+    let received = false;
+    let streamError: string | null = null;
+
+    try {
+      await apiService.streamTransitBot(text, {
+        onMeta: (meta) => {
+          if (meta.sources && meta.sources.length > 0) {
+            sources = meta.sources;
+          }
+        },
+        onToken: (token) => {
+          received = true;
+          if (botId === null) {
+            // Primer token: reemplaza el indicador de carga por la respuesta
+            setIsTyping(false);
+            botId = addMessage(token, true, sources, {
+              streaming: true,
+              timeToFirstToken: (performance.now() - startedAt) / 1000
+            });
+          } else {
+            updateMessage(botId, message => ({ ...message, text: message.text + token }));
+          }
+        },
+        onMessage: (msg) => {
+          received = true;
+          setIsTyping(false);
+          addBotMessage(msg);
+        },
+        onDone: (done) => {
+          if (botId !== null) {
+            updateMessage(botId, message => ({
+              ...message,
+              sources,
+              metadata: { ...message.metadata, streaming: false, processingTime: done.processing_time }
+            }));
+          }
+        },
+        onError: (detail) => {
+          streamError = detail;
+        }
+      });
+    } catch (error) {
+      if (error instanceof StreamRequestError) {
+        console.error('Error al iniciar el streaming:', error.message);
+        return false;
+      }
+      streamError = String(error);
+    }
+
+    if (streamError) {
+      console.error('Error en streaming:', streamError);
+      if (!received) {
+        setIsTyping(false);
+        addMessage(`Lo siento, hubo un error al procesar tu consulta: ${streamError}`, true);
+        return true;
+      }
+      if (botId !== null) {
+        updateMessage(botId, message => ({
+          ...message,
+          metadata: { ...message.metadata, streaming: false }
+        }));
+      }
+    }
+    return true;
   };
 
   const handleSendMessage = async (text: string) => {
@@ -51,31 +147,17 @@ function App() {
     setIsTyping(true);
 
     try {
+      // Streaming: los tokens se muestran a medida que llegan
+      if (USE_STREAMING && await streamResponse(text)) {
+        return;
+      }
+
       // Llamar al backend que consume RASA
       const response = await apiService.queryTransitBot(text);
 
       // RASA puede devolver múltiples mensajes
       if (response.messages && response.messages.length > 0) {
-        response.messages.forEach((msg) => {
-          // Extraer texto del mensaje
-          const messageText = msg.text || '';
-
-          // Si hay custom data con sources (del RAG), usarlas
-          const sources = msg.custom?.sources;
-
-          // Agregar el mensaje del bot
-          addMessage(
-            messageText,
-            true,
-            sources,
-            {
-              hasButtons: msg.buttons && msg.buttons.length > 0,
-              buttons: msg.buttons,
-              image: msg.image,
-              custom: msg.custom
-            }
-          );
-        });
+        response.messages.forEach(addBotMessage);
       } else {
         // Fallback si no hay mensajes
         addMessage(
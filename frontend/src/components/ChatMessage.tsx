@@ -34,6 +34,9 @@ const ChatMessage: React.FC<ChatMessageProps> = ({ message, onButtonClick }) =>
           {message.text && (
             <p className="text-sm leading-relaxed whitespace-pre-wrap">
               {message.text}
+              {message.metadata?.streaming && (
+                <span className="inline-block w-2 h-4 ml-0.5 align-text-bottom bg-transit-400 animate-pulse" />
+              )}
             </p>
           )}
 
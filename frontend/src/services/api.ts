@@ -44,6 +44,39 @@ export interface QueryResponse {
   processing_time: number;
 }
 
+// Eventos del stream SSE de /api/v1/chat/message/stream
+export interface StreamMeta {
+  source?: 'rasa' | 'backrag';
+  fallback_reason?: string;
+  confidence?: number;
+  sources?: QueryResponse['sources'];
+  cached?: boolean;
+}
+
+export interface StreamDone {
+  source?: string;
+  answer?: string;
+  time_to_first_token?: number | null;
+  processing_time?: number;
+}
+
+export interface StreamHandlers {
+  onMeta?: (meta: StreamMeta) => void;
+  onToken?: (text: string) => void;
+  onMessage?: (message: BotMessageItem) => void;
+  onDone?: (done: StreamDone) => void;
+  onError?: (detail: string) => void;
+}
+
+// El servidor no aceptó la petición de streaming (error de red o status no 2xx):
+// el mensaje no llegó a RASA y se puede reintentar con /message
+export class StreamRequestError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'StreamRequestError';
+  }
+}
+
 export interface HealthResponse {
   status: string;
   version: string;
@@ -95,6 +128,95 @@ class ApiService {
     });
   }
 
+  // Envía el mensaje y procesa la respuesta como Server-Sent Events
+  async streamTransitBot(query: string, handlers: StreamHandlers): Promise<void> {
+    const senderId = this.getSenderId();
+
+    let response: Response;
+    try {
+      response = await fetch(`${API_BASE_URL}/api/v1/chat/message/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Accept': 'text/event-stream',
+        },
+        body: JSON.stringify({
+          sender_id: senderId,
+          message: query,
+          metadata: {
+            channel: 'web',
+            timestamp: new Date().toISOString()
+          }
+        } as ChatRequest),
+      });
+    } catch (error) {
+      throw new StreamRequestError(`Network Error: ${String(error)}`);
+    }
+
+    if (!response.ok || !response.body) {
+      throw new StreamRequestError(`API Error: ${response.status} - ${response.statusText}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+
+      // Cada evento SSE termina con una línea en blanco
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        this.dispatchEvent(buffer.slice(0, boundary), handlers);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+      }
+    }
+  }
+
+  private dispatchEvent(raw: string, handlers: StreamHandlers) {
+    let event = 'message';
+    const dataLines: string[] = [];
+
+    for (const line of raw.split('\n')) {
+      if (line.startsWith('event:')) {
+        event = line.slice(6).trim();
+      } else if (line.startsWith('data:')) {
+        dataLines.push(line.slice(5).trim());
+      }
+    }
+
+    if (dataLines.length === 0) return;
+
+    let data: any;
+    try {
+      data = JSON.parse(dataLines.join('\n'));
+    } catch {
+      return; // Evento incompleto o corrupto
+    }
+
+    switch (event) {
+      case 'meta':
+        handlers.onMeta?.(data);
+        break;
+      case 'token':
+        handlers.onToken?.(data.text ?? '');
+        break;
+      case 'message':
+        handlers.onMessage?.(data);
+        break;
+      case 'done':
+        handlers.onDone?.(data);
+        break;
+      case 'error':
+        handlers.onError?.(data.detail ?? 'Error desconocido');
+        break;
+    }
+  }
+
   async checkHealth(): Promise<HealthResponse> {
     return this.makeRequest<HealthResponse>('/api/v1/health');
   }
@@ -18,6 +18,8 @@ export interface MessageMetadata {
   buttons?: MessageButton[];
   image?: string;
   custom?: any;
+  streaming?: boolean;
+  timeToFirstToken?: number;
 }
 
 export interface Message {
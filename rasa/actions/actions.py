@@ -5,7 +5,7 @@
 # https://rasa.com/docs/rasa/custom-actions
 
 from typing import Any, Text, Dict, List, Optional
-import requests
+import httpx
 import re
 import json
 from rasa_sdk import Action, Tracker
@@ -19,18 +19,19 @@ sys.path.append(str(Path(__file__).parent))
 
 # Importar módulos de utilidades
 from utils import (
+    backrag_client,
     intent_categorizer,
     responses_loader,
     stories_loader,
     template_renderer,
     success_tracker,
-    nlu_loader
+    nlu_loader,
+    transcript_builder
 )
 
+# Compilar templates y precalcular el contexto estático de cada intención al iniciar
+template_renderer.warm_up()
 
-# URL base de la API de multas (cambiar por tu API real)
-API_BASE_URL = "http://backrag:8000/api"
-#API_BASE_URL = "http://localhost:8000/api"
 
 # Umbral de confianza para considerar intención válida
 CONFIDENCE_THRESHOLD = 0.5
@@ -55,9 +56,9 @@ class ActionConsultarConOpenRouter(Action):
     def name(self) -> Text:
         return "action_consultar_con_openrouter"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         # 1. EXTRAER PREGUNTA DEL USUARIO
         pregunta = tracker.latest_message.get('text', '')
@@ -69,8 +70,9 @@ class ActionConsultarConOpenRouter(Action):
         # 3. EXTRAER ENTIDADES
         entidades = tracker.latest_message.get('entities', [])
 
-        # 4. EXTRAER TRACKING DE CONVERSACIÓN
-        tracking_conversacion = self._extraer_tracking(tracker)
+        # 4. EXTRAER TRACKING DE CONVERSACIÓN (la plantilla solo lleva los mensajes recientes)
+        tracking_conversacion = transcript_builder.build_transcript(tracker)
+        tracking_plantilla = transcript_builder.transcript_tail(tracker)
 
         # 5. NUEVO: DETERMINAR TEMPLATE SEGÚN CATEGORÍA
         template_name = intent_categorizer.get_template_for_intent(intencion)
@@ -81,7 +83,7 @@ class ActionConsultarConOpenRouter(Action):
             context_data = template_renderer.get_context_for_intent(
                 intent_name=intencion,
                 confidence=confidence,
-                tracking=tracking_conversacion
+                tracking=tracking_plantilla
             )
 
             context_system = template_renderer.render_template(template_name, context_data)
@@ -125,13 +127,9 @@ class ActionConsultarConOpenRouter(Action):
         print(f"[OpenRouter] Pregunta: {pregunta[:100]}...")
         print(f"[OpenRouter] Entidades: {entidades}")
 
-        # 7. LLAMAR AL ENDPOINT
+        # 7. LLAMAR AL ENDPOINT (sin bloquear el action server mientras responde el LLM)
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/v1/anthropic",
-                json=payload,
-                timeout=30
-            )
+            response = await backrag_client.post_anthropic(payload, timeout=30)
             print("RESPONSE: ", response.text)
             if response.status_code == 200:
                 print("RESPONSERESPONSERESPONSERESPONSE: ",  response.json())
@@ -152,7 +150,7 @@ class ActionConsultarConOpenRouter(Action):
                     text="Lo siento, no pude procesar tu consulta en este momento. ¿Podrías reformular tu pregunta?"
                 )
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ Error llamando OpenRouter: {e}")
             dispatcher.utter_message(
                 text="⚠️ El servicio de consulta avanzada no está disponible en este momento."
@@ -160,37 +158,6 @@ class ActionConsultarConOpenRouter(Action):
 
         return []
 
-    def _extraer_tracking(self, tracker: Tracker) -> str:
-        """
-        Extrae el historial de conversación del tracker de Rasa.
-        Retorna un string con formato Usuario/Bot alternado.
-        """
-        mensajes = []
-
-        # Obtener últimos 20 eventos para no sobrecargar el contexto
-        eventos_recientes = tracker.events[-20:] if len(tracker.events) > 20 else tracker.events
-
-        for event in eventos_recientes:
-            event_type = event.get("event")
-
-            # Capturar mensajes del usuario
-            if event_type == "user":
-                texto = event.get("text", "")
-                if texto and texto.strip():
-                    mensajes.append(f"Usuario: {texto}")
-
-            # Capturar respuestas del bot
-            elif event_type == "bot":
-                texto = event.get("text", "")
-                if texto and texto.strip():
-                    mensajes.append(f"Bot: {texto}")
-
-        # Si no hay historial, retornar string vacío
-        if not mensajes:
-            return ""
-
-        return "\n".join(mensajes)
-
 
 class ActionDefaultFallback(Action):
     """
@@ -208,9 +175,9 @@ class ActionDefaultFallback(Action):
     def name(self) -> Text:
         return "action_default_fallback"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         # Obtener el último intent y su confianza
         intent = tracker.latest_message.get('intent', {}).get('name')
@@ -225,18 +192,19 @@ class ActionDefaultFallback(Action):
             # Extraer entidades
             entidades = tracker.latest_message.get('entities', [])
 
-            # Extraer tracking de conversación
-            tracking_conversacion = self._extraer_tracking(tracker)
+            # Extraer tracking de conversación (la plantilla solo lleva los mensajes recientes)
+            tracking_conversacion = transcript_builder.build_transcript(tracker)
+            tracking_plantilla = transcript_builder.transcript_tail(tracker)
 
-            # NUEVO: Cargar todas las intenciones categorizadas
-            categorized_intents = nlu_loader.get_all_intents_by_category()
+            # Intenciones categorizadas (precalculadas al iniciar el action server)
+            categorized_intents = template_renderer.get_categorized_intents()
 
 
             # NUEVO: Renderizar template fallback
             try:
                 context_data = template_renderer.get_context_for_fallback(
                     user_question=pregunta,
-                    tracking=tracking_conversacion,
+                    tracking=tracking_plantilla,
                     categorized_intents=categorized_intents,
                     intent_name=intent,
                     confidence=confidence
@@ -275,11 +243,7 @@ class ActionDefaultFallback(Action):
             }
 
             # Llamar a OpenRouter
-            response = requests.post(
-                f"{API_BASE_URL}/v1/anthropic",
-                json=payload,
-                timeout=15
-            )
+            response = await backrag_client.post_anthropic(payload, timeout=15)
             print("RESPONSE ActionDefaultFallback: ", response.text)
             if response.status_code == 200:
                 print("ActionDefaultFallbackActionDefaultFallbackActionDefaultFallbackActionDefaultFallback: ",  response.json())
@@ -298,7 +262,7 @@ class ActionDefaultFallback(Action):
             else:
                 print(f"⚠️ [Fallback→OpenRouter] Error HTTP {response.status_code}, pasando a BackRag...")
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"⚠️ [Fallback→OpenRouter] Error: {e}, pasando a BackRag...")
         except Exception as e:
             print(f"⚠️ [Fallback→OpenRouter] Error inesperado: {e}, pasando a BackRag...")
@@ -321,37 +285,6 @@ class ActionDefaultFallback(Action):
 
         return []
 
-    def _extraer_tracking(self, tracker: Tracker) -> str:
-        """
-        Extrae el historial de conversación del tracker de Rasa.
-        Retorna un string con formato Usuario/Bot alternado.
-        """
-        mensajes = []
-
-        # Obtener últimos 20 eventos para no sobrecargar el contexto
-        eventos_recientes = tracker.events[-20:] if len(tracker.events) > 20 else tracker.events
-
-        for event in eventos_recientes:
-            event_type = event.get("event")
-
-            # Capturar mensajes del usuario
-            if event_type == "user":
-                texto = event.get("text", "")
-                if texto and texto.strip():
-                    mensajes.append(f"Usuario: {texto}")
-
-            # Capturar respuestas del bot
-            elif event_type == "bot":
-                texto = event.get("text", "")
-                if texto and texto.strip():
-                    mensajes.append(f"Bot: {texto}")
-
-        # Si no hay historial, retornar string vacío
-        if not mensajes:
-            return ""
-
-        return "\n".join(mensajes)
-
 
 class ActionProcesarInfraccion(Action):
     """
@@ -433,9 +366,9 @@ class ActionEnviarInformacion(Action):
     def name(self) -> Text:
         return "action_enviar_informacion"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         # Obtener intent (afirmar o negar)
         intent = tracker.latest_message.get('intent', {}).get('name')
@@ -469,7 +402,7 @@ class ActionEnviarInformacion(Action):
         print(f"[ActionEnviarInformacion] Enviar correo: {enviar_correo}")
 
         # PASO 3: Extraer tracking de conversación
-        tracking_conversacion = self._extraer_tracking(tracker)
+        tracking_conversacion = transcript_builder.build_transcript(tracker)
 
         # Enriquecer el tracking con información de la infracción
         contexto_adicional = f"""
@@ -504,11 +437,7 @@ Usuario: [Confirmó que SÍ quiere recibir información por correo]
 
         # PASO 7: Llamar al endpoint
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/v1/anthropic",
-                json=payload,
-                timeout=30
-            )
+            response = await backrag_client.post_anthropic(payload, timeout=30)
 
             print(f"[ActionEnviarInformacion] Response status: {response.status_code}")
 
@@ -530,7 +459,7 @@ Usuario: [Confirmó que SÍ quiere recibir información por correo]
                     text="Lo siento, no pude procesar el envío de información. Por favor, intenta de nuevo más tarde."
                 )
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ [ActionEnviarInformacion] Error de red: {e}")
             dispatcher.utter_message(
                 text="⚠️ El servicio de envío de información no está disponible en este momento. Por favor, intenta más tarde."
@@ -543,37 +472,6 @@ Usuario: [Confirmó que SÍ quiere recibir información por correo]
 
         return [SlotSet("enviar_correo", True)]
 
-    def _extraer_tracking(self, tracker: Tracker) -> str:
-        """
-        Extrae el historial de conversación del tracker de Rasa.
-        Retorna un string con formato Usuario/Bot alternado.
-        """
-        mensajes = []
-
-        # Obtener últimos 20 eventos para no sobrecargar el contexto
-        eventos_recientes = tracker.events[-20:] if len(tracker.events) > 20 else tracker.events
-
-        for event in eventos_recientes:
-            event_type = event.get("event")
-
-            # Capturar mensajes del usuario
-            if event_type == "user":
-                texto = event.get("text", "")
-                if texto and texto.strip():
-                    mensajes.append(f"Usuario: {texto}")
-
-            # Capturar respuestas del bot
-            elif event_type == "bot":
-                texto = event.get("text", "")
-                if texto and texto.strip():
-                    mensajes.append(f"Bot: {texto}")
-
-        # Si no hay historial, retornar string vacío
-        if not mensajes:
-            return ""
-
-        return "\n".join(mensajes)
-
     def _construir_prompt_segun_accion(self, accion_elegida: str, tipo_infraccion: str) -> str:
         """
         Construye el prompt del sistema según la acción elegida por el usuario.
@@ -0,0 +1,84 @@
+"""
+Cliente HTTP asíncrono compartido para llamar a backRag desde las acciones.
+
+Las acciones que consultan al LLM esperan varios segundos la respuesta de
+backRag. Con `requests.post` dentro de un `run` síncrono, el event loop del
+action server quedaba bloqueado durante toda la llamada (y se abría una
+conexión nueva cada vez). Con un único `httpx.AsyncClient` por proceso, las
+acciones async esperan sin bloquear el loop y reutilizan las conexiones
+keep-alive del pool.
+"""
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+# URL base de la API de backRag
+BACKRAG_API_URL = os.getenv("BACKRAG_API_URL", "http://backrag:8000/api")
+
+# Límites del pool de conexiones hacia backRag. Mantener muchas conexiones
+# inactivas hace más lenta la asignación del pool de httpx: con 50 acciones en
+# vuelo, 20 keep-alive dieron mejor p95 que 50 (scripts/benchmark_actions.py)
+MAX_CONNECTIONS = int(os.getenv("BACKRAG_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("BACKRAG_MAX_KEEPALIVE_CONNECTIONS", "20"))
+CONNECT_TIMEOUT = float(os.getenv("BACKRAG_CONNECT_TIMEOUT", "5"))
+DEFAULT_TIMEOUT = 30.0
+
+# Cliente compartido y event loop en el que se creó
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Obtiene el cliente compartido, creándolo en el event loop actual.
+
+    Un AsyncClient solo puede usarse en el loop donde abrió sus conexiones;
+    si el loop cambió (p. ej. en pruebas), se crea uno nuevo.
+
+    Returns:
+        Cliente httpx con pool de conexiones hacia backRag
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            base_url=BACKRAG_API_URL,
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+        _client_loop = loop
+
+    return _client
+
+
+async def post_anthropic(payload: Dict[str, Any], timeout: float = DEFAULT_TIMEOUT) -> httpx.Response:
+    """
+    Envía una consulta al endpoint /v1/anthropic de backRag.
+
+    Args:
+        payload: Cuerpo de la petición (context, pregunta, entidades, intencion...)
+        timeout: Segundos máximos de espera de la respuesta
+
+    Returns:
+        Respuesta HTTP de backRag
+
+    Raises:
+        httpx.HTTPError: Si falla la conexión o se agota el tiempo
+    """
+    return await get_client().post("/v1/anthropic", json=payload, timeout=timeout)
+
+
+async def close_client():
+    """Cierra el cliente compartido y sus conexiones."""
+    global _client
+
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
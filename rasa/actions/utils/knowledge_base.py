@@ -0,0 +1,374 @@
+"""
+Snapshot único e inmutable del conocimiento del dominio (NLU, responses y
+stories) que usan las acciones.
+
+Se construye una vez a partir de data/nlu.yml, data/responses.yml y
+data/openrouter/*.yml, con índices por intención (ejemplos, respuestas,
+stories e intenciones relacionadas) para que las consultas sean O(1). El
+resultado se guarda en una caché JSON junto con la firma de los archivos
+fuente (ruta, mtime y tamaño): al reiniciar, si la firma coincide, se carga
+la caché sin parsear YAML. La caché solo se lee si pertenece al usuario del
+proceso y nadie más puede escribirla.
+
+Si los archivos cambian, el siguiente get_snapshot() (como máximo cada
+KNOWLEDGE_RELOAD_INTERVAL segundos) construye un snapshot nuevo y lo
+reemplaza en una sola asignación: quien ya tiene el anterior lo sigue
+usando completo y nunca se ve un snapshot a medio construir. Si los YAML no
+se pueden parsear (por ejemplo, un archivo a medio guardar) se sigue usando
+el snapshot anterior hasta que vuelvan a cambiar.
+"""
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .intent_categorizer import INTENT_CATEGORIES
+
+
+# Directorio de los archivos de entrenamiento
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+# Caché del snapshot (vacío = .cache/knowledge.json dentro del directorio de Rasa)
+KNOWLEDGE_CACHE_PATH = os.getenv("KNOWLEDGE_CACHE_PATH", "")
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / ".cache" / "knowledge.json"
+
+# Segundos entre revisiones de cambios en los archivos (0 = en cada consulta, <0 = nunca)
+KNOWLEDGE_RELOAD_INTERVAL = float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL", "5"))
+
+# Versión del formato de la caché (cambiarla invalida las cachés existentes)
+CACHE_FORMAT_VERSION = 2
+
+
+def _congelar(valor: Any) -> Any:
+    """Convierte dicts y listas (recursivamente) en vistas de solo lectura y tuplas."""
+    if isinstance(valor, dict):
+        return MappingProxyType({clave: _congelar(v) for clave, v in valor.items()})
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+class KnowledgeSnapshot:
+    """
+    Conocimiento del dominio en un momento dado, con índices por intención.
+
+    Todas las colecciones son de solo lectura (MappingProxyType y tuplas).
+    """
+
+    __slots__ = (
+        'signature', 'source', 'built_at', 'intents', 'intents_by_name', 'intents_by_category',
+        'responses', 'responses_by_intent', 'stories', 'stories_by_intent', 'related_intents'
+    )
+
+    def __init__(self, signature: Tuple, source: str, payload: Dict[str, Any]):
+        """
+        Inicializa el snapshot a partir del contenido procesado.
+
+        Args:
+            signature: Firma de los archivos fuente
+            source: Origen del contenido ("yaml" o "cache")
+            payload: Contenido e índices construidos por _construir_payload()
+        """
+        self.signature = signature
+        self.source = source
+        self.built_at = time.time()
+        self.intents = _congelar(payload["intents"])
+        self.intents_by_name = MappingProxyType({intent["name"]: intent for intent in self.intents})
+        self.intents_by_category = _congelar(
+            {categoria: [self.intents_by_name[nombre] for nombre in nombres]
+             for categoria, nombres in payload["intents_by_category"].items()}
+        )
+        self.responses = _congelar(payload["responses"])
+        self.responses_by_intent = _congelar(payload["responses_by_intent"])
+        self.stories = _congelar(payload["stories"])
+        self.stories_by_intent = MappingProxyType({
+            intent: tuple(self.stories[i] for i in indices)
+            for intent, indices in payload["stories_by_intent"].items()
+        })
+        self.related_intents = _congelar(payload["related_intents"])
+
+    def get_intent(self, intent_name: str) -> Optional[Mapping[str, Any]]:
+        """Intención con sus ejemplos y descripción, o None si no existe."""
+        return self.intents_by_name.get(intent_name)
+
+    def get_examples(self, intent_name: str) -> Tuple[str, ...]:
+        """Ejemplos de entrenamiento de una intención."""
+        intent = self.intents_by_name.get(intent_name)
+        return intent["examples"] if intent else ()
+
+    def get_responses(self, intent_name: str) -> Mapping[str, str]:
+        """Respuestas asociadas a una intención {utter_name: texto}."""
+        respuestas = self.responses_by_intent.get(intent_name)
+        if respuestas is None:
+            # Intención que no está en el NLU ni en las categorías
+            respuestas = MappingProxyType(_respuestas_de_intencion(intent_name, self.responses))
+        return respuestas
+
+    def get_stories(self, intent_name: str) -> Tuple[Mapping[str, Any], ...]:
+        """Stories y rules que contienen la intención."""
+        return self.stories_by_intent.get(intent_name, ())
+
+    def get_related_intents(self, intent_name: str) -> Tuple[str, ...]:
+        """Intenciones que aparecen en las mismas stories que la intención."""
+        return self.related_intents.get(intent_name, ())
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamaño del snapshot y su origen."""
+        return {
+            "source": self.source,
+            "built_at": self.built_at,
+            "intents": len(self.intents),
+            "responses": len(self.responses),
+            "stories": len(self.stories)
+        }
+
+
+def _archivos_fuente() -> List[Path]:
+    """Archivos de los que se construye el snapshot."""
+    return [DATA_DIR / "nlu.yml", DATA_DIR / "responses.yml"] + sorted((DATA_DIR / "openrouter").glob("*.yml"))
+
+
+def _firma() -> Tuple:
+    """Firma de los archivos fuente: (ruta, mtime en ns, tamaño) de cada uno."""
+    firma = []
+    for ruta in _archivos_fuente():
+        try:
+            estado = ruta.stat()
+            firma.append((str(ruta), estado.st_mtime_ns, estado.st_size))
+        except OSError:
+            firma.append((str(ruta), None, None))
+    return tuple(firma)
+
+
+def _ruta_cache() -> Path:
+    """Ruta de la caché del snapshot."""
+    return Path(KNOWLEDGE_CACHE_PATH) if KNOWLEDGE_CACHE_PATH else DEFAULT_CACHE_PATH
+
+
+def _cache_confiable(ruta: Path, estado: os.stat_result) -> bool:
+    """La caché es del usuario del proceso y ni el grupo ni otros pueden escribirla."""
+    if hasattr(os, "getuid") and estado.st_uid != os.getuid():
+        print(f"⚠️ Caché de conocimiento ignorada ({ruta}): pertenece a otro usuario")
+        return False
+    if estado.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        print(f"⚠️ Caché de conocimiento ignorada ({ruta}): la pueden modificar otros usuarios")
+        return False
+    return True
+
+
+def _respuestas_de_intencion(intent_name: str, responses: Mapping[str, str]) -> Dict[str, str]:
+    """Respuestas utter_{intent} y las que contienen el nombre de la intención."""
+    esperado = f"utter_{intent_name}"
+    return {
+        utter_name: texto for utter_name, texto in responses.items()
+        if utter_name == esperado or intent_name in utter_name
+    }
+
+
+def _construir_payload(strict: bool = True) -> Dict[str, Any]:
+    """
+    Parsea los YAML y construye el contenido y los índices del snapshot.
+
+    Args:
+        strict: Lanzar excepción si algún archivo no se puede leer o parsear
+            (si no, los loaders retornan datos vacíos para ese archivo)
+
+    Returns:
+        Dict serializable (solo dicts, listas y strings)
+    """
+    from . import nlu_loader, responses_loader, stories_loader
+
+    intents = nlu_loader.parse_intents(nlu_loader.load_nlu_data(strict=strict))
+    responses = responses_loader.parse_responses(responses_loader.load_responses_data(strict=strict))
+    stories = stories_loader.parse_stories(stories_loader.load_stories_data(strict=strict))
+
+    nombres = [intent["name"] for intent in intents]
+    conocidos = set(nombres)
+    categorizados = set()
+    intents_by_category = {}
+    for categoria, intent_names in INTENT_CATEGORIES.items():
+        intents_by_category[categoria] = [nombre for nombre in nombres if nombre in intent_names]
+        categorizados.update(intent_names)
+    otros = [nombre for nombre in nombres if nombre not in categorizados]
+    if otros:
+        intents_by_category["otros"] = otros
+
+    stories_by_intent: Dict[str, List[int]] = {}
+    related: Dict[str, set] = {}
+    for indice, story in enumerate(stories):
+        for intent in dict.fromkeys(story["intents"]):
+            stories_by_intent.setdefault(intent, []).append(indice)
+            related.setdefault(intent, set()).update(i for i in story["intents"] if i != intent)
+
+    # Respuestas indexadas para todas las intenciones conocidas (NLU y categorías)
+    conocidos.update(categorizados)
+    return {
+        "intents": intents,
+        "intents_by_category": intents_by_category,
+        "responses": responses,
+        "responses_by_intent": {intent: _respuestas_de_intencion(intent, responses) for intent in sorted(conocidos)},
+        "stories": stories,
+        "stories_by_intent": stories_by_intent,
+        "related_intents": {intent: sorted(relacionados) for intent, relacionados in related.items()}
+    }
+
+
+def _leer_cache(firma: Tuple) -> Optional[Dict[str, Any]]:
+    """Carga el contenido de la caché si corresponde a la firma actual."""
+    ruta = _ruta_cache()
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            if not _cache_confiable(ruta, os.fstat(f.fileno())):
+                return None
+            datos = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Caché de conocimiento inválida ({ruta}): {e}")
+        return None
+
+    if not isinstance(datos, dict) or datos.get("version") != CACHE_FORMAT_VERSION:
+        return None
+    # JSON no tiene tuplas: la firma guardada vuelve como listas
+    if datos.get("signature") != [list(entrada) for entrada in firma]:
+        return None
+    return datos.get("payload")
+
+
+def _escribir_cache(firma: Tuple, payload: Dict[str, Any]):
+    """Guarda la caché de forma atómica (archivo temporal + os.replace)."""
+    ruta = _ruta_cache()
+    try:
+        ruta.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # mkstemp crea el archivo con permisos 0600
+        descriptor, temporal = tempfile.mkstemp(dir=str(ruta.parent), prefix=f".{ruta.name}.")
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump(
+                {"version": CACHE_FORMAT_VERSION, "signature": firma, "payload": payload},
+                f, ensure_ascii=False, separators=(',', ':')
+            )
+        os.replace(temporal, ruta)
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar la caché de conocimiento ({ruta}): {e}")
+
+
+def build_snapshot(use_cache: bool = True, strict: bool = True) -> KnowledgeSnapshot:
+    """
+    Construye un snapshot desde la caché o, si no coincide, desde los YAML.
+
+    Args:
+        use_cache: Leer y escribir la caché
+        strict: Lanzar excepción si algún YAML no se puede leer o parsear, en
+            vez de construir el snapshot con ese archivo vacío (un snapshot
+            no estricto nunca se guarda en la caché)
+
+    Returns:
+        Snapshot nuevo (no reemplaza el actual)
+    """
+    firma = _firma()
+    payload = _leer_cache(firma) if use_cache else None
+    if payload is not None:
+        try:
+            return KnowledgeSnapshot(firma, "cache", payload)
+        except Exception as e:
+            print(f"⚠️ Caché de conocimiento inválida ({_ruta_cache()}): {e}")
+
+    payload = _construir_payload(strict=strict)
+    # Si un archivo cambió mientras se leía, la firma no se guarda para no cachear una mezcla
+    if use_cache and strict and _firma() == firma:
+        _escribir_cache(firma, payload)
+    return KnowledgeSnapshot(firma, "yaml", payload)
+
+
+# Snapshot vigente, próxima revisión de cambios en los archivos y última
+# firma cuyo snapshot no se pudo construir (no se reintenta hasta que cambie)
+_snapshot: Optional[KnowledgeSnapshot] = None
+_proxima_revision = 0.0
+_firma_fallida: Optional[Tuple] = None
+_lock = threading.Lock()
+
+
+def _recargar(forzar: bool = False) -> KnowledgeSnapshot:
+    """
+    Construye y publica un snapshot nuevo si la firma cambió (o si se fuerza).
+
+    Si la construcción falla, o si los archivos cambian mientras se leen, se
+    sigue publicando el snapshot anterior. Solo sin snapshot anterior (al
+    iniciar) se publica uno con los archivos que sí se pudieron leer.
+    """
+    global _snapshot, _firma_fallida
+
+    with _lock:
+        actual = _snapshot
+        firma = _firma()
+        if actual is not None and not forzar and firma in (actual.signature, _firma_fallida):
+            return actual
+
+        inicio = time.perf_counter()
+        try:
+            nuevo = build_snapshot()
+        except Exception as e:
+            _firma_fallida = firma
+            if actual is not None:
+                print(
+                    f"❌ No se pudo recargar el conocimiento del dominio: {e}. "
+                    f"Se sigue usando el snapshot anterior ({len(actual.intents)} intenciones)"
+                )
+                return actual
+            print(f"❌ Error al cargar el conocimiento del dominio: {e}. Se inicia con los datos que se pudieron leer")
+            nuevo = build_snapshot(use_cache=False, strict=False)
+        else:
+            if actual is not None and _firma() != nuevo.signature:
+                # Archivo a medio guardar: se reintenta en la próxima revisión
+                print("⚠️ Los archivos del dominio cambiaron durante la recarga; se sigue usando el snapshot anterior")
+                return actual
+            _firma_fallida = None
+
+        _snapshot = nuevo
+        stats = nuevo.stats()
+        print(
+            f"✅ Conocimiento del dominio cargado desde {nuevo.source} en "
+            f"{(time.perf_counter() - inicio) * 1000:.1f} ms: {stats['intents']} intenciones, "
+            f"{stats['responses']} respuestas, {stats['stories']} stories"
+        )
+        return nuevo
+
+
+def get_snapshot() -> KnowledgeSnapshot:
+    """
+    Retorna el snapshot vigente, recargándolo si los archivos fuente cambiaron.
+
+    Los cambios se revisan como máximo cada KNOWLEDGE_RELOAD_INTERVAL segundos
+    (un stat por archivo).
+
+    Returns:
+        Snapshot inmutable del conocimiento del dominio
+    """
+    global _proxima_revision
+
+    snapshot = _snapshot
+    if snapshot is None:
+        return _recargar()
+
+    if KNOWLEDGE_RELOAD_INTERVAL >= 0:
+        ahora = time.monotonic()
+        if ahora >= _proxima_revision:
+            _proxima_revision = ahora + KNOWLEDGE_RELOAD_INTERVAL
+            if _firma() != snapshot.signature:
+                return _recargar()
+
+    return snapshot
+
+
+def reload() -> KnowledgeSnapshot:
+    """Reconstruye el snapshot desde los YAML aunque los archivos no hayan cambiado."""
+    try:
+        os.remove(_ruta_cache())
+    except OSError:
+        pass
+    return _recargar(forzar=True)
@@ -1,41 +1,58 @@
 """
 Carga y parsea data/nlu.yml para extraer intenciones y sus ejemplos.
+
+Las consultas leen el snapshot de knowledge_base (construido una vez e
+indexado por intención); load_nlu_data y parse_intents son el parseo del
+YAML que usa ese snapshot.
 """
 import yaml
-from pathlib import Path
 from typing import Dict, List, Any
 
+from . import knowledge_base
+
 
-def load_nlu_data() -> Dict[str, Any]:
+def load_nlu_data(strict: bool = False) -> Dict[str, Any]:
     """
     Carga el archivo data/nlu.yml y retorna el contenido parseado.
 
+    Args:
+        strict: Propagar los errores de lectura o de formato en vez de
+            retornar datos vacíos (lo usa el snapshot de conocimiento)
+
     Returns:
         Dict con el contenido del archivo NLU
     """
-    nlu_path = Path(__file__).parent.parent.parent / "data" / "nlu.yml"
+    nlu_path = knowledge_base.DATA_DIR / "nlu.yml"
 
     try:
         with open(nlu_path, 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f)
-            return data
+        if not isinstance(data, dict) or not isinstance(data.get("nlu"), list):
+            raise ValueError(f"{nlu_path} no tiene la sección 'nlu'")
+        return data
     except FileNotFoundError:
+        if strict:
+            raise
         print(f"⚠️ Archivo NLU no encontrado en: {nlu_path}")
         return {"nlu": []}
     except Exception as e:
+        if strict:
+            raise
         print(f"❌ Error al cargar NLU: {e}")
         return {"nlu": []}
 
 
-def get_all_intents() -> List[Dict[str, Any]]:
+def parse_intents(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
-    Obtiene todas las intenciones con sus ejemplos.
+    Extrae las intenciones y sus ejemplos del contenido de nlu.yml.
+
+    Args:
+        data: Contenido parseado de nlu.yml
 
     Returns:
-        Lista de diccionarios con {name, examples}
+        Lista de diccionarios con {name, examples, description}
     """
-    data = load_nlu_data()
-    nlu_items = data.get("nlu", [])
+    nlu_items = (data or {}).get("nlu", []) or []
 
     intents = []
     for item in nlu_items:
@@ -58,6 +75,16 @@ def get_all_intents() -> List[Dict[str, Any]]:
     return intents
 
 
+def get_all_intents() -> List[Dict[str, Any]]:
+    """
+    Obtiene todas las intenciones con sus ejemplos.
+
+    Returns:
+        Lista de intenciones {name, examples, description} (de solo lectura)
+    """
+    return list(knowledge_base.get_snapshot().intents)
+
+
 def get_intent_by_name(intent_name: str) -> Dict[str, Any]:
     """
     Obtiene información de una intención específica.
@@ -68,39 +95,19 @@ def get_intent_by_name(intent_name: str) -> Dict[str, Any]:
     Returns:
         Dict con {name, examples, description} o None si no existe
     """
-    all_intents = get_all_intents()
-    for intent in all_intents:
-        if intent["name"] == intent_name:
-            return intent
-    return None
+    return knowledge_base.get_snapshot().get_intent(intent_name)
 
 
 def get_all_intents_by_category() -> Dict[str, List[Dict[str, Any]]]:
     """
     Obtiene todas las intenciones organizadas por categoría.
 
+    Las intenciones que no están en INTENT_CATEGORIES van en "otros".
+
     Returns:
         Dict con categorías como keys y lista de intents como values
     """
-    from .intent_categorizer import INTENT_CATEGORIES
-
-    all_intents = get_all_intents()
-    categorized = {}
-
-    for categoria, intent_names in INTENT_CATEGORIES.items():
-        categorized[categoria] = []
-        for intent in all_intents:
-            if intent["name"] in intent_names:
-                categorized[categoria].append(intent)
-
-    # Agregar intents no categorizados
-    categorized_intent_names = [name for names in INTENT_CATEGORIES.values() for name in names]
-    uncategorized = [intent for intent in all_intents if intent["name"] not in categorized_intent_names]
-
-    if uncategorized:
-        categorized["otros"] = uncategorized
-
-    return categorized
+    return knowledge_base.get_snapshot().intents_by_category
 
 
 def _generate_description(intent_name: str, examples: List[str]) -> str:
@@ -126,14 +133,8 @@ def _generate_description(intent_name: str, examples: List[str]) -> str:
     return description
 
 
-# Cache para evitar recargar el archivo en cada llamada
-_cached_intents = None
-
 def get_all_intents_cached() -> List[Dict[str, Any]]:
     """
-    Versión cacheada de get_all_intents para mejor performance.
+    Versión cacheada de get_all_intents (se conserva por compatibilidad).
     """
-    global _cached_intents
-    if _cached_intents is None:
-        _cached_intents = get_all_intents()
-    return _cached_intents
+    return knowledge_base.get_snapshot().intents
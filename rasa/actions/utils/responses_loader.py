@@ -1,41 +1,58 @@
 """
 Carga y parsea data/responses.yml para extraer respuestas asociadas a intenciones.
+
+Las consultas leen el snapshot de knowledge_base (construido una vez e
+indexado por intención); load_responses_data y parse_responses son el parseo
+del YAML que usa ese snapshot.
 """
 import yaml
-from pathlib import Path
 from typing import Dict, List, Any
 
+from . import knowledge_base
+
 
-def load_responses_data() -> Dict[str, Any]:
+def load_responses_data(strict: bool = False) -> Dict[str, Any]:
     """
     Carga el archivo data/responses.yml y retorna el contenido parseado.
 
+    Args:
+        strict: Propagar los errores de lectura o de formato en vez de
+            retornar datos vacíos (lo usa el snapshot de conocimiento)
+
     Returns:
         Dict con el contenido del archivo responses
     """
-    responses_path = Path(__file__).parent.parent.parent / "data" / "responses.yml"
+    responses_path = knowledge_base.DATA_DIR / "responses.yml"
 
     try:
         with open(responses_path, 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f)
-            return data
+        if not isinstance(data, dict) or not isinstance(data.get("responses"), dict):
+            raise ValueError(f"{responses_path} no tiene la sección 'responses'")
+        return data
     except FileNotFoundError:
+        if strict:
+            raise
         print(f"⚠️ Archivo responses no encontrado en: {responses_path}")
         return {"responses": {}}
     except Exception as e:
+        if strict:
+            raise
         print(f"❌ Error al cargar responses: {e}")
         return {"responses": {}}
 
 
-def get_all_responses() -> Dict[str, Any]:
+def parse_responses(data: Dict[str, Any]) -> Dict[str, str]:
     """
-    Obtiene todas las respuestas del archivo.
+    Extrae el texto de cada respuesta del contenido de responses.yml.
+
+    Args:
+        data: Contenido parseado de responses.yml
 
     Returns:
-        Dict con todas las respuestas {utter_name: content}
+        Dict con todas las respuestas {utter_name: texto}
     """
-    data = load_responses_data()
-    responses = data.get("responses", {})
+    responses = (data or {}).get("responses", {}) or {}
 
     # Procesar cada response para extraer el texto
     processed_responses = {}
@@ -53,12 +70,23 @@ def get_all_responses() -> Dict[str, Any]:
     return processed_responses
 
 
+def get_all_responses() -> Dict[str, Any]:
+    """
+    Obtiene todas las respuestas del archivo.
+
+    Returns:
+        Dict con todas las respuestas {utter_name: content} (de solo lectura)
+    """
+    return knowledge_base.get_snapshot().responses
+
+
 def get_responses_for_intent(intent_name: str) -> Dict[str, str]:
     """
     Obtiene las respuestas asociadas a una intención específica.
 
-    Busca respuestas que coincidan con el patrón: utter_{intent_name}
-    También busca variaciones comunes.
+    Incluye utter_{intent_name} y las respuestas cuyo nombre contiene la
+    intención (para casos como multa_exceso_velocidad), precalculadas en el
+    snapshot.
 
     Args:
         intent_name: Nombre de la intención (ej: tipos_multa)
@@ -66,21 +94,7 @@ def get_responses_for_intent(intent_name: str) -> Dict[str, str]:
     Returns:
         Dict con {utter_name: response_text}
     """
-    all_responses = get_all_responses()
-    intent_responses = {}
-
-    # Buscar respuestas exactas
-    expected_utter_name = f"utter_{intent_name}"
-
-    for utter_name, response_text in all_responses.items():
-        # Coincidencia exacta
-        if utter_name == expected_utter_name:
-            intent_responses[utter_name] = response_text
-        # Coincidencia parcial (para casos como multa_exceso_velocidad)
-        elif intent_name in utter_name:
-            intent_responses[utter_name] = response_text
-
-    return intent_responses
+    return knowledge_base.get_snapshot().get_responses(intent_name)
 
 
 def get_responses_by_category(category: str, intent_names: List[str]) -> Dict[str, str]:
@@ -131,7 +145,7 @@ def search_responses_by_keyword(keyword: str) -> Dict[str, str]:
     Returns:
         Dict con respuestas que contienen la keyword
     """
-    all_responses = get_all_responses()
+    all_responses = knowledge_base.get_snapshot().responses
     matching_responses = {}
 
     keyword_lower = keyword.lower()
@@ -143,23 +157,15 @@ def search_responses_by_keyword(keyword: str) -> Dict[str, str]:
     return matching_responses
 
 
-# Cache para evitar recargar el archivo en cada llamada
-_cached_responses = None
-
-
 def get_all_responses_cached() -> Dict[str, str]:
     """
-    Versión cacheada de get_all_responses para mejor performance.
+    Versión cacheada de get_all_responses (se conserva por compatibilidad).
     """
-    global _cached_responses
-    if _cached_responses is None:
-        _cached_responses = get_all_responses()
-    return _cached_responses
+    return knowledge_base.get_snapshot().responses
 
 
 def clear_cache():
     """
-    Limpia el cache de responses. Útil para testing o hot-reload.
+    Reconstruye el snapshot de conocimiento desde los YAML. Útil para testing o hot-reload.
     """
-    global _cached_responses
-    _cached_responses = None
+    knowledge_base.reload()
@@ -1,30 +1,43 @@
 """
 Carga y parsea data/openrouter/*.yml para extraer stories y rules.
+
+Las consultas leen el snapshot de knowledge_base (construido una vez e
+indexado por intención); load_stories_data y parse_stories son el parseo del
+YAML que usa ese snapshot.
 """
 import yaml
 from pathlib import Path
 from typing import Dict, List, Any
 import glob
 
+from . import knowledge_base
+
 
-def load_stories_data() -> List[Dict[str, Any]]:
+def load_stories_data(strict: bool = False) -> List[Dict[str, Any]]:
     """
     Carga todos los archivos de stories en data/openrouter/*.yml
 
+    Args:
+        strict: Propagar los errores de lectura o de formato en vez de
+            retornar las stories leídas hasta el error (lo usa el snapshot
+            de conocimiento)
+
     Returns:
         Lista de stories parseadas
     """
-    stories_path = Path(__file__).parent.parent.parent / "data" / "openrouter"
+    stories_path = knowledge_base.DATA_DIR / "openrouter"
     all_stories = []
 
     try:
         # Buscar todos los archivos .yml en data/openrouter/
         pattern = str(stories_path / "*.yml")
-        story_files = glob.glob(pattern)
+        story_files = sorted(glob.glob(pattern))
 
         for file_path in story_files:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = yaml.safe_load(f)
+                if not isinstance(data, dict):
+                    raise ValueError(f"{file_path} está vacío o no es un mapeo YAML")
 
                 # Extraer stories
                 if "stories" in data:
@@ -47,19 +60,23 @@ def load_stories_data() -> List[Dict[str, Any]]:
                         })
 
     except Exception as e:
+        if strict:
+            raise
         print(f"❌ Error al cargar stories: {e}")
 
     return all_stories
 
 
-def get_all_stories() -> List[Dict[str, Any]]:
+def parse_stories(raw_stories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Obtiene todas las stories con información procesada.
+    Procesa las stories crudas: pasos legibles, intenciones, acciones y flujo.
+
+    Args:
+        raw_stories: Stories y rules de load_stories_data()
 
     Returns:
         Lista de diccionarios con información de stories
     """
-    raw_stories = load_stories_data()
     processed_stories = []
 
     for story in raw_stories:
@@ -77,6 +94,16 @@ def get_all_stories() -> List[Dict[str, Any]]:
     return processed_stories
 
 
+def get_all_stories() -> List[Dict[str, Any]]:
+    """
+    Obtiene todas las stories con información procesada.
+
+    Returns:
+        Lista de stories (de solo lectura)
+    """
+    return list(knowledge_base.get_snapshot().stories)
+
+
 def get_stories_for_intent(intent_name: str) -> List[Dict[str, Any]]:
     """
     Obtiene todas las stories que contienen una intención específica.
@@ -87,14 +114,7 @@ def get_stories_for_intent(intent_name: str) -> List[Dict[str, Any]]:
     Returns:
         Lista de stories que incluyen esa intención
     """
-    all_stories = get_all_stories()
-    matching_stories = []
-
-    for story in all_stories:
-        if intent_name in story["intents"]:
-            matching_stories.append(story)
-
-    return matching_stories
+    return list(knowledge_base.get_snapshot().get_stories(intent_name))
 
 
 def get_related_intents_from_stories(intent_name: str) -> List[str]:
@@ -105,17 +125,9 @@ def get_related_intents_from_stories(intent_name: str) -> List[str]:
         intent_name: Nombre de la intención
 
     Returns:
-        Lista de intenciones que aparecen en las mismas stories
+        Lista ordenada de intenciones que aparecen en las mismas stories
     """
-    stories_with_intent = get_stories_for_intent(intent_name)
-    related_intents = set()
-
-    for story in stories_with_intent:
-        for intent in story["intents"]:
-            if intent != intent_name:
-                related_intents.add(intent)
-
-    return list(related_intents)
+    return list(knowledge_base.get_snapshot().get_related_intents(intent_name))
 
 
 def _extract_step_descriptions(steps: List[Dict[str, Any]]) -> List[str]:
@@ -205,27 +217,19 @@ def get_stories_by_type(story_type: str) -> List[Dict[str, Any]]:
     Returns:
         Lista de stories del tipo especificado
     """
-    all_stories = get_all_stories()
+    all_stories = knowledge_base.get_snapshot().stories
     return [story for story in all_stories if story["type"] == story_type]
 
 
-# Cache para evitar recargar archivos en cada llamada
-_cached_stories = None
-
-
 def get_all_stories_cached() -> List[Dict[str, Any]]:
     """
-    Versión cacheada de get_all_stories para mejor performance.
+    Versión cacheada de get_all_stories (se conserva por compatibilidad).
     """
-    global _cached_stories
-    if _cached_stories is None:
-        _cached_stories = get_all_stories()
-    return _cached_stories
+    return knowledge_base.get_snapshot().stories
 
 
 def clear_cache():
     """
-    Limpia el cache de stories. Útil para testing o hot-reload.
+    Reconstruye el snapshot de conocimiento desde los YAML. Útil para testing o hot-reload.
     """
-    global _cached_stories
-    _cached_stories = None
+    knowledge_base.reload()
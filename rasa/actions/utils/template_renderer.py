@@ -1,21 +1,36 @@
 """
 Motor de renderizado de templates Jinja2 para generar contextos dinámicos.
+
+Los templates se compilan una vez (con caché de bytecode en disco para los
+reinicios) y, sin auto_reload, no se vuelve a revisar el archivo en cada
+render. Las intenciones categorizadas del fallback salen del snapshot de
+knowledge_base en lugar de releer el NLU en cada turno.
 """
-from jinja2 import Environment, FileSystemLoader, Template, TemplateNotFound
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, TemplateNotFound
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import os
 
+from . import intent_categorizer, knowledge_base
+
 
 # Configurar el environment de Jinja2
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
 
+# Revisar en cada render si el template cambió en disco (solo para desarrollo)
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+
+# Directorio de la caché de bytecode de los templates (vacío = directorio temporal del sistema)
+TEMPLATE_BYTECODE_CACHE_DIR = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR", "")
+
 # Crear environment con configuración personalizada
 jinja_env = Environment(
     loader=FileSystemLoader(str(TEMPLATES_DIR)),
     autoescape=False,  # No escapar HTML ya que generamos texto plano
     trim_blocks=True,  # Eliminar primer newline después de bloque
-    lstrip_blocks=True  # Eliminar espacios antes de bloques
+    lstrip_blocks=True,  # Eliminar espacios antes de bloques
+    auto_reload=TEMPLATE_AUTO_RELOAD,
+    bytecode_cache=FileSystemBytecodeCache(TEMPLATE_BYTECODE_CACHE_DIR or None)
 )
 
 
@@ -67,6 +82,61 @@ def render_template_string(template_string: str, context: Dict[str, Any]) -> str
         return ""
 
 
+def list_known_intents() -> List[str]:
+    """
+    Intenciones del NLU y de las categorías.
+
+    Returns:
+        Lista ordenada de nombres de intenciones
+    """
+    intent_names = set(knowledge_base.get_snapshot().intents_by_name)
+    for category in intent_categorizer.get_all_categories():
+        intent_names.update(intent_categorizer.get_intents_in_category(category))
+    return sorted(intent_names)
+
+
+def warm_up() -> Dict[str, int]:
+    """
+    Compila los templates y revisa que exista el template de cada intención.
+
+    Se llama una vez al iniciar el action server (al importar actions.py).
+
+    Returns:
+        Dict con el número de templates compilados e intenciones revisadas
+    """
+    templates = 0
+    for template_name in list_available_templates():
+        try:
+            jinja_env.get_template(template_name)
+            templates += 1
+        except Exception as e:
+            print(f"❌ Error al compilar template {template_name}: {e}")
+
+    intent_names = list_known_intents()
+    missing: Dict[str, List[str]] = {}
+    for intent_name in intent_names:
+        template_name = intent_categorizer.get_template_for_intent(intent_name)
+        if not template_exists(template_name):
+            missing.setdefault(template_name, []).append(intent_name)
+
+    # Estas intenciones usarán el texto de respaldo de _render_fallback_template
+    for template_name, intent_list in missing.items():
+        print(f"⚠️ Template no encontrado: {template_name} ({len(intent_list)} intenciones, ej: {intent_list[0]})")
+
+    print(f"✅ Templates compilados: {templates}, intenciones revisadas: {len(intent_names)}")
+    return {"templates": templates, "intents": len(intent_names)}
+
+
+def get_categorized_intents() -> Dict[str, list]:
+    """
+    Obtiene las intenciones organizadas por categoría (índice del snapshot de conocimiento).
+
+    Returns:
+        Dict con categorías como keys y lista de intents como values
+    """
+    return knowledge_base.get_snapshot().intents_by_category
+
+
 def get_context_for_intent(
     intent_name: str,
     confidence: float,
@@ -97,7 +167,7 @@ def get_context_for_intent(
 def get_context_for_fallback(
     user_question: str,
     tracking: str,
-    categorized_intents: Dict[str, list],
+    categorized_intents: Optional[Dict[str, list]] = None,
     intent_name: Optional[str] = None,
     confidence: float = 0.0
 ) -> Dict[str, Any]:
@@ -108,13 +178,16 @@ def get_context_for_fallback(
         user_question: Pregunta del usuario
         tracking: Historial de conversación
         categorized_intents: Intenciones organizadas por categoría
-        all_stories: Todas las historias disponibles
+                             (None = las del snapshot de conocimiento)
         intent_name: Intención detectada (opcional)
         confidence: Confianza de la clasificación
 
     Returns:
         Dict con el contexto completo
     """
+    if categorized_intents is None:
+        categorized_intents = get_categorized_intents()
+
     return {
         "user_question": user_question,
         "tracking_conversacion": tracking,
@@ -0,0 +1,158 @@
+"""
+Construcción incremental del historial de conversación (Usuario/Bot) que las
+acciones envían al LLM.
+
+Rasa envía el tracker completo en cada llamada a una acción. En lugar de
+recorrer y filtrar los eventos en cada turno, se guarda por conversación
+(sender_id) cuántos eventos ya se procesaron y solo se agregan los mensajes
+user/bot nuevos. La ventana se limita por tokens (no por número de eventos):
+se conservan los mensajes más recientes que quepan en el presupuesto.
+"""
+import os
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from rasa_sdk import Tracker
+
+
+# Tokens máximos del historial (estimados como caracteres / 4). Va en
+# context.user y backRag lo compacta si supera su CONTEXT_TOKEN_BUDGET (600)
+TRANSCRIPT_MAX_TOKENS = int(os.getenv("TRANSCRIPT_MAX_TOKENS", "2000"))
+
+# Tokens máximos del historial que se incrusta en las plantillas del system
+# prompt (backRag no compacta el system)
+TRANSCRIPT_TEMPLATE_MAX_TOKENS = int(os.getenv("TRANSCRIPT_TEMPLATE_MAX_TOKENS", "400"))
+
+# Conversaciones cuyo historial se mantiene en memoria (LRU)
+TRANSCRIPT_MAX_SENDERS = int(os.getenv("TRANSCRIPT_MAX_SENDERS", "1000"))
+
+# Prefijo de cada tipo de evento en el historial
+PREFIJOS = {"user": "Usuario", "bot": "Bot"}
+
+
+def estimate_tokens(texto: str) -> int:
+    """Estimación de tokens de un texto (caracteres / 4, mínimo 1)."""
+    return max(1, len(texto) // 4)
+
+
+class _Transcript:
+    """Historial de una conversación: líneas dentro de la ventana y texto renderizado."""
+
+    __slots__ = ('eventos_procesados', 'ultimo_timestamp', 'lineas', 'tokens', 'texto')
+
+    def __init__(self):
+        self.eventos_procesados = 0
+        self.ultimo_timestamp = None
+        self.lineas: Deque[Tuple[str, int]] = deque()
+        self.tokens = 0
+        self.texto: Optional[str] = ""
+
+
+# Historiales por sender_id
+_transcripts: "OrderedDict[str, _Transcript]" = OrderedDict()
+
+
+def _agregar_eventos(transcript: _Transcript, eventos: List[Dict[str, Any]], max_tokens: int):
+    """Agrega las líneas de los eventos user/bot y recorta la ventana por tokens."""
+    for event in eventos:
+        prefijo = PREFIJOS.get(event.get("event"))
+        texto = event.get("text") or ""
+        if prefijo is None or not texto.strip():
+            continue
+
+        linea = f"{prefijo}: {texto}"
+        tokens = estimate_tokens(linea)
+        transcript.lineas.append((linea, tokens))
+        transcript.tokens += tokens
+        transcript.texto = None
+
+    # Descartar las líneas más antiguas; la última siempre se conserva
+    while transcript.tokens > max_tokens and len(transcript.lineas) > 1:
+        _, tokens = transcript.lineas.popleft()
+        transcript.tokens -= tokens
+        transcript.texto = None
+
+
+def _es_continuacion(transcript: _Transcript, eventos: List[Dict[str, Any]]) -> bool:
+    """Indica si los eventos extienden los ya procesados (misma conversación, sin reinicio)."""
+    procesados = transcript.eventos_procesados
+    if procesados == 0:
+        return True
+    if len(eventos) < procesados:
+        return False
+    return eventos[procesados - 1].get("timestamp") == transcript.ultimo_timestamp
+
+
+def build_transcript(tracker: Tracker, max_tokens: Optional[int] = None) -> str:
+    """
+    Retorna el historial de la conversación con formato Usuario/Bot alternado.
+
+    Solo procesa los eventos posteriores a la llamada anterior de la misma
+    conversación. Si los eventos no continúan los ya procesados (p. ej. tras
+    un /restart), el historial se reconstruye. Las líneas que ya salieron de
+    la ventana no se recuperan si después se pide una ventana mayor.
+
+    Args:
+        tracker: Tracker de la conversación
+        max_tokens: Tokens máximos del historial (None = TRANSCRIPT_MAX_TOKENS)
+
+    Returns:
+        String con un mensaje por línea, o vacío si no hay mensajes
+    """
+    max_tokens = TRANSCRIPT_MAX_TOKENS if max_tokens is None else max_tokens
+    eventos = tracker.events
+
+    transcript = _transcripts.get(tracker.sender_id)
+    if transcript is None or not _es_continuacion(transcript, eventos):
+        transcript = _Transcript()
+        _transcripts[tracker.sender_id] = transcript
+    _transcripts.move_to_end(tracker.sender_id)
+    while len(_transcripts) > TRANSCRIPT_MAX_SENDERS:
+        _transcripts.popitem(last=False)
+
+    if len(eventos) > transcript.eventos_procesados:
+        _agregar_eventos(transcript, eventos[transcript.eventos_procesados:], max_tokens)
+        transcript.eventos_procesados = len(eventos)
+        transcript.ultimo_timestamp = eventos[-1].get("timestamp")
+    elif transcript.tokens > max_tokens:
+        _agregar_eventos(transcript, [], max_tokens)
+
+    if transcript.texto is None:
+        transcript.texto = "\n".join(linea for linea, _ in transcript.lineas)
+    return transcript.texto
+
+
+def transcript_tail(tracker: Tracker, max_tokens: Optional[int] = None) -> str:
+    """
+    Retorna los mensajes más recientes del historial que quepan en max_tokens.
+
+    A diferencia de build_transcript con una ventana menor, no descarta
+    líneas del historial guardado de la conversación.
+
+    Args:
+        tracker: Tracker de la conversación
+        max_tokens: Tokens máximos (None = TRANSCRIPT_TEMPLATE_MAX_TOKENS)
+
+    Returns:
+        String con un mensaje por línea (al menos el último), o vacío si no hay mensajes
+    """
+    max_tokens = TRANSCRIPT_TEMPLATE_MAX_TOKENS if max_tokens is None else max_tokens
+    texto = build_transcript(tracker)
+
+    transcript = _transcripts[tracker.sender_id]
+    if transcript.tokens <= max_tokens:
+        return texto
+
+    lineas: List[str] = []
+    tokens = 0
+    for linea, tokens_linea in reversed(transcript.lineas):
+        if lineas and tokens + tokens_linea > max_tokens:
+            break
+        lineas.append(linea)
+        tokens += tokens_linea
+    return "\n".join(reversed(lineas))
+
+
+def clear_cache():
+    """Descarta los historiales en memoria."""
+    _transcripts.clear()
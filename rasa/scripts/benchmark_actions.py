@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de las custom actions que consultan a backRag.
+
+Ejecuta N acciones con C en vuelo sobre el ActionExecutor de rasa_sdk, igual
+que el webhook del action server (un solo proceso y un solo event loop),
+contra un backRag simulado que responde /v1/anthropic después de una
+latencia fija. Reporta:
+- throughput (acciones/s) y latencia p50/p95 por acción
+- máximo de peticiones simultáneas que llegaron a backRag
+- conexiones TCP abiertas hacia backRag
+
+Con `requests.post` en un `run` síncrono las acciones se ejecutan de a una
+(el loop queda bloqueado durante cada llamada); con `run` async y el cliente
+compartido se solapan y reutilizan conexiones.
+
+Para comparar con la versión anterior de las acciones:
+    git worktree add /tmp/acciones-antes <commit-anterior>
+    python scripts/benchmark_actions.py --actions-dir /tmp/acciones-antes/rasa/actions
+    python scripts/benchmark_actions.py
+
+Uso:
+    python scripts/benchmark_actions.py [--acciones 100] [--concurrencia 50] [--latencia 0.5]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+RASA_DIR = Path(__file__).resolve().parent.parent
+RESPUESTA = {"answer": "Respuesta simulada de backRag", "model_used": "stub", "processing_time": 0.0}
+# Intent del último mensaje con el que cada acción llama a backRag
+INTENCIONES = {"action_enviar_informacion": "afirmar"}
+
+
+class BackRagSimulado:
+    """
+    Servidor HTTP/1.1 mínimo (keep-alive) que simula POST /api/v1/anthropic.
+
+    Corre en su propio hilo y event loop para seguir respondiendo aunque una
+    acción síncrona bloquee el loop del action server. También acepta
+    peticiones en forma absoluta (como proxy HTTP), así las acciones
+    anteriores, con la URL de backRag fija en el código, llegan a él
+    mediante la variable de entorno http_proxy.
+    """
+
+    def __init__(self, latencia: float):
+        self.latencia = latencia
+        self.conexiones = 0
+        self.en_vuelo = 0
+        self.max_en_vuelo = 0
+        self.peticiones = 0
+        self.puerto = None
+        self._listo = threading.Event()
+        self._loop = None
+
+    def iniciar(self):
+        threading.Thread(target=self._correr, daemon=True).start()
+        self._listo.wait()
+
+    def _correr(self):
+        self._loop = asyncio.new_event_loop()
+        servidor = self._loop.run_until_complete(asyncio.start_server(self._atender, "127.0.0.1", 0))
+        self.puerto = servidor.sockets[0].getsockname()[1]
+        self._listo.set()
+        self._loop.run_forever()
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.conexiones += 1
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                cabeceras = {}
+                while True:
+                    cabecera = await reader.readline()
+                    if cabecera in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = cabecera.decode("latin-1").partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                await reader.readexactly(int(cabeceras.get("content-length", 0)))
+
+                self.peticiones += 1
+                self.en_vuelo += 1
+                self.max_en_vuelo = max(self.max_en_vuelo, self.en_vuelo)
+                await asyncio.sleep(self.latencia)
+                self.en_vuelo -= 1
+
+                cuerpo = json.dumps({**RESPUESTA, "processing_time": self.latencia}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(cuerpo)}\r\n\r\n".encode() + cuerpo
+                )
+                await writer.drain()
+                if cabeceras.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def llamada_accion(accion: str, i: int) -> Dict:
+    """Cuerpo del webhook de una acción, como lo envía el servidor de Rasa."""
+    texto = f"¿Cuál es la multa por pasarse un semáforo en rojo? ({i})"
+    latest_message = {
+        "text": texto,
+        "intent": {"name": INTENCIONES.get(accion, "consulta_codigo_transito"), "confidence": 0.92},
+        "entities": []
+    }
+    return {
+        "next_action": accion,
+        "sender_id": f"carga-{i}",
+        "tracker": {
+            "sender_id": f"carga-{i}",
+            "slots": {"accion_elegida": "pagar", "tipo_infraccion": "semáforo en rojo"},
+            "latest_message": latest_message,
+            "events": [
+                {"event": "user", "text": "Hola", "parse_data": latest_message},
+                {"event": "bot", "text": "¡Hola! ¿En qué te puedo ayudar?"},
+                {"event": "user", "text": texto, "parse_data": latest_message}
+            ],
+            "paused": False,
+            "followup_action": None,
+            "active_loop": {},
+            "latest_action_name": "action_listen"
+        },
+        "domain": {}
+    }
+
+
+async def ejecutar_carga(executor, accion: str, total: int, concurrencia: int) -> List[float]:
+    """Ejecuta las acciones con un máximo de `concurrencia` en vuelo; retorna la latencia de cada una."""
+    semaforo = asyncio.Semaphore(concurrencia)
+    latencias = []
+
+    async def una(i: int):
+        async with semaforo:
+            inicio = time.perf_counter()
+            await executor.run(llamada_accion(accion, i))
+            latencias.append(time.perf_counter() - inicio)
+
+    await asyncio.gather(*(una(i) for i in range(total)))
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--actions-dir", default=str(RASA_DIR / "actions"), help="Paquete de acciones a probar")
+    parser.add_argument("--accion", default="action_consultar_con_openrouter", help="Acción a ejecutar")
+    parser.add_argument("--acciones", type=int, default=100, help="Número total de acciones")
+    parser.add_argument("--concurrencia", type=int, default=50, help="Acciones en vuelo a la vez")
+    parser.add_argument("--latencia", type=float, default=0.5, help="Segundos que tarda backRag en responder")
+    args = parser.parse_args()
+
+    backrag = BackRagSimulado(args.latencia)
+    backrag.iniciar()
+    os.environ["BACKRAG_API_URL"] = f"http://127.0.0.1:{backrag.puerto}/api"
+    # Solo las acciones con la URL fija usan el proxy; el cliente compartido va directo
+    os.environ["http_proxy"] = f"http://127.0.0.1:{backrag.puerto}"
+    os.environ["no_proxy"] = "127.0.0.1"
+
+    actions_dir = Path(args.actions_dir).resolve()
+    sys.path.insert(0, str(actions_dir.parent))
+    from rasa_sdk.executor import ActionExecutor
+
+    executor = ActionExecutor()
+    executor.register_package(actions_dir.name)
+
+    async def correr():
+        # Calentamiento: carga de templates, NLU y stories (cachés de los loaders)
+        await executor.run(llamada_accion(args.accion, -1))
+        backrag.conexiones = backrag.peticiones = backrag.max_en_vuelo = 0
+        inicio = time.perf_counter()
+        latencias = await ejecutar_carga(executor, args.accion, args.acciones, args.concurrencia)
+        return latencias, time.perf_counter() - inicio
+
+    # Las acciones imprimen el prompt completo en cada llamada
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencias, total = asyncio.run(correr())
+
+    latencias.sort()
+    print(f"\n=== CARGA DE ACCIONES ({args.accion}, {actions_dir}) ===")
+    print(f"acciones: {args.acciones} | concurrencia: {args.concurrencia} | latencia backRag: {args.latencia:.2f}s")
+    print(f"tiempo total: {total:.2f}s | throughput: {args.acciones / total:.1f} acciones/s")
+    print(
+        f"latencia por acción p50/p95: {statistics.median(latencias):.2f}/"
+        f"{latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))]:.2f}s"
+    )
+    print(f"máximo en vuelo hacia backRag: {backrag.max_en_vuelo} | conexiones abiertas: {backrag.conexiones}")
+
+
+if __name__ == "__main__":
+    main()
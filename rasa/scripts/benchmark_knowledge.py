@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark del snapshot de conocimiento del dominio (actions/utils/knowledge_base.py).
+
+Trabaja sobre una copia de data/ en un directorio temporal; además de
+data/openrouter/*.yml copia data/stories.yml y data/rules.yml a openrouter/
+para que haya stories que indexar. Reporta:
+- construcción del snapshot parseando YAML vs cargando la caché
+- µs por consulta por intención: búsqueda lineal (como hacían los loaders)
+  vs índices del snapshot
+- tiempo hasta que una modificación de nlu.yml se ve en get_snapshot()
+- que un nlu.yml inválido (a medio guardar) no reemplaza el snapshot vigente
+
+Uso:
+    python scripts/benchmark_knowledge.py [--repeticiones 2000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+RASA_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RASA_DIR / "actions"))
+from utils import knowledge_base, nlu_loader, responses_loader, stories_loader
+
+
+def medir(funcion: Callable, repeticiones: int) -> float:
+    """µs promedio por llamada."""
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+
+def preparar_datos(destino: Path):
+    """Copia data/ y agrega stories.yml y rules.yml a openrouter/."""
+    shutil.copytree(RASA_DIR / "data", destino)
+    (destino / "openrouter").mkdir(exist_ok=True)
+    for nombre in ("stories.yml", "rules.yml"):
+        shutil.copy(destino / nombre, destino / "openrouter" / nombre)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=2000, help="Consultas por medición")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        knowledge_base.DATA_DIR = Path(directorio) / "data"
+        knowledge_base.KNOWLEDGE_CACHE_PATH = str(Path(directorio) / "knowledge.json")
+        knowledge_base.KNOWLEDGE_RELOAD_INTERVAL = 0
+        preparar_datos(knowledge_base.DATA_DIR)
+
+        inicio = time.perf_counter()
+        desde_yaml = knowledge_base.build_snapshot()
+        t_yaml = (time.perf_counter() - inicio) * 1e3
+        inicio = time.perf_counter()
+        desde_cache = knowledge_base.build_snapshot()
+        t_cache = (time.perf_counter() - inicio) * 1e3
+        stats = desde_yaml.stats()
+
+        print(f"\n=== SNAPSHOT DE CONOCIMIENTO ({stats['intents']} intenciones, {stats['responses']} respuestas, "
+              f"{stats['stories']} stories) ===")
+        print(f"construcción: {t_yaml:.1f} ms parseando YAML ({desde_yaml.source}), "
+              f"{t_cache:.1f} ms desde la caché ({desde_cache.source})")
+
+        # Referencia: las búsquedas lineales de los loaders, sobre listas ya cargadas
+        intents: List[Dict] = nlu_loader.parse_intents(nlu_loader.load_nlu_data())
+        respuestas = responses_loader.parse_responses(responses_loader.load_responses_data())
+        stories = stories_loader.parse_stories(stories_loader.load_stories_data())
+
+        def lineal(intencion: str):
+            intent = next((i for i in intents if i["name"] == intencion), None)
+            utters = {u: t for u, t in respuestas.items() if u == f"utter_{intencion}" or intencion in u}
+            con_intencion = [s for s in stories if intencion in s["intents"]]
+            relacionadas = {i for s in con_intencion for i in s["intents"] if i != intencion}
+            return intent, utters, con_intencion, relacionadas
+
+        def indexada(intencion: str):
+            snapshot = knowledge_base.get_snapshot()
+            return (
+                snapshot.get_intent(intencion), snapshot.get_responses(intencion),
+                snapshot.get_stories(intencion), snapshot.get_related_intents(intencion)
+            )
+
+        nombres = [intent["name"] for intent in intents]
+        t_lineal = sum(medir(lambda: lineal(n), args.repeticiones) for n in nombres) / len(nombres)
+        knowledge_base.KNOWLEDGE_RELOAD_INTERVAL = 5
+        knowledge_base.get_snapshot()
+        t_indice = sum(medir(lambda: indexada(n), args.repeticiones) for n in nombres) / len(nombres)
+        print(f"consulta por intención (intent, respuestas, stories, relacionadas): "
+              f"{t_lineal:.1f} µs lineal vs {t_indice:.2f} µs con índices")
+
+        # Recarga en caliente: modificar nlu.yml y esperar a que get_snapshot() lo publique
+        knowledge_base.KNOWLEDGE_RELOAD_INTERVAL = 0
+        knowledge_base._proxima_revision = 0.0
+        anterior = knowledge_base.get_snapshot()
+        nlu = knowledge_base.DATA_DIR / "nlu.yml"
+        with open(nlu, 'a', encoding='utf-8') as f:
+            f.write("\n  - intent: intencion_nueva\n    examples: |\n      - ejemplo nuevo\n")
+        os.utime(nlu, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+        inicio = time.perf_counter()
+        nuevo = knowledge_base.get_snapshot()
+        t_recarga = (time.perf_counter() - inicio) * 1e3
+        print(
+            f"recarga tras modificar nlu.yml: {t_recarga:.1f} ms "
+            f"(snapshot nuevo: {nuevo is not anterior}, 'intencion_nueva': {nuevo.get_intent('intencion_nueva') is not None}, "
+            f"el anterior sigue intacto: {anterior.get_intent('intencion_nueva') is None})"
+        )
+
+        # YAML inválido: se sigue publicando el snapshot anterior
+        with open(nlu, 'a', encoding='utf-8') as f:
+            f.write("\n  - intent: [sin cerrar\n")
+        os.utime(nlu, ns=(time.time_ns(), time.time_ns() + 2_000_000))
+        tras_error = knowledge_base.get_snapshot()
+        print(
+            f"nlu.yml inválido: se mantiene el snapshot anterior: {tras_error is nuevo} "
+            f"({len(tras_error.intents)} intenciones)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark del renderizado de los templates del system prompt por intención.
+
+Compara, por intención, el tiempo de un turno (contexto + render):
+- original: Environment con auto_reload (revisa el archivo del template en
+  cada render), contexto armado en cada turno y, en el fallback, las
+  intenciones categorizadas leídas de data/nlu.yml en cada turno
+- precalculado: actions/utils/template_renderer.py (templates compilados en
+  warm_up() sin auto_reload e intenciones categorizadas del snapshot de
+  conocimiento). El contexto es el mismo, así que ambos textos deben coincidir
+
+También mide la compilación de todos los templates al iniciar, sin y con la
+caché de bytecode en disco (lo que se ahorra en cada reinicio).
+
+Uso:
+    python scripts/benchmark_templates.py [--repeticiones 2000]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "actions"))
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from utils import intent_categorizer, nlu_loader, template_renderer
+
+TRACKING = (
+    "Usuario: Hola\n"
+    "Bot: ¡Hola! ¿En qué te puedo ayudar?\n"
+    "Usuario: Me llegó una fotomulta, ¿cómo sé si es válida?"
+)
+CONFIANZA = 0.87
+
+
+def entorno_original() -> Environment:
+    """Environment como estaba antes (auto_reload activo, sin caché de bytecode)."""
+    env = Environment(
+        loader=FileSystemLoader(str(template_renderer.TEMPLATES_DIR)),
+        autoescape=False,
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+    env.filters['format_list'] = template_renderer.format_list
+    env.filters['truncate_text'] = template_renderer.truncate_text
+    return env
+
+
+def categorias_desde_yaml() -> Dict[str, list]:
+    """Intenciones categorizadas leyendo data/nlu.yml, como hacía el fallback en cada turno."""
+    intents = nlu_loader.parse_intents(nlu_loader.load_nlu_data())
+    categorizadas = {
+        categoria: [intent for intent in intents if intent["name"] in nombres]
+        for categoria, nombres in intent_categorizer.INTENT_CATEGORIES.items()
+    }
+    conocidas = {nombre for nombres in intent_categorizer.INTENT_CATEGORIES.values() for nombre in nombres}
+    otras = [intent for intent in intents if intent["name"] not in conocidas]
+    if otras:
+        categorizadas["otros"] = otras
+    return categorizadas
+
+
+def medir(funcion: Callable[[], str], repeticiones: int) -> float:
+    """µs promedio por llamada."""
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+
+def compilar_todo(bytecode_dir: str) -> float:
+    """ms para compilar todos los templates en un Environment nuevo con caché de bytecode."""
+    env = Environment(
+        loader=FileSystemLoader(str(template_renderer.TEMPLATES_DIR)),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(bytecode_dir)
+    )
+    env.filters['format_list'] = template_renderer.format_list
+    env.filters['truncate_text'] = template_renderer.truncate_text
+    inicio = time.perf_counter()
+    for nombre in template_renderer.list_available_templates():
+        env.get_template(nombre)
+    return (time.perf_counter() - inicio) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=2000, help="Renders por intención")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resumen = template_renderer.warm_up()
+    t_warm_up = (time.perf_counter() - inicio) * 1e3
+    env = entorno_original()
+
+    def original(intencion: str) -> str:
+        contexto: Dict[str, Any] = {
+            "intent_name": intencion,
+            "confidence": round(CONFIANZA * 100, 2),
+            "tracking_conversacion": TRACKING,
+            "has_tracking": True
+        }
+        return env.get_template(intent_categorizer.get_template_for_intent(intencion)).render(**contexto)
+
+    def precalculado(intencion: str) -> str:
+        contexto = template_renderer.get_context_for_intent(intencion, CONFIANZA, TRACKING)
+        return template_renderer.render_template(intent_categorizer.get_template_for_intent(intencion), contexto)
+
+    print(f"\n=== RENDER DE TEMPLATES POR INTENCIÓN ({args.repeticiones} renders) ===")
+    print(f"warm_up: {t_warm_up:.1f} ms ({resumen['templates']} templates, {resumen['intents']} intenciones)")
+    print(f"{'intención':<34} {'template':<26} {'µs orig':>8} {'µs precalc':>11} {'chars orig':>11} {'chars precalc':>14}")
+
+    originales, precalculados, sin_template = [], [], []
+    for intencion in template_renderer.list_known_intents():
+        template = intent_categorizer.get_template_for_intent(intencion)
+        if not template_renderer.template_exists(template):
+            # Ambos caminos terminan en el texto de respaldo; no es una comparación útil
+            sin_template.append(intencion)
+            continue
+        t_orig = medir(lambda: original(intencion), args.repeticiones)
+        t_nuevo = medir(lambda: precalculado(intencion), args.repeticiones)
+        originales.append(t_orig)
+        precalculados.append(t_nuevo)
+        print(
+            f"{intencion:<34} {template:<26} {t_orig:>8.1f} {t_nuevo:>11.1f} "
+            f"{len(original(intencion)):>11} {len(precalculado(intencion)):>14}"
+        )
+    if originales:
+        print(f"{'mediana':<34} {'':<26} {statistics.median(originales):>8.1f} {statistics.median(precalculados):>11.1f}")
+    if sin_template:
+        print(f"({len(sin_template)} intenciones sin template usan el texto de respaldo; no se comparan)")
+
+    def fallback_original() -> str:
+        contexto = template_renderer.get_context_for_fallback(
+            "¿me pueden quitar el carro?", TRACKING, categorias_desde_yaml(), "nlu_fallback", 0.3
+        )
+        return env.get_template("fallback.j2").render(**contexto)
+
+    def fallback_precalculado() -> str:
+        contexto = template_renderer.get_context_for_fallback(
+            "¿me pueden quitar el carro?", TRACKING, intent_name="nlu_fallback", confidence=0.3
+        )
+        return template_renderer.render_template("fallback.j2", contexto)
+
+    repeticiones_fallback = max(1, args.repeticiones // 20)
+    print(
+        f"{'(fallback, nlu.yml por turno)':<34} {'fallback.j2':<26} "
+        f"{medir(fallback_original, repeticiones_fallback):>8.1f} "
+        f"{medir(fallback_precalculado, args.repeticiones):>11.1f}"
+    )
+
+    with tempfile.TemporaryDirectory() as directorio:
+        frio = compilar_todo(directorio)
+        caliente = compilar_todo(directorio)
+    print(f"\ncompilación de templates al iniciar: {frio:.2f} ms sin caché de bytecode, {caliente:.2f} ms con caché")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark del historial de conversación que las acciones envían al LLM.
+
+Simula conversaciones de varias longitudes y compara, por turno:
+- original: recorrer tracker.events[-20:], filtrar user/bot y unir (en cada turno)
+- incremental: actions/utils/transcript_builder.py (solo eventos nuevos,
+  ventana por tokens)
+
+Reporta el tiempo por turno (µs) al final de la conversación y los tokens
+estimados (caracteres / 4) del historial enviado. La ventana original es de
+20 eventos de cualquier tipo, así que su tamaño en tokens depende del largo
+de los mensajes; la incremental está acotada por tokens.
+
+Uso:
+    python scripts/benchmark_transcript.py [--turnos 10 50 200] [--max-tokens 400] [--largo-respuesta 600]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "actions"))
+from utils import transcript_builder
+
+# Eventos que Rasa agrega en cada turno además de los mensajes
+EVENTOS_POR_TURNO = ("user", "user_featurization", "action", "bot", "action")
+
+
+def extraer_tracking_original(events: List[Dict[str, Any]]) -> str:
+    """Copia del _extraer_tracking anterior de las acciones (referencia)."""
+    mensajes = []
+    eventos_recientes = events[-20:] if len(events) > 20 else events
+    for event in eventos_recientes:
+        event_type = event.get("event")
+        if event_type == "user":
+            texto = event.get("text", "")
+            if texto and texto.strip():
+                mensajes.append(f"Usuario: {texto}")
+        elif event_type == "bot":
+            texto = event.get("text", "")
+            if texto and texto.strip():
+                mensajes.append(f"Bot: {texto}")
+    if not mensajes:
+        return ""
+    return "\n".join(mensajes)
+
+
+def eventos_turno(turno: int, largo_respuesta: int) -> List[Dict[str, Any]]:
+    """Eventos de un turno: pregunta del usuario, acciones y respuesta del bot."""
+    eventos = []
+    for i, tipo in enumerate(EVENTOS_POR_TURNO):
+        evento = {"event": tipo, "timestamp": turno * 10 + i}
+        if tipo == "user":
+            evento["text"] = f"¿Cuál es la multa por la infracción número {turno} y cómo la pago?"
+        elif tipo == "bot":
+            respuesta = (
+                f"La infracción {turno} tiene una multa de quince salarios mínimos diarios. "
+                "Puedes pagarla en el portal del SIMIT o tomar el curso pedagógico para obtener descuento. "
+            )
+            evento["text"] = (respuesta * (largo_respuesta // len(respuesta) + 1))[:largo_respuesta]
+        eventos.append(evento)
+    return eventos
+
+
+def medir(turnos: int, max_tokens: int, largo_respuesta: int) -> Dict[str, float]:
+    """Recorre una conversación de `turnos` turnos y mide el último turno con cada método."""
+    transcript_builder.clear_cache()
+    tracker = SimpleNamespace(sender_id=f"bench-{turnos}", events=[])
+    for turno in range(turnos):
+        tracker.events.extend(eventos_turno(turno, largo_respuesta))
+        incremental = transcript_builder.build_transcript(tracker, max_tokens=max_tokens)
+    original = extraer_tracking_original(tracker.events)
+
+    repeticiones = 2000
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        extraer_tracking_original(tracker.events)
+    t_original = (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    # Turno nuevo de la conversación en cada repetición (el caso real de las acciones)
+    siguientes = [eventos_turno(turnos + i, largo_respuesta) for i in range(repeticiones)]
+    inicio = time.perf_counter()
+    for eventos in siguientes:
+        tracker.events.extend(eventos)
+        transcript_builder.build_transcript(tracker, max_tokens=max_tokens)
+    t_incremental = (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    return {
+        't_original': t_original,
+        't_incremental': t_incremental,
+        'tokens_original': transcript_builder.estimate_tokens(original),
+        'tokens_incremental': transcript_builder.estimate_tokens(incremental),
+        'mensajes_original': original.count("\n") + 1,
+        'mensajes_incremental': incremental.count("\n") + 1
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turnos", type=int, nargs="+", default=[5, 20, 100, 500], help="Turnos por conversación")
+    parser.add_argument("--max-tokens", type=int, default=transcript_builder.TRANSCRIPT_MAX_TOKENS,
+                        help="Ventana del historial incremental")
+    parser.add_argument("--largo-respuesta", type=int, default=600,
+                        help="Caracteres de cada respuesta del bot (las del LLM suelen ser largas)")
+    args = parser.parse_args()
+
+    print(f"\n=== HISTORIAL DE CONVERSACIÓN (ventana {args.max_tokens} tokens, respuestas de {args.largo_respuesta} caracteres) ===")
+    print(f"{'turnos':>7} {'µs original':>12} {'µs incremental':>15} {'tokens orig':>12} {'tokens incr':>12} {'msgs orig':>10} {'msgs incr':>10}")
+    for turnos in args.turnos:
+        r = medir(turnos, args.max_tokens, args.largo_respuesta)
+        print(
+            f"{turnos:>7} {r['t_original']:>12.1f} {r['t_incremental']:>15.1f} {r['tokens_original']:>12} "
+            f"{r['tokens_incremental']:>12} {r['mensajes_original']:>10} {r['mensajes_incremental']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
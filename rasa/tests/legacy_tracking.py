@@ -0,0 +1,40 @@
+"""
+Implementación anterior de ActionDefaultFallback._extraer_tracking (actions.py).
+
+Se conserva como referencia: los tests verifican que build_transcript produce
+el mismo historial en conversaciones cortas (hasta 20 eventos, dentro del
+presupuesto de tokens).
+"""
+from rasa_sdk import Tracker
+
+
+def extraer_tracking_legado(tracker: Tracker) -> str:
+    """
+    Extrae el historial de conversación del tracker de Rasa.
+    Retorna un string con formato Usuario/Bot alternado.
+    """
+    mensajes = []
+
+    # Obtener últimos 20 eventos para no sobrecargar el contexto
+    eventos_recientes = tracker.events[-20:] if len(tracker.events) > 20 else tracker.events
+
+    for event in eventos_recientes:
+        event_type = event.get("event")
+
+        # Capturar mensajes del usuario
+        if event_type == "user":
+            texto = event.get("text", "")
+            if texto and texto.strip():
+                mensajes.append(f"Usuario: {texto}")
+
+        # Capturar respuestas del bot
+        elif event_type == "bot":
+            texto = event.get("text", "")
+            if texto and texto.strip():
+                mensajes.append(f"Bot: {texto}")
+
+    # Si no hay historial, retornar string vacío
+    if not mensajes:
+        return ""
+
+    return "\n".join(mensajes)
@@ -0,0 +1,143 @@
+"""Historial incremental de la conversación (actions/utils/transcript_builder.py)."""
+import pytest
+from rasa_sdk import Tracker
+
+from actions.utils import transcript_builder
+from actions.utils.transcript_builder import (
+    _Transcript,
+    _es_continuacion,
+    build_transcript,
+    clear_cache,
+    estimate_tokens,
+    transcript_tail,
+)
+from tests.legacy_tracking import extraer_tracking_legado
+
+
+@pytest.fixture(autouse=True)
+def _sin_historiales():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _tracker(eventos, sender_id="usuario_1"):
+    return Tracker.from_dict({
+        "sender_id": sender_id,
+        "slots": {},
+        "latest_message": {},
+        "events": eventos,
+        "paused": False,
+        "followup_action": None,
+        "active_loop": {},
+        "latest_action_name": None
+    })
+
+
+def _turnos(mensajes, inicio=0.0):
+    """Eventos de Rasa para pares (usuario, bot), con acciones intermedias."""
+    eventos = []
+    timestamp = inicio
+    for usuario, bot in mensajes:
+        for evento in (
+            {"event": "user", "text": usuario},
+            {"event": "action", "name": "action_default_fallback"},
+            {"event": "bot", "text": bot},
+            {"event": "action", "name": "action_listen"},
+        ):
+            timestamp += 1
+            eventos.append({**evento, "timestamp": timestamp})
+    return eventos
+
+
+CONVERSACIONES_CORTAS = [
+    [],
+    [("hola", "¡Hola! ¿En qué te ayudo?")],
+    [("¿Cuál es la multa por no llevar SOAT?", "La multa es de 30 SMDLV."), ("¿y si reincido?", "   ")],
+    [("", "Bot sin pregunta"), ("¿Puedo girar en rojo?", "No, salvo señal que lo permita."),
+     ("gracias", "Con gusto"), ("chao", "¡Hasta luego!"), ("otra", "respuesta")],
+]
+
+
+@pytest.mark.parametrize("mensajes", CONVERSACIONES_CORTAS)
+def test_igual_al_tracking_anterior_en_conversaciones_cortas(mensajes):
+    eventos = _turnos(mensajes)
+    assert len(eventos) <= 20
+
+    # Turno a turno, como llegan las llamadas de Rasa
+    for fin in range(len(eventos) + 1):
+        tracker = _tracker(eventos[:fin])
+        assert build_transcript(tracker) == extraer_tracking_legado(tracker)
+
+
+def test_es_continuacion_detecta_reinicio():
+    eventos = _turnos([("hola", "hola"), ("multa", "30 SMDLV")])
+    transcript = _Transcript()
+    assert _es_continuacion(transcript, eventos)
+
+    transcript.eventos_procesados = len(eventos)
+    transcript.ultimo_timestamp = eventos[-1]["timestamp"]
+
+    assert _es_continuacion(transcript, eventos + _turnos([("otra", "ok")], inicio=100))
+    # Tras /restart Rasa envía menos eventos
+    assert not _es_continuacion(transcript, eventos[:3])
+    # Mismo número de eventos, pero de otra conversación
+    assert not _es_continuacion(transcript, _turnos([("hola", "hola"), ("multa", "30 SMDLV")], inicio=50))
+
+
+def test_reinicio_reconstruye_el_historial():
+    build_transcript(_tracker(_turnos([("primera", "uno"), ("segunda", "dos")])))
+
+    texto = build_transcript(_tracker(_turnos([("nueva", "conversación")], inicio=100)))
+
+    assert texto == "Usuario: nueva\nBot: conversación"
+
+
+def test_ventana_por_tokens_conserva_los_mensajes_recientes():
+    mensajes = [(f"pregunta número {i} " + "x" * 40, f"respuesta número {i} " + "y" * 40) for i in range(10)]
+    eventos = _turnos(mensajes)
+    completo = extraer_tracking_legado(_tracker(eventos[-20:])).split("\n")
+    presupuesto = sum(estimate_tokens(linea) for linea in completo[-3:])
+
+    texto = build_transcript(_tracker(eventos), max_tokens=presupuesto)
+
+    assert texto.split("\n") == completo[-3:]
+
+
+def test_ventana_conserva_siempre_el_ultimo_mensaje():
+    eventos = _turnos([("hola", "x" * 400)])
+
+    assert build_transcript(_tracker(eventos), max_tokens=10) == "Bot: " + "x" * 400
+
+
+def test_ventana_incremental_igual_a_construir_de_una_vez():
+    eventos = _turnos([(f"pregunta {i} " + "x" * 30, f"respuesta {i} " + "y" * 30) for i in range(12)])
+
+    for fin in range(len(eventos) + 1):
+        incremental = build_transcript(_tracker(eventos[:fin]), max_tokens=60)
+    clear_cache()
+    de_una_vez = build_transcript(_tracker(eventos), max_tokens=60)
+
+    assert incremental == de_una_vez
+
+
+def test_transcript_tail_no_recorta_el_historial():
+    eventos = _turnos([(f"pregunta {i} " + "x" * 30, f"respuesta {i} " + "y" * 30) for i in range(6)])
+    tracker = _tracker(eventos)
+    completo = build_transcript(tracker)
+
+    cola = transcript_tail(tracker, max_tokens=25)
+
+    assert completo.endswith(cola)
+    assert 0 < len(cola.split("\n")) < len(completo.split("\n"))
+    assert build_transcript(tracker) == completo
+    assert transcript_tail(tracker, max_tokens=10_000) == completo
+
+
+def test_historiales_por_conversacion_limitados(monkeypatch):
+    monkeypatch.setattr(transcript_builder, "TRANSCRIPT_MAX_SENDERS", 2)
+
+    for sender_id in ("a", "b", "c"):
+        build_transcript(_tracker(_turnos([("hola", sender_id)]), sender_id=sender_id))
+
+    assert list(transcript_builder._transcripts) == ["b", "c"]
@@ -2,17 +2,174 @@
 Endpoints para chat
 """
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+import httpx
+import asyncio
+import codecs
+import json
 import logging
+import time
+from typing import AsyncIterator, Dict, Optional, Tuple
 
 from app.models.chat import UserMessage, BotResponse
 from app.core.rasa_client import rasa_client
 from app.core.backrag_client import backrag_client
 from app.core.message_transformer import message_transformer
+from app.core.speculation import speculation_policy, TimedTask
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+GENERIC_ERROR_TEXT = "Lo siento, en este momento no puedo procesar tu consulta. Por favor, intenta de nuevo más tarde."
+
+
+def _cancelar(task):
+    """Cancela una consulta especulativa que ya no se necesita"""
+    if task is not None and not task.done():
+        task.cancel()
+
+
+_FIN_STREAM = object()
+
+
+async def _adelantar_stream(chunks: AsyncIterator[bytes], cola: asyncio.Queue):
+    """
+    Consume el stream de BackRag hacia `cola` mientras RASA responde
+
+    Los errores se encolan para que el consumidor los relance; al terminar
+    (o al cancelarse la especulación) se encola `_FIN_STREAM`.
+    """
+    try:
+        async for chunk in chunks:
+            cola.put_nowait(chunk)
+    except Exception as e:
+        cola.put_nowait(e)
+    finally:
+        cola.put_nowait(_FIN_STREAM)
+
+
+async def _consumir_adelantado(cola: asyncio.Queue) -> AsyncIterator[bytes]:
+    """Reproduce los fragmentos encolados por `_adelantar_stream`"""
+    while True:
+        item = await cola.get()
+        if item is _FIN_STREAM:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def _sse(event: str, data: dict) -> str:
+    """Serializa un evento Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _relay_con_meta(chunks: AsyncIterator[bytes], meta: Dict) -> AsyncIterator[str]:
+    """
+    Reenvía el stream SSE de BackRag agregando `meta` a su evento `meta`
+
+    Solo se decodifica hasta completar el primer evento: si es `meta` se le
+    agregan los campos (origen y razón del fallback) y si no, se emite un
+    `meta` propio antes. El resto del stream pasa sin modificar.
+
+    Args:
+        chunks: Fragmentos crudos del stream de BackRag
+        meta: Campos a agregar al evento `meta`
+
+    Yields:
+        Fragmentos del stream a reenviar al cliente
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    primero = None
+
+    async for chunk in chunks:
+        if primero is not None:
+            yield decoder.decode(chunk)
+            continue
+
+        buffer += decoder.decode(chunk)
+        fin = buffer.find("\n\n")
+        if fin == -1:
+            continue
+
+        primero, resto = buffer[:fin], buffer[fin + 2:]
+        yield _fusionar_meta(primero, meta) + resto
+
+    if primero is None:
+        # El stream terminó sin un evento completo
+        yield _sse("meta", meta) + buffer + decoder.decode(b"", final=True)
+
+
+def _fusionar_meta(evento: str, meta: Dict) -> str:
+    """Agrega `meta` al evento si es `meta`; si no, emite un `meta` propio antes."""
+    lineas = evento.split("\n")
+    if "event: meta" in lineas:
+        datos = [linea[5:].strip() for linea in lineas if linea.startswith("data:")]
+        try:
+            return _sse("meta", {**json.loads("\n".join(datos)), **meta})
+        except ValueError:
+            logger.warning("[Chat] Evento meta de BackRag inválido, se reenvía sin modificar")
+    return _sse("meta", meta) + evento + "\n\n"
+
+
+def _evaluar_fallback(rasa_responses) -> Tuple[bool, Optional[str]]:
+    """
+    Evalúa los criterios de fallback sobre la respuesta de RASA
+
+    Args:
+        rasa_responses: Lista de respuestas de RASA
+
+    Returns:
+        Tupla (debe usar RAG, razón del fallback)
+    """
+    if not rasa_responses:
+        # RASA no respondió nada
+        logger.warning(f"[Chat] ✗ RASA no respondió (lista vacía)")
+        return True, "empty_response_list"
+
+    logger.info(f"[Chat] ✓ RASA respondió con {len(rasa_responses)} mensaje(s)")
+    logger.debug(f"[Chat] Respuestas RASA: {rasa_responses}")
+
+    should_use_rag = False
+    fallback_reason = None
+
+    # Evaluar criterios de fallback más inteligentes
+    first_response = rasa_responses[0]
+
+    # Criterio 1: Mensaje vacío o solo espacios
+    if not first_response.text or first_response.text.strip() == "":
+        should_use_rag = True
+        fallback_reason = "empty_text"
+        logger.info(f"[Chat] Criterio 1: Texto vacío detectado")
+
+    # Criterio 2: Custom metadata indica fallback
+    elif first_response.custom and first_response.custom.get("fallback") == True:
+        should_use_rag = True
+        fallback_reason = first_response.custom.get("reason", "custom_fallback")
+        logger.info(f"[Chat] Criterio 2: Metadata de fallback detectada - Razón: {fallback_reason}")
+
+    # Criterio 3: Confianza baja en custom metadata
+    elif first_response.custom and first_response.custom.get("confidence", 1.0) < 0.6:
+        should_use_rag = True
+        confidence = first_response.custom.get("confidence", 0)
+        fallback_reason = f"low_confidence_{confidence:.2f}"
+        logger.info(f"[Chat] Criterio 3: Baja confianza detectada ({confidence:.2f})")
+
+    # Criterio 4: Intent específico que debe ir a RAG
+    elif first_response.custom:
+        intent = first_response.custom.get("intent", "")
+        if intent in ["out_of_scope", "consulta_codigo_transito", "nlu_fallback"]:
+            should_use_rag = True
+            fallback_reason = f"intent_{intent}"
+            logger.info(f"[Chat] Criterio 4: Intent {intent} debe usar RAG")
+
+    if should_use_rag:
+        logger.warning(f"[Chat] ✗ RASA activó fallback - Razón: {fallback_reason}")
+
+    return should_use_rag, fallback_reason
+
 
 @router.post("/message", response_model=BotResponse, status_code=status.HTTP_200_OK)
 async def send_message(user_message: UserMessage):
@@ -23,14 +180,29 @@ async def send_message(user_message: UserMessage):
     1. Intenta primero con RASA
     2. Si RASA no puede responder (lista vacía), usa BackRag como fallback
 
+    Con speculative_rag_enabled, los mensajes con alta probabilidad de
+    fallback lanzan BackRag en paralelo con RASA; la consulta se cancela si
+    RASA responde con confianza.
+
     - **sender_id**: ID único del usuario
     - **message**: Mensaje del usuario
     - **metadata**: Metadata adicional (opcional)
     """
+    rag_task = None
+
     try:
         logger.info(f"========== NUEVO MENSAJE ==========")
         logger.info(f"[Chat] Recibido de sender_id={user_message.sender_id}: '{user_message.message}'")
 
+        # PASO 0: Especulación - lanzar BackRag en paralelo si es probable el fallback
+        speculated = speculation_policy.should_speculate(user_message.sender_id, user_message.message)
+        if speculated:
+            logger.info(f"[Chat] PASO 0: Lanzando BackRag especulativamente en paralelo con RASA")
+            rag_timer = TimedTask()
+            rag_task = asyncio.create_task(
+                rag_timer.run(backrag_client.query(message=user_message.message))
+            )
+
         # PASO 1: Intentar primero con RASA
         logger.info(f"[Chat] PASO 1: Enviando mensaje a RASA...")
         rasa_responses = await rasa_client.send_message(
@@ -38,72 +210,45 @@ async def send_message(user_message: UserMessage):
             message=user_message.message,
             metadata=user_message.metadata
         )
+        rasa_done = time.perf_counter()
         logger.info(f"========== RASA RESPONDE ==========")
         logger.info(rasa_responses)
         logger.info(f"[Chat] Respuestas recibidas de RASA: {len(rasa_responses) if rasa_responses else 0}")
         logger.info(f"===================================")
         # PASO 2: Evaluar si RASA pudo responder
-        should_use_rag = False
-        fallback_reason = None
-
-        if rasa_responses and len(rasa_responses) > 0:
-            logger.info(f"[Chat] ✓ RASA respondió con {len(rasa_responses)} mensaje(s)")
-            logger.debug(f"[Chat] Respuestas RASA: {rasa_responses}")
-
-            # Evaluar criterios de fallback más inteligentes
-            first_response = rasa_responses[0]
-
-            # Criterio 1: Mensaje vacío o solo espacios
-            if not first_response.text or first_response.text.strip() == "":
-                should_use_rag = True
-                fallback_reason = "empty_text"
-                logger.info(f"[Chat] Criterio 1: Texto vacío detectado")
-
-            # Criterio 2: Custom metadata indica fallback
-            elif first_response.custom and first_response.custom.get("fallback") == True:
-                should_use_rag = True
-                fallback_reason = first_response.custom.get("reason", "custom_fallback")
-                logger.info(f"[Chat] Criterio 2: Metadata de fallback detectada - Razón: {fallback_reason}")
-
-            # Criterio 3: Confianza baja en custom metadata
-            elif first_response.custom and first_response.custom.get("confidence", 1.0) < 0.6:
-                should_use_rag = True
-                confidence = first_response.custom.get("confidence", 0)
-                fallback_reason = f"low_confidence_{confidence:.2f}"
-                logger.info(f"[Chat] Criterio 3: Baja confianza detectada ({confidence:.2f})")
-
-            # Criterio 4: Intent específico que debe ir a RAG
-            elif first_response.custom:
-                intent = first_response.custom.get("intent", "")
-                if intent in ["out_of_scope", "consulta_codigo_transito", "nlu_fallback"]:
-                    should_use_rag = True
-                    fallback_reason = f"intent_{intent}"
-                    logger.info(f"[Chat] Criterio 4: Intent {intent} debe usar RAG")
-
-            # Si NO debe usar RAG, retornar respuesta de RASA
-            if not should_use_rag:
-                logger.info(f"[Chat] ✓ RASA manejó la consulta exitosamente")
-                bot_response = message_transformer.rasa_to_ui(
-                    sender_id=user_message.sender_id,
-                    rasa_responses=rasa_responses
-                )
-                logger.info(f"[Chat] Respuesta final enviada (origen: RASA) - {len(bot_response.messages)} mensaje(s)")
-                logger.info(f"========== FIN PROCESAMIENTO ==========")
-                return bot_response
-            else:
-                logger.warning(f"[Chat] ✗ RASA activó fallback - Razón: {fallback_reason}")
-        else:
-            # RASA no respondió nada
-            should_use_rag = True
-            fallback_reason = "empty_response_list"
-            logger.warning(f"[Chat] ✗ RASA no respondió (lista vacía)")
+        should_use_rag, fallback_reason = _evaluar_fallback(rasa_responses)
+
+        # Si NO debe usar RAG, retornar respuesta de RASA
+        if not should_use_rag:
+            logger.info(f"[Chat] ✓ RASA manejó la consulta exitosamente")
+            _cancelar(rag_task)
+            speculation_policy.record(
+                user_message.sender_id, fell_back=False, speculated=speculated,
+                wasted_seconds=rag_timer.elapsed(rasa_done) if speculated else 0.0,
+                wasted_completed=speculated and rag_timer.finished is not None
+            )
+            bot_response = message_transformer.rasa_to_ui(
+                sender_id=user_message.sender_id,
+                rasa_responses=rasa_responses
+            )
+            logger.info(f"[Chat] Respuesta final enviada (origen: RASA) - {len(bot_response.messages)} mensaje(s)")
+            logger.info(f"========== FIN PROCESAMIENTO ==========")
+            return bot_response
 
         # PASO 3: Activar fallback a BackRag
         logger.info(f"[Chat] PASO 3: Activando fallback a BackRag (Razón: {fallback_reason})...")
 
-        rag_response = await backrag_client.query(
-            message=user_message.message
-        )
+        if rag_task is not None:
+            # La consulta ya está en curso desde el PASO 0
+            rag_response = await rag_task
+            saved = rag_timer.elapsed(rasa_done)
+            logger.info(f"[Chat] Especulación aprovechada - ahorro: {saved * 1000:.0f}ms")
+        else:
+            rag_response = await backrag_client.query(
+                message=user_message.message
+            )
+            saved = 0.0
+        speculation_policy.record(user_message.sender_id, fell_back=True, speculated=speculated, saved_seconds=saved)
 
         # PASO 4: Evaluar respuesta de BackRag
         if rag_response:
@@ -130,7 +275,7 @@ async def send_message(user_message: UserMessage):
             sender_id=user_message.sender_id,
             messages=[
                 BotMessageItem(
-                    text="Lo siento, en este momento no puedo procesar tu consulta. Por favor, intenta de nuevo más tarde.",
+                    text=GENERIC_ERROR_TEXT,
                     custom={"source": "fallback_error"}
                 )
             ],
@@ -142,6 +287,7 @@ async def send_message(user_message: UserMessage):
         return fallback_response
 
     except Exception as e:
+        _cancelar(rag_task)
         logger.error(f"[Chat] ✗✗✗ Error crítico al procesar mensaje: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -149,6 +295,121 @@ async def send_message(user_message: UserMessage):
         )
 
 
+@router.post("/message/stream", status_code=status.HTTP_200_OK)
+async def send_message_stream(user_message: UserMessage):
+    """
+    Versión en streaming (Server-Sent Events) de /message
+
+    Emite un único `meta` con el origen de la respuesta ("rasa" o "backrag").
+    Si RASA responde, cada mensaje llega como evento `message`. Si se activa
+    el fallback, se reenvía el stream de BackRag (`meta` con fuentes, `token`
+    por fragmento y `done`); a su `meta` se le agregan `source` y
+    `fallback_reason`. Siempre termina con `done` o `error`.
+
+    Igual que /message, con speculative_rag_enabled el stream de BackRag se
+    abre en paralelo con RASA y se cancela si RASA responde con confianza.
+
+    - **sender_id**: ID único del usuario
+    - **message**: Mensaje del usuario
+    - **metadata**: Metadata adicional (opcional)
+    """
+    logger.info(f"[Chat] Stream recibido de sender_id={user_message.sender_id}: '{user_message.message}'")
+
+    async def eventos():
+        start = time.perf_counter()
+        rag_task = None
+
+        # Especulación - abrir el stream de BackRag en paralelo si es probable el fallback
+        speculated = speculation_policy.should_speculate(user_message.sender_id, user_message.message)
+        if speculated:
+            logger.info(f"[Chat] Stream: abriendo BackRag especulativamente en paralelo con RASA")
+            rag_timer = TimedTask()
+            cola = asyncio.Queue()
+            rag_task = asyncio.create_task(
+                rag_timer.run(_adelantar_stream(backrag_client.stream_query(message=user_message.message), cola))
+            )
+
+        def solapado() -> float:
+            """Segundos que BackRag corrió en paralelo con RASA"""
+            return rag_timer.elapsed(rasa_done) if speculated else 0.0
+
+        try:
+            try:
+                rasa_responses = await rasa_client.send_message(
+                    sender_id=user_message.sender_id,
+                    message=user_message.message,
+                    metadata=user_message.metadata
+                )
+            except Exception as e:
+                logger.error(f"[Chat] ✗ Error en RASA durante stream: {e}")
+                yield _sse("error", {"detail": f"Error al procesar mensaje: {str(e)}"})
+                return
+            rasa_done = time.perf_counter()
+
+            should_use_rag, fallback_reason = _evaluar_fallback(rasa_responses)
+
+            if not should_use_rag:
+                _cancelar(rag_task)
+                speculation_policy.record(
+                    user_message.sender_id, fell_back=False, speculated=speculated,
+                    wasted_seconds=solapado(), wasted_completed=speculated and rag_timer.finished is not None
+                )
+                bot_response = message_transformer.rasa_to_ui(
+                    sender_id=user_message.sender_id,
+                    rasa_responses=rasa_responses
+                )
+                elapsed = time.perf_counter() - start
+                yield _sse("meta", {"source": "rasa"})
+                for item in bot_response.messages:
+                    yield _sse("message", item.model_dump(exclude_none=True))
+                yield _sse("done", {"source": "rasa", "time_to_first_token": elapsed, "processing_time": elapsed})
+                logger.info(f"[Chat] Stream finalizado (origen: RASA) en {elapsed:.3f}s")
+                return
+
+            logger.info(f"[Chat] Stream: fallback a BackRag (Razón: {fallback_reason})")
+            meta = {"source": "backrag", "fallback_reason": fallback_reason}
+
+            if rag_task is not None:
+                # El stream ya está en curso desde antes de consultar a RASA
+                chunks = _consumir_adelantado(cola)
+            else:
+                chunks = backrag_client.stream_query(message=user_message.message)
+
+            recibido = False
+            try:
+                async for chunk in _relay_con_meta(chunks, meta):
+                    if not recibido:
+                        recibido = True
+                        logger.info(f"[Chat] Primer evento de BackRag en {time.perf_counter() - start:.3f}s")
+                    yield chunk
+            except Exception as e:
+                speculation_policy.record(user_message.sender_id, fell_back=True, speculated=speculated, saved_seconds=solapado())
+                if isinstance(e, httpx.HTTPError):
+                    logger.error(f"[Chat] ✗ Error en stream de BackRag: {e}")
+                else:
+                    logger.error(f"[Chat] ✗ Error inesperado en stream de BackRag: {e}", exc_info=True)
+                # Cerrar cualquier evento a medio enviar antes de emitir el de respaldo
+                prefijo = "\n\n" if recibido else _sse("meta", meta)
+                yield prefijo + _sse("message", {"text": GENERIC_ERROR_TEXT, "custom": {"source": "fallback_error"}})
+                yield _sse("done", {"source": "fallback_error", "processing_time": time.perf_counter() - start})
+                return
+
+            saved = solapado()
+            if rag_task is not None:
+                logger.info(f"[Chat] Especulación aprovechada - ahorro: {saved * 1000:.0f}ms")
+            speculation_policy.record(user_message.sender_id, fell_back=True, speculated=speculated, saved_seconds=saved)
+            logger.info(f"[Chat] Stream finalizado (origen: BackRag) en {time.perf_counter() - start:.3f}s")
+        finally:
+            # El cliente puede desconectarse a mitad del stream
+            _cancelar(rag_task)
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/reset/{sender_id}", status_code=status.HTTP_200_OK)
 async def reset_conversation(sender_id: str):
     """
@@ -6,6 +6,8 @@ from datetime import datetime
 import logging
 
 from app.core.rasa_client import rasa_client
+from app.core.backrag_client import backrag_client
+from app.core.speculation import speculation_policy
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -16,7 +18,7 @@ router = APIRouter()
 @router.get("/health", status_code=status.HTTP_200_OK)
 async def health_check():
     """
-    Health check del orquestador y conexión con RASA
+    Health check del orquestador, conexión con RASA y estado de los pools HTTP
     """
     rasa_connected = await rasa_client.health_check()
 
@@ -27,7 +29,12 @@ async def health_check():
         "rasa": {
             "connected": rasa_connected,
             "url": settings.rasa_url
-        }
+        },
+        "http_pools": {
+            "rasa": rasa_client.pool_stats(),
+            "backrag": backrag_client.pool_stats()
+        },
+        "speculation": speculation_policy.stats()
     }
 
     if not rasa_connected:
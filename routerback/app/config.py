@@ -23,8 +23,21 @@ class Settings(BaseSettings):
     # BackRag (Fallback RAG service)
     backrag_url: str = "http://localhost:8001"
     backrag_query_path: str = "/api/v1/query"
+    backrag_stream_path: str = "/api/v1/query/stream"
     backrag_timeout: int = 30
 
+    # Pool HTTP persistente hacia RASA y BackRag
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http2_enabled: bool = True
+
+    # Despacho especulativo de BackRag en paralelo con RASA
+    speculative_rag_enabled: bool = False
+    speculative_rag_threshold: float = 0.5
+    speculative_history_size: int = 5
+    speculative_max_senders: int = 1000
+
     # CORS
     cors_origins: list = ["*"]
 
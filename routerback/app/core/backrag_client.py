@@ -2,10 +2,11 @@
 Cliente HTTP para comunicarse con BackRag (servicio RAG de fallback)
 """
 import httpx
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Optional, Dict, Any
 import logging
 
 from app.config import settings
+from app.core.http_pool import PooledHttpClient
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +17,23 @@ class BackRagClient:
     def __init__(self):
         self.base_url = settings.backrag_url
         self.query_url = f"{self.base_url}{settings.backrag_query_path}"
+        self.stream_url = f"{self.base_url}{settings.backrag_stream_path}"
         self.timeout = settings.backrag_timeout
+        self.http = PooledHttpClient("BackRag", timeout=self.timeout)
         logger.info(f"BackRagClient inicializado - URL: {self.query_url}, Timeout: {self.timeout}s")
 
+    async def start(self):
+        """Abre el pool de conexiones persistente"""
+        await self.http.start()
+
+    async def close(self):
+        """Cierra el pool de conexiones"""
+        await self.http.close()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Estadísticas del pool de conexiones hacia BackRag"""
+        return self.http.stats()
+
     async def query(
         self,
         message: str,
@@ -50,25 +65,24 @@ class BackRagClient:
             # Realizar petición HTTP a BackRag
             logger.info("TIMEE ============00")
             logger.info(self.timeout)
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.query_url,
-                    json=backrag_request
-                )
-                response.raise_for_status()
-
-                # Parsear respuesta
-                backrag_response = response.json()
-
-                logger.info(
-                    f"[BackRag] Respuesta recibida - "
-                    f"Confianza: {backrag_response.get('confidence', 0):.2f}, "
-                    f"Fuentes: {len(backrag_response.get('sources', []))}, "
-                    f"Tiempo: {backrag_response.get('processing_time', 0):.3f}s"
-                )
-                logger.debug(f"[BackRag] Respuesta completa: {backrag_response}")
-
-                return backrag_response
+            response = await self.http.post(
+                self.query_url,
+                json=backrag_request
+            )
+            response.raise_for_status()
+
+            # Parsear respuesta
+            backrag_response = response.json()
+
+            logger.info(
+                f"[BackRag] Respuesta recibida - "
+                f"Confianza: {backrag_response.get('confidence', 0):.2f}, "
+                f"Fuentes: {len(backrag_response.get('sources', []))}, "
+                f"Tiempo: {backrag_response.get('processing_time', 0):.3f}s"
+            )
+            logger.debug(f"[BackRag] Respuesta completa: {backrag_response}")
+
+            return backrag_response
 
         except httpx.TimeoutException as e:
             logger.error(f"[BackRag] Timeout al comunicarse con BackRag después de {self.timeout}s: {e}")
@@ -83,6 +97,39 @@ class BackRagClient:
             logger.error(f"[BackRag] Error inesperado en BackRagClient: {e}", exc_info=True)
             return None
 
+    async def stream_query(
+        self,
+        message: str,
+        max_results: int = 3,
+        confidence_threshold: float = 0.4
+    ) -> AsyncIterator[bytes]:
+        """
+        Envía una consulta a BackRag y reenvía su stream SSE sin modificarlo
+
+        Args:
+            message: Mensaje/pregunta del usuario
+            max_results: Número máximo de resultados a buscar
+            confidence_threshold: Umbral de confianza para resultados
+
+        Yields:
+            Fragmentos crudos del stream text/event-stream de BackRag
+
+        Raises:
+            httpx.HTTPError: Si BackRag no responde o devuelve un error antes del stream
+        """
+        backrag_request = {
+            "query": message,
+            "max_results": max_results,
+            "confidence_threshold": confidence_threshold
+        }
+
+        logger.info(f"[BackRag] Abriendo stream: '{message[:50]}...'")
+
+        async with self.http.stream("POST", self.stream_url, json=backrag_request) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                yield chunk
+
     async def health_check(self) -> bool:
         """
         Verifica si BackRag está disponible
@@ -95,12 +142,11 @@ class BackRagClient:
 
             logger.debug(f"[BackRag] Verificando salud del servicio: {health_endpoint}")
 
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.get(health_endpoint)
-                response.raise_for_status()
+            response = await self.http.get(health_endpoint, timeout=5)
+            response.raise_for_status()
 
-                logger.info(f"[BackRag] Servicio disponible - Status: {response.status_code}")
-                return True
+            logger.info(f"[BackRag] Servicio disponible - Status: {response.status_code}")
+            return True
 
         except Exception as e:
             logger.warning(f"[BackRag] Servicio no disponible: {e}")
@@ -0,0 +1,233 @@
+"""
+Pool de conexiones HTTP persistente compartido por los clientes de servicios
+"""
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class PooledHttpClient:
+    """
+    Envoltura de un httpx.AsyncClient de larga vida con métricas del pool.
+
+    El cliente se crea en el lifespan de la aplicación (start) y se cierra
+    al apagarla (close). Si se usa antes de start() se crea bajo demanda.
+    """
+
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self.http2 = settings.http2_enabled and HTTP2_AVAILABLE
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Métricas (contadores propios, sin leer el pool interno de httpx)
+        self.in_flight = 0
+        self.in_use = 0
+        self.requests = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.connections_reused = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def start(self):
+        """Crea el cliente y su pool de conexiones."""
+        if self._client is not None:
+            return
+
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=limits,
+            http2=self.http2
+        )
+        logger.info(
+            f"[{self.name}] Pool HTTP iniciado - max_connections={limits.max_connections}, "
+            f"keepalive={limits.max_keepalive_connections}, http2={self.http2}"
+        )
+
+    async def close(self):
+        """Cierra el cliente y todas sus conexiones."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info(f"[{self.name}] Pool HTTP cerrado")
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Realiza una petición usando el pool compartido
+
+        Args:
+            method: Método HTTP
+            url: URL completa
+            **kwargs: Argumentos de httpx.AsyncClient.request
+
+        Returns:
+            Respuesta HTTP
+        """
+        if self._client is None:
+            logger.warning(f"[{self.name}] Pool usado antes del startup, creándolo bajo demanda")
+            await self.start()
+
+        peticion = self._trace(kwargs)
+
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            return await self._client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._finalizar(peticion)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """
+        Abre una petición en streaming usando el pool compartido
+
+        Args:
+            method: Método HTTP
+            url: URL completa
+            **kwargs: Argumentos de httpx.AsyncClient.stream
+
+        Yields:
+            Respuesta HTTP cuyo cuerpo se lee incrementalmente
+        """
+        if self._client is None:
+            logger.warning(f"[{self.name}] Pool usado antes del startup, creándolo bajo demanda")
+            await self.start()
+
+        peticion = self._trace(kwargs)
+
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            async with self._client.stream(method, url, **kwargs) as response:
+                yield response
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._finalizar(peticion)
+
+    def _trace(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Agrega a la petición el trace de httpx (extensión pública)
+
+        El primer evento llega cuando el pool entrega la conexión: el tiempo
+        hasta ese punto es la espera por una conexión libre. Si ese evento no es
+        de conexión (connect_tcp) el pool reutilizó una conexión abierta. La
+        conexión queda en uso desde el primer evento que no es de conexión
+        hasta que termina la petición.
+
+        Args:
+            kwargs: Argumentos de la petición (se modifica `extensions`)
+
+        Returns:
+            Estado de la petición que llena el trace (espera por conexión y
+            si ocupa una conexión)
+        """
+        inicio = time.perf_counter()
+        peticion: Dict[str, Any] = {"espera": None, "en_uso": False}
+        conexion: Dict[str, bool] = {"cerrada": False}
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            es_de_conexion = event_name.startswith("connection.")
+            if peticion["espera"] is None:
+                peticion["espera"] = time.perf_counter() - inicio
+                if not es_de_conexion:
+                    self.connections_reused += 1
+            if not es_de_conexion and not peticion["en_uso"]:
+                peticion["en_uso"] = True
+                self.in_use += 1
+            if event_name == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+            if event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                self._contar_cierre(info.get("return_value"), conexion)
+
+        extensions = kwargs.pop("extensions", None) or {}
+        kwargs["extensions"] = {**extensions, "trace": trace}
+        return peticion
+
+    def _contar_cierre(self, stream, conexion: Dict[str, bool]):
+        """
+        Cuenta el cierre de una conexión nueva
+
+        httpcore no reporta el cierre en el trace de ninguna petición (el pool
+        cierra las conexiones vencidas por fuera de ellas), así que se envuelve
+        el aclose() del stream de red que entrega el trace. Con TLS se
+        envuelven el stream TCP y el cifrado; `conexion` evita contar dos veces.
+        """
+        if stream is None:
+            return
+        aclose = stream.aclose
+
+        async def aclose_contado():
+            if not conexion["cerrada"]:
+                conexion["cerrada"] = True
+                self.connections_closed += 1
+            await aclose()
+
+        stream.aclose = aclose_contado
+
+    def _finalizar(self, peticion: Dict[str, Any]):
+        """Libera la conexión de una petición terminada y registra su espera."""
+        if peticion["en_uso"]:
+            self.in_use -= 1
+        espera = peticion["espera"]
+        if espera is not None:
+            self.total_wait += espera
+            self.max_wait = max(self.max_wait, espera)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas del pool
+
+        Returns:
+            Peticiones en vuelo, conexiones abiertas, cerradas, reutilizadas,
+            en uso e inactivas, errores y tiempo de espera por conexión.
+            `idle` (abiertas - cerradas - en uso) es exacto con HTTP/1.1; con
+            HTTP/2 varias peticiones comparten conexión y es una cota inferior
+        """
+        abiertas = self.connections_opened - self.connections_closed
+        return {
+            "started": self._client is not None,
+            "http2": self.http2,
+            "in_flight": self.in_flight,
+            "in_use": self.in_use,
+            "idle": max(abiertas - self.in_use, 0),
+            "connections_opened": self.connections_opened,
+            "connections_closed": self.connections_closed,
+            "connections_reused": self.connections_reused,
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_wait_ms": round(self.total_wait / self.requests * 1000, 3) if self.requests else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3)
+        }
@@ -6,6 +6,7 @@ from typing import List, Optional, Dict, Any
 import logging
 
 from app.config import settings
+from app.core.http_pool import PooledHttpClient
 from app.models.rasa import RasaRequest, RasaResponseItem, RasaTrackerResponse
 
 logger = logging.getLogger(__name__)
@@ -19,6 +20,19 @@ class RasaClient:
         self.webhook_url = f"{self.base_url}{settings.rasa_webhook_path}"
         self.tracker_url = f"{self.base_url}{settings.rasa_tracker_path}"
         self.timeout = settings.rasa_timeout
+        self.http = PooledHttpClient("RASA", timeout=self.timeout)
+
+    async def start(self):
+        """Abre el pool de conexiones persistente"""
+        await self.http.start()
+
+    async def close(self):
+        """Cierra el pool de conexiones"""
+        await self.http.close()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Estadísticas del pool de conexiones hacia RASA"""
+        return self.http.stats()
 
     async def send_message(
         self,
@@ -48,22 +62,21 @@ class RasaClient:
             logger.info(f"Enviando mensaje a RASA: sender={sender_id}, message={message}")
 
             # Realizar petición HTTP a RASA
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.webhook_url,
-                    json=rasa_request.model_dump()
-                )
-                response.raise_for_status()
-
-                # Parsear respuesta
-                rasa_responses = response.json()
-                logger.info(f"Respuesta de RASA: {len(rasa_responses)} mensajes")
-
-                # Convertir a modelos Pydantic
-                return [
-                    RasaResponseItem(**item)
-                    for item in rasa_responses
-                ]
+            response = await self.http.post(
+                self.webhook_url,
+                json=rasa_request.model_dump()
+            )
+            response.raise_for_status()
+
+            # Parsear respuesta
+            rasa_responses = response.json()
+            logger.info(f"Respuesta de RASA: {len(rasa_responses)} mensajes")
+
+            # Convertir a modelos Pydantic
+            return [
+                RasaResponseItem(**item)
+                for item in rasa_responses
+            ]
 
         except httpx.HTTPError as e:
             logger.error(f"Error HTTP al comunicarse con RASA: {e}")
@@ -87,12 +100,11 @@ class RasaClient:
 
             logger.info(f"Obteniendo tracker para: {sender_id}")
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(tracker_endpoint)
-                response.raise_for_status()
+            response = await self.http.get(tracker_endpoint)
+            response.raise_for_status()
 
-                tracker_data = response.json()
-                return RasaTrackerResponse(**tracker_data)
+            tracker_data = response.json()
+            return RasaTrackerResponse(**tracker_data)
 
         except httpx.HTTPError as e:
             logger.error(f"Error al obtener tracker: {e}")
@@ -121,15 +133,14 @@ class RasaClient:
                 "event": "restart"
             }
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    tracker_endpoint,
-                    json=reset_event
-                )
-                response.raise_for_status()
+            response = await self.http.post(
+                tracker_endpoint,
+                json=reset_event
+            )
+            response.raise_for_status()
 
-                logger.info(f"Conversación reiniciada para: {sender_id}")
-                return True
+            logger.info(f"Conversación reiniciada para: {sender_id}")
+            return True
 
         except httpx.HTTPError as e:
             logger.error(f"Error al reiniciar conversación: {e}")
@@ -148,10 +159,9 @@ class RasaClient:
         try:
             health_endpoint = f"{self.base_url}/status"
 
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.get(health_endpoint)
-                response.raise_for_status()
-                return True
+            response = await self.http.get(health_endpoint, timeout=5)
+            response.raise_for_status()
+            return True
 
         except Exception as e:
             logger.error(f"RASA no está disponible: {e}")
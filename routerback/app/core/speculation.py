@@ -0,0 +1,192 @@
+"""
+Despacho especulativo de BackRag en paralelo con RASA
+"""
+import re
+import time
+import logging
+import unicodedata
+from collections import OrderedDict, deque
+from typing import Any, Dict
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Términos que suelen indicar una consulta normativa que RASA termina
+# derivando al RAG (nlu_fallback / consulta_codigo_transito)
+TERMINOS_NORMATIVOS = {
+    "articulo", "ley", "codigo", "norma", "decreto", "sancion", "multa",
+    "infraccion", "permitido", "prohibido", "obligatorio", "requisito",
+    "velocidad", "licencia", "soat", "tecnomecanica", "inmovilizacion",
+    "comparendo", "embriaguez", "alcoholemia", "casco", "cinturon",
+    "pico", "placa", "parqueo", "estacionar", "peaton", "ciclista"
+}
+
+# Mensajes conversacionales que RASA resuelve sin ayuda
+MENSAJES_TRIVIALES = {
+    "hola", "buenas", "buenos dias", "buenas tardes", "buenas noches",
+    "gracias", "muchas gracias", "si", "no", "ok", "vale", "chao", "adios"
+}
+
+PALABRAS_PREGUNTA = ("que", "cual", "cuales", "cuanto", "cuando", "como", "donde", "puedo", "debo")
+
+
+def _normalizar(texto: str) -> str:
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9\s]", " ", texto).strip()
+
+
+class SpeculationPolicy:
+    """
+    Decide si lanzar BackRag en paralelo con RASA y lleva las métricas.
+
+    La decisión combina un clasificador local barato (términos normativos,
+    forma de pregunta, longitud) con la tasa reciente de fallback del
+    usuario.
+    """
+
+    def __init__(self):
+        self.threshold = settings.speculative_rag_threshold
+        self.history_size = settings.speculative_history_size
+        self.max_senders = settings.speculative_max_senders
+        self._history: "OrderedDict[str, deque]" = OrderedDict()
+
+        # Métricas
+        self.considered = 0
+        self.speculated = 0
+        self.used = 0
+        self.wasted = 0
+        self.missed = 0
+        self.saved_ms = 0.0
+        # Costo de las especulaciones desperdiciadas
+        self.wasted_ms = 0.0
+        self.wasted_completed = 0
+
+    def score(self, sender_id: str, message: str) -> float:
+        """
+        Probabilidad aproximada de que el mensaje termine en fallback
+
+        Args:
+            sender_id: ID del usuario
+            message: Mensaje del usuario
+
+        Returns:
+            Puntaje entre 0 y 1
+        """
+        texto = _normalizar(message)
+        if not texto or texto in MENSAJES_TRIVIALES:
+            return 0.0
+
+        palabras = texto.split()
+        puntaje = 0.0
+
+        if any(palabra in TERMINOS_NORMATIVOS for palabra in palabras):
+            puntaje += 0.4
+        if "?" in message or palabras[0] in PALABRAS_PREGUNTA:
+            puntaje += 0.1
+        if len(palabras) >= 8:
+            puntaje += 0.1
+
+        historial = self._history.get(sender_id)
+        if historial:
+            puntaje += 0.5 * (sum(historial) / len(historial))
+
+        return min(puntaje, 1.0)
+
+    def should_speculate(self, sender_id: str, message: str) -> bool:
+        """Indica si conviene lanzar BackRag antes de conocer la respuesta de RASA"""
+        if not settings.speculative_rag_enabled:
+            return False
+
+        self.considered += 1
+        speculate = self.score(sender_id, message) >= self.threshold
+        if speculate:
+            self.speculated += 1
+        return speculate
+
+    def record(
+        self,
+        sender_id: str,
+        fell_back: bool,
+        speculated: bool,
+        saved_seconds: float = 0.0,
+        wasted_seconds: float = 0.0,
+        wasted_completed: bool = False
+    ):
+        """
+        Registra el resultado de un turno
+
+        Args:
+            sender_id: ID del usuario
+            fell_back: Si el turno terminó usando BackRag
+            speculated: Si se lanzó BackRag especulativamente
+            saved_seconds: Latencia ahorrada al solapar BackRag con RASA
+            wasted_seconds: Tiempo que BackRag trabajó en una especulación descartada
+            wasted_completed: Si la especulación descartada ya había terminado
+                (BackRag pagó la llamada al LLM completa)
+        """
+        if speculated and fell_back:
+            self.used += 1
+            self.saved_ms += saved_seconds * 1000
+        elif speculated:
+            self.wasted += 1
+            self.wasted_ms += wasted_seconds * 1000
+            if wasted_completed:
+                self.wasted_completed += 1
+        elif fell_back and settings.speculative_rag_enabled:
+            self.missed += 1
+
+        historial = self._history.pop(sender_id, None) or deque(maxlen=self.history_size)
+        historial.append(1 if fell_back else 0)
+        self._history[sender_id] = historial
+        while len(self._history) > self.max_senders:
+            self._history.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas de especulación
+
+        Returns:
+            Turnos considerados, especulados, aprovechados, desperdiciados,
+            fallbacks no anticipados, tiempo ahorrado y costo de las
+            especulaciones desperdiciadas (tiempo de BackRag y cuántas
+            alcanzaron a completarse antes de cancelarse)
+        """
+        return {
+            "enabled": settings.speculative_rag_enabled,
+            "threshold": self.threshold,
+            "considered": self.considered,
+            "speculated": self.speculated,
+            "used": self.used,
+            "wasted": self.wasted,
+            "missed": self.missed,
+            "saved_ms_total": round(self.saved_ms, 1),
+            "saved_ms_avg": round(self.saved_ms / self.used, 1) if self.used else 0.0,
+            "wasted_ms_total": round(self.wasted_ms, 1),
+            "wasted_ms_avg": round(self.wasted_ms / self.wasted, 1) if self.wasted else 0.0,
+            "wasted_completed": self.wasted_completed,
+            "precision": round(self.used / self.speculated, 3) if self.speculated else 0.0
+        }
+
+
+class TimedTask:
+    """Mide cuánto tarda una corrutina lanzada en segundo plano"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+
+    async def run(self, coro):
+        try:
+            return await coro
+        finally:
+            self.finished = time.perf_counter()
+
+    def elapsed(self, until: float) -> float:
+        """Segundos que corrió la tarea hasta `until` (o hasta que terminó, si fue antes)"""
+        return min(until, self.finished or until) - self.started
+
+
+# Instancia global de la política
+speculation_policy = SpeculationPolicy()
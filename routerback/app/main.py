@@ -1,12 +1,15 @@
 """
 FastAPI Orchestrator - Capa de orquestación entre UI y RASA
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from app.config import settings
 from app.api.v1.endpoints import chat, health
+from app.core.rasa_client import rasa_client
+from app.core.backrag_client import backrag_client
 
 # Configurar logging
 logging.basicConfig(
@@ -16,13 +19,31 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ciclo de vida: abre y cierra los pools HTTP hacia RASA y BackRag"""
+    logger.info(f"Iniciando {settings.app_name}")
+    logger.info(f"RASA URL: {settings.rasa_url}")
+    await rasa_client.start()
+    await backrag_client.start()
+    logger.info(f"Documentación disponible en: http://{settings.host}:{settings.port}/docs")
+
+    yield
+
+    logger.info(f"Deteniendo {settings.app_name}")
+    await rasa_client.close()
+    await backrag_client.close()
+
+
 # Crear aplicación FastAPI
 app = FastAPI(
     title=settings.app_name,
     description="Capa de orquestación para comunicación con RASA",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -47,20 +68,6 @@ app.include_router(
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Evento al iniciar la aplicación"""
-    logger.info(f"Iniciando {settings.app_name}")
-    logger.info(f"RASA URL: {settings.rasa_url}")
-    logger.info(f"Documentación disponible en: http://{settings.host}:{settings.port}/docs")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Evento al detener la aplicación"""
-    logger.info(f"Deteniendo {settings.app_name}")
-
-
 if __name__ == "__main__":
     import uvicorn
 